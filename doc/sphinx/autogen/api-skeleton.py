@@ -47,13 +47,15 @@ CALLS=[{
     "query_opts":{
         'fullname':'The full name of the account to search for',
         'contact_email':'The contact email of the account to search for',
+        'offset':'See :ref:`query-operators`',
+        'limit':'See :ref:`query-operators`',
         },
     "data_fields":{
         },
     "description":"Search for accounts by name or email.",
     "return_desc":":http:statuscode:`200` with information about matching accounts, or :http:statuscode:`400` if no search parameters are passed.",
     "return_ex":'''
-<Accounts>
+<Accounts total_account_count="1">
   <Account id="joeuser@indivo.example.org">
     <fullName>Joe User</fullName>
     <contactEmail>joeuser@gmail.com</contactEmail>
@@ -74,7 +76,7 @@ CALLS=[{
 ''',
     "deprecated": None,
     "added": None,
-    "changed": None,
+    "changed": ('2.1.0', 'Results are now ranked, and paged with offset and limit (100 by default)'),
 
 },
 {
@@ -592,7 +594,7 @@ Preferences format is defined by the app setting the preferences, and will there
 ''',
     "deprecated": None,
     "added": None,
-    "changed": None,
+    "changed": ('2.1.0', 'Listing notifications now zeroes the unread notification count in the account summary'),
 
 },
 {
@@ -763,6 +765,55 @@ Preferences format is defined by the app setting the preferences, and will there
     "added": None,
     "changed": None,
 
+},
+{
+    "method":"GET",
+    "path":"/accounts/{ACCOUNT_EMAIL}/summary",
+    "view_func_name":"account_summary",
+    "access_doc":"Any admin app, or the Account owner.",
+    "url_params":{
+        'ACCOUNT_EMAIL':'The email identifier of the Indivo account',
+        },
+    "query_opts":{
+        },
+    "data_fields":{
+        },
+    "description":"Everything a portal's landing page shows about an account, in one call.",
+    "return_desc":":http:statuscode:`200` with the account's records (with its role, and their carenets and enabled apps) and unread message and notification counts, as JSON.",
+    "return_ex":'''
+{
+  "id": "joeuser@indivo.example.org",
+  "full_name": "Joe User",
+  "unread_messages": 2,
+  "unread_notifications": 0,
+  "records": [
+    {
+      "id": "123",
+      "label": "Joe User",
+      "role": "owner",
+      "carenets": [{"id": "456", "name": "Family"}, {"id": "789", "name": "Physicians"}],
+      "apps": [
+        {
+          "name" : "SMART Problems",
+          "id" : "problem-list@apps.smartplatforms.org",
+          ...
+        }
+      ]
+    },
+    {
+      "id": "234",
+      "label": "Jane User",
+      "role": "carenet",
+      "carenet": {"id": "567", "name": "Family", "can_write": false},
+      "apps": []
+    }
+  ]
+}
+''',
+    "deprecated": None,
+    "added": ('2.1.0', ''),
+    "changed": None,
+
 },
 {
     "method":"GET",
@@ -849,7 +900,7 @@ Preferences format is defined by the app setting the preferences, and will there
 ''',
     "deprecated": None,
     "added": ('2.0.0', ''),
-    "changed": None,
+    "changed": ('2.1.0', 'Responses carry an ETag, and requests with a matching If-None-Match get a 304'),
 
 },
 {
@@ -964,7 +1015,7 @@ Preferences format is defined by the app setting the preferences, and will there
 ''',
     "deprecated": None,
     "added": None,
-    "changed": None,
+    "changed": ('2.1.0', 'Responses carry an ETag, and requests with a matching If-None-Match get a 304'),
 
 },
 {
@@ -1083,7 +1134,7 @@ Preferences format is defined by the app setting the preferences, and will there
 ''',
     "deprecated": None,
     "added": None,
-    "changed": None,
+    "changed": ('2.1.0', 'Responses carry an ETag, and requests with a matching If-None-Match get a 304'),
 
 },
 {
@@ -1132,7 +1183,7 @@ Preferences format is defined by the app setting the preferences, and will there
 ''',
     "deprecated": None,
     "added": None,
-    "changed": None,
+    "changed": ('2.1.0', 'Responses carry an ETag, and requests with a matching If-None-Match get a 304'),
 
 },
 {
@@ -1254,7 +1305,7 @@ Preferences format is defined by the app setting the preferences, and will there
 ''',
     "deprecated": None,
     "added": None,
-    "changed": None,
+    "changed": ('2.1.0', 'Responses carry an ETag, and requests with a matching If-None-Match get a 304'),
 
 },
 {
@@ -1294,7 +1345,7 @@ Preferences format is defined by the app setting the preferences, and will there
 ''',
     "deprecated": None,
     "added": ('2.0.0', ''),
-    "changed": None,
+    "changed": ('2.1.0', 'Responses carry an ETag, and requests with a matching If-None-Match get a 304'),
 
 },
 {
@@ -1312,7 +1363,7 @@ Preferences format is defined by the app setting the preferences, and will there
     "description":"Return a list of all records that have this pha enabled.",
     "return_desc":":http:statuscode:`200` with a list of records on success.",
     "return_ex":'''
-<Records>
+<Records total_record_count="2">
   <Record id="123" label="John R. Smith" />
   <Record id = "234" label="Frank Frankson" />
 
@@ -1829,7 +1880,7 @@ application/json:
 ''',
     "deprecated": None,
     "added": None,
-    "changed": None,
+    "changed": ('2.1.0', 'Responses carry an ETag, and requests with a matching If-None-Match get a 304'),
 
 },
 {
@@ -1873,7 +1924,7 @@ application/json:
 ''',
     "deprecated": None,
     "added": None,
-    "changed": None,
+    "changed": ('2.1.0', 'Responses carry an ETag, and requests with a matching If-None-Match get a 304'),
 
 },
 {
@@ -2296,7 +2347,7 @@ SDMX Example:
 ''',
     "deprecated": None,
     "added": None,
-    "changed": None,
+    "changed": ('2.1.0', 'Responses carry an ETag, and requests with a matching If-None-Match get a 304'),
 
 },
 {
@@ -2348,6 +2399,37 @@ SDMX Example:
     "added": None,
     "changed": None,
 
+},
+{
+    "method":"GET",
+    "path":"/metrics",
+    "view_func_name":"get_metrics",
+    "access_doc":"Any admin app.",
+    "url_params":{
+        },
+    "query_opts":{
+        },
+    "data_fields":{
+        },
+    "description":"Return request, ingest, cache and database metrics, in the Prometheus text format.",
+    "return_desc":":http:statuscode:`200` with the metrics.",
+    "return_ex":'''
+# HELP indivo_request_duration_seconds Time to handle each request, in seconds, by view.
+# TYPE indivo_request_duration_seconds histogram
+indivo_request_duration_seconds_bucket{view="record",le="0.005"} 0
+indivo_request_duration_seconds_bucket{view="record",le="0.01"} 3
+...
+indivo_request_duration_seconds_bucket{view="record",le="+Inf"} 12
+indivo_request_duration_seconds_sum{view="record"} 0.1932
+indivo_request_duration_seconds_count{view="record"} 12
+# HELP indivo_requests_total Requests handled, by view.
+# TYPE indivo_requests_total counter
+indivo_requests_total{view="record"} 12
+''',
+    "deprecated": None,
+    "added": ('2.1.0', ''),
+    "changed": None,
+
 },
 {
     "method":"POST",
@@ -2552,6 +2634,38 @@ see http://sandbox-api.smartplatforms.org/ontology
 ''',
     "deprecated": None,
     "added": ('2.0.0', ''),
+    "changed": ('2.1.0', 'Served from a copy that ships with Indivo, with an ETag and caching headers'),
+
+},
+{
+    "method":"GET",
+    "path":"/population/{DATA_MODEL}/",
+    "view_func_name":"population_list",
+    "access_doc":"Any admin app (but not Indivo UI apps).",
+    "url_params":{
+        'DATA_MODEL':'The data model to aggregate, e.g. LabResult',
+        },
+    "query_opts":{
+        'record_id':'Only aggregate over these records (ids separated by ``|``). Defaults to all records',
+        'timeout':'Give up after this many seconds. Defaults to (and may not exceed) the server\'s limit',
+        'response_format':'The format for the response. Must be application/json (the default) or application/xml',
+        '{FIELD}':'See :ref:`query-operators`, :ref:`valid-query-fields`',
+        'aggregate_by':'See :ref:`query-operators`. Required',
+        'date_range':'See :ref:`query-operators`',
+        'date_group':'See :ref:`query-operators`',
+        'group_by':'See :ref:`query-operators`',
+        'limit':'See :ref:`query-operators`. Defaults to every group',
+        'offset':'See :ref:`query-operators`',
+        },
+    "data_fields":{
+        },
+    "description":"Aggregate the Model data across all records, or across a list of records.",
+    "return_desc":":http:statuscode:`200` with a list of AggregateReports on success, :http:statuscode:`400` if any invalid query parameters were passed or there was no aggregate_by, or :http:statuscode:`503` if the query took longer than its time limit.",
+    "return_ex":'''
+[{"__modelname__": "AggregateReport", "value": 1242, "group": "2011-05"}, {"__modelname__": "AggregateReport", "value": 1310, "group": "2011-06"}]
+''',
+    "deprecated": None,
+    "added": ('2.1.0', ''),
     "changed": None,
 
 },
@@ -2614,13 +2728,15 @@ see http://sandbox-api.smartplatforms.org/ontology
         },
     "query_opts":{
         'label':'A search string to match against record labels.',
+        'offset':'See :ref:`query-operators`',
+        'limit':'See :ref:`query-operators`',
         },
     "data_fields":{
         },
     "description":"Search for records by label (usually the same as full name).",
     "return_desc":":http:statuscode:`200` with a list of matching records on success, :http:statuscode:`400` if no query parameters were passed.",
     "return_ex":'''
-<Records>
+<Records total_record_count="2">
   <Record id="123" label="John R. Smith" />
   <Record id = "234" label="Frank Frankson" />
 
@@ -2630,7 +2746,7 @@ see http://sandbox-api.smartplatforms.org/ontology
 ''',
     "deprecated": None,
     "added": ('1.0.1', ''),
-    "changed": None,
+    "changed": ('2.1.0', 'Results are now ranked, and paged with offset and limit (100 by default)'),
 
 },
 {
@@ -2797,7 +2913,7 @@ see http://sandbox-api.smartplatforms.org/ontology
 ''',
     "deprecated": None,
     "added": ('2.0.0', ''),
-    "changed": None,
+    "changed": ('2.1.0', 'Responses carry an ETag, and requests with a matching If-None-Match get a 304'),
 
 },
 {
@@ -2882,7 +2998,7 @@ xmlns:sp="http://smartplatforms.org/terms#"
 ''',
     "deprecated": None,
     "added": ('2.1.0', ''),
-    "changed": None,
+    "changed": ('2.1.0', 'Responses carry an ETag, and requests with a matching If-None-Match get a 304'),
 
 },
 {
@@ -3069,7 +3185,7 @@ xmlns:sp="http://smartplatforms.org/terms#"
 ''',
     "deprecated": None,
     "added": None,
-    "changed": None,
+    "changed": ('2.1.0', 'Responses carry an ETag, and requests with a matching If-None-Match get a 304'),
 
 },
 {
@@ -3220,7 +3336,7 @@ xmlns:sp="http://smartplatforms.org/terms#"
 ''',
     "deprecated": None,
     "added": None,
-    "changed": None,
+    "changed": ('2.1.0', 'Responses carry an ETag, and requests with a matching If-None-Match get a 304'),
 
 },
 {
@@ -3271,7 +3387,7 @@ xmlns:sp="http://smartplatforms.org/terms#"
 ''',
     "deprecated": None,
     "added": None,
-    "changed": None,
+    "changed": ('2.1.0', 'Responses carry an ETag, and requests with a matching If-None-Match get a 304'),
 
 },
 {
@@ -3362,7 +3478,7 @@ xmlns:sp="http://smartplatforms.org/terms#"
 ''',
     "deprecated": None,
     "added": None,
-    "changed": None,
+    "changed": ('2.1.0', 'Responses carry an ETag, and requests with a matching If-None-Match get a 304'),
 
 },
 {
@@ -3991,7 +4107,7 @@ application/json:
 ''',
     "deprecated": None,
     "added": None,
-    "changed": None,
+    "changed": ('2.1.0', 'Responses carry an ETag, and requests with a matching If-None-Match get a 304'),
 
 },
 {
@@ -4172,7 +4288,7 @@ application/json:
 ''',
     "deprecated": None,
     "added": None,
-    "changed": None,
+    "changed": ('2.1.0', 'Responses carry an ETag, and requests with a matching If-None-Match get a 304'),
 
 },
 {
@@ -4220,7 +4336,7 @@ application/json:
 ''',
     "deprecated": None,
     "added": None,
-    "changed": None,
+    "changed": ('2.1.0', 'Responses carry an ETag, and requests with a matching If-None-Match get a 304'),
 
 },
 {
@@ -4409,7 +4525,7 @@ application/json:
 ''',
     "deprecated": None,
     "added": None,
-    "changed": None,
+    "changed": ('2.1.0', 'Responses carry an ETag, and requests with a matching If-None-Match get a 304'),
 
 },
 {
@@ -4480,6 +4596,57 @@ application/json:
     "added": None,
     "changed": None,
 
+},
+{
+    "method":"GET",
+    "path":"/records/{RECORD_ID}/documents/{DOCUMENT_ID}/related/",
+    "view_func_name":"get_related_documents",
+    "access_doc":"A user app with access to the record, or a principal in full control of the record",
+    "url_params":{
+        'RECORD_ID':'The id string associated with the Indivo record',
+        'DOCUMENT_ID':'The unique identifier of the Indivo document',
+        },
+    "query_opts":{
+        'rel':'Only follow relationships of this type, i.e. ``annotation``. May be passed more than once',
+        'max_depth':'Stop after following this many relationships. Defaults to (and may not exceed) the server\'s limit',
+        'cursor':'Continue listing after the previous page: its ``next_cursor``',
+        'status':'The document status to filter by.',
+        'limit':'See :ref:`query-operators`',
+        },
+    "data_fields":{
+        },
+    "description":"Get all documents reachable from the passed document_id by following relationships, level by level.",
+    "return_desc":":http:statuscode:`200` with a list of related documents and their depths, :http:statuscode:`400` if ``rel``, ``max_depth`` or ``cursor`` are invalid, or :http:statuscode:`404` if ``DOCUMENT_ID`` is invalid.",
+    "return_ex":'''
+<RelatedDocuments record_id="123" document_id="14c81023-c84f-496d-8b8e-9438280441d3" max_depth="10" total_document_count="3" next_cursor="1:2a3c3e01-88b0-4c7b-9a07-25bcf2b1a3d4">
+  <Levels>
+    <Level depth="1" count="2" />
+    <Level depth="2" count="1" />
+  </Levels>
+  <RelatedDocument depth="1">
+    <Document id="2a3c3e01-88b0-4c7b-9a07-25bcf2b1a3d4" type="" digest="7e9bc09276e0829374fd810f96ed98d544649703db3a9bc231550a0b0e5bcb1c" size="77" record_id="123">
+      <createdAt>2009-05-04T17:05:33</createdAt>
+      <creator id="steve@indivo.org" type="account">
+        <fullname>Steve Zabak</fullname>
+      </creator>
+      <original id="2a3c3e01-88b0-4c7b-9a07-25bcf2b1a3d4" />
+      <latest id="2a3c3e01-88b0-4c7b-9a07-25bcf2b1a3d4" createdAt="2009-05-04T17:05:33" createdBy="steve@indivo.org" />
+      <status>active</status>
+      <nevershare>false</nevershare>
+      <relatesTo>
+        <relation type="http://indivo.org/vocab/documentrels#interpretation" count="1" />
+      </relatesTo>
+      <isRelatedFrom>
+        <relation type="http://indivo.org/vocab/documentrels#annotation" count="1" />
+      </isRelatedFrom>
+    </Document>
+  </RelatedDocument>
+</RelatedDocuments>
+''',
+    "deprecated": None,
+    "added": ('2.1.0', ''),
+    "changed": None,
+
 },
 {
     "method":"GET",
@@ -4838,6 +5005,33 @@ application/json:
     "added": None,
     "changed": None,
 
+},
+{
+    "method":"GET",
+    "path":"/records/{RECORD_ID}/export",
+    "view_func_name":"record_export",
+    "access_doc":"The owner of the record, or any admin app.",
+    "url_params":{
+        'RECORD_ID':'The id string associated with the Indivo record',
+        },
+    "query_opts":{
+        'format':'``ndjson`` (the default) for one JSON object per line, or ``zip`` for a zip archive with the document bodies as separate files',
+        'facts':'``true`` to include the facts extracted from the documents',
+        },
+    "data_fields":{
+        },
+    "description":"Export a whole record: its documents (with all versions), metadata, relationships and facts.",
+    "return_desc":":http:statuscode:`200` with the export on success, :http:statuscode:`400` if *format* is invalid.",
+    "return_ex":'''
+{"type": "record", "id": "123", "label": "Joe Smith", "owner": "joeuser@indivo.example.org", ...}
+{"type": "document", "id": "456", "fqn": "http://indivo.org/vocab/xml/documents#Medication", "content": "<Medication ...", ...}
+{"type": "relationship", "relationship": "http://indivo.org/vocab/documentrels#annotation", "document_id": "456", "related_document_id": "789"}
+{"type": "fact", "__modelname__": "Medication", "__documentid__": "456", "id": "abc", ...}
+''',
+    "deprecated": None,
+    "added": ('2.1.0', ''),
+    "changed": None,
+
 },
 {
     "method":"POST",
@@ -5534,7 +5728,7 @@ SDMX Example:
 ''',
     "deprecated": None,
     "added": None,
-    "changed": None,
+    "changed": ('2.1.0', 'Responses carry an ETag, and requests with a matching If-None-Match get a 304'),
 
 },
 {
@@ -5797,7 +5991,7 @@ SDMX Example:
 ''',
     "deprecated": None,
     "added": ('2.0.0', ''),
-    "changed": None,
+    "changed": ('2.1.0', 'Responses carry an ETag, and requests with a matching If-None-Match get a 304'),
 
 },
 {
@@ -5949,7 +6143,7 @@ xmlns:v="http://www.w3.org/2006/vcard/ns#"
 ''',
     "deprecated": None,
     "added": ('2.1.0', ''),
-    "changed": None,
+    "changed": ('2.1.0', 'Responses carry an ETag, and requests with a matching If-None-Match get a 304'),
 
 },
 {
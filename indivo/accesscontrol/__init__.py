@@ -57,6 +57,7 @@ def load_access_rules():
   views = [account_info,
            account_info_set,
            account_username_set,
+           account_summary,
            record_list,]
   AccessRule('Account Management Owner', account_management_owner, views)
 
@@ -115,6 +116,13 @@ def load_access_rules():
   AccessRule('Account Management By Ext Id', 
              account_management_by_ext_id, views)
 
+  def admin_app_only(principal, **unused_args):
+    """Any admin app (but not Indivo UI apps)."""
+    return principal.isType('admin')
+  views = [get_metrics,
+           population_list]
+  AccessRule('Admin App Only', admin_app_only, views)
+
   def chrome_app_priveleges(principal, **unused_args):
     """Any Indivo UI app."""
     return principal.isType('chrome')
@@ -234,7 +242,8 @@ def load_access_rules():
   # Decision: PHAs shouldn't be allowed to manipulate sharing, at least not yet.
   views = [record_shares,
            record_share_add,
-           record_share_delete]
+           record_share_delete,
+           record_export]
   AccessRule('Record Full Admin', record_full_admin, views)
 
   # WHY CAN'T ACCOUNTS DO THIS?
@@ -292,6 +301,7 @@ def load_access_rules():
            document_versions,
            document_create_by_rel,
            get_documents_by_rel,
+           get_related_documents,
            document_set_status,
            document_status_history,
            document_rels,
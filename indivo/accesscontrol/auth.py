@@ -27,7 +27,7 @@ def authenticate(request, username, password=None, system=None):
         raise PermissionDenied()
     elif system:
       user = models.AccountAuthSystem.objects.get( 
-          auth_system = models.AuthSystem.objects.get(short_name=system), 
+          auth_system = models.AuthSystem.cached.get(system), 
           username    = urllib.unquote(username).lower().strip()).account
       if user.is_active:
         return user
@@ -10,6 +10,8 @@ from indivo import models
 
 import datetime, logging
 
+# Relations walked by access control and auditing for every request made with an access token
+ACCESS_TOKEN_RELATED = ('share', 'share__record', 'share__record__owner', 'share__with_pha', 'account', 'carenet')
 
 class UserDataStore(oauth.OAuthStore):
   """
@@ -28,7 +30,7 @@ class UserDataStore(oauth.OAuthStore):
     if pha: kwargs['share__with_pha'] = pha
 
     try:
-      return models.AccessToken.objects.get(**kwargs)
+      return models.AccessToken.objects.select_related(*ACCESS_TOKEN_RELATED).get(**kwargs)
     except models.AccessToken.DoesNotExist:
       return None
     
@@ -261,7 +263,7 @@ class SessionDataStore(oauth.OAuthStore):
 
   def _get_token(self, token_str, type=None, pha=None):
     try:
-      return models.SessionToken.objects.get(token = token_str)
+      return models.SessionToken.objects.select_related('user').get(token = token_str)
     except models.SessionToken.DoesNotExist:
       return None
 
@@ -350,7 +352,7 @@ class ConnectAuthDataStore(SessionDataStore):
 
   def _get_token(self, token_str, type=None, pha=None):
     try:
-      return models.AccessToken.objects.get(token=token_str, connect_auth_p=True)
+      return models.AccessToken.objects.select_related(*ACCESS_TOKEN_RELATED).get(token=token_str, connect_auth_p=True)
     except models.AccessToken.DoesNotExist:
       return None
 
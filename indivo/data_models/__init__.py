@@ -8,6 +8,7 @@ from django.db import models
 
 from indivo.models import Fact
 from indivo.lib import simpledatamodel
+from indivo.lib.registry_manifest import get_manifest, walk
 from options import DataModelOptions
 
 MODULE_NAME = 'model'
@@ -22,7 +23,7 @@ MODEL_MODULES = {
 # Utilities to discover and load data models
 def load_data_models(from_dir, target_module):
     """ Load all datamodels under *directory* into *module*. """
-    loader = IndivoDataModelLoader(from_dir)
+    loader = IndivoDataModelLoader(from_dir, manifest=get_manifest())
     loader.import_data_models(target_module)
     
 def attach_filter_fields(cls):
@@ -44,8 +45,9 @@ def attach_filter_fields(cls):
     
 class IndivoDataModelLoader(object):
     
-    def __init__(self, top):
+    def __init__(self, top, manifest=None):
         self.top = top
+        self.manifest = manifest
 
     def import_data_models(self, target_module):
         for model_name, model_class in self.discover_data_models():
@@ -109,22 +111,44 @@ class IndivoDataModelLoader(object):
 
         """
 
-        for (dirpath, dirnames, filenames) in os.walk(self.top):
+        for dirpath, fileroot, ext in self.find_model_dirs():
+            # Handle models based on their definition type
+            if ext == '.py':
+                handler_func = self._discover_python_data_models
+            elif ext == '.sdml':
+                handler_func = self._discover_sdml_data_models
+
+            for name, cls in handler_func(dirpath, fileroot, ext):
+                attach_filter_fields(cls)
+                self.process_data_model_extras(dirpath, cls)
+                yield (name, cls)
+
+    def find_model_dirs(self):
+        """ The datamodel directories below *top*, as a list of (dir_path, fileroot, ext) tuples.
+
+        Read from the registry manifest, if we have one and it is up to date,
+        and saved to it otherwise.
+
+        """
+
+        key = 'data_models:%s' % self.top
+        if self.manifest:
+            found = self.manifest.get(key)
+            if found is not None:
+                return [(dirpath, str(fileroot), str(ext)) for dirpath, fileroot, ext in found]
+
+        found = []
+        walked, dirs = walk(self.top)
+        for (dirpath, dirnames, filenames) in walked:
             valid_p, fileroot, ext = self.detect_model_dir(dirpath)
             if valid_p:
-                dirnames = [] # we found a datamodel: don't look in subdirectories for others
-
-                # Handle models based on their definition type
-                if ext == '.py':
-                    handler_func = self._discover_python_data_models
-                elif ext == '.sdml':
-                    handler_func = self._discover_sdml_data_models
-
-                for name, cls in handler_func(dirpath, fileroot, ext):
-                    attach_filter_fields(cls)
-                    self.process_data_model_extras(dirpath, cls)
-                    yield (name, cls)
-                
+                found.append((dirpath, fileroot, ext))
+
+        if self.manifest:
+            self.manifest.put(key, found, dirs)
+            self.manifest.save()
+        return found
+
     def _discover_python_data_models(self, dirpath, fileroot, ext):
         """ Imports a python module and extracts all Indivo Fact subclasses."""
         
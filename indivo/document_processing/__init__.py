@@ -3,8 +3,11 @@
 from django.conf import settings
 import sys, os
 import functools, inspect
+import threading
+from StringIO import StringIO
 from lxml import etree
 from transform import BaseTransform
+from indivo.lib.registry_manifest import get_manifest, walk
 
 REGISTERED_SCHEMAS = {}
 
@@ -56,10 +59,79 @@ class IndivoSchemaDir(object):
         except TypeError:
             return None
 
+class LazyCompiled(object):
+    """ An XSD or XSLT file, compiled the first time it is used in each thread, rather than at startup.
+
+    lxml's compiled XSLTs and schemas aren't safe to use from several threads
+    at once, so each thread compiles (and keeps) its own, from a copy of the
+    file read once and shared.
+
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.compilations = 0
+        self._source = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def compile(self, xml_etree):
+        raise NotImplementedError
+
+    @property
+    def source(self):
+        """ The file's contents. """
+        if self._source is None:
+            self._lock.acquire()
+            try:
+                if self._source is None:
+                    with open(self.path, 'r') as f:
+                        self._source = f.read()
+            finally:
+                self._lock.release()
+        return self._source
+
+    @property
+    def is_compiled(self):
+        """ Has the current thread compiled its copy yet? """
+        return getattr(self._local, 'compiled', None) is not None
+
+    @property
+    def compiled(self):
+        """ The current thread's compiled copy. """
+        compiled = getattr(self._local, 'compiled', None)
+        if compiled is None:
+            # Parse a fresh tree for each thread, relative to the file (for includes and imports)
+            compiled = self.compile(etree.parse(StringIO(self.source), base_url=self.path))
+            self._local.compiled = compiled
+            self._lock.acquire()
+            self.compilations += 1
+            self._lock.release()
+        return compiled
+
+class LazyXMLSchema(LazyCompiled):
+    """ Validates a document against an XSD, as ``etree.XMLSchema(...).assertValid`` would. """
+
+    def compile(self, xml_etree):
+        return etree.XMLSchema(xml_etree)
+
+    def __call__(self, doc_etree):
+        return self.compiled.assertValid(doc_etree)
+
+class LazyXSLT(LazyCompiled):
+    """ Transforms a document with an XSLT, as ``etree.XSLT(...)`` would. """
+
+    def compile(self, xml_etree):
+        return etree.XSLT(xml_etree)
+
+    def __call__(self, doc_etree, **params):
+        return self.compiled(doc_etree, **params)
+
 class IndivoSchemaLoader(object):
 
-    def __init__(self, top=''):
+    def __init__(self, top='', manifest=None):
         self.top = top
+        self.manifest = manifest
 
     def import_schemas(self):
         for schema_name, schema_etree, transform_func in self.discover_schema_dirs():
@@ -99,34 +171,59 @@ class IndivoSchemaLoader(object):
             raise ValueError("The schema %s does not exist"%schema_qn)
         
     def discover_schema_dirs(self):
-        for (dirpath, dirnames, filenames) in os.walk(self.top):
+        for schema_dir, fqns in self.find_schema_dirs():
+
+            # Get the validation func
+            if schema_dir.schema_ext == '.xsd':
+                validation_handler = self._get_validation_func_from_xsd
+
+            validation_func = validation_handler(schema_dir)
+
+            # Get the transformation func
+            if schema_dir.transform_ext == '.py':
+                transform_handler = self._get_transform_from_py
+            elif schema_dir.transform_ext.startswith('.xsl'):
+                transform_handler = self._get_transform_from_xslt
+
+            transformation_func = transform_handler(schema_dir)
+
+            # make sure to yield a separate entry for each top-level fqn
+            for fqn in fqns:
+                yield (fqn, validation_func, transformation_func)
+
+    def find_schema_dirs(self):
+        """ The valid schema directories below *top*, as a list of (IndivoSchemaDir, fqns) tuples.
+
+        *fqns* are the FQNs of the top-level elements we can validate with the schema.
+        Read from the registry manifest, if we have one and it is up to date, and
+        saved to it otherwise.
+
+        """
+
+        key = 'schemas:%s' % self.top
+        if self.manifest:
+            found = self.manifest.get(key)
+            if found is not None:
+                return [(self.detect_schema_dir(dir_path), fqns) for dir_path, fqns in found]
+
+        found = []
+        schema_paths = []
+        walked, dirs = walk(self.top)
+        for (dirpath, dirnames, filenames) in walked:
             schema_dir = self.detect_schema_dir(dirpath)
             if schema_dir.is_valid():
-                dirnames = [] # we found a schema dir: don't look in subdirectories for others
 
                 # Get the FQNs for top-level elements that we can validate with the schema
                 if schema_dir.schema_ext == '.xsd':
                     fqn_handler = self._get_fqns_from_xsd
 
-                fqns = fqn_handler(schema_dir)
+                found.append((schema_dir, fqn_handler(schema_dir)))
+                schema_paths.append(schema_dir.get_full_schema_path())
 
-                # Get the validation func
-                if schema_dir.schema_ext == '.xsd':
-                    validation_handler = self._get_validation_func_from_xsd
-                    
-                validation_func = validation_handler(schema_dir)
-
-                # Get the transformation func
-                if schema_dir.transform_ext == '.py':
-                    transform_handler = self._get_transform_from_py
-                elif schema_dir.transform_ext.startswith('.xsl'):
-                    transform_handler = self._get_transform_from_xslt
-
-                transformation_func = transform_handler(schema_dir)
-                
-                # make sure to yield a separate entry for each top-level fqn
-                for fqn in fqns:
-                    yield (fqn, validation_func, transformation_func)
+        if self.manifest:
+            self.manifest.put(key, [(schema_dir.dir_path, fqns) for schema_dir, fqns in found], dirs + schema_paths)
+            self.manifest.save()
+        return found
 
     def _get_fqns_from_xsd(self, schema_dir):
         fqns = []
@@ -140,10 +237,8 @@ class IndivoSchemaLoader(object):
         return fqns
 
     def _get_validation_func_from_xsd(self, schema_dir):
-        with open(schema_dir.get_full_schema_path(), 'r') as schema_file:
-            schema = etree.XMLSchema(etree.parse(schema_file))
-
-        return schema.assertValid
+        # Compiled when first used
+        return LazyXMLSchema(schema_dir.get_full_schema_path())
 
     def _get_transform_from_py(self, schema_dir):
 
@@ -169,14 +264,14 @@ class IndivoSchemaLoader(object):
 
         
     def _get_transform_from_xslt(self, schema_dir):
-        with open(schema_dir.get_full_transform_path(), 'r') as transform_file:
-            transform_func = etree.XSLT(etree.parse(transform_file))
-            
+        # Compiled when first used
+        transform_func = LazyXSLT(schema_dir.get_full_transform_path())
+
         # XSLTs should transform data into SDMX form
         return BaseTransform.from_transformation_func(transform_func, 'to_sdmx')
 
 # get the core schemas
-loader = IndivoSchemaLoader()
-for schema_dir in settings.CORE_SCHEMA_DIRS + settings.CONTRIB_SCHEMA_DIRS:
-    loader.top = schema_dir
+loader = IndivoSchemaLoader(manifest=get_manifest())
+for top in settings.CORE_SCHEMA_DIRS + settings.CONTRIB_SCHEMA_DIRS:
+    loader.top = top
     loader.import_schemas()
@@ -16,6 +16,7 @@ from django.core.files.base import ContentFile
 from indivo.lib.utils import LazyProperty
 from indivo.lib.simpledatamodel import SDMXData, SDMJData
 from . import REGISTERED_SCHEMAS
+from . import offload
 
 DEFAULT_PREFIX= "http://indivo.org/vocab/xml/documents#"
 ETREE_NS_RE = re.compile(r'{(?P<ns>.*?)}')
@@ -74,6 +75,11 @@ class DocumentProcessing(object):
 
   def process(self):
 
+    # Large documents are validated and transformed in a worker process
+    if self.offload_p:
+      self.processed_facts = offload.process(self.content, self.fqn)
+      return
+
     # Validate the XML, if necessary
     if self.validate_p:
       self.validate_xml()
@@ -95,6 +101,22 @@ class DocumentProcessing(object):
 
     return settings.VALIDATE_XML and self.validation_func
 
+  @property # Depends on settings, like validate_p
+  def offload_p(self):
+    """ Whether or not to validate and transform this doc in a worker process.
+
+    Right now:
+
+    * Is offloading turned on, and the doc larger than the threshold?
+    * Is it XML that we know how to process elsewhere?
+
+    """
+
+    threshold = getattr(settings, 'DOCUMENT_OFFLOAD_THRESHOLD', 0)
+    if not threshold or self.is_binary or not self.content or len(self.content) <= threshold:
+      return False
+    return bool(self.fqn and offload.can_offload(self.fqn))
+
   @NonBinaryLazyProperty
   def process_p(self):
     """ Whether or not this doc needs processing. 
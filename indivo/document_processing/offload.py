@@ -0,0 +1,155 @@
+"""
+Validating and transforming large documents in worker processes.
+
+XSD validation and XSLT transformation are CPU-bound, and hold the GIL for
+as long as they run: one large document stalls every other request in the
+process. Documents larger than ``settings.DOCUMENT_OFFLOAD_THRESHOLD`` bytes
+are instead validated and transformed (to SDMX or SDMJ) by a pool of
+``settings.DOCUMENT_OFFLOAD_PROCESSES`` worker processes, and the result is
+turned into facts back in the request's process, where they are saved.
+
+Transforms that make facts directly (python transforms with a ``to_facts``
+method) can't be run elsewhere, so their documents are always processed in
+the request's process.
+
+A document still waiting for (or being processed by) a worker after
+``settings.DOCUMENT_OFFLOAD_TIMEOUT`` seconds is rejected, like an invalid
+one. The worker finishes with it anyway: work already handed to a process
+can't be taken back.
+
+Servers start the pool with :py:func:`start` while they're still
+single-threaded (see ``django.wsgi``): forking a process with other threads
+running can leave the workers holding locks that no thread will release.
+
+"""
+
+from django.conf import settings
+from lxml import etree
+from StringIO import StringIO
+from indivo.lib import metrics
+from . import REGISTERED_SCHEMAS, BaseTransform
+
+import multiprocessing
+import os
+import threading
+import time
+
+# What a worker sends back
+SDMX = 'sdmx'
+SDMJ = 'sdmj'
+INVALID = 'invalid'
+FAILED = 'failed'
+
+_pool = None
+_pool_pid = None
+_lock = threading.Lock()
+
+def can_offload(fqn):
+    """ Can documents of type *fqn* be processed in a worker? """
+    if fqn not in REGISTERED_SCHEMAS:
+        return False
+    transform = REGISTERED_SCHEMAS[fqn][1]
+    to_facts = getattr(transform, 'to_facts', None)
+    return getattr(to_facts, 'im_func', to_facts) in (None, BaseTransform.to_facts.im_func)
+
+def start():
+    """ Start the worker pool now, if documents are offloaded at all. Call before starting any threads. """
+    if getattr(settings, 'DOCUMENT_OFFLOAD_THRESHOLD', 0):
+        get_pool()
+
+def get_pool():
+    """ The process's worker pool, started when first needed if :py:func:`start` wasn't called (and again in each forked process). """
+    global _pool, _pool_pid
+    _lock.acquire()
+    try:
+        if _pool is None or _pool_pid != os.getpid():
+            # Workers never use the database: they leave the connections they inherit alone
+            _pool = multiprocessing.Pool(getattr(settings, 'DOCUMENT_OFFLOAD_PROCESSES', 2))
+            _pool_pid = os.getpid()
+        return _pool
+    finally:
+        _lock.release()
+
+def shutdown():
+    """ Stop the worker pool, if it was started. """
+    global _pool, _pool_pid
+    _lock.acquire()
+    try:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.terminate()
+            _pool.join()
+        _pool = None
+        _pool_pid = None
+    finally:
+        _lock.release()
+
+def _work(content, fqn, validate, submitted):
+    """ In a worker: validate and transform *content*. Returns (kind, output, seconds queued, seconds working). """
+    started = time.time()
+    kind, output = None, None
+    validation_func, transform = REGISTERED_SCHEMAS[fqn]
+    try:
+        doc_etree = etree.parse(StringIO(content))
+        if validate and validation_func:
+            validation_func(doc_etree)
+        if transform:
+            kind, output = _transform(transform, doc_etree)
+    except etree.DocumentInvalid, e:
+        kind, output = INVALID, str(e)
+    except ValueError, e:
+        kind, output = FAILED, str(e)
+    except Exception:
+        # As in the request's process, a transform that doesn't work makes no facts
+        kind, output = None, None
+    return kind, output, started - submitted, time.time() - started
+
+def _transform(transform, doc_etree):
+    # The order BaseTransform tries them in, after to_facts
+    ret = transform._call_func('to_sdmj', doc_etree)
+    if ret and isinstance(ret, str):
+        return SDMJ, ret
+
+    ret = transform._call_func('to_sdmx', doc_etree)
+    if ret and isinstance(ret, etree._ElementTree):
+        return SDMX, etree.tostring(ret)
+
+    return None, None
+
+def process(content, fqn):
+    """ Validate (if configured to) and transform *content*, of type *fqn*, in a worker.
+
+    Returns the facts it describes, unsaved. Raises ValueError if it doesn't
+    validate, the transform rejects it, or it takes too long.
+
+    """
+
+    validation_func = REGISTERED_SCHEMAS[fqn][0]
+    validate = bool(settings.VALIDATE_XML and validation_func)
+    timeout = getattr(settings, 'DOCUMENT_OFFLOAD_TIMEOUT', 30)
+
+    result = get_pool().apply_async(_work, (content, fqn, validate, time.time()))
+    try:
+        kind, output, queued, working = result.get(timeout)
+    except multiprocessing.TimeoutError:
+        metrics.OFFLOADED_DOCUMENTS.inc('timeout')
+        raise ValueError("Input document took longer than %s seconds to process" % timeout)
+    except Exception:
+        metrics.OFFLOADED_DOCUMENTS.inc('error')
+        raise
+
+    metrics.OFFLOAD_QUEUE_WAIT.observe(max(queued, 0))
+    metrics.OFFLOAD_EXECUTION.observe(working)
+
+    if kind == INVALID:
+        metrics.OFFLOADED_DOCUMENTS.inc('invalid')
+        raise ValueError("Input document didn't validate, error was: %s" % output)
+    if kind == FAILED:
+        metrics.OFFLOADED_DOCUMENTS.inc('invalid')
+        raise ValueError(output)
+
+    metrics.OFFLOADED_DOCUMENTS.inc('ok')
+    if kind == SDMJ:
+        return BaseTransform()._sdmj_to_facts(output)
+    if kind == SDMX:
+        return BaseTransform()._sdmx_to_facts(etree.parse(StringIO(output)))
+    return []
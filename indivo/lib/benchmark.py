@@ -0,0 +1,153 @@
+"""
+Utilities for benchmarking Indivo end to end.
+
+A :py:class:`Scenario` is one kind of API call, made repeatedly through the
+whole middleware stack with an :py:class:`OAuthClient`, which signs requests
+just as a real app would. :py:func:`run_scenario` times it, and summarizes
+throughput, latency percentiles, SQL query counts and memory use as a dict
+that can be dumped straight to JSON, so runs can be compared across commits.
+
+"""
+
+from django.conf import settings
+from django.db import connection, reset_queries
+from django.test.client import Client
+from oauth.oauth import HTTPRequest, OAuthRequest
+
+import math
+import resource
+import time
+
+# The host Django's test client sends requests to
+SERVER_NAME = 'testserver'
+
+class OAuthClient(Client):
+    """ A test client whose requests are signed by *consumer*, and *token* if it isn't None.
+
+    *consumer* is an app (:py:class:`~indivo.models.apps.PHA` or
+    :py:class:`~indivo.models.apps.MachineApp`), and *token* an
+    :py:class:`~indivo.models.shares.AccessToken` or
+    :py:class:`~indivo.models.apps.SessionToken`.
+
+    """
+
+    def __init__(self, consumer, token=None, **defaults):
+        super(OAuthClient, self).__init__(**defaults)
+        self.consumer = consumer
+        self.token = token
+
+    def authorization(self, method, path, content_type=HTTPRequest.FORM_URLENCODED_TYPE, data=''):
+        """ An Authorization header for a request, with a fresh nonce. """
+        url = 'http://%s%s' % (SERVER_NAME, path)
+        http_request = HTTPRequest(method, url, content_type, data, {})
+        oauth_request = OAuthRequest(consumer=self.consumer,
+                                     token=self.token,
+                                     http_request=http_request,
+                                     oauth_parameters={})
+        oauth_request.sign()
+        return oauth_request.to_header()['Authorization']
+
+class Scenario(object):
+    """ One API call: a *method* request for *path*, made by *client*.
+
+    *body* is the request body for POSTs or PUTs, either a string or a
+    callable returning a fresh one for each request.
+
+    """
+
+    def __init__(self, name, client, method, path, body=None, content_type='application/xml'):
+        self.name = name
+        self.client = client
+        self.method = method
+        self.path = path
+        self.body = body
+        self.content_type = content_type
+
+    def prepare(self):
+        """ Sign a request, returning a function that makes it, so signing isn't timed. """
+        if self.method == 'GET':
+            auth = self.client.authorization('GET', self.path)
+            return lambda: self.client.get(self.path, HTTP_AUTHORIZATION=auth)
+
+        body = self.body() if callable(self.body) else self.body
+        auth = self.client.authorization(self.method, self.path, self.content_type, body)
+        send = getattr(self.client, self.method.lower())
+        return lambda: send(self.path, data=body, content_type=self.content_type, HTTP_AUTHORIZATION=auth)
+
+def percentile(sorted_values, pct):
+    """ The *pct* percentile of *sorted_values*, by the nearest-rank method. """
+    if not sorted_values:
+        return None
+    rank = int(math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(max(rank, 1), len(sorted_values)) - 1]
+
+def peak_rss_kb():
+    """ Peak resident memory of this process so far, in KB (as reported on Linux). """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def _ms(seconds):
+    if seconds is None:
+        return None
+    return round(seconds * 1000, 3)
+
+def summarize(latencies, elapsed, queries, errors):
+    """ Summarize a run: *latencies* (in seconds) and *queries* are lists with one entry per request. """
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'throughput': round(len(latencies) / elapsed, 2) if elapsed else None,
+        'latency_ms': {
+            'mean': _ms(sum(latencies) / len(latencies) if latencies else None),
+            'p50': _ms(percentile(latencies, 50)),
+            'p95': _ms(percentile(latencies, 95)),
+            'p99': _ms(percentile(latencies, 99)),
+            'max': _ms(latencies[-1] if latencies else None),
+            },
+        'queries': {
+            'mean': round(sum(queries) / float(len(queries)), 2) if queries else None,
+            'max': max(queries) if queries else None,
+            },
+        }
+
+def run_scenario(scenario, iterations, warmup=10):
+    """ Run *scenario*, and return its summary.
+
+    The warmup requests are made with ``settings.DEBUG`` on, to count their
+    SQL queries. The timed requests are made with it off, so that logging
+    queries doesn't skew the timings.
+
+    """
+    rss_before = peak_rss_kb()
+    old_debug = settings.DEBUG
+    queries = []
+    errors = 0
+    try:
+        settings.DEBUG = True
+        for i in xrange(max(warmup, 1)):
+            request = scenario.prepare()
+            reset_queries()
+            response = request()
+            queries.append(len(connection.queries))
+            if response.status_code >= 400:
+                errors += 1
+        settings.DEBUG = False
+
+        latencies = []
+        for i in xrange(iterations):
+            request = scenario.prepare()
+            start = time.time()
+            response = request()
+            latencies.append(time.time() - start)
+            if response.status_code >= 400:
+                errors += 1
+        # throughput counts time spent handling requests, not signing them
+        elapsed = sum(latencies)
+    finally:
+        settings.DEBUG = old_debug
+        reset_queries()
+
+    summary = summarize(latencies, elapsed, queries, errors)
+    summary['peak_rss_kb'] = peak_rss_kb()
+    summary['rss_growth_kb'] = summary['peak_rss_kb'] - rss_before
+    return summary
@@ -0,0 +1,269 @@
+"""
+A streaming Continuity of Care Record (CCR) writer.
+
+:py:class:`CCRWriter` builds a record's CCR as a stream of XML chunks, one
+section at a time. Each section is a single query for exactly the columns
+it needs (with one join, to the fact's document, to check its status),
+read row by row, so nothing is held in memory beyond the current batch of
+output and nothing is fetched that the CCR doesn't show.
+
+When ``settings.CCR_CACHE_TIMEOUT`` is set, finished record CCRs are kept in
+the Django cache for that many seconds, keyed on the record, the number of
+documents it holds and the last time any of them changed: adding, replacing,
+changing the status of or deleting a document all produce a new key. Carenet
+CCRs also depend on the carenet's shares, so they are never cached.
+
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils.html import escape
+from indivo.lib.sharing_utils import carenet_facts_filter
+from indivo.models import Document, Immunization, Medication, StatusName, VitalSigns
+from indivo.templatetags.template_utils import format_iso8601_date, format_iso8601_datetime
+
+import datetime
+import hashlib
+
+# Rows to render before handing a chunk to the client
+CHUNK_ROWS = 100
+
+MEDICATION_FIELDS = ('document', 'startDate', 'drugName_title', 'drugName_identifier', 'drugName_system',
+                     'quantity_value', 'quantity_unit', 'frequency_value', 'frequency_unit', 'instructions')
+
+IMMUNIZATION_FIELDS = ('document', 'date', 'product_name_title', 'product_name_identifier', 'product_name_system')
+
+# The vital signs in a VitalSigns fact, each rendered as its own CCR result
+VITAL_SIGNS = ('bp_systolic', 'bp_diastolic', 'bmi', 'heart_rate', 'height', 'oxygen_saturation',
+               'respiratory_rate', 'temperature', 'weight')
+
+VITAL_SIGNS_FIELDS = ('document', 'date') + tuple(
+    '%s%s' % (vital, suffix) for vital in VITAL_SIGNS
+    for suffix in ('_value', '_unit', '_name_title', '_name_identifier', '_name_system'))
+
+HEADER = u'''<?xml version="1.0"?>
+<ContinuityOfCareRecord xmlns="urn:astm-org:CCR">
+  <CCRDocumentObjectID>0</CCRDocumentObjectID>
+  <Language>
+    <Text>ENGLISH</Text>
+  </Language>
+  <Version>V1.0</Version>
+  <DateTime>
+    <Type>
+      <Text>Create</Text>
+      <ObjectAttribute>
+        <Attribute>DisplayDate</Attribute>
+        <AttributeValue>
+          <Value>%(display_date)s</Value>
+        </AttributeValue>
+      </ObjectAttribute>
+    </Type>
+    <ExactDateTime>%(now)s</ExactDateTime>
+  </DateTime>
+  <Patient>
+    <ActorID>%(record_id)s</ActorID>
+  </Patient>
+  <From>
+    <ActorLink/>
+  </From>
+  <Body>
+'''
+
+FOOTER = u'''  </Body>
+  <Actors>
+  </Actors>
+</ContinuityOfCareRecord>
+'''
+
+MEDICATION = u'''      <Medication>
+        <CCRDataObjectID>%(document)s</CCRDataObjectID>
+        <DateTime>
+          <Type>
+            <Text>Start date</Text>
+          </Type>
+          <ExactDateTime>%(startDate)s</ExactDateTime>
+        </DateTime>
+        <Status>
+          <Text>Active</Text>
+        </Status>
+        <Product>
+          <ProductName>
+            <Text>%(drugName_title)s</Text>
+            <Code>
+              <Value>%(drugName_identifier)s</Value>
+              <CodingSystem>%(drugName_system)s</CodingSystem>
+            </Code>
+          </ProductName>
+        </Product>
+        <Directions>
+          <Direction>
+            <Dose>
+              <Value>%(quantity_value)s</Value>
+              <Units>
+                <Unit>%(quantity_unit)s</Unit>
+              </Units>
+            </Dose>
+            <Frequency>
+              <Value>%(frequency_value)s</Value>
+              <Units>
+                <Unit>%(frequency_unit)s</Unit>
+              </Units>
+            </Frequency>
+          </Direction>
+        </Directions>
+        <PatientInstructions>
+          <Instruction>
+            <Text>%(instructions)s</Text>
+          </Instruction>
+        </PatientInstructions>
+      </Medication>
+'''
+
+IMMUNIZATION = u'''      <Immunization>
+        <CCRDataObjectID>%(document)s</CCRDataObjectID>
+        <DateTime>
+          <Type>
+            <Text>Start date</Text>
+          </Type>
+          <ExactDateTime>%(date)s</ExactDateTime>
+        </DateTime>
+        <Product>
+          <ProductName>
+            <Text>%(product_name_title)s</Text>
+            <Code>
+              <Value>%(product_name_identifier)s</Value>
+              <CodingSystem>%(product_name_system)s</CodingSystem>
+            </Code>
+          </ProductName>
+        </Product>
+      </Immunization>
+'''
+
+VITAL_SIGN = u'''      <Result>
+        <CCRDataObjectID>%(document)s</CCRDataObjectID>
+        <DateTime>
+          <Type>
+            <Text>Collection date</Text>
+          </Type>
+          <ExactDateTime>%(date)s</ExactDateTime>
+        </DateTime>
+        <Status/>
+        <Source/>
+        <Test>
+          <CCRDataObjectID>%(document)s</CCRDataObjectID>
+          <Description>
+            <Text>%(name_title)s</Text>
+            <Code>
+              <Value>%(name_identifier)s</Value>
+              <CodingSystem>%(name_system)s</CodingSystem>
+            </Code>
+          </Description>
+          <Status/>
+          <Source/>
+          <TestResult>
+            <Value>%(value)s</Value>
+            <Units>
+              <Unit>%(unit)s</Unit>
+            </Units>
+          </TestResult>
+        </Test>
+      </Result>
+'''
+
+def _xml(value):
+    """ *value*, escaped for XML, as the template engine would render it. """
+    if value is None:
+        return u''
+    if isinstance(value, datetime.datetime):
+        return format_iso8601_datetime(value)
+    if isinstance(value, datetime.date):
+        return format_iso8601_date(value)
+    return escape(value)
+
+def _render(template, row):
+    return template % dict((key, _xml(value)) for key, value in row.iteritems())
+
+class CCRWriter(object):
+
+    def __init__(self, record, carenet=None, now=None):
+        self.record = record
+        self.carenet = carenet
+        self.now = now or datetime.datetime.utcnow()
+
+    def facts(self, model, fields):
+        """ The active facts of type *model* visible to us, as dicts of *fields*. """
+        facts = model.objects.filter(record=self.record, document__status=StatusName.cached.get('active'))
+        return carenet_facts_filter(self.carenet, facts).order_by('created_at', 'id').values(*fields)
+
+    def medications(self):
+        for row in self.facts(Medication, MEDICATION_FIELDS).iterator():
+            yield _render(MEDICATION, row)
+
+    def immunizations(self):
+        for row in self.facts(Immunization, IMMUNIZATION_FIELDS).iterator():
+            yield _render(IMMUNIZATION, row)
+
+    def vital_signs(self):
+        for row in self.facts(VitalSigns, VITAL_SIGNS_FIELDS).iterator():
+            for vital in VITAL_SIGNS:
+                if row['%s_value' % vital] is None:
+                    continue
+                yield _render(VITAL_SIGN, {'document': row['document'], 'date': row['date'],
+                                           'value': row['%s_value' % vital],
+                                           'unit': row['%s_unit' % vital],
+                                           'name_title': row['%s_name_title' % vital],
+                                           'name_identifier': row['%s_name_identifier' % vital],
+                                           'name_system': row['%s_name_system' % vital]})
+
+    def sections(self):
+        return (('Medications', self.medications()),
+                ('Immunizations', self.immunizations()),
+                ('VitalSigns', self.vital_signs()))
+
+    def __iter__(self):
+        """ The CCR, as a stream of UTF-8 encoded chunks. """
+        yield (HEADER % {'display_date': self.now.strftime('%m/%d/%y'),
+                         'now': format_iso8601_datetime(self.now),
+                         'record_id': _xml(self.record.id)}).encode('utf-8')
+
+        for tag, rows in self.sections():
+            chunk = [u'    <%s>\n' % tag]
+            for row in rows:
+                chunk.append(row)
+                if len(chunk) >= CHUNK_ROWS:
+                    yield u''.join(chunk).encode('utf-8')
+                    chunk = []
+            chunk.append(u'    </%s>\n' % tag)
+            yield u''.join(chunk).encode('utf-8')
+
+        yield FOOTER.encode('utf-8')
+
+def cache_timeout():
+    return getattr(settings, 'CCR_CACHE_TIMEOUT', 0)
+
+def cache_key(record):
+    """ A key for the current CCR of *record*, which changes whenever its documents do. """
+    stats = Document.objects.filter(record=record).aggregate(count=Count('id'), modified=Max('modified_at'))
+    key = '%s|%s|%s' % (record.id, stats['count'], stats['modified'] or '')
+    return 'indivo-ccr-%s' % hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+def ccr(record, carenet=None):
+    """ The CCR of *record* (as seen from *carenet*), as a stream of chunks, cached if enabled. """
+    timeout = cache_timeout()
+    if carenet or not timeout:
+        return iter(CCRWriter(record, carenet))
+
+    key = cache_key(record)
+    cached = cache.get(key)
+    if cached is not None:
+        return iter([cached])
+    return _caching(CCRWriter(record), key, timeout)
+
+def _caching(chunks, key, timeout):
+    """ Pass on *chunks*, and cache them all once the last one is through. """
+    seen = []
+    for chunk in chunks:
+        seen.append(chunk)
+        yield chunk
+    cache.set(key, ''.join(seen), timeout)
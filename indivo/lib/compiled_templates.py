@@ -0,0 +1,439 @@
+"""
+Compiled renderers for the hottest XML templates.
+
+Document lists and reports render document.xml (and, for reports, an item
+template) once per result, and on large pages the template engine's per-node
+overhead, context pushes and per-row includes dominate the cost of the
+request. The renderers here produce exactly the same bytes as the templates
+they replace, using precompiled variable lookups and plain string assembly.
+
+Each renderer takes the context dict its template would be rendered with, and
+is registered in ``RENDERERS`` under the template's name.
+:py:func:`indivo.lib.utils.render_template_raw` uses them in place of the
+templates when ``settings.COMPILED_TEMPLATES`` is true. Report item templates
+without a compiled renderer are still rendered by Django, once per row.
+
+Variables are resolved with Django's own :py:class:`~django.template.Variable`
+and rendered with the same filters, localization and escaping as ``{{ }}``, so
+the usual template semantics (callables, dict lookups, silent failures) hold.
+If you change one of the templates below, change its renderer too: the tests
+in ``indivo.tests.unit.lib.compiled_templates`` compare the two byte for byte.
+
+"""
+
+from django.conf import settings
+from django.template import Context, Variable, VariableDoesNotExist, loader
+from django.utils.encoding import force_unicode
+from django.utils.formats import localize
+from django.utils.html import conditional_escape, strip_spaces_between_tags
+from django.utils.safestring import SafeData, mark_safe
+
+from indivo.templatetags.template_utils import check_empty, format_iso8601_datetime
+
+XML_DECLARATION = u'<?xml version="1.0" encoding="utf-8" ?>'
+
+def _render_value(value, filter_func=None):
+    """ Render *value* as ``{{ value|filter_func }}`` would, with autoescaping on. """
+    if filter_func is not None:
+        filtered = filter_func(value)
+        if getattr(filter_func, 'is_safe', False) and isinstance(value, SafeData):
+            filtered = mark_safe(filtered)
+        value = filtered
+    return conditional_escape(force_unicode(localize(value)))
+
+class _Expression(object):
+    """ A precompiled ``path|filter_func`` template expression. """
+
+    def __init__(self, path, filter_func=None):
+        self.var = Variable(path)
+        self.filter_func = filter_func
+
+    def value(self, obj):
+        """ Resolve against *obj*, as ``{% if %}`` and ``{% for %}`` do: None if we can't. """
+        try:
+            return self.var.resolve(obj)
+        except VariableDoesNotExist:
+            return None
+
+    def resolve(self, obj):
+        """ Resolve against *obj*, as ``{{ }}`` and ``{% with %}`` do. """
+        try:
+            return self.var.resolve(obj)
+        except VariableDoesNotExist:
+            return settings.TEMPLATE_STRING_IF_INVALID
+
+    def render(self, obj):
+        return _render_value(self.resolve(obj), self.filter_func)
+
+class _Expressions(object):
+    """ The expressions used by one template, as attributes. """
+
+    def __init__(self, **expressions):
+        for name, spec in expressions.iteritems():
+            if isinstance(spec, basestring):
+                spec = (spec,)
+            setattr(self, name, _Expression(*spec))
+
+def _sequence(expression, obj):
+    """ The values ``{% for x in expression %}`` would iterate over. """
+    values = expression.value(obj)
+    if values is None:
+        return []
+    return values
+
+def _spaceless(out):
+    """ The output of ``{% spaceless %}`` around the parts in *out*. """
+    return strip_spaces_between_tags(u''.join(out).strip())
+
+# document.xml
+
+_DOCUMENT = _Expressions(
+    id = ('id', check_empty),
+    type = ('type.uri', check_empty),
+    size = ('size', check_empty),
+    digest = ('digest', check_empty),
+    created_at = ('created_at', format_iso8601_datetime),
+    creator_email = 'creator.email',
+    creator_type = 'creator.type',
+    creator_name = 'creator.descriptor',
+    suppressed_at = ('suppressed_at', format_iso8601_datetime),
+    suppressor_email = 'suppressed_by.email',
+    suppressor_type = 'suppressed_by.type',
+    suppressor_name = 'suppressed_by.descriptor',
+    replaced_by_id = ('replaced_by_id', check_empty),
+    replaces = 'replaces',
+    replaces_id = ('replaces.id', check_empty),
+    original_id = ('original_id', check_empty),
+    latest_id = ('latest_id', check_empty),
+    latest_created_at = ('latest_created_at', format_iso8601_datetime),
+    latest_creator_email = ('latest_creator_email', check_empty),
+    label = ('label', check_empty),
+    status = ('status.name', check_empty),
+    nevershare = 'nevershare',
+    relates_to = 'relates_to',
+    is_related_from = 'is_related_from',
+    )
+
+_RELATION = _Expressions(
+    type = 'relationship__type',
+    count = 'count',
+    )
+
+def _render_relations(out, tag, relationships):
+    # relationships is a queryset: evaluating it for the {% if %} caches it for the {% for %}
+    if relationships:
+        out.append(u'<%s>' % tag)
+        for relationship in relationships:
+            out.extend((u'<relation type="', _RELATION.type.render(relationship),
+                        u'" count="', _RELATION.count.render(relationship), u'" />'))
+        out.append(u'</%s>' % tag)
+
+def _render_document(out, doc, record_id):
+    """ Append the body of document.xml for *doc* to *out*.
+
+    *record_id* is the rendered ``{{ record.id }}`` of the enclosing context.
+
+    """
+    d = _DOCUMENT
+    out.extend((u'<Document id="', d.id.render(doc),
+                u'" type="', d.type.render(doc),
+                u'" size="', d.size.render(doc),
+                u'" digest="', d.digest.render(doc),
+                u'" record_id="', record_id, u'">'))
+
+    if d.created_at.value(doc):
+        out.extend((u'<createdAt>', d.created_at.render(doc), u'</createdAt>',
+                    u'<creator id="', d.creator_email.render(doc), u'" type="', d.creator_type.render(doc), u'">',
+                    u'<fullname>', d.creator_name.render(doc), u'</fullname></creator>'))
+
+    if d.suppressed_at.value(doc):
+        # sic: the template closes this tag as </suppresedAt>
+        out.extend((u'<suppressedAt>', d.suppressed_at.render(doc), u'</suppresedAt>',
+                    u'<suppressor id="', d.suppressor_email.render(doc), u'" type="', d.suppressor_type.render(doc), u'">',
+                    u'<fullname>', d.suppressor_name.render(doc), u'</fullname></suppressor>'))
+
+    if d.replaced_by_id.value(doc):
+        out.extend((u'<replacedBy id="', d.replaced_by_id.render(doc), u'"/>'))
+
+    if d.replaces.value(doc):
+        out.extend((u'<replaces id="', d.replaces_id.render(doc), u'"/>'))
+
+    if d.original_id.value(doc):
+        out.extend((u'<original id="', d.original_id.render(doc), u'"/>'))
+
+    if d.latest_id.value(doc):
+        out.extend((u'<latest id="', d.latest_id.render(doc),
+                    u'" createdAt="', d.latest_created_at.render(doc),
+                    u'" createdBy="', d.latest_creator_email.render(doc), u'" />'))
+
+    if d.label.value(doc):
+        out.extend((u'<label>', d.label.render(doc), u'</label>'))
+
+    if d.status.value(doc):
+        out.extend((u'<status>', d.status.render(doc), u'</status>'))
+
+    if d.nevershare.value(doc):
+        out.append(u'<nevershare>true</nevershare>')
+    else:
+        out.append(u'<nevershare>false</nevershare>')
+
+    _render_relations(out, u'relatesTo', d.relates_to.value(doc))
+    _render_relations(out, u'isRelatedFrom', d.is_related_from.value(doc))
+    out.append(u'</Document>')
+
+_DOCUMENT_CONTEXT = _Expressions(
+    doc = 'doc',
+    docs = 'docs',
+    record_id = 'record.id',
+    checked_record_id = ('record.id', check_empty),
+    tdc = 'tdc',
+    pha = 'pha',
+    pha_email = ('pha.email', check_empty),
+    )
+
+def render_document(context):
+    """ Render document.xml. """
+    c = _DOCUMENT_CONTEXT
+    out = []
+    _render_document(out, c.doc.resolve(context), c.record_id.render(context))
+    return _spaceless(out) + u'\n'
+
+def render_single_document(context):
+    """ Render single_document.xml. """
+    c = _DOCUMENT_CONTEXT
+    out = [XML_DECLARATION]
+    _render_document(out, c.doc.resolve(context), c.record_id.render(context))
+    return _spaceless(out) + u'\n'
+
+def render_documents(context):
+    """ Render documents.xml. """
+    c = _DOCUMENT_CONTEXT
+    out = [XML_DECLARATION,
+           u'<Documents record_id="', c.checked_record_id.render(context),
+           u'" total_document_count="', c.tdc.render(context), u'" ']
+    if c.pha.value(context):
+        out.extend((u' pha="', c.pha_email.render(context), u'" '))
+    out.append(u' >')
+
+    record_id = c.record_id.render(context)
+    for doc in _sequence(c.docs, context):
+        _render_document(out, doc, record_id)
+    out.append(u'</Documents>')
+    return _spaceless(out) + u'\n'
+
+# Report items, rendered into <Item> by reports/report.xml
+
+_MEASUREMENT = _Expressions(
+    id = 'id',
+    value = 'value',
+    type = 'type',
+    datetime = ('datetime', format_iso8601_datetime),
+    unit = 'unit',
+    document_id = 'document_id',
+    )
+
+def _render_measurement(out, fobj):
+    """ reports/measurement.xml """
+    m = _MEASUREMENT
+    out.extend((u'<Measurement id="', m.id.render(fobj),
+                u'" value="', m.value.render(fobj),
+                u'" type="', m.type.render(fobj),
+                u'" datetime="', m.datetime.render(fobj),
+                u'" unit="', m.unit.render(fobj),
+                u'" source_doc="', m.document_id.render(fobj), u'" />'))
+
+_VITAL = _Expressions(
+    date_measured = ('date_measured', format_iso8601_datetime),
+    name = 'name',
+    name_type = 'name_type',
+    name_value = 'name_value',
+    name_abbrev = 'name_abbrev',
+    value = 'value',
+    unit = 'unit',
+    unit_type = 'unit_type',
+    unit_value = 'unit_value',
+    unit_abbrev = 'unit_abbrev',
+    site = 'site',
+    position = 'position',
+    comments = 'comments',
+    )
+
+def _render_coded_vital(out, fobj, tag, text, coded_type, coded_value, coded_abbrev):
+    out.append(u'<%s' % tag)
+    if coded_type.value(fobj):
+        out.extend((u' type="', coded_type.render(fobj), u'" value="', coded_value.render(fobj), u'"'))
+        if coded_abbrev.value(fobj):
+            out.extend((u' abbrev="', coded_abbrev.render(fobj), u'"'))
+    out.extend((u'>', text.render(fobj), u'</%s>' % tag))
+
+def _render_vital(out, fobj):
+    """ reports/vital.xml """
+    v = _VITAL
+    out.append(u'<VitalSign xmlns="http://indivo.org/vocab/xml/documents#">')
+    if v.date_measured.value(fobj):
+        out.extend((u'<dateMeasured>', v.date_measured.render(fobj), u'</dateMeasured>'))
+    if v.name.value(fobj):
+        _render_coded_vital(out, fobj, u'name', v.name, v.name_type, v.name_value, v.name_abbrev)
+    if v.value.value(fobj):
+        out.extend((u'<value>', v.value.render(fobj), u'</value>'))
+    if v.unit.value(fobj):
+        _render_coded_vital(out, fobj, u'unit', v.unit, v.unit_type, v.unit_value, v.unit_abbrev)
+    for tag, expression in ((u'site', v.site), (u'position', v.position), (u'comments', v.comments)):
+        if expression.value(fobj):
+            out.extend((u'<%s>' % tag, expression.render(fobj), u'</%s>' % tag))
+    out.append(u'</VitalSign>')
+
+_AUDIT = _Expressions(
+    datetime = ('datetime', format_iso8601_datetime),
+    view_func = ('view_func', check_empty),
+    request_successful = 'request_successful',
+    effective_principal_email = ('effective_principal_email', check_empty),
+    proxied_by_email = ('proxied_by_email', check_empty),
+    carenet_id = ('carenet_id', check_empty),
+    record_id = ('record_id', check_empty),
+    pha_id = ('pha_id', check_empty),
+    document_id = ('document_id', check_empty),
+    external_id = ('external_id', check_empty),
+    message_id = ('message_id', check_empty),
+    req_url = ('req_url', check_empty),
+    req_ip_address = ('req_ip_address', check_empty),
+    req_domain = ('req_domain', check_empty),
+    req_method = ('req_method', check_empty),
+    resp_code = ('resp_code', check_empty),
+    )
+
+def _render_audit(out, fobj):
+    """ audit.xml """
+    a = _AUDIT
+    out.extend((u'<AuditEntry>',
+                u'<BasicInfo datetime="', a.datetime.render(fobj),
+                u'" view_func="', a.view_func.render(fobj),
+                u'" request_successful="', a.request_successful.value(fobj) and u'true' or u'false', u'" />',
+                u'<PrincipalInfo effective_principal="', a.effective_principal_email.render(fobj),
+                u'" proxied_principal="', a.proxied_by_email.render(fobj), u'" />',
+                u'<Resources carenet_id="', a.carenet_id.render(fobj),
+                u'" record_id="', a.record_id.render(fobj),
+                u'" pha_id="', a.pha_id.render(fobj),
+                u'" document_id="', a.document_id.render(fobj),
+                u'" external_id="', a.external_id.render(fobj),
+                u'" message_id="', a.message_id.render(fobj), u'" />',
+                u'<RequestInfo req_url="', a.req_url.render(fobj),
+                u'" req_ip_address="', a.req_ip_address.render(fobj),
+                u'" req_domain="', a.req_domain.render(fobj),
+                u'" req_method="', a.req_method.render(fobj), u'" />',
+                u'<ResponseInfo resp_code="', a.resp_code.render(fobj), u'" />',
+                u'</AuditEntry>'))
+
+ITEM_RENDERERS = {
+    'reports/measurement.xml': _render_measurement,
+    'reports/vital.xml': _render_vital,
+    'audit.xml': _render_audit,
+    }
+
+def _template_item_renderer(item_template, context):
+    """ Render rows with the Django template *item_template*, loaded just once. """
+    templates = []
+    template_context = Context(context)
+    def render(out, fobj):
+        if not templates:
+            templates.append(loader.get_template(item_template))
+        template_context.update({'fobj': fobj})
+        try:
+            out.append(templates[0].render(template_context))
+        finally:
+            template_context.pop()
+    return render
+
+# reports/report.xml
+
+_REPORT = _Expressions(
+    trc = 'trc',
+    limit = 'limit',
+    offset = 'offset',
+    order_by = 'order_by',
+    group_by = 'group_by',
+    date_group = 'date_group',
+    date_group_field = 'date_group.field',
+    date_group_incr = 'date_group.time_incr',
+    aggregate_by = 'aggregate_by',
+    aggregate_operator = 'aggregate_by.operator',
+    aggregate_field = 'aggregate_by.field',
+    date_range = 'date_range',
+    date_range_field = 'date_range.field',
+    date_range_start = ('date_range.start_date', format_iso8601_datetime),
+    date_range_end = ('date_range.end_date', format_iso8601_datetime),
+    filters = 'filters',
+    filter_items = 'filters.items',
+    fobjs = 'fobjs',
+    item_template = 'item_template',
+    record_id = 'record.id',
+    )
+
+_FOBJ_DOCUMENT = _Expression('document')
+
+def _render_summary(out, context):
+    r = _REPORT
+    out.extend((u'<Summary total_document_count="', r.trc.render(context),
+                u'" limit="', r.limit.render(context),
+                u'" offset="', r.offset.render(context),
+                u'" order_by="', r.order_by.render(context), u'" />',
+                u'<QueryParams>'))
+    if r.group_by.value(context):
+        out.extend((u'<GroupBy value="', r.group_by.render(context), u'" />'))
+    if r.date_group.value(context):
+        out.extend((u'<DateGroup value="', r.date_group_field.render(context),
+                    u'*', r.date_group_incr.render(context), u'" />'))
+    if r.aggregate_by.value(context):
+        out.extend((u'<AggregateBy value="', r.aggregate_operator.render(context),
+                    u'*', r.aggregate_field.render(context), u'" />'))
+    if r.date_range.value(context):
+        out.extend((u'<DateRange value="', r.date_range_field.render(context),
+                    u'*', r.date_range_start.render(context),
+                    u'*', r.date_range_end.render(context), u'" />'))
+    if r.filters.value(context):
+        out.append(u'<Filters>')
+        for item in _sequence(r.filter_items, context):
+            # {% for filter_name, filter_value in ... %} unpacks with zip(), so be as forgiving
+            unpacked = dict(zip(('name', 'value'), item))
+            out.extend((u'<Filter name="', _render_value(unpacked.get('name', settings.TEMPLATE_STRING_IF_INVALID)),
+                        u'" value="', _render_value(unpacked.get('value', settings.TEMPLATE_STRING_IF_INVALID)), u'"/>'))
+        out.append(u'</Filters>')
+    out.append(u'</QueryParams>')
+
+def _render_item(out, render_item, fobj):
+    # {% include item_template %} renders nothing, rather than failing, if the item does
+    item_out = []
+    try:
+        render_item(item_out, fobj)
+    except Exception:
+        if settings.TEMPLATE_DEBUG:
+            raise
+        return
+    out.extend(item_out)
+
+def render_report(context):
+    """ Render reports/report.xml, with any item template. """
+    r = _REPORT
+    item_template = r.item_template.resolve(context)
+    render_item = ITEM_RENDERERS.get(item_template)
+    if render_item is None:
+        render_item = _template_item_renderer(item_template, context)
+    record_id = r.record_id.render(context)
+
+    out = [XML_DECLARATION, u'<Reports>']
+    _render_summary(out, context)
+    for fobj in _sequence(r.fobjs, context):
+        out.append(u'<Report><Meta>')
+        _render_document(out, _FOBJ_DOCUMENT.resolve(fobj), record_id)
+        out.append(u'</Meta><Item>')
+        _render_item(out, render_item, fobj)
+        out.append(u'</Item></Report>')
+    out.append(u'</Reports>')
+    return _spaceless(out) + u'\n'
+
+RENDERERS = {
+    'document.xml': render_document,
+    'documents.xml': render_documents,
+    'single_document.xml': render_single_document,
+    'reports/report.xml': render_report,
+    }
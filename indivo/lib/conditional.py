@@ -0,0 +1,100 @@
+"""
+Conditional GETs: ETags, Last-Modified dates, and 304 Not Modified responses to requests that already have the current version.
+
+"""
+
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import http_date, parse_http_date_safe
+
+import hashlib
+import time
+
+def strong_etag(body):
+    """ A strong ETag for *body* (a byte string): a hash of its bytes. """
+    return '"%s"' % hashlib.sha1(body).hexdigest()
+
+def etag(*parts):
+    """ An opaque strong ETag for the version identified by *parts* (anything with a unicode form). """
+    return strong_etag(u'\n'.join(unicode(part) for part in parts).encode('utf-8'))
+
+def etag_matches(request, etag):
+    """ Does *request*'s If-None-Match header name *etag* (or any current representation, with ``*``)? """
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+
+    # If-None-Match uses the weak comparison: W/"x" matches "x"
+    for candidate in header.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return True
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+def _timestamp(when):
+    # naive datetimes are in settings.TIME_ZONE, which Django makes the process's local time
+    return int(time.mktime(when.timetuple()))
+
+def not_modified(request, etag=None, last_modified=None):
+    """ Does the client already have the version with *etag*, last modified at *last_modified* (a datetime)?
+
+    If-None-Match takes precedence over If-Modified-Since, which is only
+    checked when the request has no If-None-Match.
+
+    """
+
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    if request.META.get('HTTP_IF_NONE_MATCH'):
+        return etag is not None and etag_matches(request, etag)
+    if last_modified is not None:
+        since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE') or '')
+        return since is not None and _timestamp(last_modified) <= since
+    return False
+
+def set_headers(response, etag=None, last_modified=None):
+    if etag is not None:
+        response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(_timestamp(last_modified))
+    return response
+
+def response(request, body, etag, mimetype):
+    """ *body* with its *etag*, or an empty :http:statuscode:`304` if the client already has it. """
+    if not_modified(request, etag):
+        return set_headers(HttpResponseNotModified(), etag)
+    return set_headers(HttpResponse(body, mimetype=mimetype), etag)
+
+def lazy_response(request, build, etag=None, last_modified=None):
+    """ The response *build()* returns, or an empty :http:statuscode:`304`, without calling *build*, if the client already has it.
+
+    Only successful responses get the *etag* and *last_modified* headers.
+
+    """
+
+    if not_modified(request, etag, last_modified):
+        return set_headers(HttpResponseNotModified(), etag, last_modified)
+
+    built = build()
+    if built.status_code == 200:
+        set_headers(built, etag, last_modified)
+    return built
+
+def hashed_response(request, built):
+    """ *built* (an :py:class:`~django.http.HttpResponse`) with an ETag hashed from its body, or a :http:statuscode:`304` if the client already has it.
+
+    For responses with no cheaper way to tell whether they've changed: saves
+    sending them, but not building them.
+
+    """
+
+    if built.status_code != 200:
+        return built
+
+    etag = strong_etag(built.content)
+    if not_modified(request, etag):
+        return set_headers(HttpResponseNotModified(), etag)
+    return set_headers(built, etag)
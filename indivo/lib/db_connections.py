@@ -0,0 +1,207 @@
+"""
+Reusing database connections across requests.
+
+Django closes every database connection at the end of each request, so each
+request pays to open a new one: with TLS and authentication, often more than
+its queries cost. :py:func:`install` (called from django.wsgi) replaces that
+with one of:
+
+* **Persistent connections** (``settings.DB_CONNECTION_MAX_AGE`` is None or
+  a number of seconds): each worker thread keeps its connections open
+  between requests. At the end of each request, whatever transaction is left
+  open is rolled back (Django's transaction decorators, including
+  ``commit_manually`` and our ``commit_on_200``, have committed or rolled
+  back their own work by then). A connection that can't be rolled back, was
+  left under transaction management, or is older than the maximum age is
+  closed instead. With ``settings.DB_CONNECTION_HEALTH_CHECKS`` on,
+  connections are checked with a trivial query at the start of each request,
+  and reopened if they've gone away (e.g., if the database was restarted).
+
+* **Pooled connections** (``settings.DB_CONNECTION_POOL_SIZE`` above 0 as
+  well), for threaded workers: at the end of each request, connections go
+  back to a pool shared by all of the process's threads, and are handed to
+  whichever thread needs one next. At most that many idle connections are
+  kept per database.
+
+A maximum age of 0 keeps Django's behaviour: a new connection per request.
+
+"""
+
+from django.conf import settings
+from django.core import signals
+from django.db import close_connection, connections, transaction
+from django.db.backends.signals import connection_created
+
+import threading
+import time
+
+# When each open (DB-API) connection was made, by id()
+_born = {}
+
+# Stands for "as configured in settings"
+_SETTING = object()
+
+# The installed options, and pool
+_options = None
+_pool = None
+
+class ConnectionPool(object):
+    """ Idle DB-API connections, by database alias, shared by all threads. """
+
+    def __init__(self, size):
+        self.size = size
+        self.idle = {}
+        self.lock = threading.Lock()
+
+    def get(self, alias):
+        """ The most recently used idle connection to *alias*, or None. """
+        self.lock.acquire()
+        try:
+            idle = self.idle.get(alias)
+            return idle.pop() if idle else None
+        finally:
+            self.lock.release()
+
+    def put(self, alias, raw):
+        """ Keep *raw* for the next request, if there's room. Returns False if there isn't. """
+        self.lock.acquire()
+        try:
+            idle = self.idle.setdefault(alias, [])
+            if len(idle) >= self.size:
+                return False
+            idle.append(raw)
+            return True
+        finally:
+            self.lock.release()
+
+    def close_all(self):
+        self.lock.acquire()
+        try:
+            for idle in self.idle.values():
+                for raw in idle:
+                    _close_raw(raw)
+            self.idle = {}
+        finally:
+            self.lock.release()
+
+def _connection_created(sender, connection, **kwargs):
+    _born[id(connection.connection)] = time.time()
+
+def age(raw):
+    """ Seconds since *raw* was opened (0 if we didn't see it open). """
+    born = _born.get(id(raw))
+    if born is None:
+        return 0
+    return time.time() - born
+
+def usable(raw):
+    """ Can we still run queries on *raw*? """
+    try:
+        cursor = raw.cursor()
+        try:
+            cursor.execute('SELECT 1')
+        finally:
+            cursor.close()
+    except Exception:
+        return False
+    return True
+
+def _close_raw(raw):
+    _born.pop(id(raw), None)
+    try:
+        raw.close()
+    except Exception:
+        # Already gone
+        pass
+
+def close(conn):
+    """ Close *conn*, and forget any transaction state it was left in. """
+    if conn.connection is not None:
+        _close_raw(conn.connection)
+        conn.connection = None
+    conn.transaction_state = []
+    conn.savepoint_state = 0
+    conn._dirty = None
+
+def _expired(raw, max_age):
+    return max_age is not None and age(raw) >= max_age
+
+def check(conn, max_age=None, health_checks=True, pool=None):
+    """ At the start of a request: make sure *conn* is fit to reuse, taking one from *pool* if it has none. """
+    if conn.connection is None and pool is not None:
+        conn.connection = pool.get(conn.alias)
+    if conn.connection is None:
+        return
+
+    if _expired(conn.connection, max_age) or (health_checks and not usable(conn.connection)):
+        close(conn)
+
+def release(conn, max_age=None, pool=None):
+    """ At the end of a request: roll back what's left of *conn*'s transaction, then keep, pool or close it. """
+    if conn.connection is None:
+        return
+
+    # A view that leaves transaction management unbalanced leaves the connection in an unknown state
+    if conn.transaction_state:
+        close(conn)
+        return
+
+    try:
+        transaction.rollback_unless_managed(using=conn.alias)
+    except Exception:
+        close(conn)
+        return
+
+    if _expired(conn.connection, max_age):
+        close(conn)
+    elif pool is not None:
+        raw, conn.connection = conn.connection, None
+        if not pool.put(conn.alias, raw):
+            _close_raw(raw)
+
+def _request_started(**kwargs):
+    for conn in connections.all():
+        check(conn, _options['max_age'], _options['health_checks'], _pool)
+
+def _request_finished(**kwargs):
+    for conn in connections.all():
+        release(conn, _options['max_age'], _pool)
+
+def install(max_age=_SETTING, health_checks=_SETTING, pool_size=_SETTING):
+    """ Reuse connections across requests, as configured in settings unless given here. See above. """
+    global _options, _pool
+    uninstall()
+
+    if max_age is _SETTING:
+        max_age = getattr(settings, 'DB_CONNECTION_MAX_AGE', 0)
+    if health_checks is _SETTING:
+        health_checks = getattr(settings, 'DB_CONNECTION_HEALTH_CHECKS', True)
+    if pool_size is _SETTING:
+        pool_size = getattr(settings, 'DB_CONNECTION_POOL_SIZE', 0)
+
+    if max_age == 0:
+        # New connections for every request, as Django does them
+        return False
+
+    _options = {'max_age': max_age, 'health_checks': health_checks}
+    _pool = ConnectionPool(pool_size) if pool_size else None
+    connection_created.connect(_connection_created)
+    signals.request_finished.disconnect(close_connection)
+    signals.request_started.connect(_request_started)
+    signals.request_finished.connect(_request_finished)
+    return True
+
+def uninstall():
+    """ Go back to Django's connection per request, closing any pooled connections. """
+    global _options, _pool
+    if _options is None:
+        return
+
+    signals.request_started.disconnect(_request_started)
+    signals.request_finished.disconnect(_request_finished)
+    signals.request_finished.connect(close_connection)
+    connection_created.disconnect(_connection_created)
+    if _pool is not None:
+        _pool.close_all()
+    _options = None
+    _pool = None
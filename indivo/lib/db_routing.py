@@ -0,0 +1,105 @@
+"""
+Sending safe reads to read replicas.
+
+:py:class:`ReplicaRouter` (installed with ``settings.DATABASE_ROUTERS``)
+sends every write to the primary (``default``) database, and reads to the
+primary unless the current request has chosen a replica with
+:py:func:`use_replica`. The
+:py:class:`~indivo.middlewares.replica.ReplicaRouting` middleware makes that
+choice for GET requests to the views listed in
+``settings.REPLICA_READ_VIEWS``.
+
+Replicas lag behind the primary, so after a write to a record (or, for
+app-specific data, to an app) its reads stay on the primary for
+``settings.REPLICA_STICKY_SECONDS``: apps always read their own writes. The
+pins are kept in the Django cache, which must be shared between processes
+(i.e., memcached) for them to hold across processes.
+
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+import fnmatch
+import random
+import threading
+
+# GET views that are safe to answer from a replica. Shell-style patterns are allowed.
+READ_VIEWS = ('generic_list', 'carenet_generic_list', 'smart_*',
+              'document', 'record_specific_document', 'app_specific_document', 'record_app_specific_document',
+              'carenet_document', 'document_list', 'app_document_list', 'carenet_document_list',
+              'audit_query')
+
+STICKY_SECONDS = 10
+
+_local = threading.local()
+
+def replicas():
+    """ The aliases (in ``settings.DATABASES``) of the read replicas. """
+    return tuple(getattr(settings, 'DATABASE_REPLICAS', ()))
+
+def replica_view(view_name):
+    """ Is *view_name* safe to answer from a replica? """
+    for pattern in getattr(settings, 'REPLICA_READ_VIEWS', READ_VIEWS):
+        if fnmatch.fnmatchcase(view_name, pattern):
+            return True
+    return False
+
+def use_replica():
+    """ Send this thread's reads to a replica (the same one, until :py:func:`use_primary`). """
+    aliases = replicas()
+    _local.replica = random.choice(aliases) if aliases else None
+    return _local.replica
+
+def use_primary():
+    """ Send this thread's reads to the primary again. """
+    _local.replica = None
+
+def current_replica():
+    """ The replica this thread reads from, or None if it reads from the primary. """
+    return getattr(_local, 'replica', None)
+
+def _pin_key(scope):
+    return 'indivo-primary-%s' % scope
+
+def pin(scope):
+    """ Keep reads of *scope* (see :py:func:`scope`) on the primary for a while, after a write to it. """
+    timeout = getattr(settings, 'REPLICA_STICKY_SECONDS', STICKY_SECONDS)
+    if scope and timeout:
+        cache.set(_pin_key(scope), True, timeout)
+
+def pinned(scope):
+    return bool(scope) and cache.get(_pin_key(scope), False)
+
+def scope(view_kwargs):
+    """ What a request with (loaded) *view_kwargs* reads or writes: a record or, failing that, an app. """
+    record = view_kwargs.get('record')
+    carenet = view_kwargs.get('carenet')
+    if not record and carenet:
+        record = carenet.record
+    if record:
+        return 'record-%s' % record.id
+    pha = view_kwargs.get('pha')
+    if pha:
+        return 'pha-%s' % pha.email
+    return None
+
+class ReplicaRouter(object):
+    """ Writes go to the primary, reads to the replica chosen for the request, if any. """
+
+    def db_for_read(self, model, **hints):
+        return current_replica() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_syncdb(self, db, model):
+        # Replicas get their tables from the primary
+        if db in replicas():
+            return False
+        return None
@@ -0,0 +1,122 @@
+"""
+Sending email alerts after the request that triggers them, rather than during it.
+
+Talking to the mail server can take longer than everything else a request
+does, and a message sent to a widely shared record alerts every account it's
+routed to. :py:func:`send_mail` hands each email to a background thread,
+which sends them one at a time with :py:func:`indivo.lib.utils.send_mail`.
+Failures are logged there, and not retried.
+
+Emails asked for during a request are held until the request is over (see
+:py:class:`~indivo.middlewares.deferred_mail.DeferredMail`), and dropped if
+it fails: until then, what they announce may not be committed, and may yet
+be rolled back. Outside of requests, they're sent right away.
+
+With ``settings.DEFER_MAIL`` off, emails are sent in the request's thread,
+once it's over. With the outbox on (see :py:mod:`indivo.lib.outbox`),
+there's nothing to hold or defer: emails are saved to it right away, all in
+one statement, in the request's transaction.
+
+"""
+
+from django.conf import settings
+from indivo.lib import utils
+
+import atexit
+import logging
+import os
+import Queue
+import threading
+
+_queue = Queue.Queue()
+_worker = None
+_worker_pid = None
+_lock = threading.Lock()
+
+# The emails held for the current thread's request, if it's in one
+_held = threading.local()
+
+def send_mail(subject, body, sender, recipient_list):
+    """ Send an email soon, in the background. Takes the same arguments as :py:func:`indivo.lib.utils.send_mail`. """
+    send_mass_mail([(subject, body, sender, recipient_list)])
+
+def send_mass_mail(emails):
+    """ Send *emails*, (subject, body, sender, recipient_list) tuples, soon, in the background. """
+    # imported here, since the outbox is a model, and models depend on us
+    from indivo.lib import outbox
+    if outbox.enabled():
+        outbox.enqueue_many(emails)
+        return
+
+    held = getattr(_held, 'emails', None)
+    if held is not None:
+        held.extend(emails)
+        return
+    _send_mass_mail(emails)
+
+def hold():
+    """ Hold the emails asked for in this thread from now on, until :py:func:`release`. """
+    _held.emails = []
+
+def release(send=True):
+    """ Stop holding emails in this thread, and send the ones held, unless *send* is False. """
+    emails = getattr(_held, 'emails', None)
+    _held.emails = None
+    if emails and send:
+        _send_mass_mail(emails)
+
+def _send_mass_mail(emails):
+    if not getattr(settings, 'DEFER_MAIL', True):
+        for email in emails:
+            utils.send_mail(*email)
+        return
+
+    _start_worker()
+    for email in emails:
+        _queue.put(email)
+
+def _start_worker():
+    global _worker, _worker_pid
+    _lock.acquire()
+    try:
+        # Threads don't survive a fork
+        if _worker is None or _worker_pid != os.getpid():
+            _worker = threading.Thread(target=_run, name='indivo-deferred-mail')
+            _worker.daemon = True
+            _worker.start()
+            _worker_pid = os.getpid()
+    finally:
+        _lock.release()
+
+def _send(email):
+    try:
+        utils.send_mail(*email)
+    except Exception:
+        # utils.send_mail has logged the email
+        logging.exception('Could not send a deferred email')
+
+def _run():
+    while True:
+        email = _queue.get()
+        try:
+            _send(email)
+        finally:
+            _queue.task_done()
+
+def flush():
+    """ Wait until every email handed to :py:func:`send_mail` so far has been sent (or failed). """
+    if _worker is not None and _worker_pid == os.getpid():
+        _queue.join()
+        return
+
+    # No worker in this process to wait for: send them here
+    while True:
+        try:
+            email = _queue.get_nowait()
+        except Queue.Empty:
+            return
+        _send(email)
+        _queue.task_done()
+
+# Don't lose the emails still queued when the process exits
+atexit.register(flush)
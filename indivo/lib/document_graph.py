@@ -0,0 +1,165 @@
+"""
+Following chains of document relationships.
+
+A document's related documents (see
+:py:func:`~indivo.views.documents.document_rels.get_documents_by_rel`) are
+those that a :py:class:`~indivo.models.DocumentRels` points to from any
+version of it. :py:func:`closure` follows those relationships from one
+document as far as they go (or up to a maximum depth), finding each reachable
+document and the fewest hops it takes to reach it.
+
+On databases that support them, the whole traversal is a single recursive
+query. Elsewhere, it's a breadth-first search, with one query per level (per
+:py:data:`BATCH_SIZE` documents in that level).
+
+"""
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Count
+from indivo.models import Document, DocumentRels
+
+import sqlite3
+
+# Documents to expand per query, in the breadth-first search
+BATCH_SIZE = 500
+
+CLOSURE_SQL = '''
+WITH RECURSIVE closure(document_id, original_id, depth) AS (
+    SELECT d.%(id)s, d.%(original)s, 0 FROM %(documents)s d WHERE d.%(id)s = %%s
+  UNION
+    SELECT d1.%(id)s, d1.%(original)s, c.depth + 1
+    FROM closure c
+    JOIN %(documents)s d0 ON d0.%(original)s = c.original_id
+    JOIN %(rels)s r ON r.%(document_0)s = d0.%(id)s
+    JOIN %(documents)s d1 ON d1.%(id)s = r.%(document_1)s
+    WHERE c.depth < %%s AND d1.%(record)s = %%s %(rel_filter)s
+)
+SELECT document_id, MIN(depth) FROM closure WHERE original_id <> %%s GROUP BY document_id
+'''
+
+def max_depth_setting():
+    return getattr(settings, 'DOCUMENT_RELS_MAX_DEPTH', 10)
+
+def supports_recursive_cte(connection):
+    """ Can *connection*'s database run :py:data:`CLOSURE_SQL`? """
+    if connection.vendor == 'postgresql':
+        return True
+    if connection.vendor == 'sqlite':
+        return sqlite3.sqlite_version_info >= (3, 8, 3)
+    return False
+
+def closure(document, relationships=None, max_depth=None, use_cte=None):
+    """ Every document reachable from *document* by following relationships, with how far away it is.
+
+    Only follows relationships of the types in *relationships* (a list of
+    :py:class:`~indivo.models.DocumentSchema` objects), if given, and only
+    to documents in *document*'s record. Stops after *max_depth* hops (by
+    default, and at most, ``settings.DOCUMENT_RELS_MAX_DEPTH``).
+
+    Returns a dict of document id to depth (1 for documents *document* relates
+    to directly). Other versions of *document* are never included.
+
+    """
+
+    limit = max_depth_setting()
+    if max_depth is None or max_depth > limit:
+        max_depth = limit
+
+    db = DocumentRels.objects.db
+    if use_cte is None:
+        use_cte = supports_recursive_cte(connections[db])
+
+    if use_cte:
+        return _closure_cte(db, document, relationships, max_depth)
+    return _closure_bfs(db, document, relationships, max_depth)
+
+def _column(model, field_name):
+    return model._meta.get_field(field_name).column
+
+def _closure_cte(db, document, relationships, max_depth):
+    connection = connections[db]
+    quote = connection.ops.quote_name
+    params = [document.id, max_depth, document.record_id]
+
+    rel_filter = ''
+    if relationships is not None:
+        if not relationships:
+            return {}
+        rel_filter = 'AND r.%s IN (%s)' % (quote(_column(DocumentRels, 'relationship')),
+                                           ', '.join(['%s'] * len(relationships)))
+        params.extend(relationship.id for relationship in relationships)
+    params.append(document.original_id)
+
+    sql = CLOSURE_SQL % {
+        'documents': quote(Document._meta.db_table),
+        'rels': quote(DocumentRels._meta.db_table),
+        'id': quote(_column(Document, 'id')),
+        'original': quote(_column(Document, 'original')),
+        'record': quote(_column(Document, 'record')),
+        'document_0': quote(_column(DocumentRels, 'document_0')),
+        'document_1': quote(_column(DocumentRels, 'document_1')),
+        'rel_filter': rel_filter,
+        }
+
+    cursor = connection.cursor()
+    cursor.execute(sql, params)
+    return dict(cursor.fetchall())
+
+def _closure_bfs(db, document, relationships, max_depth):
+    depths = {}
+    seen = set([document.original_id])
+    frontier = [document.original_id]
+    depth = 0
+    while frontier and depth < max_depth:
+        depth += 1
+        next_frontier = []
+        for start in range(0, len(frontier), BATCH_SIZE):
+            rels = DocumentRels.objects.using(db).filter(document_0__original__in=frontier[start:start+BATCH_SIZE],
+                                                         document_1__record=document.record_id)
+            if relationships is not None:
+                rels = rels.filter(relationship__in=relationships)
+
+            for document_id, original_id in rels.values_list('document_1', 'document_1__original'):
+                if original_id == document.original_id:
+                    continue
+                depths.setdefault(document_id, depth)
+                if original_id not in seen:
+                    seen.add(original_id)
+                    next_frontier.append(original_id)
+        frontier = next_frontier
+    return depths
+
+def with_status(depths, status):
+    """ Only the documents in *depths* (as returned by :py:func:`closure`) with status *status*. """
+    ids = depths.keys()
+    kept = {}
+    for start in range(0, len(ids), BATCH_SIZE):
+        for document_id in Document.objects.filter(id__in=ids[start:start+BATCH_SIZE], status=status)\
+                .values_list('id', flat=True):
+            kept[document_id] = depths[document_id]
+    return kept
+
+def level_counts(depths):
+    """ The number of documents at each depth, as a sorted list of (depth, count). """
+    counts = {}
+    for depth in depths.itervalues():
+        counts[depth] = counts.get(depth, 0) + 1
+    return sorted(counts.iteritems())
+
+def prefetch_relation_counts(docs):
+    """ Load the relatesTo and isRelatedFrom counts of all of *docs* in two queries, rather than two per document. """
+    by_id = dict((doc.id, doc) for doc in docs)
+    for doc in docs:
+        doc._relates_to = []
+        doc._is_related_from = []
+
+    ids = by_id.keys()
+    for start in range(0, len(ids), BATCH_SIZE):
+        batch = ids[start:start+BATCH_SIZE]
+        for field, attr in (('document_0', '_relates_to'), ('document_1', '_is_related_from')):
+            counts = DocumentRels.objects.filter(**{'%s__in' % field: batch})\
+                .values(field, 'relationship__type').annotate(count=Count('relationship')).order_by()
+            for row in counts:
+                getattr(by_id[row[field]], attr).append({'relationship__type': row['relationship__type'],
+                                                         'count': row['count']})
@@ -0,0 +1,129 @@
+"""
+A request-scoped identity map for Indivo models.
+
+Within a single request, the same rows tend to be loaded over and over: the
+ParamLoader loads the record in the url, the access rules load it again via
+``token.share.record``, and auditing walks ``token.share.with_pha``. The
+IdentityMap holds every object loaded for the request, keyed by ``(model, pk)``,
+so that each row is fetched at most once. Whenever an object is added, foreign
+keys pointing at objects already in the map are filled in, so that Django's
+related-object descriptors don't go back to the database.
+
+"""
+
+import logging
+
+from django.db.models import ForeignKey
+
+# Process-wide totals, by view name: how much work the identity map has saved us.
+# Maps view names to {'requests': n, 'queries': n, 'saved': n}
+IDENTITY_MAP_STATS = {}
+
+class IdentityMap(object):
+
+    def __init__(self):
+        # (model, pk) -> object
+        self._objects = {}
+
+        # (model, field_name, value) -> pk, for lookups by natural keys (i.e., emails)
+        self._keys = {}
+
+        # instrumentation
+        self.queries = 0 # lookups that went to the database
+        self.hits = 0    # lookups answered from the map
+        self.links = 0   # foreign keys filled in from the map
+
+    @property
+    def saved(self):
+        """ The number of queries the map has saved us so far. """
+        return self.hits + self.links
+
+    def add(self, obj):
+        """ Register *obj*, along with any related objects already cached on it (i.e., by select_related). """
+        self._add(obj, set())
+        self._link_all()
+        return obj
+
+    def get(self, model, field_name, value, related=()):
+        """ Get the instance of *model* whose *field_name* is *value*.
+
+        Answers from the map if possible, otherwise loads the object (following
+        the relations in *related*), and registers it.
+        Raises ``model.DoesNotExist`` if there is no such object.
+
+        """
+        if field_name in ('pk', model._meta.pk.name, model._meta.pk.attname):
+            pk = value
+        else:
+            pk = self._keys.get((model, field_name, value))
+
+        obj = self._objects.get((model, pk)) if pk is not None else None
+        if obj is not None and isinstance(obj, model):
+            self.hits += 1
+            return obj
+
+        qs = model.objects.all()
+        if related:
+            qs = qs.select_related(*related)
+        obj = qs.get(**{field_name: value})
+        self.queries += 1
+
+        self._keys[(model, field_name, value)] = obj.pk
+        return self.add(obj)
+
+    def _add(self, obj, seen):
+        if obj is None or id(obj) in seen:
+            return
+        seen.add(id(obj))
+
+        # Register under the concrete model, and under any parent models (i.e.,
+        # an Account is also a Principal), unless a more specific object is already there
+        for model in [obj.__class__] + obj._meta.get_parent_list():
+            current = self._objects.get((model, obj.pk))
+            if current is None or not isinstance(current, obj.__class__):
+                self._objects[(model, obj.pk)] = obj
+
+        # Walk objects already loaded through foreign keys
+        for field in self._foreign_keys(obj):
+            related_obj = obj.__dict__.get(field.get_cache_name())
+            if related_obj is not None:
+                self._add(related_obj, seen)
+
+    def _link_all(self):
+        for obj in set(self._objects.itervalues()):
+            for field in self._foreign_keys(obj):
+                cache_name = field.get_cache_name()
+                if cache_name in obj.__dict__:
+                    continue
+
+                # Only foreign keys to primary keys can be answered from the map
+                if not field.rel.get_related_field().primary_key:
+                    continue
+
+                related_pk = getattr(obj, field.attname)
+                if related_pk is None:
+                    continue
+
+                related_obj = self._objects.get((field.rel.to, related_pk))
+                if related_obj is not None:
+                    setattr(obj, cache_name, related_obj)
+                    self.links += 1
+
+    def _foreign_keys(self, obj):
+        # Skip the links from child models to their parents (i.e., Account.account): they point back at obj itself
+        return [f for f in obj._meta.fields if isinstance(f, ForeignKey) and not f.rel.parent_link]
+
+def get_identity_map(request):
+    """ Get the identity map for *request*, creating it if necessary. """
+    if not hasattr(request, 'identity_map'):
+        request.identity_map = IdentityMap()
+    return request.identity_map
+
+def record_stats(view_name, identity_map):
+    """ Fold the work done by *identity_map* into the totals for *view_name*. """
+    stats = IDENTITY_MAP_STATS.setdefault(view_name, {'requests': 0, 'queries': 0, 'saved': 0})
+    stats['requests'] += 1
+    stats['queries'] += identity_map.queries
+    stats['saved'] += identity_map.saved
+    logging.debug('identity map for %s: %s queries, %s saved (%s hits, %s links)'%(
+            view_name, identity_map.queries, identity_map.saved, identity_map.hits, identity_map.links))
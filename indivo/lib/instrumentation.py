@@ -0,0 +1,146 @@
+"""
+Per-request instrumentation: SQL queries, DB time, and time spent rendering templates and serializing data.
+
+:py:class:`RequestTimings` collects the numbers for one request. While one
+is active in the current thread (between :py:func:`start_request` and
+:py:func:`finish_request`), blocks of code wrapped in :py:func:`timed` add
+their running time to it, by category. Outside of an instrumented request
+:py:func:`timed` does nothing but check for one, so it is cheap enough to
+leave in place everywhere.
+
+SQL queries are counted with Django's debug cursor, which we turn on for the
+duration of the request even if ``settings.DEBUG`` is off.
+
+"""
+
+from django.conf import settings
+from django.db import connections
+
+import threading
+import time
+
+# Categories we time, and their names in the Server-Timing header
+TEMPLATE = 'template'
+SERIALIZE = 'serialize'
+
+_local = threading.local()
+
+class QueryCounter(object):
+    """ Counts the queries run on each database connection between :py:meth:`start` and :py:meth:`stop`. """
+
+    def __init__(self):
+        self.queries = []
+
+    def start(self):
+        self._state = []
+        for connection in connections.all():
+            self._state.append((connection, connection.use_debug_cursor, len(connection.queries)))
+            connection.use_debug_cursor = True
+        return self
+
+    def stop(self):
+        for connection, use_debug_cursor, start in self._state:
+            self.queries.extend(connection.queries[start:])
+            connection.use_debug_cursor = use_debug_cursor
+
+            # Don't let the query log grow when it wouldn't normally be kept
+            if not settings.DEBUG:
+                del connection.queries[start:]
+        self._state = []
+        return self
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def time(self):
+        """ Total time spent running the queries, in seconds. """
+        return sum(float(query['time']) for query in self.queries)
+
+class RequestTimings(object):
+    """ What one request cost us. Times are in seconds. """
+
+    def __init__(self):
+        self.view_name = None
+        self.started = time.time()
+        self.total = None
+        self.timings = {}
+        self.query_counter = QueryCounter().start()
+        self._depth = {}
+
+    def add(self, category, seconds):
+        self.timings[category] = self.timings.get(category, 0.0) + seconds
+
+    def finish(self):
+        self.total = time.time() - self.started
+        self.query_counter.stop()
+
+    @property
+    def queries(self):
+        return self.query_counter.count
+
+    @property
+    def db_time(self):
+        return self.query_counter.time
+
+    def as_dict(self):
+        """ The timings, in milliseconds, ready to be logged. """
+        data = {'view': self.view_name,
+                'queries': self.queries,
+                'db_ms': _ms(self.db_time),
+                'total_ms': _ms(self.total)}
+        for category in (TEMPLATE, SERIALIZE):
+            data['%s_ms' % category] = _ms(self.timings.get(category, 0.0))
+        return data
+
+def _ms(seconds):
+    if seconds is None:
+        return None
+    return round(seconds * 1000, 3)
+
+def start_request():
+    """ Start instrumenting a request in the current thread, returning its :py:class:`RequestTimings`. """
+    # Clean up after a request that never finished (i.e., a response middleware raised)
+    finish_request()
+    _local.timings = RequestTimings()
+    return _local.timings
+
+def finish_request():
+    """ Stop instrumenting the current thread's request, returning its :py:class:`RequestTimings`, if any. """
+    timings = getattr(_local, 'timings', None)
+    _local.timings = None
+    if timings:
+        timings.finish()
+    return timings
+
+def current():
+    """ The :py:class:`RequestTimings` of the request being instrumented in this thread, or None. """
+    return getattr(_local, 'timings', None)
+
+class timed(object):
+    """ Add the running time of a ``with`` block to *category* for the current request.
+
+    Nested blocks of the same category are only counted once.
+
+    """
+
+    def __init__(self, category):
+        self.category = category
+
+    def __enter__(self):
+        self.timings = current()
+        if self.timings:
+            depth = self.timings._depth.get(self.category, 0)
+            self.timings._depth[self.category] = depth + 1
+            if depth == 0:
+                self.started = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.timings:
+            depth = self.timings._depth[self.category] - 1
+            self.timings._depth[self.category] = depth
+            if depth == 0:
+                self.timings.add(self.category, time.time() - self.started)
+        return False
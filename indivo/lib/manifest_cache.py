@@ -0,0 +1,84 @@
+"""
+Ready-to-send app manifests.
+
+The UI fetches the manifests of all userapps (``/apps/`` and
+``/apps/manifests/``) on every page load, and producing them means
+serializing every app, and parsing each one's requirements JSON, again.
+Instead, each process keeps the serialized JSON of the manifest list, and of
+each app's manifest (``/apps/{PHA_EMAIL}`` and ``/apps/{PHA_EMAIL}/manifest``),
+as bytes, with a strong ETag, so that clients that have them already get a
+:http:statuscode:`304`.
+
+Saving or deleting a PHA (as ``sync_apps`` does) empties the cache of the
+process that does it. It also replaces a generation token in the Django cache
+(see ``settings.CACHES``), which every lookup checks, so that other processes
+drop their copies too, as long as that cache is shared between them. With the
+default local-memory cache, other processes see changes once their copies are
+``settings.APP_MANIFEST_CACHE_TIMEOUT`` seconds old. A timeout of 0 disables
+the cache (responses still carry ETags).
+
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from indivo.lib import conditional
+
+import threading
+import time
+import uuid
+
+GENERATION_KEY = 'indivo-app-manifests-generation'
+
+# The generation token should outlive anything cached under it
+GENERATION_TIMEOUT = 60 * 60 * 24 * 30
+
+# key -> (generation, expiry timestamp, body, etag)
+_CACHE = {}
+_LOCK = threading.Lock()
+
+# instrumentation
+STATS = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+def timeout():
+    return getattr(settings, 'APP_MANIFEST_CACHE_TIMEOUT', 300)
+
+def _generation():
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        # Nobody has invalidated lately (or the cache forgot): start a new generation, unless someone beat us to it
+        cache.add(GENERATION_KEY, uuid.uuid4().hex, GENERATION_TIMEOUT)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+def get(key, serialize):
+    """ The bytes cached under *key* and their ETag, calling *serialize()* for the bytes if they aren't cached. """
+    cache_timeout = timeout()
+    if not cache_timeout:
+        body = serialize()
+        return body, conditional.strong_etag(body)
+
+    generation = _generation()
+    now = time.time()
+    entry = _CACHE.get(key)
+    if entry and entry[0] == generation and entry[1] > now:
+        STATS['hits'] += 1
+        return entry[2], entry[3]
+
+    STATS['misses'] += 1
+    body = serialize()
+    etag = conditional.strong_etag(body)
+    with _LOCK:
+        _CACHE[key] = (generation, now + cache_timeout, body, etag)
+    return body, etag
+
+def response(request, key, serialize):
+    """ A JSON response for the manifests cached under *key* (see :py:func:`get`), or a :http:statuscode:`304`. """
+    body, etag = get(key, serialize)
+    return conditional.response(request, body, etag, 'application/json')
+
+def invalidate(*args, **kwargs):
+    """ Drop every cached manifest, here and (through the Django cache) in other processes. """
+    STATS['invalidations'] += 1
+    with _LOCK:
+        _CACHE.clear()
+    cache.set(GENERATION_KEY, uuid.uuid4().hex, GENERATION_TIMEOUT)
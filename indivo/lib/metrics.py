@@ -0,0 +1,306 @@
+"""
+An in-process metrics registry, exported in the Prometheus text format.
+
+Views and libraries count things with the metrics defined at the bottom of
+this module (i.e. ``REQUESTS.inc(view_name)``), and ``GET /metrics`` renders
+them all. Counters and histograms are labelled: each distinct tuple of label
+values (i.e. each view) gets its own series. Libraries that already keep
+their own statistics (the permission cache, the reference data caches, the
+identity maps) are read by *collectors* when the metrics are rendered, so
+they pay nothing extra per request.
+
+When Indivo runs in several processes (i.e. under mod_wsgi or gunicorn), set
+``settings.METRICS_DIR``: each process then writes its metrics to its own
+file in that directory every ``settings.METRICS_FLUSH_INTERVAL`` seconds,
+and ``GET /metrics`` adds up the files of every process. Files of processes
+that have exited are kept, so that totals never go backwards: empty the
+directory when restarting the server.
+
+"""
+
+from django.conf import settings
+from django.utils import simplejson
+from indivo.lib import identity_map, permission_cache, reference_data
+
+import glob
+import os
+import tempfile
+import threading
+import time
+
+# Latency buckets, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+FILE_PREFIX = 'metrics-'
+
+class Metric(object):
+    """ A named family of series, one for each distinct tuple of *labels* values. """
+    type = None
+
+    def __init__(self, registry, name, help, labels=()):
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+
+    def _key(self, label_values):
+        if len(label_values) != len(self.labels):
+            raise ValueError('%s takes labels %s, got %s' % (self.name, self.labels, label_values))
+        return tuple([unicode(v) for v in label_values])
+
+    def samples(self):
+        """ {label values: value}, for every series of this metric. """
+        with self.registry._lock:
+            return dict((key, self._copy(value)) for key, value in self._values.iteritems())
+
+    def _copy(self, value):
+        return value
+
+    def reset(self):
+        with self.registry._lock:
+            self._values = {}
+
+class Counter(Metric):
+    """ A count that only goes up. """
+    type = 'counter'
+
+    def inc(self, *label_values, **kwargs):
+        """ Add *amount* (default 1) to the series for *label_values*. """
+        key = self._key(label_values)
+        amount = kwargs.get('amount', 1)
+        with self.registry._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+class Histogram(Metric):
+    """ Observations (i.e. latencies) counted into *buckets*, along with their sum. """
+    type = 'histogram'
+
+    def __init__(self, registry, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        super(Histogram, self).__init__(registry, name, help, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *label_values):
+        key = self._key(label_values)
+        with self.registry._lock:
+            # [count in each bucket (not cumulative)..., count above the last bucket, sum]
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def _copy(self, value):
+        return list(value)
+
+class Registry(object):
+
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+        self._lock = threading.RLock()
+        self._pid = os.getpid()
+        self._last_flush = 0
+
+    def counter(self, name, help, labels=()):
+        return self._add(Counter(self, name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._add(Histogram(self, name, help, labels, buckets))
+
+    def _add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector):
+        """ Register *collector*, a function called whenever metrics are gathered.
+
+        It should return a list of ``(name, type, help, labels, samples)``
+        tuples, where *samples* maps tuples of label values to the current
+        (process-wide) value of a counter.
+
+        """
+        self.collectors.append(collector)
+        return collector
+
+    def snapshot(self):
+        """ All of this process's metrics, as a JSON-friendly dict. """
+        self._check_fork()
+        families = {}
+        for metric in self.metrics:
+            families[metric.name] = _family(metric.type, metric.help, metric.labels, metric.samples(),
+                                            getattr(metric, 'buckets', None))
+        for collector in self.collectors:
+            for name, type, help, labels, samples in collector():
+                families[name] = _family(type, help, labels, samples)
+        return families
+
+    def _check_fork(self):
+        # A forked child inherits its parent's counts: start again, so they aren't counted twice
+        if os.getpid() != self._pid:
+            self._pid = os.getpid()
+            for metric in self.metrics:
+                metric.reset()
+
+    def maybe_flush(self):
+        """ Flush, if it's been a while since we last did. """
+        if _metrics_dir() and time.time() - self._last_flush >= getattr(settings, 'METRICS_FLUSH_INTERVAL', 5):
+            self.flush()
+
+    def flush(self):
+        """ Write this process's metrics to its file in ``settings.METRICS_DIR``, if it is set. """
+        metrics_dir = _metrics_dir()
+        if not metrics_dir:
+            return
+        self._last_flush = time.time()
+        data = simplejson.dumps(self.snapshot())
+
+        # Write and rename, so that readers never see half a file
+        fd, tmp_path = tempfile.mkstemp(dir=metrics_dir, prefix='.tmp-')
+        try:
+            f = os.fdopen(fd, 'w')
+            try:
+                f.write(data)
+            finally:
+                f.close()
+            os.rename(tmp_path, os.path.join(metrics_dir, '%s%s.json' % (FILE_PREFIX, os.getpid())))
+        except:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def gather(self):
+        """ The metrics of every process (or just this one, without a ``METRICS_DIR``), added up. """
+        metrics_dir = _metrics_dir()
+        if not metrics_dir:
+            return self.snapshot()
+
+        self.flush()
+        snapshots = []
+        for path in sorted(glob.glob(os.path.join(metrics_dir, '%s*.json' % FILE_PREFIX))):
+            try:
+                f = open(path)
+                try:
+                    snapshots.append(simplejson.load(f))
+                finally:
+                    f.close()
+            except (IOError, ValueError):
+                # The process went away as we read it: skip it
+                continue
+        return merge(snapshots)
+
+    def render(self):
+        """ Every process's metrics, in the Prometheus text format. """
+        return render(self.gather())
+
+def _metrics_dir():
+    metrics_dir = getattr(settings, 'METRICS_DIR', None)
+    if metrics_dir and not os.path.isdir(metrics_dir):
+        os.makedirs(metrics_dir)
+    return metrics_dir
+
+def _family(type, help, labels, samples, buckets=None):
+    # JSON object keys must be strings: encode label values as a JSON list
+    return {'type': type, 'help': help, 'labels': list(labels), 'buckets': buckets and list(buckets),
+            'samples': dict((simplejson.dumps(list(key)), value) for key, value in samples.iteritems())}
+
+def merge(snapshots):
+    """ Add up *snapshots*, from :py:meth:`Registry.snapshot`. """
+    merged = {}
+    for snapshot in snapshots:
+        for name, family in snapshot.iteritems():
+            if not merged.has_key(name):
+                merged[name] = dict(family, samples={})
+            samples = merged[name]['samples']
+            for key, value in family['samples'].iteritems():
+                if isinstance(value, list):
+                    old = samples.get(key) or [0] * len(value)
+                    samples[key] = [a + b for a, b in zip(old, value)]
+                else:
+                    samples[key] = samples.get(key, 0) + value
+    return merged
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _labels(names, values, extra=()):
+    pairs = zip(names, values) + list(extra)
+    if not pairs:
+        return ''
+    return '{%s}' % ','.join(['%s="%s"' % (name, _escape(unicode(value))) for name, value in pairs])
+
+def _number(value):
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+def render(families):
+    """ Render metric *families*, from :py:meth:`Registry.snapshot` or :py:func:`merge`, for Prometheus. """
+    lines = []
+    for name in sorted(families.keys()):
+        family = families[name]
+        lines.append('# HELP %s %s' % (name, family['help']))
+        lines.append('# TYPE %s %s' % (name, family['type']))
+        for key in sorted(family['samples'].keys()):
+            label_values = simplejson.loads(key)
+            value = family['samples'][key]
+            if family['type'] == 'histogram':
+                cumulative = 0
+                for bound, count in zip(family['buckets'], value):
+                    cumulative += count
+                    lines.append('%s_bucket%s %s' % (name, _labels(family['labels'], label_values,
+                                                                   [('le', _number(float(bound)))]), cumulative))
+                count = cumulative + value[len(family['buckets'])]
+                lines.append('%s_bucket%s %s' % (name, _labels(family['labels'], label_values, [('le', '+Inf')]),
+                                                 count))
+                lines.append('%s_sum%s %s' % (name, _labels(family['labels'], label_values), _number(value[-1])))
+                lines.append('%s_count%s %s' % (name, _labels(family['labels'], label_values), count))
+            else:
+                lines.append('%s%s %s' % (name, _labels(family['labels'], label_values), _number(value)))
+    return u'\n'.join(lines) + u'\n'
+
+REGISTRY = Registry()
+
+REQUESTS = REGISTRY.counter('indivo_requests_total', 'Requests handled, by view.', ('view',))
+REQUEST_ERRORS = REGISTRY.counter('indivo_request_errors_total',
+                                  'Requests that failed (with a 4XX or 5XX status), by view.', ('view',))
+REQUEST_LATENCY = REGISTRY.histogram('indivo_request_duration_seconds',
+                                     'Time to handle each request, in seconds, by view.', ('view',))
+DB_QUERIES = REGISTRY.counter('indivo_db_queries_total',
+                              'SQL queries run, by view (only counted with REQUEST_INSTRUMENTATION on).', ('view',))
+FACTS_INGESTED = REGISTRY.counter('indivo_facts_ingested_total',
+                                  'Facts created by processing documents, by data model.', ('model',))
+OFFLOADED_DOCUMENTS = REGISTRY.counter('indivo_offloaded_documents_total',
+                                       'Documents validated and transformed in a worker process, by result.',
+                                       ('result',))
+OFFLOAD_QUEUE_WAIT = REGISTRY.histogram('indivo_offload_queue_wait_seconds',
+                                        'Time documents waited for a free worker process, in seconds.')
+OFFLOAD_EXECUTION = REGISTRY.histogram('indivo_offload_execution_seconds',
+                                       'Time worker processes spent validating and transforming each document, '
+                                       'in seconds.')
+
+def record_request(view_name, status_code, seconds):
+    """ Count a request to *view_name*, which returned *status_code* after *seconds*. """
+    REQUESTS.inc(view_name)
+    if status_code >= 400:
+        REQUEST_ERRORS.inc(view_name)
+    REQUEST_LATENCY.observe(seconds, view_name)
+    REGISTRY.maybe_flush()
+
+@REGISTRY.register_collector
+def _cache_stats():
+    samples = {
+        ('permission', 'hit'): permission_cache.STATS['hits'],
+        ('permission', 'miss'): permission_cache.STATS['misses'],
+        ('reference_data', 'hit'): reference_data.STATS['hits'],
+        ('reference_data', 'miss'): reference_data.STATS['misses'],
+        ('identity_map', 'hit'): sum([s['saved'] for s in identity_map.IDENTITY_MAP_STATS.values()]),
+        ('identity_map', 'miss'): sum([s['queries'] for s in identity_map.IDENTITY_MAP_STATS.values()]),
+        }
+    return [('indivo_cache_requests_total', 'counter', 'Cache lookups, by cache and result (hit or miss).',
+             ('cache', 'result'), samples)]
@@ -0,0 +1,132 @@
+"""
+A durable outbox for email.
+
+With ``settings.EMAIL_OUTBOX`` on (it's off by default), emails aren't sent
+by the requests that ask for them: they're saved as
+:py:class:`~indivo.models.OutboxEmail` rows (in the request's transaction,
+so a request that fails sends nothing), and ``python manage.py
+deliver_email`` sends them. Each pass of the command
+claims a batch of due emails and sends them over one SMTP connection. An
+email that can't be sent is retried with exponential backoff, starting at
+``settings.EMAIL_OUTBOX_RETRY_DELAY`` seconds and doubling up to
+``settings.EMAIL_OUTBOX_MAX_RETRY_DELAY``, until it has been tried
+``settings.EMAIL_OUTBOX_MAX_ATTEMPTS`` times.
+
+Several workers can run at once: claiming an email pushes its next attempt
+back by ``settings.EMAIL_OUTBOX_CLAIM_SECONDS``, so that no other worker
+picks it up in the meantime, and a worker that dies mid-batch only delays
+its emails by that long.
+
+"""
+
+from django.conf import settings
+from django.core import mail
+from indivo.models import OutboxEmail
+from indivo.lib.utils import bulk_insert
+
+import datetime
+import logging
+import uuid
+
+def enabled():
+    """ Should emails go to the outbox, rather than straight to the mail server? """
+    return settings.SEND_MAIL and getattr(settings, 'EMAIL_OUTBOX', False)
+
+def enqueue(subject, body, sender, recipient_list):
+    """ Save an email for the deliver_email command to send. """
+    enqueue_many([(subject, body, sender, recipient_list)])
+
+def enqueue_many(emails):
+    """ Save *emails*, (subject, body, sender, recipient_list) tuples, in one statement. """
+    now = datetime.datetime.now()
+    bulk_insert(OutboxEmail, [OutboxEmail(id              = str(uuid.uuid4()),
+                                          subject         = subject,
+                                          body            = body,
+                                          sender          = sender,
+                                          recipients      = '\n'.join(recipient_list),
+                                          next_attempt_at = now)
+                              for subject, body, sender, recipient_list in emails])
+
+def retry_delay(attempts):
+    """ Seconds to wait before trying an email again, after *attempts* failures. """
+    delay = getattr(settings, 'EMAIL_OUTBOX_RETRY_DELAY', 60)
+    return min(delay * 2 ** (attempts - 1), getattr(settings, 'EMAIL_OUTBOX_MAX_RETRY_DELAY', 3600))
+
+def claim(batch_size, now=None):
+    """ Claim up to *batch_size* of the emails due to be sent, oldest first. """
+    now = now or datetime.datetime.now()
+    due = list(OutboxEmail.objects.filter(status=OutboxEmail.QUEUED, next_attempt_at__lte=now)
+               .order_by('next_attempt_at').values_list('id', flat=True)[:batch_size])
+    if not due:
+        return []
+
+    # Only the emails no other worker got to first end up with our claim's time
+    until = now + datetime.timedelta(seconds=getattr(settings, 'EMAIL_OUTBOX_CLAIM_SECONDS', 300))
+    OutboxEmail.objects.filter(id__in=due, status=OutboxEmail.QUEUED, next_attempt_at__lte=now)\
+        .update(next_attempt_at=until)
+    return list(OutboxEmail.objects.filter(id__in=due, status=OutboxEmail.QUEUED, next_attempt_at=until)
+                .order_by('created_at'))
+
+def deliver(batch_size=50, connection=None):
+    """ Send a batch of due emails, over one connection. Returns how many were sent, and how many failed. """
+    emails = claim(batch_size)
+    if not emails:
+        return 0, 0
+
+    connection = connection or mail.get_connection()
+    sent = failed = 0
+    opened = False
+    try:
+        for i, email in enumerate(emails):
+            if not opened:
+                try:
+                    connection.open()
+                    opened = True
+                except Exception, e:
+                    # Can't reach the mail server: none of the rest will go either
+                    for unsent in emails[i:]:
+                        _failed(unsent, e)
+                    failed += len(emails) - i
+                    break
+
+            try:
+                connection.send_messages([mail.EmailMessage(email.subject, email.body, email.sender,
+                                                            email.recipient_list, connection=connection)])
+            except Exception, e:
+                _failed(email, e)
+                failed += 1
+
+                # The connection may be broken: start the next email on a new one
+                try:
+                    connection.close()
+                except Exception, e:
+                    logging.warning('Error closing the mail connection after a failed send: %s' % e)
+                opened = False
+            else:
+                email.status = OutboxEmail.SENT
+                email.sent_at = datetime.datetime.now()
+                email.save()
+                sent += 1
+    finally:
+        if opened:
+            connection.close()
+    return sent, failed
+
+def _failed(email, error):
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 8):
+        email.status = OutboxEmail.FAILED
+        logging.error('Giving up on email %s to %s after %s attempts: %s' % (
+                email.id, ', '.join(email.recipient_list), email.attempts, error))
+    else:
+        email.next_attempt_at = datetime.datetime.now() + datetime.timedelta(seconds=retry_delay(email.attempts))
+    email.save()
+
+def purge(days):
+    """ Delete emails sent more than *days* days ago. Returns how many there were. """
+    sent = OutboxEmail.objects.filter(status=OutboxEmail.SENT,
+                                      sent_at__lt=datetime.datetime.now() - datetime.timedelta(days=days))
+    count = sent.count()
+    sent.delete()
+    return count
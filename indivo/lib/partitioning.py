@@ -0,0 +1,217 @@
+"""
+Monthly table partitioning for append-only tables (i.e., Audit)
+
+On PostgreSQL, rows are routed into child tables (one per calendar month)
+which inherit from the parent table and carry a CHECK constraint on the
+partition field. Queries against the parent table transparently see all of
+the children, and the planner can skip children whose CHECK constraint
+excludes the query's date bounds. Old months can then be archived and
+removed with a cheap DROP TABLE instead of a huge DELETE.
+
+On other databases, partitioning degrades gracefully: everything stays in
+the parent table, and month-based archiving falls back to range deletes.
+"""
+
+import datetime
+
+from django.db import connection, transaction
+
+POSTGRES_ENGINE = 'django.db.backends.postgresql_psycopg2'
+
+# Rows are written to their partition by a BEFORE trigger, which then cancels
+# the insert into the parent table (by returning NULL). That also means an
+# INSERT ... RETURNING gets no id back: saves take their id from the sequence
+# beforehand instead (see MonthlyPartitions.next_id).
+ROUTE_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION %(table)s_route_insert() RETURNS TRIGGER AS $$
+DECLARE
+    child TEXT := '%(table)s_y' || to_char(NEW.%(field)s, 'YYYY') || 'm' || to_char(NEW.%(field)s, 'MM');
+    lower_bound TIMESTAMP := date_trunc('month', NEW.%(field)s);
+BEGIN
+    BEGIN
+        EXECUTE 'INSERT INTO ' || quote_ident(child) || ' SELECT ($1).*' USING NEW;
+    EXCEPTION WHEN undefined_table THEN
+        BEGIN
+            EXECUTE 'CREATE TABLE ' || quote_ident(child) || ' ('
+                 || 'CHECK (%(field)s >= ' || quote_literal(lower_bound) || '::timestamptz'
+                 || ' AND %(field)s < ' || quote_literal(lower_bound + interval '1 month') || '::timestamptz)'
+                 || ') INHERITS (%(table)s)';
+            EXECUTE 'CREATE INDEX ' || quote_ident(child || '_record_dt') || ' ON '
+                 || quote_ident(child) || ' (record_id, %(field)s)';
+            EXECUTE 'CREATE INDEX ' || quote_ident(child || '_id') || ' ON '
+                 || quote_ident(child) || ' (id)';
+        EXCEPTION WHEN duplicate_table THEN
+            -- another transaction created the partition first
+            NULL;
+        END;
+        EXECUTE 'INSERT INTO ' || quote_ident(child) || ' SELECT ($1).*' USING NEW;
+    END;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+INSTALL_TRIGGERS_SQL = """
+DROP TRIGGER IF EXISTS %(table)s_route_insert_trigger ON %(table)s;
+CREATE TRIGGER %(table)s_route_insert_trigger BEFORE INSERT ON %(table)s
+    FOR EACH ROW EXECUTE PROCEDURE %(table)s_route_insert();
+-- earlier versions let the row into the parent table, and deleted it again after the insert
+DROP TRIGGER IF EXISTS %(table)s_remove_parent_row_trigger ON %(table)s;
+DROP FUNCTION IF EXISTS %(table)s_remove_parent_row();
+"""
+
+UNINSTALL_TRIGGERS_SQL = """
+DROP TRIGGER IF EXISTS %(table)s_route_insert_trigger ON %(table)s;
+DROP TRIGGER IF EXISTS %(table)s_remove_parent_row_trigger ON %(table)s;
+DROP FUNCTION IF EXISTS %(table)s_route_insert();
+DROP FUNCTION IF EXISTS %(table)s_remove_parent_row();
+"""
+
+NEXT_ID_SQL = "SELECT nextval(pg_get_serial_sequence(%s, 'id'))"
+
+LIST_PARTITIONS_SQL = """
+SELECT c.relname FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    JOIN pg_class p ON p.oid = i.inhparent
+    WHERE p.relname = %s
+    ORDER BY c.relname
+"""
+
+def month_start(dt):
+    """ Return the first instant of the month containing *dt*. """
+    return datetime.datetime(dt.year, dt.month, 1)
+
+def next_month(dt):
+    """ Return the first instant of the month following the one containing *dt*. """
+    if dt.month == 12:
+        return datetime.datetime(dt.year + 1, 1, 1)
+    return datetime.datetime(dt.year, dt.month + 1, 1)
+
+def months_between(start, end):
+    """ Yield the first instant of every month from *start* up to (not including) *end*. """
+    cur = month_start(start)
+    while cur < end:
+        yield cur
+        cur = next_month(cur)
+
+class MonthlyPartitions(object):
+    """ Describes the monthly partitioning of a single model's table.
+
+    Attach an instance to a model class (as ``partitions``) to make
+    :py:class:`~indivo.lib.query.FactQuery` partition-aware for that model.
+
+    """
+
+    def __init__(self, table, field):
+        self.table = table
+        self.field = field
+
+    @property
+    def supported(self):
+        """ Whether the configured database can hold real partitions. """
+        return connection.settings_dict['ENGINE'] == POSTGRES_ENGINE
+
+    def partition_name(self, dt):
+        """ The name of the child table holding rows for the month of *dt*. """
+        return '%s_y%04dm%02d' % (self.table, dt.year, dt.month)
+
+    def parse_partition_name(self, name):
+        """ The first instant of the month stored in child table *name*, or None. """
+        prefix = '%s_y' % self.table
+        if not name.startswith(prefix):
+            return None
+        try:
+            year, month = name[len(prefix):].split('m')
+            return datetime.datetime(int(year), int(month), 1)
+        except ValueError:
+            return None
+
+    def install(self):
+        """ Start routing new rows into monthly child tables. Idempotent. """
+        if not self.supported:
+            return
+        cursor = connection.cursor()
+        args = {'table': self.table, 'field': self.field}
+        cursor.execute(ROUTE_FUNCTION_SQL % args)
+        cursor.execute(INSTALL_TRIGGERS_SQL % args)
+        transaction.commit_unless_managed()
+
+    def next_id(self):
+        """ Reserve an id for a new row, or None if the database will assign one as the row is inserted. """
+        if not self.supported:
+            return None
+        cursor = connection.cursor()
+        cursor.execute(NEXT_ID_SQL, [self.table])
+        return cursor.fetchone()[0]
+
+    def uninstall(self):
+        """ Stop routing rows into child tables. Existing children are left in place. """
+        if not self.supported:
+            return
+        cursor = connection.cursor()
+        cursor.execute(UNINSTALL_TRIGGERS_SQL % {'table': self.table})
+        transaction.commit_unless_managed()
+
+    def existing(self):
+        """ Return a list of (month_start, table_name) for all existing child tables, oldest first. """
+        if not self.supported:
+            return []
+        cursor = connection.cursor()
+        cursor.execute(LIST_PARTITIONS_SQL, [self.table])
+        ret = []
+        for (name,) in cursor.fetchall():
+            month = self.parse_partition_name(name)
+            if month:
+                ret.append((month, name))
+        return ret
+
+    def drop_month(self, month):
+        """ Remove every row stored for the month beginning at *month*.
+
+        With partitioning this drops the child table, and clears any rows
+        for that month left in the parent table from before partitioning
+        was installed. Without it, this is a plain range delete.
+
+        """
+        cursor = connection.cursor()
+        qn = connection.ops.quote_name
+        if self.supported:
+            cursor.execute('DROP TABLE IF EXISTS %s' % qn(self.partition_name(month)))
+            only = 'ONLY '
+        else:
+            only = ''
+        cursor.execute('DELETE FROM %s%s WHERE %s >= %%s AND %s < %%s' % (only, qn(self.table), qn(self.field), qn(self.field)),
+                       [month, next_month(month)])
+        transaction.commit_unless_managed()
+
+    def prune(self, queryset, start_date=None, end_date=None):
+        """ Restrict *queryset* so that the planner can skip irrelevant partitions.
+
+        Django hands datetimes to the database as ``timestamp`` values, and the
+        cross-type comparison against our ``timestamptz`` CHECK constraints isn't
+        immutable, so PostgreSQL won't use it for constraint exclusion. Adding the
+        same bounds as plain ``timestamptz`` literals lets it exclude partitions.
+
+        """
+        if not self.supported or not (start_date or end_date):
+            return queryset
+
+        qn = connection.ops.quote_name
+        column = '%s.%s' % (qn(self.table), qn(self.field))
+        where = []
+        if start_date:
+            where.append("%s >= '%s'::timestamptz" % (column, self._literal(start_date)))
+        if end_date:
+            where.append("%s <= '%s'::timestamptz" % (column, self._literal(end_date)))
+        return queryset.extra(where=where)
+
+    def _literal(self, dt):
+        # Only datetimes produced by our own parsers make it here, but be strict anyway:
+        # these are interpolated into SQL directly so that they reach the planner as constants.
+        if not isinstance(dt, datetime.datetime):
+            if not isinstance(dt, datetime.date):
+                raise ValueError('Invalid partition bound: %s' % dt)
+            dt = datetime.datetime(dt.year, dt.month, dt.day)
+        if dt.tzinfo:
+            dt = dt.replace(tzinfo=None) - dt.utcoffset()
+        return dt.isoformat(' ')
@@ -0,0 +1,86 @@
+"""
+A process-wide cache of the permission checks made for each principal.
+
+Access rules ask the same questions on almost every request (does this account
+fully share the record? is this app in the carenet?), and the answers only
+change when shares are created or deleted, which is rare. Instead of querying
+AccountFullShare, CarenetAccount, PHAShare or CarenetPHA for every check, we
+remember each answer, per principal, for ``settings.PERMISSION_CACHE_TTL`` seconds.
+
+Creating or deleting a share drops everything cached for the affected principal
+immediately in the current process. Other processes pick up the change when
+their cached entry expires, so the TTL bounds how long a revoked share may
+still be honored elsewhere. A TTL of 0 (the default) disables the cache.
+
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.db.models import signals
+
+# Don't let the cache grow without bound: start over when it gets this big.
+MAX_PRINCIPALS = 10000
+
+# principal id -> (expiry timestamp, {check key: answer})
+_CACHE = {}
+_LOCK = threading.Lock()
+
+# instrumentation
+STATS = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+def ttl():
+    return getattr(settings, 'PERMISSION_CACHE_TTL', 0)
+
+def check(principal, key, loader):
+    """ Answer the permission check *key* for *principal*.
+
+    Returns the cached answer if we have one, otherwise calls *loader()* and caches its result.
+
+    """
+    cache_ttl = ttl()
+    if not cache_ttl:
+        return bool(loader())
+
+    now = time.time()
+    entry = _CACHE.get(principal.id)
+    if entry and entry[0] > now and entry[1].has_key(key):
+        STATS['hits'] += 1
+        return entry[1][key]
+
+    STATS['misses'] += 1
+    answer = bool(loader())
+    with _LOCK:
+        entry = _CACHE.get(principal.id)
+        if not entry or entry[0] <= now:
+            if len(_CACHE) >= MAX_PRINCIPALS:
+                _CACHE.clear()
+            entry = (now + cache_ttl, {})
+            _CACHE[principal.id] = entry
+        entry[1][key] = answer
+    return answer
+
+def invalidate(principal_id):
+    """ Forget everything cached for the principal with id *principal_id*. """
+    with _LOCK:
+        if _CACHE.pop(principal_id, None):
+            STATS['invalidations'] += 1
+
+def clear():
+    """ Forget everything cached for every principal. """
+    with _LOCK:
+        _CACHE.clear()
+
+def invalidate_on_change(model, principal_field):
+    """ Invalidate the cache for the principal referenced by *principal_field*
+    whenever an instance of *model* is saved or deleted.
+
+    """
+    attname = model._meta.get_field(principal_field).attname
+    def _invalidate(sender, instance, **kwargs):
+        invalidate(getattr(instance, attname))
+
+    uid = 'permission_cache_%s' % model.__name__
+    signals.post_save.connect(_invalidate, sender=model, weak=False, dispatch_uid=uid)
+    signals.post_delete.connect(_invalidate, sender=model, weak=False, dispatch_uid=uid)
@@ -6,9 +6,11 @@ from indivo.lib.sharing_utils import carenet_facts_filter
 from indivo.lib.utils import render_template
 from indivo.lib.iso8601 import parse_utc_date
 from django.db.models import Avg, Count, Max, Min, Sum
-from django.db import connection
+from django.db import connection, transaction
 from django.db.backends import postgresql_psycopg2, mysql, oracle
 
+from contextlib import contextmanager
+
 
 db_string = connection.settings_dict['ENGINE']
 if '.' in db_string:
@@ -71,6 +73,12 @@ FORMAT_STRS = {
     mysql: "date_format(%(field)s, '%(format)s')",
 }
 
+# Setting (in milliseconds) and resetting the longest a statement may run before the database cancels it
+STATEMENT_TIMEOUT_SQL = {
+    postgresql_psycopg2: ("SET statement_timeout = %d", "SET statement_timeout = DEFAULT"),
+    mysql: ("SET SESSION max_execution_time = %d", "SET SESSION max_execution_time = DEFAULT"),
+}
+
 OUTPUT_TEMPLATE = 'reports/report'
 AGGREGATE_TEMPLATE = 'reports/aggregate.xml'
 
@@ -87,7 +95,7 @@ RELATED_LIST = [
 class FactQuery(object):
     def __init__(self, model, model_filters,
                  query_options,
-                 record=None, carenet=None):
+                 record=None, carenet=None, record_ids=None):
         self.model = model
         self.valid_filters = model_filters
         self.group_by = query_options.get('group_by')
@@ -109,6 +117,9 @@ class FactQuery(object):
         self.carenet = carenet
         self.record = carenet.record if carenet else record
 
+        # Population queries, over many records (or all of them, with no record, carenet or record_ids)
+        self.record_ids = record_ids
+
     def render(self, item_template, output_template=OUTPUT_TEMPLATE):
         if self.results is None:
             self.execute()
@@ -137,7 +148,7 @@ class FactQuery(object):
                          }
         return render_template(output_template, template_args, type="xml")
 
-    def execute(self):
+    def execute(self, count=True):
         '''
         New API Query Interface (to be released for Beta 3)
         Query operators are evaluated as follows:
@@ -146,6 +157,8 @@ class FactQuery(object):
         3. Aggregate by is evaluated
         4. order_by is applied
         5. We evaluate the query to get an ordered list of results, the apply limit and offset.
+
+        Pass count=False to skip counting the results before paging: trc will be None.
         '''
 
         # This is okay, Django evaluates lazily
@@ -181,7 +194,7 @@ class FactQuery(object):
 
         # Avoid evaluation for as long as possible: pass back a QuerySet object
         else:
-            self.trc = results.count()
+            self.trc = results.count() if count else None
             if self.limit:
                 results = results[self.offset:self.offset+self.limit]
                 
@@ -195,6 +208,8 @@ class FactQuery(object):
         # Need to allow queries with no record or carenet, i.e., Audit, which isn't constrained to a single record
         if self.record:
             results = results.filter(record=self.record)
+        elif self.record_ids is not None:
+            results = results.filter(record__in=self.record_ids)
         results = carenet_facts_filter(self.carenet, results)
 
 
@@ -235,6 +250,11 @@ class FactQuery(object):
         if filter_args:
             results = results.filter(**filter_args)
 
+        # Partitioned models (i.e., Audit) can skip whole partitions outside the date range
+        partitions = getattr(self.model, 'partitions', None)
+        if partitions and self.date_range and self.valid_filters[self.date_range['field']][0] == partitions.field:
+            results = partitions.prune(results, self.date_range['start_date'], self.date_range['end_date'])
+
         # Results look like:
         # [obj1, obj2, ...] For every Fact object we haven't filtered out
         return results
@@ -345,3 +365,28 @@ class FactQuery(object):
             results = results.order_by()
 
         return results
+
+@contextmanager
+def statement_timeout(seconds):
+    """ Have the database cancel any statement that runs for longer than *seconds*, within the block.
+
+    Supported on PostgreSQL and MySQL (5.7 or later): on other databases, statements aren't limited. A
+    cancelled statement raises a :py:class:`~django.db.DatabaseError`, and rolls back the current
+    transaction.
+
+    """
+    sql = STATEMENT_TIMEOUT_SQL.get(DB_ENGINE)
+    if not sql or not seconds:
+        yield
+        return
+
+    cursor = connection.cursor()
+    cursor.execute(sql[0] % int(seconds * 1000))
+    try:
+        yield
+    except:
+        # A cancelled statement leaves PostgreSQL's transaction unusable until we roll it back
+        transaction.rollback_unless_managed()
+        raise
+    finally:
+        cursor.execute(sql[1])
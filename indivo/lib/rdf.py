@@ -4,8 +4,11 @@ Adapted from the `Smart Sample Data generator <https://github.com/chb/smart_samp
 
 .. moduleauthor:: Daniel Haas <daniel.haas@post.harvard.edu
 
+rdflib is slow to import, and most processes never build a graph, so it is
+imported (and the namespaces below defined) when the first
+:py:class:`PatientGraph` is created, by :py:func:`load_rdflib`.
+
 """
-from rdflib import ConjunctiveGraph, Namespace, BNode, Literal, RDF, URIRef
 
 # Some constant strings:
 SP_DEMOGRAPHICS = "http://smartplatforms.org/records/%s/demographics"
@@ -25,14 +28,31 @@ INDIVO_VOCAB_URI="http://indivo.org/vocab/documents#%s"
 LAB_INTERP_URI="http://smartplatforms.org/terms/codes/LabResultInterpretation#%s"
 LAB_STATUS_URI="http://smartplatforms.org/terms/codes/LabStatus#%s"
 
-# First Declare Name Spaces
-SP = Namespace("http://smartplatforms.org/terms#")
-SPCODE = Namespace("http://smartplatforms.org/terms/codes/")
-DC = Namespace("http://purl.org/dc/elements/1.1/")
-DCTERMS = Namespace("http://purl.org/dc/terms/")
-FOAF = Namespace("http://xmlns.com/foaf/0.1/")
-RDFS=Namespace("http://www.w3.org/2000/01/rdf-schema#")
-VCARD=Namespace("http://www.w3.org/2006/vcard/ns#")
+# Name Spaces, declared by load_rdflib()
+NAMESPACES = {
+    'SP': "http://smartplatforms.org/terms#",
+    'SPCODE': "http://smartplatforms.org/terms/codes/",
+    'DC': "http://purl.org/dc/elements/1.1/",
+    'DCTERMS': "http://purl.org/dc/terms/",
+    'FOAF': "http://xmlns.com/foaf/0.1/",
+    'RDFS': "http://www.w3.org/2000/01/rdf-schema#",
+    'VCARD': "http://www.w3.org/2006/vcard/ns#",
+    }
+
+_rdflib_loaded = False
+
+def load_rdflib():
+    """ Import rdflib, and declare our Name Spaces, if we haven't already. """
+    global _rdflib_loaded
+    global ConjunctiveGraph, Namespace, BNode, Literal, RDF, URIRef
+    if _rdflib_loaded:
+        return
+
+    from rdflib import ConjunctiveGraph, Namespace, BNode, Literal, RDF, URIRef
+    module_globals = globals()
+    for name, uri in NAMESPACES.iteritems():
+        module_globals[name] = Namespace(uri)
+    _rdflib_loaded = True
 
 
 class PatientGraph(object):
@@ -40,6 +60,7 @@ class PatientGraph(object):
 
     def __init__(self, record):
         """Create an instance of a RDF graph for patient instance p""" 
+        load_rdflib()
         self.record=record
         
         # Create a RDF graph and namespaces:
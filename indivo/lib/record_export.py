@@ -0,0 +1,225 @@
+"""
+Export a whole record -- documents, metadata, version chains, relationships and (optionally) facts.
+
+:py:class:`RecordExporter` walks a record in primary key batches, so memory
+use stays flat however many documents the record holds, and writes it out as
+a stream of chunks, in one of two formats:
+
+``ndjson``
+  One JSON object per line, each with a ``type`` of ``record`` (always
+  first), ``document``, ``relationship`` or ``fact``. Text document bodies
+  are inlined as ``content``; binary bodies as base64, in ``content_base64``.
+
+``zip``
+  A zip archive of ``record.json``, the document metadata, relationships
+  and facts as NDJSON files of at most one batch each
+  (``documents/00001.ndjson``, ``relationships/00001.ndjson``,
+  ``facts/<Model>/00001.ndjson``), and the document bodies, as is, in
+  ``content/<document id>``. Metadata for a document names its body with
+  ``content_path``.
+
+Documents are listed in order of id, with all of their versions: a
+document's ``original_id``, ``replaces_id`` and ``replaced_by_id`` link
+each version to the others.
+
+NDJSON exports hold at most one batch in memory. Zip exports also keep a
+small entry per file in the archive, for its closing directory.
+
+"""
+
+from django.core import serializers
+from django.db.models.loading import get_models
+from django.utils import simplejson
+from indivo.models import Document, DocumentRels, Fact
+from indivo.serializers.json import IndivoJSONEncoder
+
+import base64
+import zipfile
+
+NDJSON = 'ndjson'
+ZIP = 'zip'
+FORMATS = {NDJSON: 'application/x-ndjson', ZIP: 'application/zip'}
+EXTENSIONS = {NDJSON: 'ndjson', ZIP: 'zip'}
+
+BATCH_SIZE = 500
+
+DOCUMENT_FIELDS = ('id', 'created_at', 'creator__email', 'external_id', 'fqn', 'mime_type', 'label', 'size',
+                   'digest', 'status__name', 'nevershare', 'pha__email', 'original', 'replaces', 'replaced_by',
+                   'suppressed_at', 'suppressed_by__email', 'content', 'content_file')
+
+# Names of the metadata fields in the export, when not the same as in DOCUMENT_FIELDS
+DOCUMENT_FIELD_NAMES = {'creator__email': 'creator', 'status__name': 'status', 'pha__email': 'pha',
+                        'original': 'original_id', 'replaces': 'replaces_id', 'replaced_by': 'replaced_by_id',
+                        'suppressed_by__email': 'suppressed_by'}
+
+def _batches(queryset, batch_size=BATCH_SIZE):
+    """ Lists of rows (from ``queryset.values()``, or objects) from *queryset*, *batch_size* at a time, by id.
+
+    Paging by id rather than by offset keeps every batch as cheap as the
+    first, and means we never hold more than one batch at a time.
+
+    """
+    queryset = queryset.order_by('id')
+    last_id = None
+    while True:
+        batch = queryset if last_id is None else queryset.filter(id__gt=last_id)
+        batch = list(batch[:batch_size])
+        if not batch:
+            return
+        yield batch
+        last = batch[-1]
+        last_id = last['id'] if isinstance(last, dict) else last.id
+
+def fact_models():
+    """ All of the Fact data models, by name. """
+    return sorted([(model.__name__, model) for model in get_models()
+                   if issubclass(model, Fact) and model is not Fact])
+
+class RecordExporter(object):
+
+    def __init__(self, record, format=NDJSON, include_facts=False, batch_size=BATCH_SIZE):
+        if format not in FORMATS:
+            raise ValueError("Unknown export format: %s" % format)
+        self.record = record
+        self.format = format
+        self.include_facts = include_facts
+        self.batch_size = batch_size
+
+    @property
+    def content_type(self):
+        return FORMATS[self.format]
+
+    @property
+    def filename(self):
+        return 'record-%s.%s' % (self.record.id, EXTENSIONS[self.format])
+
+    def __iter__(self):
+        """ The export, as a stream of byte strings. """
+        if self.format == ZIP:
+            return self._zip_chunks()
+        return self._ndjson_chunks()
+
+    def record_data(self):
+        record = self.record
+        return {'id': record.id,
+                'label': record.label,
+                'created_at': record.created_at,
+                'owner': record.owner.email if record.owner else None,
+                'external_id': record.external_id}
+
+    def document_batches(self):
+        """ Metadata (with the raw ``content`` and ``content_file`` fields) of the record's documents, in batches. """
+        queryset = Document.objects.filter(record=self.record).values(*DOCUMENT_FIELDS)
+        for batch in _batches(queryset, self.batch_size):
+            for row in batch:
+                for field, name in DOCUMENT_FIELD_NAMES.iteritems():
+                    row[name] = row.pop(field)
+            yield batch
+
+    def relationships(self, document_ids):
+        """ The relationships from the documents in *document_ids*. """
+        rels = DocumentRels.objects.filter(document_0__in=document_ids)
+        return [{'type': 'relationship', 'relationship': row['relationship__type'],
+                 'document_id': row['document_0'], 'related_document_id': row['document_1']}
+                for row in rels.values('document_0', 'document_1', 'relationship__type').order_by('id')]
+
+    def fact_batches(self):
+        """ (model name, serialized facts) for each batch of the record's facts. """
+        for name, model in fact_models():
+            for batch in _batches(model.objects.filter(record=self.record), self.batch_size):
+                facts = serializers.serialize('indivo_python', batch)
+                for fact in facts:
+                    fact['type'] = 'fact'
+                yield name, facts
+
+    def content(self, document):
+        """ The body of *document* (a row from :py:meth:`document_batches`), as a byte string. """
+        if document['content_file']:
+            return self._read_file(document['content_file'])
+        return (document['content'] or u'').encode('utf-8')
+
+    def _read_file(self, name):
+        f = Document._meta.get_field('content_file').storage.open(name, 'rb')
+        try:
+            return f.read()
+        finally:
+            f.close()
+
+    def _line(self, data):
+        return simplejson.dumps(data, cls=IndivoJSONEncoder) + '\n'
+
+    def _ndjson_chunks(self):
+        data = self.record_data()
+        data['type'] = 'record'
+        yield self._line(data)
+
+        for batch in self.document_batches():
+            lines = []
+            for document in batch:
+                content_file = document.pop('content_file')
+                if content_file:
+                    document['content_base64'] = base64.b64encode(self._read_file(content_file))
+                document['type'] = 'document'
+                lines.append(self._line(document))
+            lines.extend([self._line(rel) for rel in self.relationships([d['id'] for d in batch])])
+            yield ''.join(lines)
+
+        if self.include_facts:
+            for name, facts in self.fact_batches():
+                yield ''.join([self._line(fact) for fact in facts])
+
+    def _zip_chunks(self):
+        out = _ChunkedWriter()
+        archive = zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED, allowZip64=True)
+
+        archive.writestr('record.json', simplejson.dumps(self.record_data(), cls=IndivoJSONEncoder))
+        yield out.drain()
+
+        for i, batch in enumerate(self.document_batches()):
+            for document in batch:
+                path = 'content/%s' % document['id']
+                archive.writestr(path, self.content(document))
+                yield out.drain()
+                del document['content'], document['content_file']
+                document['type'] = 'document'
+                document['content_path'] = path
+
+            archive.writestr('documents/%05d.ndjson' % (i + 1), ''.join([self._line(d) for d in batch]))
+            rels = self.relationships([d['id'] for d in batch])
+            if rels:
+                archive.writestr('relationships/%05d.ndjson' % (i + 1), ''.join([self._line(r) for r in rels]))
+            yield out.drain()
+
+        if self.include_facts:
+            counts = {}
+            for name, facts in self.fact_batches():
+                counts[name] = counts.get(name, 0) + 1
+                archive.writestr('facts/%s/%05d.ndjson' % (name, counts[name]),
+                                 ''.join([self._line(fact) for fact in facts]))
+                yield out.drain()
+
+        archive.close()
+        yield out.drain()
+
+class _ChunkedWriter(object):
+    """ A write-only file for :py:class:`zipfile.ZipFile`, whose contents we hand on as they are written. """
+
+    def __init__(self):
+        self.position = 0
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(data)
+        self.position += len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        """ Everything written since the last call. """
+        data = ''.join(self.chunks)
+        self.chunks = []
+        return data
@@ -0,0 +1,89 @@
+"""
+Process-wide caches for small, nearly static reference tables.
+
+Tables like StatusName, DocumentSchema and AuthSystem hold a handful of rows
+that change only when Indivo is upgraded or new schemas are registered, but
+views look them up by name on almost every request. A ReferenceDataCache loads
+the whole table once, answers lookups by natural key from memory, and drops its
+contents whenever a row of the table is saved or deleted.
+
+Usage: add a cache to the model as a class attribute::
+
+  class StatusName(BaseModel):
+    name = models.CharField(max_length=24)
+    cached = ReferenceDataCache('name')
+
+  active = StatusName.cached.get('active')
+
+"""
+
+import threading
+
+from django.db.models import signals
+
+# All caches, so they can be loaded or cleared together
+_CACHES = []
+
+# instrumentation
+STATS = {'hits': 0, 'misses': 0}
+
+class ReferenceDataCache(object):
+
+    def __init__(self, key_field):
+        self.key_field = key_field
+        self.model = None
+        self._rows = None
+        self._lock = threading.Lock()
+
+    def contribute_to_class(self, cls, name):
+        # Called by Django's model metaclass: lets us learn our model, and watch it for changes
+        self.model = cls
+        setattr(cls, name, self)
+        signals.post_save.connect(self.invalidate, sender=cls, weak=False)
+        signals.post_delete.connect(self.invalidate, sender=cls, weak=False)
+        _CACHES.append(self)
+
+    def load(self):
+        """ (Re)load the whole table. """
+        rows = dict((getattr(obj, self.key_field), obj) for obj in self.model.objects.all())
+        self._rows = rows
+        return rows
+
+    def get(self, key):
+        """ Get the row whose key field is *key*.
+
+        Falls back to the database for rows we haven't seen yet (i.e., added by another process),
+        and raises ``model.DoesNotExist`` if there is no such row.
+
+        """
+        rows = self._rows
+        if rows is None:
+            rows = self.load()
+
+        try:
+            obj = rows[key]
+            STATS['hits'] += 1
+            return obj
+        except KeyError:
+            STATS['misses'] += 1
+            obj = self.model.objects.get(**{self.key_field: key})
+            with self._lock:
+                # copy on write: other threads may be reading the old dict
+                rows = dict(rows)
+                rows[key] = obj
+                self._rows = rows
+            return obj
+
+    def invalidate(self, *args, **kwargs):
+        """ Drop everything we know: the table will be reloaded on the next lookup. """
+        self._rows = None
+
+def load_all():
+    """ Load every reference table, i.e. at startup, so no request pays for it. """
+    for cache in _CACHES:
+        cache.load()
+
+def clear_all():
+    """ Drop the contents of every reference data cache. """
+    for cache in _CACHES:
+        cache.invalidate()
@@ -0,0 +1,93 @@
+"""
+A cached manifest of the data models and schemas found on disk.
+
+At startup, :py:mod:`indivo.data_models` and
+:py:mod:`indivo.document_processing` walk their directories looking for
+data models and schemas, and read every schema to find the documents it
+describes. When ``settings.REGISTRY_MANIFEST`` names a file, what they found
+is saved there, along with the modification times of every directory they
+walked (and every schema they read), and the next process to start reuses it
+instead, as long as none of those times has changed. Adding, removing or
+renaming a file changes its directory's modification time, so the manifest
+never hides a new data model or schema.
+
+The manifest only saves looking: data models are still imported, and schemas
+still compiled (when first used), from their files.
+
+"""
+
+from django.conf import settings
+from django.utils import simplejson
+
+import logging
+import os
+import tempfile
+
+VERSION = 1
+
+class Manifest(object):
+    """ What was found under each directory, keyed by loader and directory. """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.dirty = False
+        try:
+            with open(path) as f:
+                data = simplejson.load(f)
+            if data.get('version') == VERSION:
+                self.entries = data['entries']
+        except (IOError, ValueError, KeyError, AttributeError):
+            # Missing or unreadable: start over
+            pass
+
+    def get(self, key):
+        """ What was found for *key*, or None if it was never saved, or any of its paths have changed since. """
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        for path, mtime in entry['mtimes'].iteritems():
+            if _mtime(path) != mtime:
+                return None
+        return entry['items']
+
+    def put(self, key, items, paths):
+        """ Save *items* for *key*, valid until any of *paths* change. """
+        self.entries[key] = {'items': items, 'mtimes': dict((path, _mtime(path)) for path in paths)}
+        self.dirty = True
+
+    def save(self):
+        """ Write the manifest out, if it has changed. Failures are logged, not raised. """
+        if not self.dirty:
+            return
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)))
+            with os.fdopen(fd, 'w') as f:
+                simplejson.dump({'version': VERSION, 'entries': self.entries}, f)
+            os.rename(tmp_path, self.path)
+            self.dirty = False
+        except (IOError, OSError):
+            logging.exception('Could not save the registry manifest to %s' % self.path)
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+def walk(top):
+    """ os.walk(*top*), noting each directory visited: returns a list of the walk's results, and the directories. """
+    results = list(os.walk(top))
+    return results, [dirpath for dirpath, dirnames, filenames in results] or [top]
+
+_manifest = None
+
+def get_manifest():
+    """ The manifest configured in settings, or None if there isn't one. """
+    global _manifest
+    path = getattr(settings, 'REGISTRY_MANIFEST', None)
+    if not path:
+        return None
+    if _manifest is None or _manifest.path != path:
+        _manifest = Manifest(path)
+    return _manifest
@@ -0,0 +1,252 @@
+"""
+Indexed search for accounts, by name and contact email, and records, by label.
+
+A search matches any part of a field, ignoring case. Asking the database
+for that directly (``LIKE '%...%'``) can't use an index, and scans the whole
+table. Instead, we keep an index of the distinct three-character substrings
+("trigrams") of each searchable field, lowercased, as
+:py:class:`~indivo.models.SearchTrigram` rows. Any field containing a search
+term contains every one of the term's trigrams, so the candidates for a
+search are the objects that have them all, found with indexed lookups. They
+are then checked against the term itself, ranked, and paged. Terms of fewer
+than three characters match the trigrams that start with them (fields are
+indexed with two trailing spaces, so that every character starts a trigram).
+
+Results are ranked best first: fields equal to the term, then fields that
+start with it, then fields with a word that starts with it, then any other
+match, with shorter fields first at each rank.
+
+A term with more than ``settings.SEARCH_MAX_CANDIDATES`` candidates (a
+single letter, say: the first keystroke of every type-ahead) is too broad to
+rank every match of. The first three characters of each field, and of each
+of its words, are indexed as well (under the field's key, with the
+:py:data:`START` and :py:data:`WORD_START` suffixes), so that the index can
+find the objects whose fields start with the term first, then those with a
+word that does, and only as many of them as the requested page needs. The
+total for such a search is counted in the index; for terms of three or more
+characters, it may include the odd object with every trigram of the term,
+but not the term itself.
+
+Accounts and records index themselves when they're created, or their
+searchable fields change, and leave the index when they're deleted. Objects
+created some other way (by bulk inserts) are indexed with
+:py:func:`index_many`, and a whole model is reindexed with
+:py:func:`rebuild`.
+
+"""
+
+from django.conf import settings
+from django.db.models import Count, Q
+from indivo.models import Account, Record, SearchTrigram
+from indivo.lib.utils import bulk_insert
+
+import re
+
+# The models with searchable fields (their search_fields)
+MODELS = (Account, Record)
+
+# Ranks, best first
+EXACT, PREFIX, WORD, SUBSTRING = range(4)
+
+# Suffixes of the keys under which the starts of fields, and of their words, are indexed
+START, WORD_START = ':start', ':word'
+
+def max_candidates():
+    return getattr(settings, 'SEARCH_MAX_CANDIDATES', 1000)
+
+def key(model, field):
+    """ How *model*'s *field* is identified in the index. """
+    return '%s.%s' % (model.__name__.lower(), field)
+
+def keys(model):
+    """ Every key *model*'s fields are indexed under. """
+    return [key(model, field) + suffix for field in model.search_fields for suffix in ('', START, WORD_START)]
+
+def trigrams(value):
+    """ The trigrams *value* is indexed under. """
+    value = (value or '').lower()
+    padded = value + '  '
+    return set(padded[i:i+3] for i in range(len(value)))
+
+def starts(value):
+    """ The first trigram of *value*, and those of its words: what it's indexed under with :py:data:`START` and :py:data:`WORD_START`. """
+    value = (value or '').lower()
+    if not value:
+        return set(), set()
+    padded = value + '  '
+    words = set(padded[m.start():m.start()+3] for m in re.finditer(r'(?<!\w)\w', value, re.UNICODE))
+    return set([padded[:3]]), words
+
+def _rows(model, object_id, field_values):
+    for field, value in zip(model.search_fields, field_values):
+        field_key = key(model, field)
+        field_start, word_starts = starts(value)
+        for suffix, grams in (('', trigrams(value)), (START, field_start), (WORD_START, word_starts)):
+            for trigram in grams:
+                yield SearchTrigram(field=field_key + suffix, object_id=object_id, trigram=trigram)
+
+def index(obj):
+    """ (Re)index an :py:class:`~indivo.models.Account` or :py:class:`~indivo.models.Record`. """
+    unindex(obj)
+    index_many([obj])
+
+def unindex(obj):
+    """ Remove an :py:class:`~indivo.models.Account` or :py:class:`~indivo.models.Record` from the index. """
+    SearchTrigram.objects.filter(object_id=obj.pk, field__in=keys(obj.__class__)).delete()
+
+def index_many(objs, batch_size=500):
+    """ Index *objs*, which haven't been indexed before, with bulk inserts. """
+    rows = []
+    for obj in objs:
+        rows.extend(_rows(obj.__class__, obj.pk, obj.search_values()))
+    bulk_insert(SearchTrigram, rows, batch_size)
+
+def rebuild(model, batch_size=500):
+    """ Reindex every object of *model*. Returns how many there were. """
+    SearchTrigram.objects.filter(field__in=keys(model)).delete()
+    count = 0
+    last_pk = None
+    while True:
+        objs = model.objects.order_by('pk')
+        if last_pk is not None:
+            objs = objs.filter(pk__gt=last_pk)
+        objs = list(objs.values_list('pk', *model.search_fields)[:batch_size])
+        if not objs:
+            return count
+
+        rows = []
+        for obj in objs:
+            rows.extend(_rows(model, obj[0], obj[1:]))
+        bulk_insert(SearchTrigram, rows, batch_size)
+        count += len(objs)
+        last_pk = objs[-1][0]
+
+def _ids(model, field, term, suffix=''):
+    """ A query for the ids of the objects of *model* whose *field* may contain *term* (lowercased), per the index.
+
+    With the :py:data:`START` *suffix*, the objects whose *field* may start
+    with *term*, and with :py:data:`WORD_START`, those with a word that may.
+
+    """
+    rows = SearchTrigram.objects.filter(field=key(model, field) + suffix)
+    if len(term) < 3:
+        if term.isalnum():
+            # the trigrams starting with term, as a range, which (unlike LIKE) can use the index in any locale
+            rows = rows.filter(trigram__gte=term, trigram__lt=term[:-1] + unichr(ord(term[-1]) + 1))
+        else:
+            rows = rows.filter(trigram__startswith=term)
+        return rows.values_list('object_id', flat=True).distinct()
+
+    if suffix:
+        starting = rows.filter(trigram=term[:3]).values_list('object_id', flat=True)
+        if len(term) == 3:
+            return starting
+        return _ids(model, field, term).filter(object_id__in=starting)
+
+    grams = set(term[i:i+3] for i in range(len(term) - 2))
+    return rows.filter(trigram__in=grams).values('object_id')\
+        .annotate(matches=Count('trigram')).filter(matches=len(grams)).values_list('object_id', flat=True)
+
+def candidates(model, field, term):
+    """ The ids of the objects of *model* whose *field* may contain *term*, per the index.
+
+    None if there are more than ``settings.SEARCH_MAX_CANDIDATES`` of them.
+
+    """
+    limit = max_candidates()
+    ids = list(_ids(model, field, term.lower()).order_by()[:limit + 1])
+    return None if len(ids) > limit else ids
+
+def best_candidates(model, field, term, count=None):
+    """ Up to *count* ids of the objects of *model* whose *field* may contain *term*, the likely best matches first.
+
+    For terms too broad to rank every candidate of: the objects whose field
+    may equal the term come first, then those whose field may start with
+    it, then those with a word that may, then any others.
+
+    """
+    term = term.lower()
+    tiers = [_ids(model, field, term, START), _ids(model, field, term, WORD_START), _ids(model, field, term)]
+    if len(term) < 3:
+        # fields are indexed padded: one that starts with the term and padding is the term
+        tiers.insert(0, SearchTrigram.objects.filter(field=key(model, field) + START, trigram=(term + '  ')[:3])
+                     .values_list('object_id', flat=True))
+
+    found, seen = [], set()
+    for ids in tiers:
+        ids = ids.order_by('object_id')
+        for object_id in (ids if count is None else ids[:count]):
+            if object_id not in seen:
+                seen.add(object_id)
+                found.append(object_id)
+        if count is not None and len(found) >= count:
+            return found[:count]
+    return found
+
+def rank(value, term):
+    """ How well *value* matches *term*, or None if it doesn't (see the module documentation). """
+    value, term = (value or '').lower(), term.lower()
+    position = value.find(term)
+    if position < 0:
+        return None
+    if value == term:
+        return EXACT
+    if position == 0:
+        return PREFIX
+    if re.search(r'(^|\W)%s' % re.escape(term), value, re.UNICODE):
+        return WORD
+    return SUBSTRING
+
+def search(model, terms, offset=0, limit=None):
+    """ Search *model* for objects matching any of *terms*, a dict of field name to search term.
+
+    Returns the number of matches, and the matching objects from *offset*, up
+    to *limit* of them, best first.
+
+    """
+
+    terms = dict((field, term) for field, term in terms.iteritems() if term)
+    fields = terms.keys()
+    end = None if limit is None else offset + limit
+
+    # the candidates for each term, or for terms too broad for that, the best
+    # of them, as many as the page needs
+    ids, broad = set(), []
+    for field, term in terms.iteritems():
+        found = candidates(model, field, term)
+        if found is None:
+            broad.append((field, term))
+            found = best_candidates(model, field, term, end)
+        ids.update(found)
+
+    # ranked by the searched fields alone
+    values = {}
+    ids = list(ids)
+    for start in range(0, len(ids), 500):
+        for row in model.objects.filter(pk__in=ids[start:start+500]).values_list('pk', *fields):
+            values[row[0]] = row[1:]
+
+    ranked = []
+    for pk, row in values.iteritems():
+        best = None
+        for field, value in zip(fields, row):
+            value = value or ''
+            r = rank(value, terms[field])
+            if r is not None and (best is None or (r, len(value)) < best):
+                best = (r, len(value))
+        if best is not None:
+            ranked.append((best, pk))
+    ranked.sort()
+
+    total = len(ranked)
+    if broad:
+        # not every match was ranked: count them in the index
+        matches = [Q(pk__in=_ids(model, field, term.lower()).order_by()) for field, term in broad]
+        if ranked:
+            matches.append(Q(pk__in=[pk for _rank, pk in ranked]))
+        total = model.objects.filter(reduce(lambda a, b: a | b, matches)).count()
+
+    # only the page's objects are loaded
+    page = [pk for _rank, pk in ranked[offset:end]]
+    objs = model.objects.in_bulk(page)
+    return total, [objs[pk] for pk in page]
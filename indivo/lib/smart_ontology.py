@@ -0,0 +1,107 @@
+"""
+The SMART ontology, served from a file that ships with Indivo.
+
+``/ontology`` used to fetch the ontology from the SMART sandbox for every
+request, which made each request wait on (and fail without) the network.
+Instead, the ontology is kept at ``settings.SMART_ONTOLOGY_PATH`` (by
+default, ``indivo/schemas/smart/ontology.rdf``), under version control, and
+served from memory with a strong ETag, so that clients that have it already
+get a :http:statuscode:`304`. The file is re-read only when its modification
+time changes. ``python manage.py refresh_smart_ontology`` replaces it with the
+current version from ``settings.SMART_ONTOLOGY_URL``, and is the only thing
+that touches the network: serving the ontology never does.
+
+"""
+
+from django.conf import settings
+from lxml import etree
+from indivo.lib import conditional
+
+import os
+import tempfile
+import threading
+import urllib2
+
+import indivo
+
+DEFAULT_URL = 'http://sandbox-api.smartplatforms.org/ontology'
+
+# (path, modification time, size, body, etag)
+_LOADED = None
+
+_LOCK = threading.Lock()
+
+def path():
+    return getattr(settings, 'SMART_ONTOLOGY_PATH', None) or \
+        os.path.join(os.path.dirname(indivo.__file__), 'schemas', 'smart', 'ontology.rdf')
+
+def url():
+    return getattr(settings, 'SMART_ONTOLOGY_URL', None) or DEFAULT_URL
+
+def max_age():
+    return getattr(settings, 'SMART_ONTOLOGY_MAX_AGE', 60 * 60 * 24)
+
+def load():
+    """ The ontology's bytes, their ETag, and when the file was last modified (a timestamp).
+
+    **Raises:** :py:exc:`IOError` if the file is missing.
+
+    """
+
+    global _LOADED
+    ontology_path = path()
+    stat = os.stat(ontology_path)
+    loaded = _LOADED
+    if loaded and loaded[:3] == (ontology_path, stat.st_mtime, stat.st_size):
+        return loaded[3], loaded[4], stat.st_mtime
+
+    with _LOCK:
+        with open(ontology_path, 'rb') as f:
+            body = f.read()
+        _LOADED = (ontology_path, stat.st_mtime, stat.st_size, body, conditional.strong_etag(body))
+    return body, _LOADED[4], stat.st_mtime
+
+def validate(body):
+    """ Check that *body* is RDF/XML. **Raises:** :py:exc:`ValueError` if it isn't. """
+    try:
+        root = etree.fromstring(body)
+    except etree.XMLSyntaxError, e:
+        raise ValueError('not XML: %s' % e)
+    if root.tag != '{http://www.w3.org/1999/02/22-rdf-syntax-ns#}RDF':
+        raise ValueError('not RDF/XML: the root element is %s' % root.tag)
+
+def refresh(source=None, timeout=30):
+    """ Replace the ontology file with the ontology at *source* (by default, ``settings.SMART_ONTOLOGY_URL``).
+
+    The file is only replaced once the new ontology has been fetched in full,
+    and checked (see :py:func:`validate`), and then atomically, so that
+    processes reading it never see part of a file.
+
+    Returns whether it changed, and its ETag.
+
+    """
+
+    body = urllib2.urlopen(source or url(), timeout=timeout).read()
+    validate(body)
+
+    ontology_path = path()
+    new_etag = conditional.strong_etag(body)
+    try:
+        if load()[1] == new_etag:
+            return False, new_etag
+    except (IOError, OSError):
+        pass
+
+    directory = os.path.dirname(ontology_path)
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.ontology')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(body)
+        os.chmod(temp_path, 0644)
+        os.rename(temp_path, ontology_path)
+    except:
+        os.remove(temp_path)
+        raise
+    return True, new_etag
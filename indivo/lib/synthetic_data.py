@@ -0,0 +1,541 @@
+"""
+.. module:: lib.synthetic_data
+   :synopsis: Generate large, reproducible synthetic datasets for benchmarks and capacity tests.
+
+Unlike :py:class:`~indivo.lib.sample_data.IndivoDataLoader`, which loads
+hand-written profiles document by document through the full processing
+pipeline, this writes generated rows straight to the database with
+:py:func:`~indivo.lib.utils.bulk_insert`, so it can produce millions of facts
+in reasonable time.
+
+Records are generated in two passes. The first creates each record with its
+owner account and default carenets. The second fills each record in with
+medications, labs, vitals, problems, allergies and immunizations (and,
+optionally, the SDMX documents they would have been loaded from), shares
+with other accounts and apps, and audits. Since every record's data is
+generated from its own random stream, seeded by ``(seed, index)``, the
+dataset doesn't depend on how the work is split between processes, and
+shares can refer to any record created in the first pass.
+
+"""
+
+from django.conf import settings
+from django.db import transaction
+from xml.sax.saxutils import escape
+
+from indivo.models import *
+from indivo.models.accounts import ACTIVE
+from indivo.lib.utils import bulk_insert
+from indivo.lib import search
+
+import datetime
+import hashlib
+import random
+import uuid
+
+NAMESPACE = uuid.UUID('5b1c8b0a-4f3e-4c1f-9d0e-2a7f6c3e9b41')
+
+EMAIL_DOMAIN = 'synthetic.indivo.org'
+
+SNOMED = 'http://purl.bioontology.org/ontology/SNOMEDCT/'
+LOINC = 'http://purl.bioontology.org/ontology/LNC/'
+RXNORM = 'http://purl.bioontology.org/ontology/RXNORM/'
+NDFRT = 'http://purl.bioontology.org/ontology/NDFRT/'
+UNII = 'http://fda.gov/UNII/'
+CVX = 'http://www2a.cdc.gov/nip/IIS/IISStandards/vaccines.asp?rpt=cvx#'
+VACCINE_GROUP = 'http://www2a.cdc.gov/nip/IIS/IISStandards/vaccines.asp?rpt=vg#'
+SMART_CODES = 'http://smartplatforms.org/terms/codes/'
+
+# Mean number of each kind of data per record. Actual counts are skewed
+# (gamma distributed), so some records are much bigger than others.
+DEFAULT_DISTRIBUTION = {
+    'Medication': 6,
+    'LabResult': 30,
+    'VitalSigns': 8,
+    'Problem': 4,
+    'Allergy': 1,
+    'Immunization': 8,
+    'Audit': 40,
+    }
+
+# Probability of each kind of share, per record
+FULL_SHARE_P = 0.15
+CARENET_ACCOUNT_P = 0.3
+PHA_SHARE_P = 0.4
+CARENET_DOCUMENT_P = 0.5
+
+# Facts in each generated source document
+FACTS_PER_DOCUMENT = 10
+
+FIRST_NAMES = ['James', 'Mary', 'John', 'Patricia', 'Robert', 'Jennifer', 'Michael', 'Linda', 'William',
+               'Elizabeth', 'David', 'Barbara', 'Richard', 'Susan', 'Joseph', 'Jessica', 'Thomas', 'Sarah',
+               'Wei', 'Maria', 'Ahmed', 'Priya', 'Carlos', 'Yuki']
+LAST_NAMES = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez',
+              'Martinez', 'Hernandez', 'Lopez', 'Wilson', 'Anderson', 'Taylor', 'Thomas', 'Moore', 'Jackson',
+              'Chen', 'Nguyen', 'Patel', 'Kim', 'Cohen', 'Okafor']
+
+# (title, rxnorm, frequency per day, instructions)
+MEDICATIONS = {
+    'lisinopril': ('Lisinopril 10 MG Oral Tablet', '314076', '1', 'Take one tablet by mouth daily'),
+    'amlodipine': ('Amlodipine 5 MG Oral Tablet', '197361', '1', 'Take one tablet by mouth daily'),
+    'hctz': ('Hydrochlorothiazide 25 MG Oral Tablet', '310798', '1', 'Take one tablet by mouth every morning'),
+    'metformin': ('Metformin hydrochloride 500 MG Oral Tablet', '861007', '2', 'Take one tablet by mouth twice daily with meals'),
+    'atorvastatin': ('Atorvastatin 20 MG Oral Tablet', '617310', '1', 'Take one tablet by mouth at bedtime'),
+    'simvastatin': ('Simvastatin 20 MG Oral Tablet', '312961', '1', 'Take one tablet by mouth at bedtime'),
+    'albuterol': ('Albuterol 0.09 MG/ACTUAT Metered Dose Inhaler', '745679', '4', 'Inhale two puffs every 4-6 hours as needed'),
+    'fluticasone': ('Fluticasone propionate 0.11 MG/ACTUAT Metered Dose Inhaler', '896188', '2', 'Inhale two puffs twice daily'),
+    'sertraline': ('Sertraline 50 MG Oral Tablet', '312940', '1', 'Take one tablet by mouth daily'),
+    'levothyroxine': ('Levothyroxine Sodium 0.05 MG Oral Tablet', '966222', '1', 'Take one tablet by mouth every morning'),
+    'omeprazole': ('Omeprazole 20 MG Delayed Release Oral Capsule', '198053', '1', 'Take one capsule by mouth before breakfast'),
+    'sumatriptan': ('Sumatriptan 50 MG Oral Tablet', '313165', '1', 'Take one tablet by mouth at onset of migraine'),
+    'ibuprofen': ('Ibuprofen 400 MG Oral Tablet', '197805', '3', 'Take one tablet by mouth every 8 hours as needed for pain'),
+    'amoxicillin': ('Amoxicillin 500 MG Oral Capsule', '308191', '3', 'Take one capsule by mouth three times daily for 10 days'),
+    }
+
+# (title, snomed, relative frequency, chronic?, medications, labs)
+PROBLEMS = [
+    ('Essential hypertension', '59621000', 30, True, ['lisinopril', 'amlodipine', 'hctz'], ['2951-2', '2823-3', '2160-0']),
+    ('Hyperlipidemia', '55822004', 25, True, ['atorvastatin', 'simvastatin'], ['2093-3', '13457-7']),
+    ('Diabetes mellitus type 2', '44054006', 12, True, ['metformin'], ['4548-4', '2345-7']),
+    ('Gastroesophageal reflux disease', '235595009', 10, True, ['omeprazole'], []),
+    ('Osteoarthritis', '396275006', 10, True, ['ibuprofen'], []),
+    ('Backache (Finding)', '161891005', 10, False, ['ibuprofen'], []),
+    ('Asthma', '195967001', 8, True, ['albuterol', 'fluticasone'], []),
+    ('Major depressive disorder', '370143000', 8, True, ['sertraline'], []),
+    ('Hypothyroidism', '40930008', 5, True, ['levothyroxine'], ['3016-3']),
+    ('Migraine', '37796009', 5, True, ['sumatriptan'], []),
+    ('Acute bronchitis', '10509002', 8, False, ['amoxicillin'], ['718-7']),
+    ('Streptococcal sore throat', '43878008', 6, False, ['amoxicillin'], []),
+    ]
+
+# loinc: (title, unit, normal min, normal max, mean, standard deviation, critical min, critical max, relative frequency)
+LABS = {
+    '2951-2': ('Serum Sodium', 'mEq/L', 135, 145, 140, 3, 120, 155, 20),
+    '2823-3': ('Serum Potassium', 'mEq/L', 3.5, 5.1, 4.2, 0.4, 2.8, 6.2, 20),
+    '2345-7': ('Serum Glucose', 'mg/dL', 70, 99, 95, 20, 40, 400, 20),
+    '2160-0': ('Serum Creatinine', 'mg/dL', 0.6, 1.3, 1.0, 0.25, 0.2, 10, 15),
+    '718-7': ('Hemoglobin', 'g/dL', 12, 17.5, 14, 1.5, 6, 20, 15),
+    '2093-3': ('Total Cholesterol', 'mg/dL', 125, 200, 195, 35, 50, 500, 8),
+    '13457-7': ('LDL Cholesterol (calculated)', 'mg/dL', 0, 130, 115, 30, 0, 400, 8),
+    '4548-4': ('Hemoglobin A1c', '%', 4.0, 5.6, 6.0, 1.0, 3, 15, 5),
+    '3016-3': ('Thyroid Stimulating Hormone', 'mIU/L', 0.4, 4.0, 2.0, 1.0, 0.01, 50, 5),
+    }
+
+# (field, title, loinc, unit)
+VITAL_SIGNS = [
+    ('bp_systolic', 'Intravascular systolic', '8480-6', 'mm[Hg]'),
+    ('bp_diastolic', 'Intravascular diastolic', '8462-4', 'mm[Hg]'),
+    ('heart_rate', 'Heart rate', '8867-4', '{beats}/min'),
+    ('respiratory_rate', 'Respiration rate', '9279-1', '{breaths}/min'),
+    ('temperature', 'Body temperature', '8310-5', 'Cel'),
+    ('oxygen_saturation', 'Oxygen saturation', '2710-2', '%{HemoglobinSaturation}'),
+    ('height', 'Body height', '8302-2', 'm'),
+    ('weight', 'Body weight', '3141-9', 'kg'),
+    ('bmi', 'Body mass index', '39156-5', 'kg/m2'),
+    ]
+
+# (class title, product title, cvx, relative frequency)
+IMMUNIZATIONS = [
+    ('INFLUENZA', 'influenza, seasonal, injectable', '141', 50),
+    ('TD', 'Td (adult)', '09', 10),
+    ('TDAP', 'Tdap', '115', 10),
+    ('HEPB', 'Hep B, adult', '43', 8),
+    ('PNEUMO', 'pneumococcal polysaccharide PPV23', '33', 8),
+    ('MMR', 'MMR', '03', 6),
+    ('HPV', 'HPV, quadrivalent', '62', 4),
+    ('ZOSTER', 'zoster', '121', 4),
+    ]
+
+# (category title, snomed, allergen field, allergen title, allergen system, allergen code, relative frequency)
+ALLERGENS = [
+    ('Drug allergy', '416098002', 'drug_class_allergen', 'Penicillins', NDFRT, 'N0000011281', 40),
+    ('Drug allergy', '416098002', 'drug_class_allergen', 'Sulfonamide Antibacterial', NDFRT, 'N0000175503', 20),
+    ('Drug allergy', '416098002', 'drug_class_allergen', 'Cephalosporins', NDFRT, 'N0000011161', 8),
+    ('Food allergy', '414285001', 'food_allergen', 'Peanut', UNII, 'QE1QX6B99R', 15),
+    ('Food allergy', '414285001', 'food_allergen', 'Shellfish', UNII, 'N9O7Q1I3OS', 10),
+    ('Food allergy', '414285001', 'food_allergen', 'Egg', UNII, '291P45F896', 7),
+    ]
+REACTIONS = [('Urticaria', '126485001', 40), ('Rash', '271807003', 35), ('Anaphylaxis', '39579001', 10),
+             ('Angioedema', '41291007', 15)]
+SEVERITIES = [('Mild', '255604002', 50), ('Moderate', '6736007', 35), ('Severe', '24484000', 15)]
+
+# (view, method, path, relative frequency)
+AUDITED_CALLS = [
+    ('record_document_list', 'GET', '/records/%(record_id)s/documents/', 25),
+    ('smart_generic', 'GET', '/records/%(record_id)s/medications/', 15),
+    ('smart_generic', 'GET', '/records/%(record_id)s/lab_results/', 15),
+    ('generic_list', 'GET', '/records/%(record_id)s/reports/Problem/', 10),
+    ('generic_list', 'GET', '/records/%(record_id)s/reports/VitalSigns/', 10),
+    ('record', 'GET', '/records/%(record_id)s', 10),
+    ('document_create', 'POST', '/records/%(record_id)s/documents/', 8),
+    ('record_shares', 'GET', '/records/%(record_id)s/shares/', 4),
+    ('audit_query', 'GET', '/records/%(record_id)s/audits/query/', 3),
+    ]
+
+def stable_id(seed, index, kind):
+    """ The id of the *kind* object (``'account'``, ``'record'``, or a carenet name) for record *index*.
+
+    These are the same no matter which process generates the record, so
+    other records can refer to them.
+
+    """
+    return str(uuid.uuid5(NAMESPACE, '%s/%s/%s' % (seed, index, kind)))
+
+def account_email(seed, index):
+    return 'synthetic-%s-%s@%s' % (seed, index, EMAIL_DOMAIN)
+
+def _record_random(seed, index, phase):
+    """ The random stream for one pass over record *index*. """
+    key = hashlib.sha1('%s:%s:%s' % (phase, seed, index)).hexdigest()
+    return random.Random(int(key[:16], 16))
+
+def _weighted_choice(rng, choices):
+    """ Pick one of *choices*, whose last element is its relative frequency. """
+    total = sum(choice[-1] for choice in choices)
+    pick = rng.uniform(0, total)
+    for choice in choices:
+        pick -= choice[-1]
+        if pick <= 0:
+            return choice
+    return choices[-1]
+
+def _count(rng, mean):
+    """ A skewed count, averaging *mean*. """
+    if mean <= 0:
+        return 0
+    return int(round(rng.gammavariate(2.0, mean / 2.0)))
+
+def _between(rng, start, end):
+    return start + datetime.timedelta(seconds=rng.randint(0, max(int((end - start).total_seconds()), 0)))
+
+def _coded(prefix, title, system, identifier):
+    return {prefix + '_title': title, prefix + '_system': system, prefix + '_identifier': identifier}
+
+def _format(value):
+    if isinstance(value, datetime.datetime):
+        return value.strftime('%Y-%m-%dT%H:%M:%SZ')
+    if isinstance(value, datetime.date):
+        return value.strftime('%Y-%m-%d')
+    if isinstance(value, float):
+        return repr(value)
+    return unicode(value)
+
+def sdmx_document(facts):
+    """ The SDMX document that would be processed into *facts*, a list of (model name, fields dict). """
+    models = []
+    for model_name, fields in facts:
+        models.append('  <Model name="%s">\n%s  </Model>\n' % (model_name, ''.join(
+                    ['    <Field name="%s">%s</Field>\n' % (name, escape(_format(value)))
+                     for name, value in sorted(fields.iteritems()) if value is not None])))
+    return '<Models xmlns="http://indivo.org/vocab/xml/documents#">\n%s</Models>' % ''.join(models)
+
+class SyntheticDataGenerator(object):
+    """ Generates records numbered from 0 for *seed*, with *distribution* (see :py:data:`DEFAULT_DISTRIBUTION`).
+
+    *total* is the number of records in the whole dataset, any of whose
+    owners a record may be shared with. Data is dated at most
+    ``history_years`` before *as_of* (a datetime, which defaults to now: fix
+    it to reproduce a dataset exactly). Records are shared with the apps in
+    *phas*, a list of (id, email) pairs. If
+    *with_documents* is True, each fact is attached to a generated SDMX
+    source document, as if it had been loaded through the API.
+
+    """
+
+    history_years = 15
+
+    def __init__(self, total, seed=1, as_of=None, distribution=None, with_documents=False, phas=(),
+                 batch_size=500):
+        self.seed = seed
+        self.as_of = as_of or datetime.datetime.utcnow().replace(microsecond=0)
+        self.distribution = dict(DEFAULT_DISTRIBUTION)
+        self.distribution.update(distribution or {})
+        self.with_documents = with_documents
+        self.phas = sorted(phas)
+        self.total = total
+        self.batch_size = batch_size
+
+    def create_records(self, indices):
+        """ Create the records numbered *indices*, with their owners and default carenets. """
+        principals, records, carenets = [], [], []
+        for index in indices:
+            rng = _record_random(self.seed, index, 'records')
+            created_at = _between(rng, self.as_of - datetime.timedelta(days=365 * 3), self.as_of)
+            email = account_email(self.seed, index)
+            full_name = '%s %s' % (rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES))
+            account_id = stable_id(self.seed, index, 'account')
+            principals.append(Account(id=account_id, email=email, type='Account', full_name=full_name,
+                                      contact_email=email, state=ACTIVE, last_state_change=created_at,
+                                      created_at=created_at, modified_at=created_at))
+            record_id = stable_id(self.seed, index, 'record')
+            records.append(Record(id=record_id, owner_id=account_id, creator_id=account_id, label=full_name,
+                                  created_at=created_at, modified_at=created_at))
+            for name in settings.INDIVO_DEFAULT_CARENETS:
+                carenets.append(Carenet(id=stable_id(self.seed, index, name), name=name, record_id=record_id,
+                                        created_at=created_at, modified_at=created_at))
+
+        bulk_insert(Account, principals, self.batch_size)
+        bulk_insert(UnreadCounts, [UnreadCounts(account_id=account.pk) for account in principals], self.batch_size)
+        bulk_insert(Record, records, self.batch_size)
+        bulk_insert(RecordVersion, [RecordVersion(record_id=record.pk, changed_at=record.created_at) for record in records],
+                    self.batch_size)
+        search.index_many(principals + records, self.batch_size)
+        bulk_insert(Carenet, carenets, self.batch_size)
+        return len(records)
+
+    def fill_records(self, indices):
+        """ Generate the data, shares and audits for the records numbered *indices*.
+
+        Returns the number of objects of each model created, by model name.
+
+        """
+        objects = {}
+        for index in indices:
+            for model, instances in self.record_data(index):
+                objects.setdefault(model, []).extend(instances)
+
+        # Documents before the facts and carenet shares that refer to them
+        counts = {}
+        for model in (Document, CarenetDocument, CarenetAccount, AccountFullShare, PHAShare, Medication,
+                      LabResult, VitalSigns, Problem, Allergy, Immunization, Audit):
+            instances = objects.get(model, [])
+            bulk_insert(model, instances, self.batch_size)
+            counts[model.__name__] = len(instances)
+
+        # Bulk inserts skip the signals that keep record versions current
+        RecordVersion.touch([stable_id(self.seed, index, 'record') for index in indices])
+        return counts
+
+    def record_data(self, index):
+        """ (model, list of instances) pairs of the data for record *index*. """
+        rng = _record_random(self.seed, index, 'data')
+        account_id = stable_id(self.seed, index, 'account')
+        record_id = stable_id(self.seed, index, 'record')
+        since = self.as_of - datetime.timedelta(days=rng.randint(30, 365 * self.history_years))
+
+        def new_id():
+            return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+        # (model, date, fields) for each fact, oldest first
+        facts = self.facts(rng, since)
+
+        documents, carenet_documents = [], []
+        fact_objects = {}
+        for start in xrange(0, len(facts), FACTS_PER_DOCUMENT):
+            chunk = facts[start:start + FACTS_PER_DOCUMENT]
+            document_id = None
+            created_at = chunk[-1][1]
+            if self.with_documents:
+                document_id = new_id()
+                content = sdmx_document([(fact[0].__name__, fact[2]) for fact in chunk])
+                documents.append(Document(id=document_id, record_id=record_id, creator_id=account_id,
+                                          external_id=document_id, original_id=document_id,
+                                          fqn='http://indivo.org/vocab/xml/documents#Models',
+                                          mime_type='application/xml', content=content, size=len(content),
+                                          digest=hashlib.sha256(content.encode('utf-8')).hexdigest(), processed=True,
+                                          created_at=created_at, modified_at=created_at))
+                if rng.random() < CARENET_DOCUMENT_P:
+                    carenet_documents.append(CarenetDocument(id=new_id(), document_id=document_id,
+                                                             carenet_id=stable_id(self.seed, index, 'Physicians'),
+                                                             created_at=created_at, modified_at=created_at))
+            for model, created_at, fields in chunk:
+                fact_objects.setdefault(model, []).append(
+                    model(id=new_id(), record_id=record_id, document_id=document_id, created_at=created_at, **fields))
+
+        yield Document, documents
+        yield CarenetDocument, carenet_documents
+        for model, instances in fact_objects.iteritems():
+            yield model, instances
+
+        # Shares, with other generated accounts and with apps
+        shares, carenet_accounts, pha_shares, app_emails = [], [], [], []
+        if self.total > 1 and rng.random() < FULL_SHARE_P:
+            shares.append(AccountFullShare(id=new_id(), record_id=record_id,
+                                           with_account_id=self.other_account(rng, index),
+                                           role_label=rng.choice(['Guardian', 'Spouse', 'Caregiver']),
+                                           created_at=since, modified_at=since))
+        if self.total > 1 and rng.random() < CARENET_ACCOUNT_P:
+            carenet_accounts.append(CarenetAccount(id=new_id(), carenet_id=stable_id(self.seed, index, 'Family'),
+                                                   account_id=self.other_account(rng, index),
+                                                   can_write=rng.random() < 0.2, created_at=since, modified_at=since))
+        for pha_id, pha_email in self.phas:
+            if rng.random() < PHA_SHARE_P:
+                authorized_at = _between(rng, since, self.as_of)
+                pha_shares.append(PHAShare(id=new_id(), record_id=record_id, with_pha_id=pha_id,
+                                           authorized_at=authorized_at, authorized_by_id=account_id,
+                                           created_at=authorized_at, modified_at=authorized_at))
+                app_emails.append(pha_email)
+        yield AccountFullShare, shares
+        yield CarenetAccount, carenet_accounts
+        yield PHAShare, pha_shares
+
+        yield Audit, self.audits(rng, index, record_id, app_emails)
+
+    def other_account(self, rng, index):
+        """ The owner of some record other than *index*. """
+        other = rng.randrange(self.total - 1)
+        if other >= index:
+            other += 1
+        return stable_id(self.seed, other, 'account')
+
+    def facts(self, rng, since):
+        """ (model, date, fields) for one patient's facts, oldest first. """
+        dist = self.distribution
+        facts = []
+
+        # Problems drive the medications and labs
+        problems = []
+        for i in xrange(_count(rng, dist['Problem'])):
+            problem = _weighted_choice(rng, PROBLEMS)
+            title, code, weight, chronic, medications, labs = problem
+            start = _between(rng, since, self.as_of)
+            end = None if chronic else min(start + datetime.timedelta(days=rng.randint(7, 60)), self.as_of)
+            fields = _coded('name', title, SNOMED, code)
+            fields.update({'startDate': start, 'endDate': end})
+            facts.append((Problem, start, fields))
+            problems.append(problem)
+
+        for i in xrange(_count(rng, dist['Medication'])):
+            candidates = [m for p in problems for m in p[4]]
+            if not candidates or rng.random() < 0.2:
+                candidates = sorted(MEDICATIONS.keys())
+            title, rxnorm, frequency, instructions = MEDICATIONS[rng.choice(candidates)]
+            start = _between(rng, since, self.as_of)
+            end = None
+            if rng.random() < 0.4:
+                end = min(start + datetime.timedelta(days=rng.randint(10, 720)), self.as_of)
+            fields = _coded('drugName', title, RXNORM, rxnorm)
+            fields.update(_coded('provenance', 'Derived by prescription', SMART_CODES + 'MedicationProvenance#',
+                                 'prescription'))
+            fields.update({'startDate': start.date(), 'endDate': end and end.date(), 'frequency_value': frequency,
+                           'frequency_unit': '/d', 'quantity_value': '1',
+                           'quantity_unit': '{capsule}' if 'Capsule' in title else
+                                            '{puff}' if 'Inhaler' in title else '{tablet}',
+                           'instructions': instructions})
+            facts.append((Medication, start, fields))
+
+        problem_labs = [loinc for p in problems for loinc in p[5]]
+        lab_choices = [(loinc,) + lab for loinc, lab in sorted(LABS.iteritems())]
+        for i in xrange(_count(rng, dist['LabResult'])):
+            if problem_labs and rng.random() < 0.4:
+                code = rng.choice(problem_labs)
+            else:
+                code = _weighted_choice(rng, lab_choices)[0]
+            title, unit, normal_min, normal_max, mean, sd, critical_min, critical_max, weight = LABS[code]
+            value = round(max(rng.gauss(mean, sd), 0), 2)
+            if value < critical_min or value > critical_max:
+                interpretation = ('Critical', 'critical')
+            elif value < normal_min or value > normal_max:
+                interpretation = ('Abnormal', 'abnormal')
+            else:
+                interpretation = ('Normal', 'normal')
+            collected_at = _between(rng, since, self.as_of)
+            fields = _coded('test_name', title, LOINC, code)
+            fields.update(_coded('abnormal_interpretation', interpretation[0],
+                                 SMART_CODES + 'LabResultInterpretation#', interpretation[1]))
+            fields.update(_coded('status', 'Final results: complete and verified', SMART_CODES + 'LabStatus#',
+                                 'final'))
+            fields.update({'accession_number': 'AC%011d' % rng.randrange(10 ** 11), 'collected_at': collected_at,
+                           'quantitative_result_value_value': str(value),
+                           'quantitative_result_value_unit': unit,
+                           'quantitative_result_normal_range_min_value': str(normal_min),
+                           'quantitative_result_normal_range_min_unit': unit,
+                           'quantitative_result_normal_range_max_value': str(normal_max),
+                           'quantitative_result_normal_range_max_unit': unit,
+                           'quantitative_result_non_critical_range_min_value': str(critical_min),
+                           'quantitative_result_non_critical_range_min_unit': unit,
+                           'quantitative_result_non_critical_range_max_value': str(critical_max),
+                           'quantitative_result_non_critical_range_max_unit': unit})
+            facts.append((LabResult, collected_at, fields))
+
+        # Vitals vary around the patient's own baseline
+        height = round(rng.gauss(1.70, 0.10), 2)
+        weight = rng.gauss(78, 15)
+        hypertensive = 'Essential hypertension' in [p[0] for p in problems]
+        for i in xrange(_count(rng, dist['VitalSigns'])):
+            date = _between(rng, since, self.as_of)
+            weight = max(weight + rng.gauss(0, 1.5), 35)
+            values = {
+                'bp_systolic': round(rng.gauss(145 if hypertensive else 122, 12)),
+                'bp_diastolic': round(rng.gauss(92 if hypertensive else 78, 8)),
+                'heart_rate': round(rng.gauss(72, 10)),
+                'respiratory_rate': round(rng.gauss(16, 2)),
+                'temperature': round(rng.gauss(36.9, 0.3), 1),
+                'oxygen_saturation': round(min(rng.gauss(97.5, 1.5), 100)),
+                'height': height,
+                'weight': round(weight, 1),
+                'bmi': round(weight / (height * height), 1),
+                }
+            fields = {'date': date}
+            for field, title, loinc, unit in VITAL_SIGNS:
+                fields.update(_coded(field + '_name', title, LOINC, loinc))
+                fields.update({field + '_value': float(values[field]), field + '_unit': unit})
+            fields.update(_coded('bp_position', 'Sitting', SNOMED, '33586001'))
+            fields.update(_coded('bp_site', rng.choice(['Right arm', 'Left arm']), SNOMED, '368209003'))
+            fields.update(_coded('bp_method', 'Auscultation', SMART_CODES + 'BloodPressureMethod#', 'auscultation'))
+            facts.append((VitalSigns, date, fields))
+
+        for i in xrange(_count(rng, dist['Allergy'])):
+            category, category_code, allergen_field, allergen, system, allergen_code, weight = \
+                _weighted_choice(rng, ALLERGENS)
+            reaction = _weighted_choice(rng, REACTIONS)
+            severity = _weighted_choice(rng, SEVERITIES)
+            fields = _coded('category', category, SNOMED, category_code)
+            fields.update(_coded(allergen_field, allergen, system, allergen_code))
+            fields.update(_coded('allergic_reaction', reaction[0], SNOMED, reaction[1]))
+            fields.update(_coded('severity', severity[0], SNOMED, severity[1]))
+            facts.append((Allergy, _between(rng, since, self.as_of), fields))
+
+        for i in xrange(_count(rng, dist['Immunization'])):
+            product_class, product, cvx, weight = _weighted_choice(rng, IMMUNIZATIONS)
+            date = _between(rng, since, self.as_of)
+            fields = _coded('product_class', product_class, VACCINE_GROUP, product_class)
+            fields.update(_coded('product_name', product, CVX, cvx))
+            if rng.random() < 0.05:
+                fields.update(_coded('administration_status', 'Not Administered',
+                                     SMART_CODES + 'ImmunizationAdministrationStatus#', 'notAdministered'))
+                fields.update(_coded('refusal_reason', 'Patient objection',
+                                     SMART_CODES + 'ImmunizationRefusalReason#', 'objection'))
+            else:
+                fields.update(_coded('administration_status', 'Dose given',
+                                     SMART_CODES + 'ImmunizationAdministrationStatus#', 'doseGiven'))
+            fields['date'] = date
+            facts.append((Immunization, date, fields))
+
+        facts.sort(key=lambda fact: fact[1])
+        return facts
+
+    def audits(self, rng, index, record_id, app_emails):
+        """ Audits of API calls on the record over the last year, by its owner or the apps in *app_emails*. """
+        email = account_email(self.seed, index)
+        audits = []
+        for i in xrange(_count(rng, self.distribution['Audit'])):
+            view, method, path, weight = _weighted_choice(rng, AUDITED_CALLS)
+            resp_code = _weighted_choice(rng, [(200, 95), (403, 3), (404, 2)])[0]
+            proxied_by = app_emails and rng.random() < 0.7 and rng.choice(app_emails) or None
+            audits.append(Audit(datetime=_between(rng, self.as_of - datetime.timedelta(days=365), self.as_of),
+                                view_func=view, request_successful=resp_code == 200,
+                                effective_principal_email=email, proxied_by_email=proxied_by,
+                                record_id=record_id, req_url=path % {'record_id': record_id},
+                                req_ip_address='10.%s.%s.%s' % (rng.randrange(256), rng.randrange(256),
+                                                                 rng.randrange(1, 255)),
+                                req_domain='localhost', req_method=method, resp_code=resp_code,
+                                resp_headers='application/xml'))
+        return audits
+
+def generate_records(generator, indices, phase):
+    """ Run one *phase* (``'records'`` or ``'data'``) of *generator* for *indices*, in its own transaction. """
+    transaction.enter_transaction_management()
+    transaction.managed(True)
+    try:
+        if phase == 'records':
+            result = generator.create_records(indices)
+        else:
+            result = generator.fill_records(indices)
+        transaction.commit()
+        return result
+    except:
+        transaction.rollback()
+        raise
+    finally:
+        transaction.leave_transaction_management()
@@ -5,8 +5,11 @@ Utilities for Indivo
 from django.http import HttpResponse
 from django.template import Context, loader
 from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import AutoField
 from django import http
 from django.utils import simplejson
+from indivo.lib.instrumentation import timed, TEMPLATE
 import django
 
 try:
@@ -48,6 +51,12 @@ def random_string(length, choices=[string.letters]):
 def send_mail(subject, body, sender, recipient_list):
     # if send mail?
     if settings.SEND_MAIL:
+        if getattr(settings, 'EMAIL_OUTBOX', False):
+            # imported here, since the outbox is a model, and models depend on us
+            from indivo.lib import outbox
+            outbox.enqueue(subject, body, sender, recipient_list)
+            return
+
         try:
             mail.send_mail(subject, body, sender, recipient_list)
         except Exception, e:
@@ -57,10 +66,69 @@ def send_mail(subject, body, sender, recipient_list):
     else:
         logging.debug("send_mail to set to false, would have sent email to %s\n\n%s" % (', '.join(recipient_list), body))
 
+def bulk_insert(model, objects, batch_size=500):
+    """ Insert *objects*, unsaved instances of *model*, with one multi-row statement per *batch_size* objects.
+
+    This is much faster than saving the objects one at a time, but skips
+    everything except the SQL: the models' ``save()`` methods, validation
+    and signals. Objects of models with multi-table inheritance are
+    inserted into each of their parents' tables too. Auto-incrementing ids
+    are left to the database (and not set on the objects).
+
+    SQLite takes at most 999 parameters per statement, so its batches may be
+    smaller, and Oracle has no multi-row ``INSERT ... VALUES``, so its rows
+    go in one statement each.
+
+    """
+    if not objects:
+        return
+
+    # Parents first, so that the children's foreign keys are satisfied
+    for parent, link in model._meta.parents.iteritems():
+        if link:
+            for obj in objects:
+                setattr(obj, link.attname, getattr(obj, parent._meta.pk.attname))
+        bulk_insert(parent, objects, batch_size)
+
+    fields = [f for f in model._meta.local_fields if not isinstance(f, AutoField)]
+    qn = connection.ops.quote_name
+    sql = 'INSERT INTO %s (%s) VALUES ' % (qn(model._meta.db_table), ', '.join([qn(f.column) for f in fields]))
+    placeholders = '(%s)' % ', '.join(['%s'] * len(fields))
+
+    if connection.vendor == 'oracle':
+        batch_size = 1
+    elif connection.vendor == 'sqlite':
+        batch_size = max(1, min(batch_size, 999 // len(fields)))
+
+    cursor = connection.cursor()
+    for start in xrange(0, len(objects), batch_size):
+        batch = objects[start:start + batch_size]
+        params = []
+        for obj in batch:
+            for f in fields:
+                value = getattr(obj, f.attname)
+                if value is None:
+                    # fill in auto_now dates and the like
+                    value = f.pre_save(obj, True)
+                params.append(f.get_db_prep_save(value, connection=connection))
+        cursor.execute(sql + ', '.join([placeholders] * len(batch)), params)
+
+    # As Django's own saves do: commit, or mark the managed transaction as needing a commit
+    transaction.commit_unless_managed()
+
 def render_template_raw(template_name, vars, type='xml'):
-    t_obj = loader.get_template('%s.%s' % (template_name, type))
-    c_obj = Context(vars)
-    return t_obj.render(c_obj)
+    template_name = '%s.%s' % (template_name, type)
+    with timed(TEMPLATE):
+        if getattr(settings, 'COMPILED_TEMPLATES', False) and not settings.TEMPLATE_STRING_IF_INVALID:
+            # imported here, since the compiled templates depend on our template tags, which depend on us
+            from indivo.lib.compiled_templates import RENDERERS
+            renderer = RENDERERS.get(template_name)
+            if renderer:
+                return renderer(vars)
+
+        t_obj = loader.get_template(template_name)
+        c_obj = Context(vars)
+        return t_obj.render(c_obj)
 
 def render_template(template_name, vars, type='xml'):
     content = render_template_raw(template_name, vars, type)
@@ -41,7 +41,7 @@ def marsloader(query_api_support = False):
           return int(value)
       
       def parse_status(value):
-          return models.StatusName.objects.get(name=value)
+          return models.StatusName.cached.get(value)
       
       def parse_aggregate_by(value):
           operator, field = value.split('*')
@@ -81,7 +81,7 @@ def marsloader(query_api_support = False):
         'limit': 100, 
         'offset': 0,
         'order_by': '-%s'%(DEFAULT_ORDERBY) if not request.GET.has_key('aggregate_by') or not query_api_support else None,
-        'status': models.StatusName.objects.get(name='active'),
+        'status': models.StatusName.cached.get('active'),
         }
       query_api_defaults = {
         'group_by': None,
@@ -0,0 +1,108 @@
+"""
+Archive old Audit entries to compressed NDJSON files, and remove them from the database.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+from django.db.models import Min
+from django.utils import simplejson
+from optparse import make_option
+from indivo.lib.partitioning import month_start, next_month, months_between
+from indivo.models import Audit
+import datetime
+import gzip
+import os
+
+DEFAULT_RETENTION_MONTHS = 12
+BATCH_SIZE = 5000
+
+class Command(BaseCommand):
+    args = ''
+    help = '''\
+Archive Audit entries older than a retention period (AUDIT_RETENTION_MONTHS, default %s months), one
+calendar month at a time. Each month is written to <output-dir>/<partition>.ndjson.gz (one JSON object
+per line), and then removed from the database. On PostgreSQL, removing a month drops its partition.
+''' % DEFAULT_RETENTION_MONTHS
+
+    option_list = BaseCommand.option_list + (
+        make_option('-o', '--output-dir',
+                    action='store',
+                    dest='output_dir',
+                    default=getattr(settings, 'AUDIT_ARCHIVE_DIR', None),
+                    help='Directory to write archives to. Defaults to settings.AUDIT_ARCHIVE_DIR'),
+        make_option('-m', '--months-to-keep',
+                    action='store',
+                    type='int',
+                    dest='months',
+                    default=getattr(settings, 'AUDIT_RETENTION_MONTHS', DEFAULT_RETENTION_MONTHS),
+                    help='Number of months (including the current one) to keep in the database'),
+        make_option('--keep',
+                    action='store_true',
+                    dest='keep',
+                    default=False,
+                    help='Write archives, but do not remove archived entries from the database'),
+        )
+
+    def handle(self, *args, **options):
+        output_dir = options['output_dir']
+        if not output_dir:
+            raise CommandError('No output directory: pass --output-dir, or set AUDIT_ARCHIVE_DIR')
+        if not os.path.isdir(output_dir):
+            os.makedirs(output_dir)
+
+        if options['months'] < 1:
+            raise CommandError('Must keep at least the current month of audits')
+        cutoff = self.cutoff(options['months'])
+
+        oldest = Audit.objects.aggregate(oldest=Min('datetime'))['oldest']
+        if not oldest or oldest >= cutoff:
+            print "No audits older than %s to archive." % cutoff.date()
+            return
+
+        partitions = Audit.partitions
+        for month in months_between(oldest, cutoff):
+            filename = os.path.join(output_dir, '%s.ndjson.gz' % partitions.partition_name(month))
+            count = self.archive_month(month, filename)
+            if count:
+                print "Archived %s audits from %s to %s" % (count, month.strftime('%Y-%m'), filename)
+            if not options['keep']:
+                partitions.drop_month(month)
+        print "Done."
+
+    def cutoff(self, months_to_keep):
+        """ The first instant that should stay in the database. """
+        cutoff = month_start(datetime.datetime.utcnow())
+        for i in xrange(months_to_keep - 1):
+            cutoff = month_start(cutoff - datetime.timedelta(days=1))
+        return cutoff
+
+    def archive_month(self, month, filename):
+        """ Write all audits from *month* to *filename*, in primary key batches to keep memory flat. """
+        end = next_month(month)
+        audits = Audit.objects.filter(datetime__gte=month, datetime__lt=end).order_by('id')
+        audits = Audit.partitions.prune(audits, month, end)
+
+        count = 0
+        last_id = None
+        out = None
+        try:
+            while True:
+                batch = audits if last_id is None else audits.filter(id__gt=last_id)
+                batch = list(batch.values()[:BATCH_SIZE])
+                if not batch:
+                    break
+
+                # Don't create empty archives for months with no audits
+                if out is None:
+                    out = gzip.open(filename, 'wb')
+
+                for audit in batch:
+                    audit['datetime'] = audit['datetime'].isoformat()
+                    out.write(simplejson.dumps(audit))
+                    out.write('\n')
+                count += len(batch)
+                last_id = batch[-1]['id']
+        finally:
+            if out is not None:
+                out.close()
+        return count
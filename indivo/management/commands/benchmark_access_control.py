@@ -0,0 +1,104 @@
+"""
+Measure the throughput of access control checks, with and without the permission cache.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+from django.db import connection, reset_queries, transaction
+from django.test.client import RequestFactory
+from optparse import make_option
+import indivo.accesscontrol # registers the access rules
+from indivo.lib import permission_cache
+from indivo.middlewares.authorization import Authorization
+from indivo.models import *
+from indivo.views import record_document_list, carenet_document_list
+import time
+import uuid
+
+class Command(BaseCommand):
+    args = ''
+    help = '''\
+Run Authorization.process_view repeatedly against throwaway data (rolled back when done), once with
+the permission cache disabled and once with it enabled, and report checks per second and queries per check.
+'''
+
+    option_list = BaseCommand.option_list + (
+        make_option('-n', '--iterations',
+                    action='store',
+                    type='int',
+                    dest='iterations',
+                    default=2000,
+                    help='Number of checks to run per scenario'),
+        make_option('--ttl',
+                    action='store',
+                    type='int',
+                    dest='ttl',
+                    default=300,
+                    help='PERMISSION_CACHE_TTL to use for the cached runs'),
+        )
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1 or options['ttl'] < 1:
+            raise CommandError('--iterations and --ttl must be positive')
+
+        old_ttl = getattr(settings, 'PERMISSION_CACHE_TTL', 0)
+        old_debug = settings.DEBUG
+        transaction.enter_transaction_management()
+        transaction.managed(True)
+        try:
+            scenarios = self.build_scenarios()
+            print "%-30s %-10s %12s %14s" % ('scenario', 'cache', 'checks/sec', 'queries/check')
+            for name, principal, view_func, view_kwargs in scenarios:
+                for label, ttl in (('off', 0), ('on', options['ttl'])):
+                    settings.PERMISSION_CACHE_TTL = ttl
+                    permission_cache.clear()
+                    rate, queries = self.run(principal, view_func, view_kwargs, options['iterations'])
+                    print "%-30s %-10s %12.1f %14.2f" % (name, label, rate, queries)
+        finally:
+            settings.PERMISSION_CACHE_TTL = old_ttl
+            settings.DEBUG = old_debug
+            permission_cache.clear()
+            transaction.rollback()
+            transaction.leave_transaction_management()
+
+    def build_scenarios(self):
+        def unique(prefix):
+            return '%s-%s@benchmark.indivo.org' % (prefix, uuid.uuid4().hex[:8])
+
+        owner = Account.objects.create(email=unique('owner'), full_name='Benchmark Owner')
+        record = Record.objects.create(label='Benchmark Record', owner=owner)
+        record.create_default_carenets()
+        carenet = Carenet.objects.filter(record=record)[0]
+
+        shared = Account.objects.create(email=unique('shared'), full_name='Benchmark Share')
+        AccountFullShare.objects.create(record=record, with_account=shared)
+
+        member = Account.objects.create(email=unique('member'), full_name='Benchmark Member')
+        CarenetAccount.objects.create(carenet=carenet, account=member)
+
+        return [
+            ('record owner', owner, record_document_list, {'record': record}),
+            ('full share', shared, record_document_list, {'record': record}),
+            ('carenet member', member, carenet_document_list, {'carenet': carenet}),
+            ]
+
+    def run(self, principal, view_func, view_kwargs, iterations):
+        """ Return (checks per second, queries per check) for *iterations* checks. """
+        middleware = Authorization()
+        request = RequestFactory().get('/')
+        request.principal = principal
+
+        # Count queries on a short run, then time a full run without query logging overhead
+        settings.DEBUG = True
+        reset_queries()
+        count_iterations = min(iterations, 100)
+        for i in xrange(count_iterations):
+            middleware.process_view(request, view_func, (), dict(view_kwargs))
+        queries = len(connection.queries) / float(count_iterations)
+        settings.DEBUG = False
+
+        start = time.time()
+        for i in xrange(iterations):
+            middleware.process_view(request, view_func, (), dict(view_kwargs))
+        elapsed = time.time() - start
+        return iterations / elapsed, queries
@@ -0,0 +1,241 @@
+"""
+End-to-end benchmarks of the Indivo API, run against the local database.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+from django.db import connection, transaction
+from django.test.testcases import disable_transaction_methods, restore_transaction_methods
+from django.utils import simplejson
+from optparse import make_option
+from indivo.lib.benchmark import OAuthClient, Scenario, run_scenario
+from indivo.lib.utils import random_string
+from indivo.models import *
+import datetime
+import random
+import subprocess
+import uuid
+
+# Settings that change performance, recorded with each run
+RECORDED_SETTINGS = ('PERMISSION_CACHE_TTL', 'COMPILED_TEMPLATES', 'AUDIT_LEVEL')
+
+PROBLEMS = [
+    ('Backache (Finding)', '161891005'),
+    ('Essential hypertension', '59621000'),
+    ('Diabetes mellitus type 2', '44054006'),
+    ('Asthma', '195967001'),
+    ('Migraine', '37796009'),
+    ]
+
+MEASUREMENT = "<HBA1C xmlns='http://indivo.org/vocab/xml/documents#' value='%.2f' unit='percent' datetime='%s' />"
+
+SDMX_PROBLEM = '''\
+  <Model name="Problem">
+    <Field name="startDate">%s</Field>
+    <Field name="name_title">%s</Field>
+    <Field name="name_system">http://purl.bioontology.org/ontology/SNOMEDCT/</Field>
+    <Field name="name_identifier">%s</Field>
+  </Model>
+'''
+
+# name, client (whose token to sign with), method, path, body
+SCENARIOS = (
+    ('ingest_single', 'record', 'POST', '/records/%(record_id)s/documents/', 'measurement'),
+    ('ingest_sdmx', 'record', 'POST', '/records/%(record_id)s/documents/', 'sdmx'),
+    ('generic_list_filtered', 'record', 'GET',
+     '/records/%(record_id)s/reports/Problem/?name_title=Asthma&order_by=-startDate&limit=50', None),
+    ('generic_list_grouped', 'record', 'GET',
+     '/records/%(record_id)s/reports/Problem/?group_by=name_title&aggregate_by=count*name_title', None),
+    ('generic_list_date_group', 'record', 'GET',
+     '/records/%(record_id)s/reports/Problem/?date_group=startDate*month&aggregate_by=count*name_title'
+     '&date_range=startDate*2005-01-01T00:00:00Z*', None),
+    ('smart_problems', 'record', 'GET', '/records/%(record_id)s/problems/', None),
+    ('carenet_documents', 'carenet', 'GET', '/carenets/%(carenet_id)s/documents/?limit=50', None),
+    ('carenet_generic_list', 'carenet', 'GET', '/carenets/%(carenet_id)s/reports/Problem/?limit=50', None),
+    ('carenet_measurements', 'carenet', 'GET', '/carenets/%(carenet_id)s/reports/minimal/measurements/HBA1C/', None),
+    ('audit_query', 'record', 'GET',
+     '/records/%(record_id)s/audits/query/?date_range=request_date*2000-01-01T00:00:00Z*&limit=50', None),
+    ('oauth_3legged', 'record', 'GET', '/version', None),
+    ('oauth_2legged', 'admin', 'GET', '/version', None),
+    )
+
+class Command(BaseCommand):
+    args = ''
+    help = '''\
+Benchmark document ingest, the generic and SMART reporting calls, carenet-scoped reads, audit queries and
+OAuth authentication, making OAuth-signed requests through the full middleware stack against throwaway data
+(rolled back when done). Reports throughput, p50/p95/p99 latency, SQL queries per request and peak memory
+for each scenario, and optionally writes them as JSON so runs can be compared across commits.
+'''
+
+    option_list = BaseCommand.option_list + (
+        make_option('-n', '--iterations',
+                    action='store',
+                    type='int',
+                    dest='iterations',
+                    default=200,
+                    help='Number of timed requests per scenario'),
+        make_option('-w', '--warmup',
+                    action='store',
+                    type='int',
+                    dest='warmup',
+                    default=10,
+                    help='Number of untimed requests per scenario, used to count SQL queries'),
+        make_option('-s', '--scenario',
+                    action='append',
+                    dest='scenarios',
+                    default=[],
+                    help='Run only this scenario (may be repeated). Use --list to see them all'),
+        make_option('--list',
+                    action='store_true',
+                    dest='list',
+                    default=False,
+                    help='List the available scenarios, and exit'),
+        make_option('-o', '--output',
+                    action='store',
+                    dest='output',
+                    default=None,
+                    help='Write results to this file as JSON'),
+        make_option('--seed',
+                    action='store',
+                    type='int',
+                    dest='seed',
+                    default=1,
+                    help='Random seed for the generated data'),
+        make_option('--seed-documents',
+                    action='store',
+                    type='int',
+                    dest='seed_documents',
+                    default=100,
+                    help='Number of measurement documents to load into the record before running the read scenarios'),
+        make_option('--sdmx-models',
+                    action='store',
+                    type='int',
+                    dest='sdmx_models',
+                    default=100,
+                    help='Number of Problems in each SDMX document'),
+        )
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1 or options['warmup'] < 0:
+            raise CommandError('--iterations must be positive, and --warmup not negative')
+        self.random = random.Random(options['seed'])
+        self.sdmx_models = options['sdmx_models']
+
+        names = [name for name, client, method, path, body in SCENARIOS]
+        if options['list']:
+            for name in names:
+                print name
+            return
+
+        if options['scenarios']:
+            unknown = set(options['scenarios']) - set(names)
+            if unknown:
+                raise CommandError('Unknown scenarios: %s' % ', '.join(sorted(unknown)))
+            names = [name for name in names if name in options['scenarios']]
+
+        transaction.enter_transaction_management()
+        transaction.managed(True)
+
+        # The views commit as they go: don't let them, so everything can be rolled back
+        disable_transaction_methods()
+        try:
+            results = {}
+            print "%-24s %10s %10s %10s %10s %10s %12s" % ('scenario', 'req/sec', 'p50 ms', 'p95 ms', 'p99 ms', 'queries', 'peak rss KB')
+            for scenario in self.build_scenarios(names, options['seed_documents']):
+                result = run_scenario(scenario, options['iterations'], options['warmup'])
+                results[scenario.name] = result
+                print "%-24s %10s %10s %10s %10s %10s %12s" % (scenario.name, result['throughput'],
+                                                             result['latency_ms']['p50'], result['latency_ms']['p95'],
+                                                             result['latency_ms']['p99'], result['queries']['mean'],
+                                                             result['peak_rss_kb'])
+                if result['errors']:
+                    print "  WARNING: %s of the requests failed" % result['errors']
+        finally:
+            restore_transaction_methods()
+            transaction.rollback()
+            transaction.leave_transaction_management()
+
+        if options['output']:
+            report = {
+                'revision': self.revision(),
+                'run_at': datetime.datetime.utcnow().isoformat(),
+                'database': connection.settings_dict['ENGINE'],
+                'settings': dict((name, getattr(settings, name, None)) for name in RECORDED_SETTINGS),
+                'options': dict((name, options[name]) for name in ('iterations', 'warmup', 'seed', 'seed_documents', 'sdmx_models')),
+                'scenarios': results,
+                }
+            f = open(options['output'], 'w')
+            try:
+                simplejson.dump(report, f, indent=2, sort_keys=True)
+            finally:
+                f.close()
+            print "Wrote results to %s" % options['output']
+
+    def revision(self):
+        """ The git commit we're running, if we can tell. """
+        try:
+            process = subprocess.Popen(['git', 'rev-parse', 'HEAD'], cwd=settings.APP_HOME,
+                                       stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            out, err = process.communicate()
+            return out.strip() or None
+        except OSError:
+            return None
+
+    def measurement(self):
+        when = datetime.datetime(2009, 1, 1) + datetime.timedelta(minutes=self.random.randint(0, 3 * 365 * 24 * 60))
+        return MEASUREMENT % (self.random.uniform(3.0, 12.0), when.strftime('%Y-%m-%dT%H:%M:%SZ'))
+
+    def sdmx_document(self):
+        models = []
+        for i in xrange(self.sdmx_models):
+            name, code = self.random.choice(PROBLEMS)
+            when = datetime.datetime(2000, 1, 1) + datetime.timedelta(days=self.random.randint(0, 12 * 365))
+            models.append(SDMX_PROBLEM % (when.strftime('%Y-%m-%dT%H:%M:%SZ'), name, code))
+        return '<Models xmlns="http://indivo.org/vocab/xml/documents#">\n%s</Models>' % ''.join(models)
+
+    def build_scenarios(self, names, seed_documents):
+        def unique(prefix):
+            return '%s-%s@benchmark.indivo.org' % (prefix, uuid.uuid4().hex[:8])
+
+        owner = Account.objects.create(email=unique('owner'), full_name='Benchmark Owner')
+        record = Record.objects.create(label='Benchmark Record', owner=owner)
+        record.create_default_carenets()
+        carenet = Carenet.objects.filter(record=record)[0]
+
+        # A user app enabled on the record and one of its carenets, with a token for each
+        app_email = unique('app')
+        app = PHA.objects.create(email=app_email, name='Benchmark App', consumer_key=app_email,
+                                 secret=random_string(32), start_url_template='http://localhost/start',
+                                 callback_url='http://localhost/after_auth', is_autonomous=False)
+        share = PHAShare.objects.create(record=record, with_pha=app, authorized_at=datetime.datetime.utcnow(),
+                                        authorized_by=owner)
+        CarenetPHA.objects.create(carenet=carenet, pha=app)
+        record_token = share.new_access_token(random_string(30), random_string(50), account=owner)
+        carenet_token = share.new_access_token(random_string(30), random_string(50), account=owner, carenet=carenet)
+
+        admin_email = unique('admin')
+        admin_app = MachineApp.objects.create(email=admin_email, name='Benchmark Admin App', consumer_key=admin_email,
+                                              secret=random_string(32), app_type='admin')
+
+        record_client = OAuthClient(app, record_token)
+        carenet_client = OAuthClient(app, carenet_token)
+        admin_client = OAuthClient(admin_app)
+
+        # Data for the read scenarios, loaded through the API, and shared with the carenet
+        documents_path = '/records/%s/documents/' % record.id
+        seed_scenarios = [Scenario('seed', record_client, 'POST', documents_path, self.measurement)] * seed_documents
+        seed_scenarios += [Scenario('seed', record_client, 'POST', documents_path, self.sdmx_document)] * 5
+        for scenario in seed_scenarios:
+            response = scenario.prepare()()
+            if response.status_code != 200:
+                raise CommandError('Unable to load benchmark data: POST %s returned %s: %s' % (
+                        documents_path, response.status_code, response.content))
+        for doc in record.documents.all():
+            CarenetDocument.objects.create(carenet=carenet, document=doc)
+
+        clients = {'record': record_client, 'carenet': carenet_client, 'admin': admin_client}
+        bodies = {'measurement': self.measurement, 'sdmx': self.sdmx_document}
+        ids = {'record_id': record.id, 'carenet_id': carenet.id}
+        return [Scenario(name, clients[client], method, path % ids, body and bodies[body])
+                for name, client, method, path, body in SCENARIOS if name in names]
@@ -0,0 +1,109 @@
+"""
+Measure request latency with a new database connection per request, with persistent connections, and with pooled ones.
+"""
+
+from django.core import signals
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, close_connection
+from django.db.backends.signals import connection_created
+from optparse import make_option
+from indivo.lib import db_connections
+from indivo.lib.benchmark import summarize
+
+import threading
+import time
+
+class Command(BaseCommand):
+    args = ''
+    help = '''\
+Simulate requests (the request_started and request_finished signals around one small query) against
+the configured database: with Django's new connection per request, with persistent connections (in one
+thread, and in --threads threads) and with pooled connections (in --threads threads). Reports latency
+and how many connections were opened. Run it against a database reached the way production reaches it
+(over TLS, etc.) to see what connecting costs.
+'''
+
+    option_list = BaseCommand.option_list + (
+        make_option('-n', '--iterations',
+                    action='store',
+                    type='int',
+                    dest='iterations',
+                    default=500,
+                    help='Number of requests per scenario'),
+        make_option('--threads',
+                    action='store',
+                    type='int',
+                    dest='threads',
+                    default=4,
+                    help='Number of threads for the threaded scenarios'),
+        )
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1 or options['threads'] < 1:
+            raise CommandError('--iterations and --threads must be positive')
+
+        threads = options['threads']
+        scenarios = (('per-request', 1, {'max_age': 0}),
+                     ('persistent', 1, {'max_age': None, 'pool_size': 0}),
+                     ('per-request', threads, {'max_age': 0}),
+                     ('persistent', threads, {'max_age': None, 'pool_size': 0}),
+                     ('pooled', threads, {'max_age': None, 'pool_size': threads}))
+
+        print "%-12s %8s %12s %10s %10s %10s %12s" % ('connections', 'threads', 'requests/sec', 'mean ms',
+                                                     'p95 ms', 'p99 ms', 'connects')
+        try:
+            for name, thread_count, install_options in scenarios:
+                db_connections.install(health_checks=True, **install_options)
+                summary, connects = self.run(options['iterations'], thread_count)
+                db_connections.uninstall()
+                latency = summary['latency_ms']
+                print "%-12s %8d %12.1f %10.3f %10.3f %10.3f %12d" % (
+                    name, thread_count, summary['throughput'] * thread_count, latency['mean'],
+                    latency['p95'], latency['p99'], connects)
+        finally:
+            db_connections.uninstall()
+            connection.close()
+
+    def run(self, iterations, thread_count):
+        """ Make *iterations* requests, split across *thread_count* threads. """
+        latencies = []
+        connects = []
+        lock = threading.Lock()
+
+        def count_connect(**kwargs):
+            lock.acquire()
+            connects.append(1)
+            lock.release()
+        connection_created.connect(count_connect)
+
+        def worker(requests):
+            mine = []
+            for i in xrange(requests):
+                start = time.time()
+                signals.request_started.send(sender=self.__class__)
+                try:
+                    cursor = connection.cursor()
+                    cursor.execute('SELECT 1')
+                    cursor.fetchone()
+                finally:
+                    signals.request_finished.send(sender=self.__class__)
+                mine.append(time.time() - start)
+
+            # Threads' connections outlive the benchmark otherwise
+            close_connection()
+            lock.acquire()
+            latencies.extend(mine)
+            lock.release()
+
+        try:
+            workers = [threading.Thread(target=worker, args=(iterations // thread_count,))
+                       for i in range(thread_count)]
+            for thread in workers:
+                thread.start()
+            for thread in workers:
+                thread.join()
+        finally:
+            connection_created.disconnect(count_connect)
+
+        # Throughput per thread; the caller scales it up
+        return summarize(latencies, sum(latencies), [], 0), len(connects)
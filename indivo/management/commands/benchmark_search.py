@@ -0,0 +1,123 @@
+"""
+Compare account search through the trigram index with the full-table LIKE scan it replaced.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from optparse import make_option
+from indivo.lib import search
+from indivo.lib.benchmark import summarize
+from indivo.lib.synthetic_data import SyntheticDataGenerator
+from indivo.models import Account
+
+import random
+import time
+
+# Whole words, word prefixes, single letters (the first keystroke of a type-ahead, too broad to rank every
+# match of), and fragments from the middle of words
+KINDS = ('word', 'prefix', 'letter', 'fragment')
+
+class Command(BaseCommand):
+    args = ''
+    help = '''\
+Time account searches (by name and by contact email: whole words, word prefixes, single letters, and
+fragments from the middle of words, sampled from the existing accounts) through the search index, and with the
+'LIKE %...%' scan over the whole account table that searches used to run. Use --generate to add synthetic
+accounts first: the difference shows at around a million of them.
+'''
+
+    option_list = BaseCommand.option_list + (
+        make_option('--generate',
+                    action='store',
+                    type='int',
+                    dest='generate',
+                    default=0,
+                    help='Number of synthetic accounts (and their records) to add before searching'),
+        make_option('-n', '--queries',
+                    action='store',
+                    type='int',
+                    dest='queries',
+                    default=100,
+                    help='Number of searches of each kind'),
+        make_option('--limit',
+                    action='store',
+                    type='int',
+                    dest='limit',
+                    default=20,
+                    help='Page size for indexed searches'),
+        make_option('--seed',
+                    action='store',
+                    type='int',
+                    dest='seed',
+                    default=1,
+                    help='Random seed for the generated accounts and the searches'),
+        )
+
+    def handle(self, *args, **options):
+        if options['queries'] < 1 or options['limit'] < 1 or options['generate'] < 0:
+            raise CommandError('--queries and --limit must be positive, and --generate not negative')
+
+        if options['generate']:
+            self.generate(options['generate'], options['seed'])
+
+        terms = self.terms(options['queries'], random.Random(options['seed']))
+        if not terms:
+            raise CommandError('There are no accounts to search: add some with --generate')
+
+        old_debug = settings.DEBUG
+        settings.DEBUG = False
+        try:
+            print "%-8s %-8s %8s %10s %10s %10s %10s" % ('search', 'terms', 'queries', 'mean ms', 'p95 ms', 'p99 ms',
+                                                         'matches')
+            for name, run in (('scan', self.scan), ('indexed', lambda terms: self.indexed(terms, options['limit']))):
+                for kind in KINDS:
+                    latencies = []
+                    matches = 0
+                    start = time.time()
+                    for term in terms[kind]:
+                        before = time.time()
+                        matches += run(term)
+                        latencies.append(time.time() - before)
+                    latency = summarize(latencies, time.time() - start, [], 0)['latency_ms']
+                    print "%-8s %-8s %8d %10.3f %10.3f %10.3f %10.1f" % (name, kind, len(terms[kind]), latency['mean'],
+                                                                        latency['p95'], latency['p99'],
+                                                                        matches / float(len(terms[kind])))
+        finally:
+            settings.DEBUG = old_debug
+
+    def generate(self, count, seed):
+        first = Account.objects.count()
+        generator = SyntheticDataGenerator(first + count, seed=seed)
+        start = time.time()
+        # Not in a transaction: each insert is committed as it's made
+        for block in xrange(first, first + count, 1000):
+            generator.create_records(range(block, min(block + 1000, first + count)))
+        print "Generated %d accounts in %.1f seconds" % (count, time.time() - start)
+
+    def terms(self, count, rng):
+        """ Search terms, as {field: term} dicts: *count* of each of KINDS, by kind. """
+        total = Account.objects.count()
+        if not total:
+            return {}
+
+        terms = dict((kind, []) for kind in KINDS)
+        for i in range(count):
+            full_name, contact_email = Account.objects.order_by('pk').values_list(
+                'full_name', 'contact_email')[rng.randrange(total)]
+            word = rng.choice(full_name.split() or [full_name])
+            terms['word'].append({'full_name': word})
+            terms['prefix'].append({'full_name': word[:3]})
+            terms['letter'].append({'full_name': word[:1]})
+            terms['fragment'].append({'contact_email': contact_email[1:-1]})
+        return terms
+
+    def scan(self, terms):
+        query_filter = Q()
+        for field, term in terms.iteritems():
+            query_filter |= Q(**{'%s__icontains' % field: term})
+        return len(list(Account.objects.filter(query_filter)))
+
+    def indexed(self, terms, limit):
+        total, accounts = search.search(Account, terms, limit=limit)
+        return total
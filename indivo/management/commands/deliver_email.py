@@ -0,0 +1,62 @@
+"""
+Send the email saved to the outbox (see :py:mod:`indivo.lib.outbox`).
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_connection
+from optparse import make_option
+from indivo.lib import outbox
+
+import logging
+import time
+
+class Command(BaseCommand):
+    args = ''
+    help = '''\
+Send the email that requests have saved to the outbox (with settings.EMAIL_OUTBOX on), in batches of
+--batch-size over one SMTP connection each. Failed emails are retried with backoff. Runs until killed,
+checking for new email every --interval seconds, unless --once is given. To try it without a real mail
+server, run 'python -m smtpd -n -c DebuggingServer localhost:1025', which prints what it receives, and
+set EMAIL_HOST = 'localhost' and EMAIL_PORT = 1025.
+'''
+
+    option_list = BaseCommand.option_list + (
+        make_option('--batch-size',
+                    action='store',
+                    type='int',
+                    dest='batch_size',
+                    default=50,
+                    help='Emails to send per SMTP connection'),
+        make_option('--interval',
+                    action='store',
+                    type='float',
+                    dest='interval',
+                    default=5,
+                    help='Seconds to wait, when there is nothing to send, before checking again'),
+        make_option('--once',
+                    action='store_true',
+                    dest='once',
+                    default=False,
+                    help='Send what is due now, then exit'),
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1 or options['interval'] < 0:
+            raise CommandError('--batch-size must be positive, and --interval not negative')
+
+        keep_days = getattr(settings, 'EMAIL_OUTBOX_KEEP_DAYS', 7)
+        while True:
+            # Not in a transaction: each claim, and each email sent, is committed as it happens
+            sent, failed = outbox.deliver(options['batch_size'])
+            if sent or failed:
+                logging.info('Sent %s emails, %s failed' % (sent, failed))
+
+            # A full batch means there may be more due right away
+            if sent + failed < options['batch_size']:
+                if keep_days:
+                    outbox.purge(keep_days)
+                if options['once']:
+                    return
+                close_connection()
+                time.sleep(options['interval'])
@@ -0,0 +1,70 @@
+"""
+Export whole records (documents, metadata, version chains, relationships and facts) to zip or NDJSON files.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from optparse import make_option
+from indivo.lib.record_export import RecordExporter, FORMATS, BATCH_SIZE, ZIP
+from indivo.models import Record
+import os
+
+class Command(BaseCommand):
+    args = '<record_id record_id ...>'
+    help = '''\
+Export each record to <output-dir>/record-<record_id>.<format>, as a zip archive (the default) or as
+NDJSON (one JSON object per line). Documents are read in batches, so memory use stays flat however
+large the record.
+'''
+
+    option_list = BaseCommand.option_list + (
+        make_option('-o', '--output-dir',
+                    action='store',
+                    dest='output_dir',
+                    default='.',
+                    help='Directory to write exports to. Defaults to the current directory'),
+        make_option('-f', '--format',
+                    action='store',
+                    dest='format',
+                    default=ZIP,
+                    choices=sorted(FORMATS.keys()),
+                    help='Export format: %s. Defaults to %s' % (' or '.join(sorted(FORMATS.keys())), ZIP)),
+        make_option('--facts',
+                    action='store_true',
+                    dest='facts',
+                    default=False,
+                    help='Include the facts extracted from the documents'),
+        make_option('--batch-size',
+                    action='store',
+                    type='int',
+                    dest='batch_size',
+                    default=BATCH_SIZE,
+                    help='Number of documents (or facts) to read at a time. Defaults to %s' % BATCH_SIZE),
+        )
+
+    def handle(self, *args, **options):
+        if not args:
+            raise CommandError('Expected at least one record id')
+
+        records = []
+        for record_id in args:
+            try:
+                records.append(Record.objects.get(id=record_id))
+            except Record.DoesNotExist:
+                raise CommandError('No such record: %s' % record_id)
+
+        output_dir = options['output_dir']
+        if not os.path.isdir(output_dir):
+            os.makedirs(output_dir)
+
+        for record in records:
+            exporter = RecordExporter(record, format=options['format'], include_facts=options['facts'],
+                                      batch_size=options['batch_size'])
+            filename = os.path.join(output_dir, exporter.filename)
+            out = open(filename, 'wb')
+            try:
+                for chunk in exporter:
+                    out.write(chunk)
+            finally:
+                out.close()
+            print "Exported record %s to %s" % (record.id, filename)
+        print "Done."
@@ -0,0 +1,145 @@
+"""
+Generate a large, reproducible synthetic dataset for benchmarks and capacity tests.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from optparse import make_option
+from indivo.lib.synthetic_data import SyntheticDataGenerator, DEFAULT_DISTRIBUTION, generate_records
+from indivo.models import PHA
+import datetime
+import multiprocessing
+import time
+
+def _generate(args):
+    """ Run one block of work in a worker process. """
+    generator, indices, phase = args
+    return generate_records(generator, indices, phase)
+
+def _close_connection():
+    """ Don't share the parent's database connection: each worker opens its own. """
+    connection.close()
+
+class Command(BaseCommand):
+    args = ''
+    help = '''\
+Generate synthetic records, with realistic numbers of medications, labs, vitals, problems, allergies and
+immunizations, carenets, shares with other accounts and with the registered apps, and audits, writing them
+straight to the database with bulk inserts from several processes. The same seed and --as-of date always
+produce the same dataset, however many processes are used.
+'''
+
+    option_list = BaseCommand.option_list + (
+        make_option('-n', '--records',
+                    action='store',
+                    type='int',
+                    dest='records',
+                    default=None,
+                    help='Number of records to generate (required)'),
+        make_option('--first',
+                    action='store',
+                    type='int',
+                    dest='first',
+                    default=0,
+                    help='Number of the first record to generate, to add to a dataset generated earlier '
+                         'with the same seed'),
+        make_option('-p', '--processes',
+                    action='store',
+                    type='int',
+                    dest='processes',
+                    default=multiprocessing.cpu_count(),
+                    help='Number of worker processes (use 1 with SQLite)'),
+        make_option('--seed',
+                    action='store',
+                    type='int',
+                    dest='seed',
+                    default=1,
+                    help='Random seed for the generated data'),
+        make_option('--as-of',
+                    action='store',
+                    dest='as_of',
+                    default=None,
+                    help='Date (YYYY-MM-DD) the data ends at. Defaults to today: fix it to reproduce a dataset'),
+        make_option('-m', '--mean',
+                    action='append',
+                    dest='means',
+                    default=[],
+                    help='Mean number of a kind of data per record, as MODEL=N (may be repeated). Defaults: %s' % (
+                        ', '.join(['%s=%s' % item for item in sorted(DEFAULT_DISTRIBUTION.iteritems())]))),
+        make_option('--with-documents',
+                    action='store_true',
+                    dest='with_documents',
+                    default=False,
+                    help='Also generate the SDMX documents the facts would have been loaded from'),
+        make_option('--block-size',
+                    action='store',
+                    type='int',
+                    dest='block_size',
+                    default=100,
+                    help='Number of records generated (and committed) at a time by each process'),
+        make_option('--batch-size',
+                    action='store',
+                    type='int',
+                    dest='batch_size',
+                    default=500,
+                    help='Number of rows in each INSERT'),
+        )
+
+    def handle(self, *args, **options):
+        if not options['records'] or options['records'] < 1:
+            raise CommandError('Specify the number of records to generate with --records')
+        if options['processes'] < 1 or options['block_size'] < 1 or options['batch_size'] < 1 or options['first'] < 0:
+            raise CommandError('--processes, --block-size and --batch-size must be positive, and --first not negative')
+
+        distribution = {}
+        for mean in options['means']:
+            try:
+                model, n = mean.split('=')
+                distribution[model] = float(n)
+            except ValueError:
+                raise CommandError('Invalid --mean %s: use MODEL=N' % mean)
+            if model not in DEFAULT_DISTRIBUTION:
+                raise CommandError('Invalid --mean %s: MODEL must be one of %s' % (
+                        mean, ', '.join(sorted(DEFAULT_DISTRIBUTION.keys()))))
+
+        as_of = None
+        if options['as_of']:
+            try:
+                as_of = datetime.datetime.strptime(options['as_of'], '%Y-%m-%d')
+            except ValueError:
+                raise CommandError('Invalid --as-of %s: use YYYY-MM-DD' % options['as_of'])
+
+        first, count = options['first'], options['records']
+        generator = SyntheticDataGenerator(first + count, seed=options['seed'], as_of=as_of,
+                                           distribution=distribution, with_documents=options['with_documents'],
+                                           phas=PHA.objects.values_list('id', 'email'),
+                                           batch_size=options['batch_size'])
+        blocks = [range(start, min(start + options['block_size'], first + count))
+                  for start in xrange(first, first + count, options['block_size'])]
+
+        pool = None
+        if options['processes'] > 1:
+            connection.close()
+            pool = multiprocessing.Pool(options['processes'], initializer=_close_connection)
+            run = pool.imap_unordered
+        else:
+            run = map
+        try:
+            # All the records exist before any data is generated, so records can be shared with any account
+            for phase in ('records', 'data'):
+                start = time.time()
+                totals = {}
+                for result in run(_generate, [(generator, block, phase) for block in blocks]):
+                    if phase == 'records':
+                        result = {'Record': result}
+                    for model, n in result.iteritems():
+                        totals[model] = totals.get(model, 0) + n
+                elapsed = time.time() - start
+                print "%s: %s rows in %.1f seconds (%.0f rows/sec)" % (
+                    phase, sum(totals.values()), elapsed, sum(totals.values()) / max(elapsed, 0.001))
+                for model, n in sorted(totals.iteritems()):
+                    print "  %-20s %10s" % (model, n)
+        finally:
+            if pool:
+                pool.close()
+                pool.join()
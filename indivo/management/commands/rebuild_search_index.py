@@ -0,0 +1,37 @@
+"""
+Rebuild the account and record search index.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from optparse import make_option
+from indivo.lib import search
+
+import time
+
+class Command(BaseCommand):
+    args = ''
+    help = '''\
+Rebuild the index that account and record searches use (see indivo.lib.search) from scratch. Accounts and
+records keep it up to date as they're saved (and migrations 0039 and 0042 index those from before them), so
+this is only needed after loading accounts or records some other way.
+'''
+
+    option_list = BaseCommand.option_list + (
+        make_option('--batch-size',
+                    action='store',
+                    type='int',
+                    dest='batch_size',
+                    default=500,
+                    help='Number of objects indexed (and rows inserted) at a time'),
+        )
+
+    @transaction.commit_on_success
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+
+        for model in search.MODELS:
+            start = time.time()
+            count = search.rebuild(model, options['batch_size'])
+            print "%s: indexed %d in %.1f seconds" % (model.__name__, count, time.time() - start)
@@ -0,0 +1,41 @@
+"""
+Refresh the copy of the SMART ontology that /ontology serves.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from optparse import make_option
+from indivo.lib import smart_ontology
+
+class Command(BaseCommand):
+    args = ''
+    help = '''\
+Replace the SMART ontology file that /ontology serves (settings.SMART_ONTOLOGY_PATH) with the current
+version, from settings.SMART_ONTOLOGY_URL. The file is under version control: commit the new version to
+ship it. Running servers pick up the new file by themselves.
+'''
+
+    option_list = BaseCommand.option_list + (
+        make_option('--url',
+                    action='store',
+                    dest='url',
+                    default=None,
+                    help='Fetch the ontology from this URL (or file:// path), rather than settings.SMART_ONTOLOGY_URL'),
+        make_option('--timeout',
+                    action='store',
+                    type='int',
+                    dest='timeout',
+                    default=30,
+                    help='Seconds to wait for the ontology to download'),
+        )
+
+    def handle(self, *args, **options):
+        source = options['url'] or smart_ontology.url()
+        try:
+            changed, etag = smart_ontology.refresh(source, options['timeout'])
+        except (IOError, ValueError), e:
+            raise CommandError('Could not refresh the SMART ontology from %s: %s' % (source, e))
+
+        if changed:
+            print "Updated %s from %s (ETag %s)." % (smart_ontology.path(), source, etag)
+        else:
+            print "%s is already current (ETag %s)." % (smart_ontology.path(), etag)
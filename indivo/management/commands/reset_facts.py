@@ -4,7 +4,7 @@ Drop and Re-parse facts from indivo documents. Should be wrapped around a migrat
 
 from django.core.management.base import BaseCommand, CommandError
 from indivo.document_processing.document_processing import DocumentProcessing
-from indivo.models import Document, Fact
+from indivo.models import Document, Fact, RecordVersion
 
 class Command(BaseCommand):
     args = 'drop | process'
@@ -18,6 +18,9 @@ removes all objects, and "process" re-processes existing documents to create new
         if args[0] == 'drop':
             print "Deleting all existing Fact Objects..."
             Fact.objects.all().delete()
+
+            # Reports are made of facts: their ETags must change with them
+            RecordVersion.touch_all()
             print "Done."
         elif args[0] == 'process':
             print "Re-processing all Documents..."
@@ -0,0 +1,123 @@
+"""
+Time how long a fresh Indivo process takes to start, stage by stage.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import simplejson
+from optparse import make_option
+
+import os
+import subprocess
+import sys
+
+# What a worker does before it can serve its first request, in order
+STAGES = (
+    ('settings', 'from django.conf import settings; settings.INSTALLED_APPS'),
+    ('models and data models', 'import indivo.models'),
+    ('schemas', 'import indivo.document_processing'),
+    ('access rules', 'import indivo.accesscontrol'),
+    ('urls and views', 'from django.core.urlresolvers import get_resolver; get_resolver(None).url_patterns'),
+    ('middleware', 'from django.core.handlers.wsgi import WSGIHandler; WSGIHandler().load_middleware()'),
+    )
+
+# Starts the line of results in the child's output
+MARKER = 'startup_profile: '
+
+# Run in a fresh interpreter, so that nothing is imported already
+CHILD = '''
+import sys, time
+from django.utils import simplejson
+
+profiler = None
+if %(profile)r:
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
+
+timings = []
+for name, statement in %(stages)r:
+    start = time.time()
+    exec statement
+    timings.append((name, time.time() - start))
+
+if profiler:
+    profiler.disable()
+
+from indivo.document_processing import REGISTERED_SCHEMAS, LazyCompiled
+compiled = 0
+for validation_func, transform in REGISTERED_SCHEMAS.values():
+    for func in (validation_func, getattr(transform, 'to_sdmx', None)):
+        if isinstance(func, LazyCompiled) and func.compilations:
+            compiled += 1
+
+print %(marker)r + simplejson.dumps({'timings': timings, 'rdflib': 'rdflib' in sys.modules,
+                                     'modules': len(sys.modules), 'schemas': len(REGISTERED_SCHEMAS),
+                                     'compiled': compiled})
+
+if profiler:
+    import pstats
+    pstats.Stats(profiler, stream=sys.stdout).sort_stats('cumulative').print_stats(%(profile)r)
+'''
+
+class Command(BaseCommand):
+    args = ''
+    help = '''\
+Start Indivo from scratch in a new Python process (loading settings, models and data models, schemas,
+access rules, urls and views, and middleware, as a worker does before its first request), and report
+how long each stage took. With --profile, also list the slowest functions. Runs --runs times, and
+reports the fastest time for each stage.
+'''
+
+    option_list = BaseCommand.option_list + (
+        make_option('-r', '--runs',
+                    action='store',
+                    type='int',
+                    dest='runs',
+                    default=3,
+                    help='Number of fresh processes to start'),
+        make_option('--profile',
+                    action='store',
+                    type='int',
+                    dest='profile',
+                    default=0,
+                    help='Show the slowest N functions (by cumulative time) of the last run'),
+        )
+
+    def handle(self, *args, **options):
+        if options['runs'] < 1 or options['profile'] < 0:
+            raise CommandError('--runs must be positive, and --profile not negative')
+
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join(sys.path)
+        env.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+
+        runs = []
+        profile_output = ''
+        for i in range(options['runs']):
+            profile = options['profile'] if i == options['runs'] - 1 else 0
+            script = CHILD % {'stages': STAGES, 'profile': profile, 'marker': MARKER}
+            child = subprocess.Popen([sys.executable, '-c', script], stdout=subprocess.PIPE, env=env)
+            output = child.communicate()[0]
+            if child.returncode != 0:
+                raise CommandError('Startup failed (exit status %s)' % child.returncode)
+            after = output.partition(MARKER)[2]
+            result_line, _, profile_output = after.partition('\n')
+            runs.append(simplejson.loads(result_line))
+
+        print "%-25s %10s" % ('stage', 'seconds')
+        total = 0.0
+        for i, (name, statement) in enumerate(STAGES):
+            best = min(run['timings'][i][1] for run in runs)
+            total += best
+            print "%-25s %10.3f" % (name, best)
+        print "%-25s %10.3f" % ('total', total)
+
+        last = runs[-1]
+        print
+        print "Modules imported: %s" % last['modules']
+        print "rdflib imported: %s" % ('yes' if last['rdflib'] else 'no')
+        print "Schemas registered: %s (XSDs and XSLTs compiled at startup: %s)" % (last['schemas'], last['compiled'])
+
+        if options['profile']:
+            print
+            print profile_output
@@ -5,12 +5,14 @@ inspired by django.contrib.auth middleware, but doing it differently
 for tighter integration into email-centric users in Indivo.
 """
 
-import sys, logging
+import sys, logging, time
 from indivo.accesscontrol import security
+from indivo.lib import metrics
 from indivo.models import Audit, Principal, Record, Document
 from time import strftime
 from django.http import *
 from django.conf import settings
+from django.core.urlresolvers import resolve
 
 # AUDIT DATA CATEGORIES:
 BASIC = 'basic' # REQUIRED, if audit_level > 'NONE': basic info about request
@@ -52,6 +54,11 @@ class AuditWrapper(object):
     resources = {}
     request_info = {}
 
+    # Needed for the metrics, whether or not we audit
+    if hasattr(view_func, 'resolve'):
+      view_func = view_func.resolve(request)
+    request.view_name = view_func.func_name if view_func else ''
+
     # Don't audit unless required to
     if not self.must_audit(request):
       self.audit_obj = None
@@ -59,10 +66,7 @@ class AuditWrapper(object):
 
     # Basic Info
     basic['datetime'] = strftime("%Y-%m-%d %H:%M:%S")
-
-    if hasattr(view_func, 'resolve'):
-      view_func = view_func.resolve(request)
-    basic['view_func'] = view_func.func_name if view_func else ''
+    basic['view_func'] = request.view_name
 
     # Principal Info
     if request.principal:
@@ -130,6 +134,7 @@ class AuditWrapper(object):
     return None
 
   def process_response(self, request, response):
+    self.record_metrics(request, response)
 
     # Don't audit unless required to
     if not self.must_audit(request):
@@ -172,6 +177,27 @@ class AuditWrapper(object):
 
     return response
 
+  def record_metrics(self, request, response):
+    start_time = getattr(request, 'start_time', None)
+    if start_time is None:
+      # Another middleware answered before we got to the request
+      return
+    metrics.record_request(self.view_name(request), getattr(response, 'status_code', 500),
+                           time.time() - start_time)
+
+  def view_name(self, request):
+    view_name = getattr(request, 'view_name', None)
+    if view_name is None:
+      # An earlier middleware answered before we saw the view (i.e., a 403 or 404): look it up
+      try:
+        view_func = resolve(request.path_info)[0]
+        if hasattr(view_func, 'resolve'):
+          view_func = view_func.resolve(request)
+        view_name = getattr(view_func, 'func_name', None)
+      except Http404:
+        pass
+    return view_name or 'unknown'
+
   def save_response(self, data):
     if not self.audit_obj and data:
       # We got an exception before hitting auditwrapper on the way in: make sure to add basic info
@@ -8,9 +8,14 @@ for tighter integration into email-centric users in Indivo.
 from indivo.accesscontrol import security
 from indivo.lib.utils import DjangoVersionDependentExecutor
 
+import time
+
 class Authentication(object):
   def process_request(self, request):
 
+    # We're the first Indivo middleware: start the clock for the request metrics
+    request.start_time = time.time()
+
     # django 1.3.0 fails to create a QueryDict for request.POST if we access
     # request.raw_post_data first, but django 1.3.1 raises an exception if
     # we read request.POST and subsequently read request.raw_post_data.
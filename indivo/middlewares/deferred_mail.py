@@ -0,0 +1,24 @@
+"""
+Middleware (filters) for Indivo
+
+Holds the emails a request asks indivo.lib.deferred_mail to send until the
+request is over, so that they're only sent once its changes are committed,
+and never for a request that fails.
+"""
+
+from indivo.lib import deferred_mail
+
+class DeferredMail(object):
+
+  def process_request(self, request):
+    deferred_mail.hold()
+    return None
+
+  def process_exception(self, request, exception):
+    # The view's transaction is rolled back: so are its emails
+    deferred_mail.release(send=False)
+    return None
+
+  def process_response(self, request, response):
+    deferred_mail.release()
+    return response
@@ -0,0 +1,66 @@
+"""
+Middleware (filters) for Indivo
+
+Records the SQL queries, DB time, template rendering time and serialization
+time of each request, writing them to the 'indivo.instrumentation' log and,
+for admin apps, to the response headers.
+
+Only installed if settings.REQUEST_INSTRUMENTATION is on. Goes first in
+MIDDLEWARE_CLASSES, so that the queries of the other middleware (OAuth
+checks, loading the principal) are counted too.
+"""
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils import simplejson
+from indivo.lib import instrumentation, metrics
+
+import logging
+
+logger = logging.getLogger('indivo.instrumentation')
+
+class Instrumentation(object):
+
+  def __init__(self):
+    if not getattr(settings, 'REQUEST_INSTRUMENTATION', False):
+      raise MiddlewareNotUsed()
+
+  def process_request(self, request):
+    request.timings = instrumentation.start_request()
+    return None
+
+  def process_view(self, request, view_func, view_args, view_kwargs):
+    timings = getattr(request, 'timings', None)
+    if timings:
+      if hasattr(view_func, 'resolve'):
+        view_func = view_func.resolve(request)
+      timings.view_name = view_func.func_name if view_func else ''
+    return None
+
+  def process_response(self, request, response):
+    timings = getattr(request, 'timings', None)
+    if not timings:
+      return response
+    instrumentation.finish_request()
+
+    data = timings.as_dict()
+    data.update({'method': request.META.get('REQUEST_METHOD'), 'path': request.META.get('PATH_INFO'),
+                 'status': getattr(response, 'status_code', None)})
+    logger.info(simplejson.dumps(data, sort_keys=True))
+    metrics.DB_QUERIES.inc(timings.view_name or 'unknown', amount=data['queries'])
+
+    # Only admin apps get to see how we're doing
+    principal = getattr(request, 'principal', None)
+    if principal and principal.isType('admin'):
+      response['Server-Timing'] = ', '.join([
+          'db;dur=%s;desc="%s queries"' % (data['db_ms'], data['queries']),
+          '%s;dur=%s' % (instrumentation.TEMPLATE, data['template_ms']),
+          '%s;dur=%s' % (instrumentation.SERIALIZE, data['serialize_ms']),
+          'total;dur=%s' % data['total_ms'],
+          ])
+      response['X-Indivo-Queries'] = str(data['queries'])
+      response['X-Indivo-DB-Time'] = str(data['db_ms'])
+      response['X-Indivo-Template-Time'] = str(data['template_ms'])
+      response['X-Indivo-Serialize-Time'] = str(data['serialize_ms'])
+      response['X-Indivo-Total-Time'] = str(data['total_ms'])
+    return response
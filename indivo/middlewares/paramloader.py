@@ -10,6 +10,7 @@ This is helpful to view functions, accesscontrol, and auditing.
 
 from django.http import Http404
 from indivo import models
+from indivo.lib.identity_map import get_identity_map, record_stats
 
 ID    = 'id'
 EMAIL = 'email'
@@ -29,35 +30,51 @@ LOAD_PARAMS = {
   'reqtoken_id'     : ( models.ReqToken, TOKEN ),
 }
 
+# Relations that access rules and auditing will walk for each loaded model,
+# fetched along with the model itself
+LOAD_RELATED = {
+  models.Carenet  : ( 'record', 'record__owner' ),
+  models.Record   : ( 'owner', ),
+  models.ReqToken : ( 'pha', 'record', 'carenet', 'share' ),
+}
+
 class ParamLoader(object):
 
   def process_view(self, request, view_func, view_args, view_kwargs):
     """ substitute id-strings with models in view_kwargs:
     account_email becomes account, record_id becomes record, etc."""
 
+    # Share objects with those already loaded for this request (i.e., by authentication)
+    identity_map = get_identity_map(request)
+    if getattr(request, 'principal', None):
+      identity_map.add(request.principal)
+
     # Destructively modify view_kwargs for internal layers
     for param in LOAD_PARAMS.keys():
       if view_kwargs.has_key(param):
-        model_obj = self.get_object_from_param(param, view_kwargs[param])
+        model_obj = self.get_object_from_param(param, view_kwargs[param], identity_map)
         
         #delete the old arg, and add the new one
         new_param = param[:param.find(SEPARATOR)]
         del view_kwargs[param]
         view_kwargs[new_param] = model_obj
 
+    if hasattr(view_func, 'resolve'):
+      view_func = view_func.resolve(request)
+    if view_func:
+      record_stats(view_func.func_name, identity_map)
+
     return None
 
-  def get_object_from_param(self, param, param_val):
-    return object_lookup_by_id(param_val, *LOAD_PARAMS[param])
+  def get_object_from_param(self, param, param_val, identity_map=None):
+    return object_lookup_by_id(param_val, *LOAD_PARAMS[param], identity_map=identity_map)
 
-def object_lookup_by_id(object_id, django_model, id_field):
+def object_lookup_by_id(object_id, django_model, id_field, identity_map=None):
   if object_id is None:
     return None
-  query_kwargs = {id_field : object_id}
   try:
-    return django_model.objects.get(**query_kwargs)
+    if identity_map:
+      return identity_map.get(django_model, id_field, object_id, LOAD_RELATED.get(django_model, ()))
+    return django_model.objects.get(**{id_field : object_id})
   except django_model.DoesNotExist:
     raise Http404
-  
-
-
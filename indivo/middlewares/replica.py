@@ -0,0 +1,50 @@
+"""
+Middleware (filters) for Indivo
+
+Sends the reads of safe GET views to a read replica (see
+indivo.lib.db_routing), keeping a record's reads on the primary for a while
+after each write to it.
+
+Only installed if settings.DATABASE_REPLICAS names at least one database.
+Goes after Authorization in MIDDLEWARE_CLASSES, so that access control
+always reads from the primary: a revoked share stops granting access right
+away, rather than once the replica catches up.
+"""
+
+from django.core.exceptions import MiddlewareNotUsed
+from indivo.lib import db_routing
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+class ReplicaRouting(object):
+
+  def __init__(self):
+    if not db_routing.replicas():
+      raise MiddlewareNotUsed()
+
+  def process_request(self, request):
+    # Threads are reused: never start a request on a replica
+    db_routing.use_primary()
+    return None
+
+  def process_view(self, request, view_func, view_args, view_kwargs):
+    # view_kwargs have been loaded by ParamLoader (on the primary)
+    scope = db_routing.scope(view_kwargs)
+
+    if request.method not in SAFE_METHODS:
+      db_routing.pin(scope)
+      return None
+
+    # OAuth nonces and tokens must be checked against the primary
+    if request.path_info.startswith('/oauth'):
+      return None
+
+    if hasattr(view_func, 'resolve'):
+      view_func = view_func.resolve(request)
+    if view_func and db_routing.replica_view(view_func.func_name) and not db_routing.pinned(scope):
+      db_routing.use_replica()
+    return None
+
+  def process_response(self, request, response):
+    db_routing.use_primary()
+    return response
@@ -13,6 +13,8 @@ from document_relationships import *
 from shares import *
 from messaging import *
 from notifications import *
+from outbox import *
+from search import *
 from audit import *
 from fact import Fact
 
@@ -3,8 +3,11 @@ Accounts and authentication
 """
 
 from base import *
+from search import Searchable, unindex_on_delete
+from messaging import UnreadCounts
 from django.utils import simplejson
-from indivo.lib import utils
+from indivo.lib import utils, permission_cache, deferred_mail
+from indivo.lib.reference_data import ReferenceDataCache
 import indivo
 
 ##
@@ -19,7 +22,7 @@ if hasattr(settings, 'ACCOUNT_REENABLE_TIMEOUT'):
 else:
     ACCOUNT_REENABLE_TIMEOUT = None
 
-class Account(Principal):
+class Account(Searchable, Principal):
     Meta = BaseMeta()
     
     account = models.OneToOneField(Principal, primary_key = True, parent_link = True)
@@ -32,6 +35,8 @@ class Account(Principal):
     full_name = models.CharField(max_length = 150, null= False)
     contact_email = models.CharField(max_length = 300, null = False)
     
+    search_fields = ('full_name', 'contact_email')
+    
     # password
     # password_hash = models.CharField(max_length = 64)
     # password_salt = models.CharField(max_length = 64)
@@ -57,7 +62,10 @@ class Account(Principal):
     def save(self, *args, **kwargs):
         """ Enforce case-insensitive emails. """
         self.email = self.email.lower().strip()
+        adding = self._state.adding
         super(Account,self).save(*args, **kwargs)
+        if adding:
+            UnreadCounts.objects.get_or_create(account=self)
     
     # Accesscontrol:
     # roles that an Account could have
@@ -75,7 +83,8 @@ class Account(Principal):
         True if the Account has a full share of the record
         """
         try:
-            return indivo.models.AccountFullShare.objects.filter(record=record, with_account=self)
+            return permission_cache.check(self, ('fullshare', record.id),
+                lambda: indivo.models.AccountFullShare.objects.filter(record=record, with_account=self).exists())
         except:
             return False
     
@@ -85,7 +94,8 @@ class Account(Principal):
         Accounts may be in multiple carenets for multiple records
         """
         try:
-            return indivo.models.CarenetAccount.objects.filter(carenet=carenet, account=self)
+            return permission_cache.check(self, ('carenet', carenet.id),
+                lambda: indivo.models.CarenetAccount.objects.filter(carenet=carenet, account=self).exists())
         except:
             return False
     
@@ -150,6 +160,13 @@ class Account(Principal):
                         ["%s <%s>" % (self.full_name or self.contact_email, self.contact_email)])
     
     def notify_account_of_new_message(self):
+        email = self.new_message_email()
+        if email:
+            # after the request: there may be many of these to send
+            deferred_mail.send_mail(*email)
+
+    def new_message_email(self):
+        """ The email alerting us to a new message, as (subject, body, sender, recipient_list), or None. """
         # only notify accounts that have a state of active or disabled
         if self.state == ACTIVE or self.state == DISABLED:
             subject = utils.render_template_raw('email/new_message/subject', {'account': self}, type='txt').strip()
@@ -160,9 +177,10 @@ class Account(Principal):
                                       'email_support_name': settings.EMAIL_SUPPORT_NAME,
                                    'email_support_address': settings.EMAIL_SUPPORT_ADDRESS }, 
                                             type='txt')
-            utils.send_mail(subject, body, 
-                            "%s <%s>" % (settings.EMAIL_SUPPORT_NAME, settings.EMAIL_SUPPORT_ADDRESS), 
-                            ["%s <%s>" % (self.full_name or self.contact_email, self.contact_email)])
+            return (subject, body,
+                    "%s <%s>" % (settings.EMAIL_SUPPORT_NAME, settings.EMAIL_SUPPORT_ADDRESS), 
+                    ["%s <%s>" % (self.full_name or self.contact_email, self.contact_email)])
+        return None
     
     def send_welcome_email(self):
         subject = utils.render_template_raw('email/welcome/subject', {'account': self}, type='txt').strip()
@@ -307,17 +325,24 @@ class Account(Principal):
     
     password = property(password_get, password_set)
 
+unindex_on_delete(Account)
+
 class AuthSystem(Object):
     short_name = models.CharField(max_length=100, unique=True)
     
     # is this authentication system handled internally by Indivo X?
     # otherwise externally by the Chrome App
     internal_p = models.BooleanField(default=False)
+
+    # lookups by short_name, without hitting the DB
+    cached = ReferenceDataCache('short_name')
     
     @classmethod
     def PASSWORD(cls):
-        # FIXME: memoize this
-        return cls.objects.get_or_create(short_name='password', internal_p=True)[0]
+        try:
+            return cls.cached.get('password')
+        except cls.DoesNotExist:
+            return cls.objects.get_or_create(short_name='password', internal_p=True)[0]
 
 class AccountAuthSystem(Object):
     account         = models.ForeignKey(Account, related_name = 'auth_systems')
@@ -3,6 +3,7 @@ Indivo Models for Applications that extend Indivo
 """
 
 from django.db import models
+from django.db.models import signals
 from django.conf import settings
 
 from records_and_documents import Record, DocumentSchema
@@ -11,6 +12,7 @@ from base import Object, Principal, BaseModel, BaseMeta
 import urllib, datetime
 import indivo
 from indivo.lib.utils import render_template_raw
+from indivo.lib import permission_cache, manifest_cache
 
 try:
     from django.utils import simplejson
@@ -230,7 +232,8 @@ class PHA(OAuthApp):
     True if the PHA is in the specified carenet
     """
     try:
-      return indivo.models.CarenetPHA.objects.filter(carenet=carenet, pha=self)
+      return permission_cache.check(self, ('carenet', carenet.id),
+        lambda: indivo.models.CarenetPHA.objects.filter(carenet=carenet, pha=self).exists())
     except:
       return False
 
@@ -238,13 +241,20 @@ class PHA(OAuthApp):
     """
     True if the PHA is enabled on the record
     """
-    return self.pha_shares_to.filter(record=record).exists()
+    return permission_cache.check(self, ('record', record.id),
+      lambda: self.pha_shares_to.filter(record=record).exists())
 
 ##
 ## App Tokens are implemented separately, since they require access to record and docs
 ## (yes, this is confusing, but otherwise it's circular import hell)
 ##
 
+# Drop the serialized manifests whenever an app changes (as with sync_apps)
+signals.post_save.connect(manifest_cache.invalidate, sender=PHA, weak=False,
+                          dispatch_uid='indivo.models.apps.PHA.manifest_cache')
+signals.post_delete.connect(manifest_cache.invalidate, sender=PHA, weak=False,
+                            dispatch_uid='indivo.models.apps.PHA.manifest_cache')
+
 ##
 ## Applications which communicate directly with Indivo, not user-mediated
 ## There are two types:
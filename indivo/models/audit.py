@@ -6,6 +6,7 @@ from django.db import models
 from django.conf import settings
 
 from base import BaseModel
+from indivo.lib.partitioning import MonthlyPartitions
 from indivo.models import Principal, Record, Document
 
 # SZ: Do not put any foreign key constraints on this table. :)
@@ -38,6 +39,16 @@ class Audit(BaseModel):
   resp_code = models.IntegerField(null=True)
   resp_headers = models.TextField(null=True)
   
+  # On PostgreSQL, rows live in one child table per month (see migration 0037)
+  partitions = MonthlyPartitions('indivo_audit', 'datetime')
 
   def __unicode__(self):
     return 'Audit %s' % self.id
+
+  def save(self, *args, **kwargs):
+    """ Take new rows' ids from the sequence first: inserts routed into a partition return none. """
+    if self.id is None:
+      self.id = self.partitions.next_id()
+      if self.id is not None:
+        kwargs['force_insert'] = True
+    super(Audit, self).save(*args, **kwargs)
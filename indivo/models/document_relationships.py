@@ -6,7 +6,7 @@ from django.db import models
 from django.conf import settings
 
 from base import BaseModel
-from indivo.models import Document, DocumentSchema
+from indivo.models import Document, DocumentSchema, RecordVersion
 
 class DocumentRels(BaseModel):
   document_0 = models.ForeignKey(Document, related_name='rels_as_doc_0')
@@ -16,3 +16,4 @@ class DocumentRels(BaseModel):
   def __unicode__(self):
     return 'DocumentRel %s' % self.id
 
+RecordVersion.touch_on_change(DocumentRels, lambda rel: rel.document_0.record_id)
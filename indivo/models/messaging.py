@@ -3,9 +3,10 @@ Indivo Model for Messaging
 """
 
 from django.db import models
+from django.db.models import F
 from django.conf import settings
 
-from base import Object, Principal, INDIVO_APP_LABEL
+from base import Object, Principal, BaseModel, INDIVO_APP_LABEL
 
 class Message(Object):
     account = models.ForeignKey('Account')
@@ -128,3 +129,37 @@ class MessageAttachment(Object):
                                                   mime_type = 'application/xml')
         self.save()
                                                   
+
+
+class UnreadCounts(BaseModel):
+    """ How many of an account's messages are unread, and how many notifications it has had since it last listed them.
+
+    Kept up to date as messages and notifications arrive and are read, rather
+    than counted for every request. Only ever changed by relative updates
+    (see :py:meth:`add`), so that concurrent requests can't overwrite each
+    other's changes.
+
+    """
+
+    account = models.OneToOneField('Account', primary_key = True, related_name = 'unread_counts')
+    messages = models.IntegerField(default = 0)
+    notifications = models.IntegerField(default = 0)
+
+    @classmethod
+    def add(cls, account_ids, messages=0, notifications=0):
+        """ Add *messages* and *notifications* (which may be negative) to the counts of the accounts with *account_ids*, in one query. """
+        counts = {}
+        if messages:
+            counts['messages'] = F('messages') + messages
+        if notifications:
+            counts['notifications'] = F('notifications') + notifications
+        if counts and account_ids:
+            cls.objects.filter(account__in=account_ids).update(**counts)
+
+    @classmethod
+    def for_account(cls, account):
+        """ *account*'s counts (zeros for accounts created without any). """
+        try:
+            return cls.objects.get(account=account)
+        except cls.DoesNotExist:
+            return cls(account=account)
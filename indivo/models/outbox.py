@@ -0,0 +1,37 @@
+"""
+Indivo Model for outgoing email
+"""
+
+from django.db import models
+
+from base import Object
+
+class OutboxEmail(Object):
+  """ An email waiting to be sent by the deliver_email command (or already sent, or given up on). """
+
+  QUEUED, SENT, FAILED = 'queued', 'sent', 'failed'
+  STATUSES = (
+    (QUEUED, 'Queued'),
+    (SENT, 'Sent'),
+    (FAILED, 'Failed'))
+
+  sender = models.CharField(max_length = 300)
+
+  # one address per line
+  recipients = models.TextField()
+
+  subject = models.CharField(max_length = 500)
+  body = models.TextField()
+
+  status = models.CharField(max_length = 20, choices = STATUSES, default = QUEUED)
+  attempts = models.IntegerField(default = 0)
+
+  # when it should next be tried: while a worker is sending it, when the worker's claim on it runs out
+  next_attempt_at = models.DateTimeField(db_index = True)
+
+  sent_at = models.DateTimeField(null = True)
+  last_error = models.TextField(null = True)
+
+  @property
+  def recipient_list(self):
+    return self.recipients.splitlines()
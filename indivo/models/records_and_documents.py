@@ -3,22 +3,27 @@ Indivo Model for records and documents
 """
 from django.db import models, transaction
 from django.conf import settings
-from django.core.exceptions import PermissionDenied
+from django.core.exceptions import PermissionDenied, ObjectDoesNotExist
 from django.core.files.base import ContentFile
-from django.db.models import Count
+from django.db.models import Count, Q, F, signals
 
-import urllib, hashlib, uuid
+import urllib, hashlib, uuid, datetime
 
 from base import Object, Principal, BaseModel, INDIVO_APP_LABEL
+from search import Searchable, unindex_on_delete
+from indivo.lib.reference_data import ReferenceDataCache
+from indivo.lib.metrics import FACTS_INGESTED
+from indivo.lib.utils import bulk_insert
+from indivo.lib import deferred_mail, conditional
 from accounts import Account
-from shares import AccountFullShare, PHAShare, Carenet
-from messaging import Message
+from shares import AccountFullShare, PHAShare, Carenet, CarenetDocument, CarenetAutoshare
+from messaging import Message, UnreadCounts
 from notifications import Notification
 from status import StatusName, DocumentStatusHistory
 from oauth import oauth
 
 ## Indivo Records and Documents
-class Record(Object):
+class Record(Searchable, Object):
   # owner (could be the hospital if the person does not own their own record)
   owner = models.ForeignKey('Principal', related_name = 'records_owned_by', null=True)
 
@@ -30,6 +35,8 @@ class Record(Object):
   external_id = models.CharField(max_length = 250, null = True, unique=True)
   demographics = models.OneToOneField('Demographics', null = True)
 
+  search_fields = ('label',)
+
   @classmethod
   def prepare_external_id(cls, local_external_id, principal_email):
     """
@@ -43,6 +50,12 @@ class Record(Object):
   def __unicode__(self):
     return 'Record %s' % self.id
 
+  def save(self, *args, **kwargs):
+    adding = self._state.adding
+    super(Record, self).save(*args, **kwargs)
+    if adding:
+      RecordVersion.objects.get_or_create(record=self)
+
   def can_admin(self, account):
     return (self.owner == account) or AccountFullShare.objects.filter(record = self, with_account = account)
 
@@ -66,14 +79,11 @@ class Record(Object):
     Includes a default for the owner of the record
     """
 
-    accounts = list(set([r.account for r in self.notification_routes.all()]))
-    if self.owner and (self.owner not in accounts):
-      try:
-        owner_account = Account.objects.get(email = self.owner.email)
-        accounts.append(owner_account)
-      except Account.DoesNotExist:
-        pass
-    return accounts
+    # One query for the routed accounts and the owner (if the owner is an account)
+    routed = Q(recordnotificationroute__record=self)
+    if self.owner_id:
+      routed |= Q(pk=self.owner_id)
+    return list(Account.objects.filter(routed).distinct())
 
   def get_messages(self):
     return Message.objects.filter(about_record = self)
@@ -82,20 +92,25 @@ class Record(Object):
     # FIXME: does the PHA have the right to notify the account?
     # FIXME: is the routing really the same for notifications and messages
     # go through all of the accounts that need to be notified
-    for account in self.get_accounts_to_notify():
-      # FIXME: does the account have the right to see notifications on this record?
-
-      account.notify_account_of_new_message()
-      Message.objects.create( account             = account, 
-                              about_record        = self, 
-                              external_identifier = external_identifier,
-                              sender              = sender, 
-                              recipient           = account, 
-                              subject             = subject,
-                              body                = body,
-                              body_type           = body_type,
-                              num_attachments     = num_attachments,
-                              severity            = severity)
+    accounts = self.get_accounts_to_notify()
+
+    # FIXME: does the account have the right to see notifications on this record?
+    bulk_insert(Message, [Message(id                  = str(uuid.uuid4()),
+                                  account             = account, 
+                                  about_record        = self, 
+                                  external_identifier = external_identifier,
+                                  sender              = sender, 
+                                  recipient           = account, 
+                                  subject             = subject,
+                                  body                = body,
+                                  body_type           = body_type,
+                                  num_attachments     = num_attachments,
+                                  severity            = severity)
+                          for account in accounts])
+    UnreadCounts.add([account.pk for account in accounts], messages=1)
+
+    # Only once the messages are in (emails are sent after the request)
+    deferred_mail.send_mass_mail(filter(None, [account.new_message_email() for account in accounts]))
 
   def notify(self, pha, content, document_id=None, app_url=None):
     # make sure that the document belongs to the record
@@ -106,14 +121,17 @@ class Record(Object):
         raise PermissionDenied()
 
     # go through all of the accounts that need to be notified
-    for account in self.get_accounts_to_notify():
-      Notification.objects.create(record    = self, 
-                                  sender    = pha, 
-                                  account   = account, 
-                                  content   = content, 
-                                  creator   = pha, 
-                                  document  = document, 
-                                  app_url   = app_url)
+    accounts = self.get_accounts_to_notify()
+    bulk_insert(Notification, [Notification(id        = str(uuid.uuid4()),
+                                            record    = self, 
+                                            sender    = pha, 
+                                            account   = account, 
+                                            content   = content, 
+                                            creator   = pha, 
+                                            document  = document, 
+                                            app_url   = app_url)
+                               for account in accounts])
+    UnreadCounts.add([account.pk for account in accounts], notifications=1)
 
   @transaction.commit_on_success
   def create_default_carenets(self):
@@ -128,10 +146,69 @@ class Record(Object):
     """
     return self.id
 
+unindex_on_delete(Record)
+
+class RecordVersion(BaseModel):
+  """ A record's change version, bumped whenever its documents, their relationships, or its carenet shares change.
+
+  Document lists, document metadata and reports take their ETags from it, so
+  that a conditional GET can be answered without running their queries. Only
+  ever changed by relative updates (see :py:meth:`touch`), like
+  :py:class:`~indivo.models.UnreadCounts`, so that concurrent writes can't
+  undo each other's bumps.
+
+  """
+
+  record = models.OneToOneField('Record', primary_key = True, related_name = 'change_version')
+  version = models.IntegerField(default = 0)
+  changed_at = models.DateTimeField(default = datetime.datetime.now)
+
+  @classmethod
+  def touch(cls, record_ids):
+    """ Bump the versions of the records with *record_ids*, in one query. """
+    if record_ids:
+      cls.objects.filter(record__in=record_ids).update(version=F('version') + 1, changed_at=datetime.datetime.now())
+
+  @classmethod
+  def touch_all(cls):
+    """ Bump every record's version, for changes made without signals (like dropping all the facts). """
+    cls.objects.update(version=F('version') + 1, changed_at=datetime.datetime.now())
+
+  @classmethod
+  def current(cls, record_id):
+    """ The version of the record with *record_id*, or None for records created without one. """
+    try:
+      return cls.objects.get(record=record_id)
+    except cls.DoesNotExist:
+      return None
+
+  @classmethod
+  def touch_on_change(cls, model, record_id):
+    """ Bump the version of the record that *record_id(instance)* names whenever an instance of *model* is saved or deleted. """
+    def _touch(sender, instance, **kwargs):
+      try:
+        touched = record_id(instance)
+      except ObjectDoesNotExist:
+        # deleted along with its record
+        return
+      if touched:
+        cls.touch([touched])
+
+    uid = 'record_version_%s' % model.__name__
+    signals.post_save.connect(_touch, sender=model, weak=False, dispatch_uid=uid)
+    signals.post_delete.connect(_touch, sender=model, weak=False, dispatch_uid=uid)
+
+  def etag(self, *parts):
+    """ An ETag for the representation of the record's data identified by *parts*, at this version. """
+    return conditional.etag(self.record_id, self.version, *parts)
+
 class DocumentSchema(Object):
   type = models.CharField(max_length = 500)
   stylesheet = models.ForeignKey('Document', null=True, related_name='stylesheet')
   internal_p = models.BooleanField(default=True)
+
+  # lookups by type, without hitting the DB
+  cached = ReferenceDataCache('type')
   
   DEFAULT_REL_NAMESPACE = 'http://indivo.org/vocab/documentrels#'
 
@@ -230,12 +307,17 @@ class Document(Object):
   digest = models.CharField(max_length=64, null=False)
   status = models.ForeignKey('StatusName', null=False, default=1)
 
+  # Either may have been loaded for many documents at once (see indivo.lib.document_graph)
   @property
   def relates_to(self):
+    if hasattr(self, '_relates_to'):
+      return self._relates_to
     return self.rels_as_doc_0.values('relationship__type').annotate(count=Count('relationship'))
 
   @property
   def is_related_from(self):
+    if hasattr(self, '_is_related_from'):
+      return self._is_related_from
     return self.rels_as_doc_1.values('relationship__type').annotate(count=Count('relationship'))
 
   #related_docs = models.ManyToManyField('self', through='DocumentRels', symmetrical=False)
@@ -258,7 +340,7 @@ class Document(Object):
       proxied_by_email = None
 
     if status and reason:
-      status_name = StatusName.objects.get(name=status)
+      status_name = StatusName.cached.get(status)
       self.status = status_name
       self.save()
 
@@ -387,6 +469,7 @@ class Document(Object):
           fobj.document = self
           fobj.record = self.record
           fobj.save()
+          FACTS_INGESTED.inc(fobj.__class__.__name__)
 
       # Mark document as processed
       self.processed = True
@@ -404,3 +487,8 @@ class Document(Object):
 
     if save_again:
       self.save()
+
+# Documents and their carenet shares are what lists and reports are made of
+RecordVersion.touch_on_change(Document, lambda document: document.record_id)
+RecordVersion.touch_on_change(CarenetDocument, lambda share: share.carenet.record_id)
+RecordVersion.touch_on_change(CarenetAutoshare, lambda autoshare: autoshare.record_id)
@@ -0,0 +1,59 @@
+"""
+Indivo Model for the account and record search index
+"""
+
+from django.db import models
+from django.db.models import signals
+
+from base import BaseModel
+
+class SearchTrigram(BaseModel):
+  """ One of the three-character substrings of a searchable field of an account or record.
+
+  Maintained by :py:mod:`indivo.lib.search`.
+
+  """
+
+  # which field of which model, i.e. 'account.full_name' (with a suffix for the starts of fields and words)
+  field = models.CharField(max_length = 40)
+  object_id = models.CharField(max_length = 50, db_index = True)
+
+  # lowercased
+  trigram = models.CharField(max_length = 3)
+
+class Searchable(object):
+  """ Mixin for models searched with :py:mod:`indivo.lib.search`, which keeps their index up to date.
+
+  Subclasses list their searchable fields in *search_fields*.
+
+  """
+
+  search_fields = ()
+
+  def __init__(self, *args, **kwargs):
+    super(Searchable, self).__init__(*args, **kwargs)
+    self._indexed_values = self._loaded_search_values()
+
+  def search_values(self):
+    return tuple(getattr(self, field) for field in self.search_fields)
+
+  def _loaded_search_values(self):
+    # without loading deferred fields
+    return tuple(self.__dict__.get(field) for field in self.search_fields)
+
+  def save(self, *args, **kwargs):
+    changed = self._state.adding or self._loaded_search_values() != self._indexed_values
+    super(Searchable, self).save(*args, **kwargs)
+    if changed:
+      # imported here, since it imports the models
+      from indivo.lib import search
+      search.index(self)
+      self._indexed_values = self._loaded_search_values()
+
+def unindex_on_delete(model):
+  """ Remove instances of *model*, a :py:class:`Searchable`, from the search index when they're deleted. """
+  def _unindex(sender, instance, **kwargs):
+    from indivo.lib import search
+    search.unindex(instance)
+
+  signals.post_delete.connect(_unindex, sender=model, weak=False, dispatch_uid='search_unindex_%s' % model.__name__)
@@ -8,6 +8,7 @@ from django.db import models
 from django.conf import settings
 
 from base import Object, Principal, INDIVO_APP_LABEL
+from indivo.lib import permission_cache
 
 class Carenet(Object):
   name = models.CharField(max_length=40)
@@ -346,5 +347,8 @@ class ReqToken(Principal, Token):
     # it's primed, and not authorized by a particular user
     return self.authorized_at != None
 
-
-
+# Keep cached permissions in sync as shares come and go
+permission_cache.invalidate_on_change(AccountFullShare, 'with_account')
+permission_cache.invalidate_on_change(CarenetAccount, 'account')
+permission_cache.invalidate_on_change(PHAShare, 'with_pha')
+permission_cache.invalidate_on_change(CarenetPHA, 'pha')
@@ -6,10 +6,14 @@ from django.db import models
 from django.conf import settings
 
 from base import BaseModel, Object
+from indivo.lib.reference_data import ReferenceDataCache
 
 class StatusName(BaseModel):
   name = models.CharField(max_length=24)
 
+  # lookups by name, without hitting the DB
+  cached = ReferenceDataCache('name')
+
   def __unicode__(self):
     return 'StatusName %s' % self.id
 
@@ -1,5 +1,7 @@
 import django.test
 from django.conf import settings
+from django.core.signals import request_started
+from django.db import reset_queries
 from django.test.testcases import disable_transaction_methods, restore_transaction_methods
 from django.db.models.loading import cache
 
@@ -8,7 +10,8 @@ from south.db import db
 from indivo.data_models import attach_filter_fields, IndivoDataModelLoader
 from indivo.models import *
 from indivo.tests.data import *
-from indivo.lib import iso8601
+from indivo.lib import iso8601, permission_cache, reference_data
+from indivo.lib.instrumentation import QueryCounter
 from indivo.lib.simpledatamodel import SDML
 
 import functools
@@ -157,6 +160,31 @@ class IndivoTests(object):
                     raise self.failureException('Exception Raised: %s'%e.__class__.__name__)
         return
 
+    def assertQueryBudget(self, budget, url, method='get', client=None, **kwargs):
+        """ Test that a request for *url* runs no more than *budget* SQL queries.
+
+        The request is made with *client* (or ``self.client``), by calling its
+        *method* with *kwargs*. Returns the response, so that callers can
+        check that as well.
+
+        """
+        client = client or self.client
+
+        # Each request would otherwise clear the query log as it starts
+        request_started.disconnect(reset_queries)
+        counter = QueryCounter().start()
+        try:
+            response = getattr(client, method)(url, **kwargs)
+        finally:
+            counter.stop()
+            request_started.connect(reset_queries)
+
+        if counter.count > budget:
+            queries = '\n'.join(['  %s' % q['sql'] for q in counter.queries])
+            raise self.failureException('%s %s ran %s queries, over its budget of %s:\n%s' % (
+                    method.upper(), url, counter.count, budget, queries))
+        return response
+
     def validateIso8601(self, datestring, accept_null = True):
         if not datestring and accept_null:
             return
@@ -304,6 +332,9 @@ class IndivoTests(object):
         self.restore_setting('CONTRIB_DATAMODEL_DIRS')
 
     def setUp(self):
+        # Rolled-back test data never fires delete signals, so don't trust anything cached
+        permission_cache.clear()
+        reference_data.clear_all()
         self.test_data_context = TestDataContext()
         self.disableAccessControl()
         self.loadModelDependencies()
@@ -17,3 +17,78 @@ from document_processing import DocumentProcessingUnitTests
 
 # tests of validators
 from validators import ValidatorUnitTests
+
+# tests of table partitioning and audit archival
+from partitioning import PartitioningUnitTests
+
+# tests of the request-scoped identity map
+from identity_map import IdentityMapUnitTests
+
+# tests of the permission cache
+from permission_cache import PermissionCacheUnitTests
+
+# tests of the reference data caches
+from reference_data import ReferenceDataUnitTests
+
+# tests of the compiled XML templates
+from compiled_templates import CompiledTemplatesUnitTests
+
+# tests of the benchmarking utilities
+from benchmark import BenchmarkUnitTests
+
+# tests of the synthetic data generator
+from synthetic_data import SyntheticDataUnitTests
+
+# tests of the request instrumentation
+from instrumentation import InstrumentationUnitTests
+
+# tests of the metrics registry
+from metrics import MetricsUnitTests
+
+# tests of the record export
+from record_export import RecordExportUnitTests
+
+# tests of the CCR writer
+from ccr import CCRUnitTests
+
+# tests of the population queries
+from population import PopulationUnitTests
+
+# tests of the read replica routing
+from db_routing import DBRoutingUnitTests
+
+# tests of the persistent database connections
+from db_connections import DBConnectionsUnitTests
+
+# tests of the registry manifest, and lazily compiled schemas
+from registry_manifest import RegistryManifestUnitTests
+
+# stress tests of document processing from many threads
+from concurrent_ingest import ConcurrentIngestUnitTests
+
+# tests of processing large documents in worker processes
+from offload import OffloadUnitTests
+
+# tests of following chains of document relationships
+from document_graph import DocumentGraphUnitTests
+
+# tests of sending emails after the request
+from deferred_mail import DeferredMailUnitTests
+
+# tests of the email outbox
+from outbox import OutboxUnitTests
+
+# tests of account and record search
+from search import SearchUnitTests
+
+# tests of the account summary, and unread counts
+from account_summary import AccountSummaryUnitTests
+
+# tests of the serialized app manifests
+from manifest_cache import ManifestCacheUnitTests
+
+# tests of conditional GETs
+from conditional_get import ConditionalGetUnitTests
+
+# tests of the SMART ontology
+from smart_ontology import SmartOntologyUnitTests
@@ -0,0 +1,89 @@
+from indivo.tests.internal_tests import InternalTests
+from indivo.tests.data.account import TEST_ACCOUNTS
+from indivo.tests.data.record import TEST_RECORDS
+from indivo.tests.data.app import TEST_USERAPPS
+from indivo.lib.instrumentation import QueryCounter
+from indivo.models import *
+from django.core.signals import request_started
+from django.db import reset_queries
+from django.utils import simplejson
+from django.conf import settings
+
+class AccountSummaryUnitTests(InternalTests):
+
+    def setUp(self):
+        super(AccountSummaryUnitTests, self).setUp()
+        self.account = self.createAccount(TEST_ACCOUNTS, 4)
+        self.other = self.createAccount(TEST_ACCOUNTS, 1)
+        self.app = self.createUserApp(TEST_USERAPPS, 0)
+        self.record = self.createRecord(TEST_RECORDS, 0, owner=self.account)
+        self.addAppToRecord(self.record, self.app)
+        self.url = '/accounts/%s/summary' % self.account.email
+
+    def tearDown(self):
+        super(AccountSummaryUnitTests, self).tearDown()
+
+    def get_summary(self):
+        """ The summary, and how many queries it took. """
+        request_started.disconnect(reset_queries)
+        counter = QueryCounter().start()
+        try:
+            response = self.client.get(self.url)
+        finally:
+            counter.stop()
+            request_started.connect(reset_queries)
+        self.assertEqual(response.status_code, 200)
+        return simplejson.loads(response.content), counter.count
+
+    def counts(self):
+        summary, queries = self.get_summary()
+        return summary['unread_messages'], summary['unread_notifications']
+
+    def test_summary(self):
+        summary, few_queries = self.get_summary()
+        self.assertEqual([(r['id'], r['role']) for r in summary['records']], [(self.record.id, 'owner')])
+        self.assertEqual(sorted(c['id'] for c in summary['records'][0]['carenets']),
+                         sorted(Carenet.objects.filter(record=self.record).values_list('id', flat=True)))
+        self.assertEqual([a['id'] for a in summary['records'][0]['apps']], [self.app.email])
+
+        # More records, of every kind, and more apps: no more queries
+        owned = self.createRecord(TEST_RECORDS, 1, owner=self.account)
+        self.addAppToRecord(owned, self.createUserApp(TEST_USERAPPS, 1))
+        shared = self.createRecord(TEST_RECORDS, 3, owner=self.other)
+        self.shareRecordFull(shared, self.account)
+        carenet_record = self.createRecord(TEST_RECORDS, 4, owner=self.other)
+        carenet = Carenet.objects.filter(record=carenet_record)[0]
+        self.addAccountToCarenet(self.account, carenet, can_write=True)
+        self.addAppToCarenet(self.app, carenet)
+
+        summary, queries = self.get_summary()
+        self.assertEqual(queries, few_queries)
+        self.assertEqual(sorted((r['id'], r['role']) for r in summary['records']),
+                         sorted([(self.record.id, 'owner'), (owned.id, 'owner'), (shared.id, 'full_share'),
+                                 (carenet_record.id, 'carenet')]))
+        by_role = dict((r['role'], r) for r in summary['records'])
+        self.assertEqual(by_role['carenet']['carenet'], {'id': carenet.id, 'name': carenet.name, 'can_write': True})
+        self.assertEqual([a['id'] for a in by_role['carenet']['apps']], [self.app.email])
+        self.assertEqual(len(by_role['full_share']['carenets']), len(settings.INDIVO_DEFAULT_CARENETS))
+
+    def test_unread_counts(self):
+        self.assertEqual(self.counts(), (0, 0))
+
+        self.record.send_message('summary_1', self.app, 'subject', 'body')
+        self.record.send_message('summary_2', self.app, 'subject', 'body')
+        self.record.notify(self.app, 'Notify This!')
+        self.assertEqual(self.counts(), (2, 1))
+
+        # Reading a message (twice) counts it once
+        message = Message.objects.filter(account=self.account)[0]
+        for i in range(2):
+            response = self.client.get('/accounts/%s/inbox/%s' % (self.account.email, message.id))
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.counts(), (1, 1))
+
+        # Listing notifications marks them all read
+        self.assertEqual(self.client.get('/accounts/%s/notifications/' % self.account.email).status_code, 200)
+        self.assertEqual(self.counts(), (1, 0))
+
+        # Unaffected accounts
+        self.assertEqual(UnreadCounts.for_account(self.other).messages, 0)
@@ -0,0 +1,43 @@
+from indivo.tests.internal_tests import InternalTests
+from indivo.tests.data import TEST_ADMINAPPS
+from indivo.lib.benchmark import OAuthClient, Scenario, percentile, run_scenario, summarize
+
+class BenchmarkUnitTests(InternalTests):
+
+    def setUp(self):
+        super(BenchmarkUnitTests, self).setUp()
+        self.app = self.createMachineApp(TEST_ADMINAPPS, 0)
+
+    def tearDown(self):
+        super(BenchmarkUnitTests, self).tearDown()
+
+    def test_percentile(self):
+        values = range(1, 101)
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile(values, 100), 100)
+        self.assertEqual(percentile([7], 99), 7)
+        self.assertEqual(percentile([], 50), None)
+
+    def test_summarize(self):
+        summary = summarize([0.003, 0.001, 0.002, 0.004], 0.01, [3, 5], 1)
+        self.assertEqual(summary['requests'], 4)
+        self.assertEqual(summary['errors'], 1)
+        self.assertEqual(summary['throughput'], 400.0)
+        self.assertEqual(summary['latency_ms']['p50'], 2.0)
+        self.assertEqual(summary['latency_ms']['max'], 4.0)
+        self.assertEqual(summary['queries'], {'mean': 4.0, 'max': 5})
+
+    def test_run_scenario(self):
+        # Requests are signed well enough to get through authentication
+        client = OAuthClient(self.app)
+        response = Scenario('version', client, 'GET', '/version').prepare()()
+        self.assertEqual(response.status_code, 200)
+
+        summary = run_scenario(Scenario('version', client, 'GET', '/version'), iterations=5, warmup=2)
+        self.assertEqual(summary['requests'], 5)
+        self.assertEqual(summary['errors'], 0)
+        self.assertTrue(summary['queries']['mean'] > 0)
+        self.assertTrue(summary['latency_ms']['p50'] <= summary['latency_ms']['p99'])
+        self.assertTrue(summary['peak_rss_kb'] > 0)
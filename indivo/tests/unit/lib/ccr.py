@@ -0,0 +1,101 @@
+from indivo.tests.internal_tests import InternalTests
+from indivo.tests.data import TEST_CARENETS
+from indivo.lib import ccr
+from indivo.lib.ccr import CCRWriter, VITAL_SIGNS
+from indivo.lib.instrumentation import QueryCounter
+from indivo.lib.synthetic_data import SyntheticDataGenerator, EMAIL_DOMAIN
+from indivo.models import *
+from django.conf import settings
+from django.core.cache import cache
+
+from lxml import etree
+import datetime
+
+CCR_NS = '{urn:astm-org:CCR}'
+
+class CCRUnitTests(InternalTests):
+
+    def setUp(self):
+        super(CCRUnitTests, self).setUp()
+        self.save_and_modify_setting('CCR_CACHE_TIMEOUT', 0)
+        generator = SyntheticDataGenerator(1, seed=5, as_of=datetime.datetime(2012, 1, 1), with_documents=True,
+                                           distribution={'Medication': 12, 'Immunization': 6, 'VitalSigns': 6})
+        generator.create_records([0])
+        generator.fill_records([0])
+        self.record = Record.objects.get(owner__email__endswith=EMAIL_DOMAIN)
+
+    def tearDown(self):
+        settings.CCR_CACHE_TIMEOUT = self.saved_settings['CCR_CACHE_TIMEOUT']
+        cache.clear()
+        super(CCRUnitTests, self).tearDown()
+
+    def parse(self, chunks):
+        return etree.fromstring(''.join(chunks))
+
+    def test_ccr(self):
+        medications = Medication.objects.filter(record=self.record)
+        self.assertTrue(medications.count())
+
+        # Suppressed facts are left out
+        suppressed = medications[0].document
+        suppressed.set_status(self.record.owner, 'archived', 'testing')
+
+        root = self.parse(CCRWriter(self.record))
+        self.assertEqual(root.findtext('%sPatient/%sActorID' % (CCR_NS, CCR_NS)), self.record.id)
+
+        body = root.find('%sBody' % CCR_NS)
+        ccr_medications = body.findall('%sMedications/%sMedication' % (CCR_NS, CCR_NS))
+        self.assertEqual(len(ccr_medications), medications.exclude(document=suppressed).count())
+        self.assertFalse(suppressed.id in [m.findtext('%sCCRDataObjectID' % CCR_NS) for m in ccr_medications])
+
+        medication = medications.exclude(document=suppressed).order_by('created_at', 'id')[0]
+        self.assertEqual(ccr_medications[0].findtext('%sProduct/%sProductName/%sText' % (CCR_NS, CCR_NS, CCR_NS)),
+                         medication.drugName_title)
+
+        self.assertEqual(len(body.findall('%sImmunizations/%sImmunization' % (CCR_NS, CCR_NS))),
+                         Immunization.objects.filter(record=self.record).count())
+
+        vitals = 0
+        for vital_signs in VitalSigns.objects.filter(record=self.record):
+            vitals += len([v for v in VITAL_SIGNS if getattr(vital_signs, '%s_value' % v) is not None])
+        self.assertEqual(len(body.findall('%sVitalSigns/%sResult' % (CCR_NS, CCR_NS))), vitals)
+
+    def test_queries(self):
+        # One query per section, however many facts there are
+        StatusName.cached.get('active')
+        counter = QueryCounter().start()
+        ''.join(CCRWriter(self.record))
+        counter.stop()
+        self.assertEqual(counter.count, 3)
+
+    def test_carenet(self):
+        carenet = self.createCarenet(TEST_CARENETS, 0, record=self.record)
+        root = self.parse(CCRWriter(self.record, carenet))
+        self.assertEqual(len(root.findall('%sBody/%sMedications/%sMedication' % (CCR_NS, CCR_NS, CCR_NS))), 0)
+
+        doc = Medication.objects.filter(record=self.record)[0].document
+        self.addDocToCarenet(doc, carenet)
+        root = self.parse(CCRWriter(self.record, carenet))
+        ids = [m.findtext('%sCCRDataObjectID' % CCR_NS)
+               for m in root.findall('%sBody/%sMedications/%sMedication' % (CCR_NS, CCR_NS, CCR_NS))]
+        self.assertEqual(set(ids), set([doc.id]))
+
+    def test_cache(self):
+        settings.CCR_CACHE_TIMEOUT = 60
+        first = ''.join(ccr.ccr(self.record))
+        self.assertEqual(cache.get(ccr.cache_key(self.record)), first)
+
+        # Served from the cache, in one piece
+        self.assertEqual(list(ccr.ccr(self.record)), [first])
+
+        # Changing a document changes the key
+        key = ccr.cache_key(self.record)
+        Medication.objects.filter(record=self.record)[0].document.set_status(self.record.owner, 'archived', 'testing')
+        self.assertNotEqual(ccr.cache_key(self.record), key)
+        self.assertNotEqual(''.join(ccr.ccr(self.record)), first)
+
+    def test_view(self):
+        response = self.client.get('/records/%s/reports/experimental/ccr' % self.record.id)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/xml')
+        self.assertEqual(self.parse([response.content]).tag, '%sContinuityOfCareRecord' % CCR_NS)
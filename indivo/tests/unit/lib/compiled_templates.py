@@ -0,0 +1,126 @@
+from indivo.tests.internal_tests import InternalTests
+from indivo.tests.data import TEST_ACCOUNTS, TEST_RECORDS, TEST_R_DOCS
+from indivo.lib import compiled_templates
+from indivo.models import Audit, DocumentSchema, Measurement, Procedure
+from indivo.views.documents.document import _set_doc_latest
+from django.conf import settings
+from django.template import Context, loader
+
+import datetime
+
+class CompiledTemplatesUnitTests(InternalTests):
+    """ The golden output for each compiled renderer is its Django template, rendered with the same context. """
+
+    def setUp(self):
+        super(CompiledTemplatesUnitTests, self).setUp()
+        self.old_compiled = getattr(settings, 'COMPILED_TEMPLATES', False)
+
+        self.account = self.createAccount(TEST_ACCOUNTS, 0)
+        self.record = self.createRecord(TEST_RECORDS, 0, owner=self.account)
+        self.loadTestReports(record=self.record)
+
+        # Documents with as many of document.xml's optional parts as we can manage
+        self.doc1 = self.createDocument(TEST_R_DOCS, 0, record=self.record)
+        self.doc2 = self.createDocument(TEST_R_DOCS, 1, record=self.record)
+        annotation = DocumentSchema.objects.get(type=DocumentSchema.expand_rel('annotation'))
+        self.relateDocs(self.doc1, self.doc2, annotation)
+        for doc in (self.doc1, self.doc2):
+            _set_doc_latest(doc)
+        self.doc2.label = u'<"Caf\xe9" & \'Bar\'>'
+        self.doc2.nevershare = True
+        self.doc2.suppressed_at = datetime.datetime(2011, 3, 4, 5, 6, 7, 890)
+        self.doc2.suppressed_by = self.account
+
+        now = datetime.datetime.now()
+        Audit.objects.create(datetime=now, view_func='record_document_list', request_successful=True,
+                             effective_principal_email=self.account.email, proxied_by_email='app&1@apps.indivo.org',
+                             record_id=self.record.id, document_id=self.doc1.id, req_url='/records/?a=1&b=<2>',
+                             req_ip_address='1.0.0.0', req_domain='hi.com', req_method='GET', resp_code=200)
+        Audit.objects.create(datetime=now, request_successful=False, record_id=self.record.id)
+
+    def tearDown(self):
+        settings.COMPILED_TEMPLATES = self.old_compiled
+        super(CompiledTemplatesUnitTests, self).tearDown()
+
+    def assertRendersIdentically(self, template_name, context):
+        expected = loader.get_template(template_name).render(Context(context))
+        rendered = compiled_templates.RENDERERS[template_name](context)
+        self.assertEqual(rendered, expected)
+        return rendered
+
+    def report_context(self, fobjs, item_template, **extra):
+        context = {'fobjs': fobjs, 'trc': len(fobjs), 'limit': 100, 'offset': 0, 'order_by': '-created_at',
+                   'status': 'active', 'item_template': item_template}
+        context.update(extra)
+        return context
+
+    def test_documents(self):
+        for doc in (self.doc1, self.doc2):
+            self.assertRendersIdentically('document.xml', {'doc': doc, 'record': self.record, 'pha': None})
+            self.assertRendersIdentically('single_document.xml', {'doc': doc, 'record': doc.record})
+
+        docs = [self.doc1, self.doc2]
+        for pha in (None, self.doc1.pha):
+            output = self.assertRendersIdentically('documents.xml', {'docs': docs, 'record': self.record,
+                                                                     'pha': pha, 'tdc': len(docs)})
+        self.assertTrue('<relatesTo>' in output)
+        self.assertTrue('<isRelatedFrom>' in output)
+        self.assertTrue('</suppresedAt>' in output)
+
+        # Nothing to render, and documents without a record
+        self.assertRendersIdentically('documents.xml', {'docs': [], 'record': None, 'pha': None, 'tdc': 0})
+
+    def test_measurement_report(self):
+        measurements = list(Measurement.objects.filter(record=self.record))
+        self.assertTrue(measurements)
+        output = self.assertRendersIdentically('reports/report.xml',
+                                               self.report_context(measurements, 'reports/measurement.xml'))
+        self.assertEqual(output.count('<Measurement '), len(measurements))
+
+        # With every query parameter
+        context = self.report_context(measurements, 'reports/measurement.xml', group_by='type',
+                                      date_group={'field': 'datetime', 'time_incr': 'month'},
+                                      aggregate_by={'operator': 'max', 'field': 'value'},
+                                      date_range={'field': 'datetime', 'start_date': datetime.datetime(2009, 1, 1),
+                                                  'end_date': None},
+                                      filters={'type': 'HBA1C', 'unit': '<percent>'})
+        self.assertRendersIdentically('reports/report.xml', context)
+
+    def test_audit_report(self):
+        audits = list(Audit.objects.filter(record_id=self.record.id).order_by('-datetime'))
+        self.assertEqual(len(audits), 2)
+        output = self.assertRendersIdentically('reports/report.xml', self.report_context(audits, 'audit.xml'))
+        self.assertTrue('app&amp;1@apps.indivo.org' in output)
+
+    def test_vital_report(self):
+        vitals = [{'document': self.doc1, 'date_measured': datetime.datetime(2009, 5, 16, 12),
+                   'name': 'Blood Pressure Systolic', 'name_type': 'http://codes.indivo.org/vitalsigns/',
+                   'name_value': '123', 'name_abbrev': 'BPsys', 'value': 145.0, 'unit': 'mmHg',
+                   'unit_type': 'http://codes.indivo.org/units/', 'unit_value': '31', 'unit_abbrev': '',
+                   'site': 'left arm', 'position': 'sitting', 'comments': 'a & b'},
+                  {'document': self.doc2, 'name': 'weight', 'value': 0, 'unit': 'kg'},
+                  {'document': None}]
+        self.assertRendersIdentically('reports/report.xml', self.report_context(vitals, 'reports/vital.xml'))
+
+    def test_uncompiled_item(self):
+        # Items without a compiled renderer are rendered by their template
+        procedures = list(Procedure.objects.filter(record=self.record))
+        self.assertTrue(procedures)
+        self.assertFalse(compiled_templates.ITEM_RENDERERS.has_key('reports/procedure.xml'))
+        self.assertRendersIdentically('reports/report.xml', self.report_context(procedures, 'reports/procedure.xml'))
+
+    def test_api_responses(self):
+        # The whole response is the same with and without compiled templates
+        # (no audit queries here: every request adds an audit)
+        urls = ['/records/%s/documents/' % self.record.id,
+                '/records/%s/documents/%s/meta' % (self.record.id, self.doc1.id),
+                '/records/%s/reports/minimal/measurements/HBA1C/' % self.record.id,
+                '/records/%s/reports/minimal/procedures/' % self.record.id,
+                ]
+        for url in urls:
+            settings.COMPILED_TEMPLATES = False
+            expected = self.client.get(url)
+            settings.COMPILED_TEMPLATES = True
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.content, expected.content)
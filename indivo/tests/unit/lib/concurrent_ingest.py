@@ -0,0 +1,73 @@
+from indivo.tests.internal_tests import TransactionInternalTests
+from indivo.document_processing import REGISTERED_SCHEMAS
+from indivo.document_processing.document_processing import DocumentProcessing
+from django.conf import settings
+
+import os
+import threading
+import traceback
+
+# Sample documents for core schemas, processed by XSLT (procedure, equipment, simplenote) and python (sdmx)
+DOCS = ('procedure/procedure.xml', 'equipment/equipment.xml', 'simplenote/simplenote.xml', 'sdmx/sdmx.xml')
+PROCEDURE_FQN = 'http://indivo.org/vocab/xml/documents#Procedure'
+
+THREADS = 8
+ROUNDS = 10
+
+def ingest(content):
+    """ Validate and transform *content*, returning a comparable summary of the facts it produced. """
+    doc = DocumentProcessing(content, 'application/xml')
+    doc.process()
+    return sorted((fact.__class__.__name__,
+                   sorted((name, unicode(value)) for name, value in fact.__dict__.iteritems()
+                          if not name.startswith('_') and name not in ('id', 'created_at')))
+                  for fact in doc.processed_facts)
+
+class ConcurrentIngestUnitTests(TransactionInternalTests):
+
+    def setUp(self):
+        super(ConcurrentIngestUnitTests, self).setUp()
+
+        # The SDMX sample uses the test datamodels
+        self.load_model_dir(self.TEST_MODEL_DIR)
+
+        self.docs = []
+        for doc_path in DOCS:
+            with open(os.path.join(settings.CORE_SCHEMA_DIRS[0], doc_path)) as f:
+                self.docs.append(f.read())
+
+    def tearDown(self):
+        self.unload_model_dir(self.TEST_MODEL_DIR)
+        super(ConcurrentIngestUnitTests, self).tearDown()
+
+    def test_concurrent_ingest(self):
+        expected = [ingest(content) for content in self.docs]
+        for facts in expected:
+            self.assertTrue(facts)
+
+        transform = REGISTERED_SCHEMAS[PROCEDURE_FQN][1].to_sdmx
+        compilations = transform.compilations
+
+        errors = []
+        start = threading.Event()
+        def worker(offset):
+            start.wait()
+            try:
+                for i in range(ROUNDS * len(self.docs)):
+                    doc_index = (i + offset) % len(self.docs)
+                    if ingest(self.docs[doc_index]) != expected[doc_index]:
+                        errors.append('%s came out differently' % DOCS[doc_index])
+            except Exception:
+                errors.append(traceback.format_exc())
+
+        threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(THREADS)]
+        for thread in threads:
+            thread.start()
+        start.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+
+        # Each thread compiled its own copy of the transform
+        self.assertEqual(transform.compilations - compilations, THREADS)
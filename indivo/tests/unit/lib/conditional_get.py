@@ -0,0 +1,166 @@
+from indivo.tests.internal_tests import InternalTests
+from indivo.tests.data.account import TEST_ACCOUNTS
+from indivo.tests.data.record import TEST_RECORDS
+from indivo.tests.data.app import TEST_USERAPPS
+from indivo.tests.data.document import TEST_R_DOCS, TEST_A_DOCS
+from indivo.lib import conditional
+from indivo.lib.instrumentation import QueryCounter
+from indivo.models import *
+from django.core.management import call_command
+from django.core.signals import request_started
+from django.db import reset_queries
+from django.http import HttpRequest, HttpResponse
+
+import datetime
+
+class ConditionalGetUnitTests(InternalTests):
+
+    def setUp(self):
+        super(ConditionalGetUnitTests, self).setUp()
+        self.account = self.createAccount(TEST_ACCOUNTS, 4)
+        self.record = self.createRecord(TEST_RECORDS, 0, owner=self.account)
+        self.loadTestReports(record=self.record)
+        self.doc = self.createDocument(TEST_R_DOCS, 0, record=self.record)
+        self.other_doc = self.createDocument(TEST_R_DOCS, 1, record=self.record)
+        self.carenet = Carenet.objects.filter(record=self.record)[0]
+
+    def tearDown(self):
+        super(ConditionalGetUnitTests, self).tearDown()
+
+    def get(self, url, **headers):
+        """ The response to GETting *url*, and how many queries it took. """
+        request_started.disconnect(reset_queries)
+        counter = QueryCounter().start()
+        try:
+            response = self.client.get(url, **headers)
+        finally:
+            counter.stop()
+            request_started.connect(reset_queries)
+        return response, counter.count
+
+    def assertConditional(self, url):
+        """ Check that *url* is served with an ETag, and a 304 to requests that have it. Returns the ETag. """
+        response, queries = self.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        not_modified, not_modified_queries = self.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.content, '')
+        self.assertEqual(not_modified['ETag'], etag)
+        self.assertTrue(not_modified_queries <= queries)
+
+        self.assertEqual(self.get(url, HTTP_IF_NONE_MATCH='"stale"')[0].status_code, 200)
+        return etag
+
+    def version(self):
+        return RecordVersion.current(self.record.id).version
+
+    def test_not_modified(self):
+        request = HttpRequest()
+        request.method = 'GET'
+        modified = datetime.datetime(2012, 5, 1, 12, 0, 0)
+        self.assertFalse(conditional.not_modified(request, '"a"', modified))
+
+        request.META['HTTP_IF_MODIFIED_SINCE'] = conditional.set_headers(HttpResponse(), last_modified=modified)['Last-Modified']
+        self.assertTrue(conditional.not_modified(request, '"a"', modified))
+        self.assertFalse(conditional.not_modified(request, '"a"', modified + datetime.timedelta(seconds=1)))
+
+        # If-None-Match wins
+        request.META['HTTP_IF_NONE_MATCH'] = '"b"'
+        self.assertFalse(conditional.not_modified(request, '"a"', modified))
+        request.META['HTTP_IF_NONE_MATCH'] = 'W/"a"'
+        self.assertTrue(conditional.not_modified(request, '"a"', modified))
+
+        # Only for reads
+        request.method = 'POST'
+        self.assertFalse(conditional.not_modified(request, '"a"', modified))
+
+    def test_record_version(self):
+        version = self.version()
+
+        # New documents, relationships and carenet shares all bump it
+        doc = self.createDocument(TEST_R_DOCS, 2, record=self.record)
+        self.assertTrue(self.version() > version)
+
+        version = self.version()
+        self.relateDocs(self.doc, doc, DocumentSchema.objects.get(type=DocumentSchema.expand_rel('annotation')))
+        self.assertTrue(self.version() > version)
+
+        version = self.version()
+        self.addDocToCarenet(doc, self.carenet)
+        self.assertTrue(self.version() > version)
+
+        version = self.version()
+        doc.delete()
+        self.assertTrue(self.version() > version)
+
+        # As does dropping all the facts
+        version = self.version()
+        call_command('reset_facts', 'drop')
+        self.assertTrue(self.version() > version)
+
+        # Other records' changes don't
+        version = self.version()
+        self.createDocument(TEST_R_DOCS, 3, record=self.createRecord(TEST_RECORDS, 1, owner=self.account))
+        self.assertEqual(self.version(), version)
+
+    def test_document(self):
+        url = '/records/%s/documents/%s' % (self.record.id, self.doc.id)
+        etag = self.assertConditional(url)
+
+        response = self.client.get(url)
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304)
+
+        # Unrelated changes leave the document's ETag alone, but a change of status doesn't
+        self.createDocument(TEST_R_DOCS, 2, record=self.record)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.doc.status = StatusName.cached.get('archived')
+        self.doc.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_document_meta(self):
+        url = '/records/%s/documents/%s/meta' % (self.record.id, self.doc.id)
+        etag = self.assertConditional(url)
+
+        # Relating it to another document changes its metadata
+        self.relateDocs(self.doc, self.other_doc, DocumentSchema.objects.get(type=DocumentSchema.expand_rel('annotation')))
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue('relatesTo' in response.content)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_document_list(self):
+        url = '/records/%s/documents/' % self.record.id
+        etag = self.assertConditional(url)
+
+        self.createDocument(TEST_R_DOCS, 2, record=self.record)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        # App documents have no record version: their lists are hashed
+        app = self.createUserApp(TEST_USERAPPS, 0)
+        self.createDocument(TEST_A_DOCS, 0, pha=app)
+        url = '/apps/%s/documents/' % app.email
+        etag = self.assertConditional(url)
+        self.assertEqual(etag, conditional.strong_etag(self.client.get(url).content))
+
+    def test_reports(self):
+        urls = ['/records/%s/reports/LabResult/' % self.record.id,
+                '/carenets/%s/reports/LabResult/' % self.carenet.id,
+                '/records/%s/lab_results/' % self.record.id]
+        etags = [self.assertConditional(url) for url in urls]
+
+        # Answered without running the report
+        queries = self.get(urls[0])[1]
+        self.assertTrue(self.get(urls[0], HTTP_IF_NONE_MATCH=etags[0])[1] < queries)
+
+        # Until the record changes
+        self.createDocument(TEST_R_DOCS, 2, record=self.record)
+        for url, etag in zip(urls, etags):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        # Reports without a version are still served
+        RecordVersion.objects.filter(record=self.record).delete()
+        response = self.client.get(urls[0])
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
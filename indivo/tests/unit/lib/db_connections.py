@@ -0,0 +1,84 @@
+from indivo.tests.internal_tests import InternalTests
+from indivo.lib import db_connections
+from indivo.lib.db_connections import ConnectionPool, check, release
+from django.conf import settings
+from django.db import connections
+
+import time
+
+ALIAS = 'connections_test'
+
+class DBConnectionsUnitTests(InternalTests):
+
+    def setUp(self):
+        super(DBConnectionsUnitTests, self).setUp()
+
+        # A second connection to the test database, outside of the test's transaction
+        settings.DATABASES[ALIAS] = dict(settings.DATABASES['default'], TEST_MIRROR='default')
+        self.conn = connections[ALIAS]
+        self.conn.cursor().execute('SELECT 1')
+        self.raw = self.conn.connection
+
+    def tearDown(self):
+        db_connections.uninstall()
+        db_connections.close(self.conn)
+        del connections._connections[ALIAS]
+        del settings.DATABASES[ALIAS]
+        super(DBConnectionsUnitTests, self).tearDown()
+
+    def test_persistent(self):
+        release(self.conn)
+        self.assertTrue(self.conn.connection is self.raw)
+        check(self.conn)
+        self.assertTrue(self.conn.connection is self.raw)
+
+    def test_max_age(self):
+        check(self.conn, max_age=60)
+        self.assertTrue(self.conn.connection is self.raw)
+
+        db_connections._born[id(self.raw)] = time.time() - 61
+        release(self.conn, max_age=60)
+        self.assertEqual(self.conn.connection, None)
+
+        # And we connect again when next needed
+        self.conn.cursor().execute('SELECT 1')
+        self.assertTrue(db_connections.usable(self.conn.connection))
+
+    def test_health_check(self):
+        self.raw.close()
+        check(self.conn, health_checks=False)
+        self.assertTrue(self.conn.connection is self.raw)
+        check(self.conn, health_checks=True)
+        self.assertEqual(self.conn.connection, None)
+
+    def test_transaction_state(self):
+        # Left under transaction management (e.g., by a broken view): don't reuse it
+        self.conn.enter_transaction_management()
+        self.conn.managed(True)
+        release(self.conn)
+        self.assertEqual(self.conn.connection, None)
+        self.assertEqual(self.conn.transaction_state, [])
+
+    def test_pool(self):
+        pool = ConnectionPool(1)
+        release(self.conn, pool=pool)
+        self.assertEqual(self.conn.connection, None)
+        self.assertEqual(pool.idle[ALIAS], [self.raw])
+
+        check(self.conn, pool=pool)
+        self.assertTrue(self.conn.connection is self.raw)
+        self.assertEqual(pool.idle[ALIAS], [])
+
+        # Only as many idle connections as fit
+        self.assertTrue(pool.put(ALIAS, self.raw))
+        self.assertFalse(pool.put(ALIAS, object()))
+        pool.idle[ALIAS] = []
+
+    def test_install(self):
+        self.assertFalse(db_connections.install(max_age=0))
+        self.assertEqual(db_connections._options, None)
+
+        self.assertTrue(db_connections.install(max_age=None, pool_size=2))
+        self.assertEqual(db_connections._pool.size, 2)
+        db_connections.uninstall()
+        self.assertEqual(db_connections._options, None)
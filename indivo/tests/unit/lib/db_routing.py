@@ -0,0 +1,126 @@
+from indivo.tests.internal_tests import InternalTests
+from indivo.tests.data import TEST_ACCOUNTS, TEST_RECORDS, TEST_R_DOCS
+from indivo.lib import db_routing
+from indivo.lib.db_routing import ReplicaRouter
+from indivo.middlewares.authorization import Authorization
+from indivo.middlewares.paramloader import ParamLoader
+from indivo.middlewares.replica import ReplicaRouting
+from indivo.models import Record, AccountFullShare
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed, PermissionDenied
+from django.core.urlresolvers import resolve
+from django.http import HttpResponse
+from django.test.client import RequestFactory
+
+REPLICA = 'replica_test'
+
+class DBRoutingUnitTests(InternalTests):
+
+    def setUp(self):
+        super(DBRoutingUnitTests, self).setUp()
+
+        # A second connection to the test database stands in for the replica
+        settings.DATABASES[REPLICA] = dict(settings.DATABASES['default'], TEST_MIRROR='default')
+        self.save_and_modify_setting('DATABASE_REPLICAS', (REPLICA,))
+        self.save_and_modify_setting('REPLICA_STICKY_SECONDS', 10)
+
+        self.account = self.createAccount(TEST_ACCOUNTS, 0)
+        self.s_account = self.createAccount(TEST_ACCOUNTS, 1)
+        self.record = self.createRecord(TEST_RECORDS, 0, owner=self.account)
+        self.other_record = self.createRecord(TEST_RECORDS, 1, owner=self.account)
+        self.doc = self.createDocument(TEST_R_DOCS, 0, record=self.record)
+
+    def tearDown(self):
+        db_routing.use_primary()
+        cache.clear()
+        del settings.DATABASES[REPLICA]
+        for name in ('DATABASE_REPLICAS', 'REPLICA_STICKY_SECONDS'):
+            setattr(settings, name, self.saved_settings[name])
+        super(DBRoutingUnitTests, self).tearDown()
+
+    def route(self, method, path):
+        """ The database ReplicaRouting picks for the view's reads. """
+        request = getattr(RequestFactory(), method.lower())(path)
+        view_func, view_args, view_kwargs = resolve(path)
+        middleware = ReplicaRouting()
+        middleware.process_request(request)
+        ParamLoader().process_view(request, view_func, view_args, view_kwargs)
+        middleware.process_view(request, view_func, view_args, view_kwargs)
+        chosen = db_routing.current_replica()
+        middleware.process_response(request, HttpResponse())
+
+        # Back on the primary for the next request
+        self.assertEqual(db_routing.current_replica(), None)
+        return chosen
+
+    def test_router(self):
+        router = ReplicaRouter()
+        self.assertEqual(router.db_for_read(Record), 'default')
+        self.assertEqual(db_routing.use_replica(), REPLICA)
+        self.assertEqual(router.db_for_read(Record), REPLICA)
+        self.assertEqual(router.db_for_write(Record), 'default')
+        self.assertFalse(router.allow_syncdb(REPLICA, Record))
+        db_routing.use_primary()
+        self.assertEqual(router.db_for_read(Record), 'default')
+
+    def test_routing(self):
+        # Safe reads go to the replica
+        self.assertEqual(self.route('GET', '/records/%s/reports/vitalsigns/' % self.record.id), REPLICA)
+        self.assertEqual(self.route('GET', '/records/%s/documents/%s' % (self.record.id, self.doc.id)), REPLICA)
+        self.assertEqual(self.route('GET', '/records/%s/documents/' % self.record.id), REPLICA)
+
+        # Other views, and writes, don't
+        self.assertEqual(self.route('GET', '/records/%s' % self.record.id), None)
+        self.assertEqual(self.route('POST', '/records/%s/documents/' % self.record.id), None)
+
+        # After a write, the record's reads stay on the primary, but other records' don't
+        self.assertEqual(self.route('GET', '/records/%s/reports/vitalsigns/' % self.record.id), None)
+        self.assertEqual(self.route('GET', '/records/%s/reports/vitalsigns/' % self.other_record.id), REPLICA)
+
+        cache.clear()
+        self.assertEqual(self.route('GET', '/records/%s/reports/vitalsigns/' % self.record.id), REPLICA)
+
+        # Unless we don't stick at all
+        settings.REPLICA_STICKY_SECONDS = 0
+        self.route('POST', '/records/%s/documents/' % self.record.id)
+        self.assertEqual(self.route('GET', '/records/%s/reports/vitalsigns/' % self.record.id), REPLICA)
+
+    def authorized(self, principal, path):
+        """ Whether ReplicaRouting and Authorization, run in their MIDDLEWARE_CLASSES order, let a GET of *path* through. """
+        request = RequestFactory().get(path)
+        request.principal = principal
+        view_func, view_args, view_kwargs = resolve(path)
+        ParamLoader().process_view(request, view_func, view_args, view_kwargs)
+
+        replica = ReplicaRouting()
+        replica.process_request(request)
+        classes = [name.rsplit('.', 1)[1] for name in settings.MIDDLEWARE_CLASSES]
+        middleware = sorted([replica, Authorization()], key=lambda m: classes.index(m.__class__.__name__))
+        self.enableAccessControl()
+        try:
+            for m in middleware:
+                m.process_view(request, view_func, view_args, view_kwargs)
+            return True
+        except PermissionDenied:
+            return False
+        finally:
+            self.disableAccessControl()
+            replica.process_response(request, HttpResponse())
+
+    def test_authorization_on_primary(self):
+        # The test's own data isn't committed, so the replica's connection doesn't see it: like a
+        # replica that is lagging, it has no record of the share, or of its revocation
+        path = '/records/%s/documents/' % self.record.id
+        share = self.shareRecordFull(self.record, self.s_account)
+        self.assertTrue(self.authorized(self.s_account, path))
+
+        # A revoked share stops granting access right away
+        AccountFullShare.objects.get(pk=share.pk).delete()
+        self.assertFalse(self.authorized(self.s_account, path))
+
+    def test_no_replicas(self):
+        settings.DATABASE_REPLICAS = ()
+        self.assertRaises(MiddlewareNotUsed, ReplicaRouting)
+        self.assertEqual(db_routing.use_replica(), None)
+        self.assertEqual(ReplicaRouter().db_for_read(Record), 'default')
@@ -0,0 +1,74 @@
+from indivo.tests.internal_tests import InternalTests
+from indivo.lib import deferred_mail
+from indivo.middlewares.deferred_mail import DeferredMail
+from django.conf import settings
+from django.core import mail
+from django.http import HttpResponse
+from django.test.client import RequestFactory
+
+SETTINGS = ('SEND_MAIL', 'DEFER_MAIL', 'EMAIL_OUTBOX')
+
+class DeferredMailUnitTests(InternalTests):
+
+    def setUp(self):
+        super(DeferredMailUnitTests, self).setUp()
+        self.save_and_modify_setting('SEND_MAIL', True)
+        self.save_and_modify_setting('DEFER_MAIL', True)
+        self.save_and_modify_setting('EMAIL_OUTBOX', False)
+        mail.outbox = []
+
+    def tearDown(self):
+        deferred_mail.release(send=False)
+        deferred_mail.flush()
+        for name in SETTINGS:
+            setattr(settings, name, self.saved_settings[name])
+        super(DeferredMailUnitTests, self).tearDown()
+
+    def test_deferred(self):
+        for i in range(3):
+            deferred_mail.send_mail('subject %s' % i, 'body', 'from@example.org', ['to@example.org'])
+        deferred_mail.flush()
+        self.assertEqual(sorted(message.subject for message in mail.outbox), ['subject 0', 'subject 1', 'subject 2'])
+
+    def test_immediate(self):
+        settings.DEFER_MAIL = False
+        deferred_mail.send_mail('subject', 'body', 'from@example.org', ['to@example.org'])
+        self.assertEqual([message.subject for message in mail.outbox], ['subject'])
+
+    def test_held(self):
+        # Held until the request is over, then sent
+        deferred_mail.hold()
+        deferred_mail.send_mail('held', 'body', 'from@example.org', ['to@example.org'])
+        deferred_mail.flush()
+        self.assertEqual(mail.outbox, [])
+        deferred_mail.release()
+        deferred_mail.flush()
+        self.assertEqual([message.subject for message in mail.outbox], ['held'])
+
+        # Or dropped, if it failed
+        deferred_mail.hold()
+        deferred_mail.send_mail('dropped', 'body', 'from@example.org', ['to@example.org'])
+        deferred_mail.release(send=False)
+        deferred_mail.flush()
+        self.assertEqual([message.subject for message in mail.outbox], ['held'])
+
+    def test_middleware(self):
+        middleware = DeferredMail()
+        for failed in (True, False):
+            request = RequestFactory().post('/records/')
+            middleware.process_request(request)
+            deferred_mail.send_mail('failed %s' % failed, 'body', 'from@example.org', ['to@example.org'])
+            if failed:
+                middleware.process_exception(request, ValueError())
+            middleware.process_response(request, HttpResponse(status=500 if failed else 200))
+        deferred_mail.flush()
+        self.assertEqual([message.subject for message in mail.outbox], ['failed False'])
+
+    def test_outbox(self):
+        from indivo.models import OutboxEmail
+        settings.EMAIL_OUTBOX = True
+        deferred_mail.send_mass_mail([('subject %s' % i, 'body', 'from@example.org', ['to@example.org'])
+                                      for i in range(3)])
+        deferred_mail.flush()
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(OutboxEmail.objects.count(), 3)
@@ -0,0 +1,87 @@
+from indivo.tests.internal_tests import InternalTests
+from indivo.tests.data.record import TEST_RECORDS
+from indivo.tests.data.document import TEST_R_DOCS
+from indivo.lib import document_graph
+from indivo.models import *
+from django.db import connections
+
+from lxml import etree
+
+class DocumentGraphUnitTests(InternalTests):
+
+    def setUp(self):
+        super(DocumentGraphUnitTests, self).setUp()
+        self.record = self.createRecord(TEST_RECORDS, 0)
+        self.a, self.b, self.c, self.d, self.e = [self.createDocument(TEST_R_DOCS, i, record=self.record)
+                                                  for i in range(5, 10)]
+        self.annotation = DocumentSchema.objects.get(type=DocumentSchema.expand_rel('annotation'))
+        self.interpretation = DocumentSchema.objects.get(type=DocumentSchema.expand_rel('interpretation'))
+
+        # a -> b -> c -> a (a cycle), and b -> d. e is unrelated.
+        self.relateDocs(self.a, self.b, self.annotation)
+        self.relateDocs(self.b, self.c, self.interpretation)
+        self.relateDocs(self.c, self.a, self.annotation)
+        self.relateDocs(self.b, self.d, self.annotation)
+
+    def tearDown(self):
+        super(DocumentGraphUnitTests, self).tearDown()
+
+    def closures(self, *args, **kwargs):
+        """ The closure, by breadth-first search, checked against the recursive query where the database has one. """
+        depths = document_graph.closure(use_cte=False, *args, **kwargs)
+        if document_graph.supports_recursive_cte(connections[DocumentRels.objects.db]):
+            self.assertEqual(document_graph.closure(use_cte=True, *args, **kwargs), depths)
+        return depths
+
+    def test_closure(self):
+        self.assertEqual(self.closures(self.a), {self.b.id: 1, self.c.id: 2, self.d.id: 2})
+        self.assertEqual(self.closures(self.c), {self.a.id: 1, self.b.id: 2, self.d.id: 3})
+        self.assertEqual(self.closures(self.e), {})
+
+        # Limited by depth, and by relationship type
+        self.assertEqual(self.closures(self.a, max_depth=1), {self.b.id: 1})
+        self.assertEqual(self.closures(self.a, relationships=[self.annotation]), {self.b.id: 1, self.d.id: 2})
+        self.assertEqual(self.closures(self.a, relationships=[self.interpretation]), {})
+
+        self.assertEqual(document_graph.level_counts(self.closures(self.a)), [(1, 1), (2, 2)])
+
+    def test_view(self):
+        url = '/records/%s/documents/%s/related/' % (self.record.id, self.a.id)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        xml = etree.XML(response.content)
+        self.assertEqual(xml.get('total_document_count'), '3')
+        self.assertEqual([(l.get('depth'), l.get('count')) for l in xml.findall('Levels/Level')], [('1', '1'), ('2', '2')])
+        related = [(r.get('depth'), r.find('Document').get('id')) for r in xml.findall('RelatedDocument')]
+        self.assertEqual(related, [('1', self.b.id)] + sorted([('2', self.c.id), ('2', self.d.id)]))
+        self.assertEqual(xml.get('next_cursor'), None)
+
+        # b's relationship counts
+        b = xml.find('RelatedDocument/Document')
+        self.assertEqual(sorted((r.get('type'), r.get('count')) for r in b.findall('relatesTo/relation')),
+                         sorted([(self.annotation.type, '1'), (self.interpretation.type, '1')]))
+        self.assertEqual([(r.get('type'), r.get('count')) for r in b.findall('isRelatedFrom/relation')],
+                         [(self.annotation.type, '1')])
+
+        # Paged with a cursor
+        seen = []
+        cursor = None
+        while True:
+            params = {'limit': 1}
+            if cursor:
+                params['cursor'] = cursor
+            xml = etree.XML(self.client.get(url, params).content)
+            seen.extend(r.find('Document').get('id') for r in xml.findall('RelatedDocument'))
+            cursor = xml.get('next_cursor')
+            if not cursor:
+                break
+        self.assertEqual(seen, [doc_id for depth, doc_id in related])
+
+        # Filtered
+        xml = etree.XML(self.client.get(url, {'rel': 'annotation', 'max_depth': 1}).content)
+        self.assertEqual([r.find('Document').get('id') for r in xml.findall('RelatedDocument')], [self.b.id])
+
+        self.assertEqual(self.client.get(url, {'rel': 'nonsense'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'max_depth': 0}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'cursor': 'nonsense'}).status_code, 400)
+        self.assertEqual(self.client.get('/records/%s/documents/nonsense/related/' % self.record.id).status_code, 404)
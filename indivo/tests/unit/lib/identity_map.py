@@ -0,0 +1,57 @@
+from indivo.tests.internal_tests import InternalTests
+from indivo.tests.data import TEST_ACCOUNTS, TEST_RECORDS
+from indivo.lib.identity_map import IdentityMap
+from indivo.models import Account, Carenet, Record, Principal
+
+class IdentityMapUnitTests(InternalTests):
+
+    def setUp(self):
+        super(IdentityMapUnitTests, self).setUp()
+        self.account = self.createAccount(TEST_ACCOUNTS, 0)
+        self.record = self.createRecord(TEST_RECORDS, 0, owner=self.account)
+        self.carenet = Carenet.objects.filter(record=self.record)[0]
+        self.map = IdentityMap()
+
+    def tearDown(self):
+        super(IdentityMapUnitTests, self).tearDown()
+
+    def test_get(self):
+        # first lookup hits the DB, second doesn't
+        with self.assertNumQueries(1):
+            r1 = self.map.get(Record, 'id', self.record.id)
+        with self.assertNumQueries(0):
+            r2 = self.map.get(Record, 'id', self.record.id)
+        self.assertEqual(r1, self.record)
+        self.assertTrue(r1 is r2)
+        self.assertEqual(self.map.queries, 1)
+        self.assertEqual(self.map.hits, 1)
+
+        # lookups by natural key are cached too
+        with self.assertNumQueries(1):
+            a1 = self.map.get(Account, 'email', self.account.email)
+        with self.assertNumQueries(0):
+            a2 = self.map.get(Account, 'email', self.account.email)
+        self.assertTrue(a1 is a2)
+
+        # missing objects raise the usual exception
+        self.assertRaises(Record.DoesNotExist, self.map.get, Record, 'id', 'NOTAREALRECORD')
+
+    def test_links(self):
+        # Load the account first: it should become the record's owner without another query
+        account = self.map.get(Account, 'email', self.account.email)
+        record = self.map.get(Record, 'id', self.record.id)
+        with self.assertNumQueries(0):
+            self.assertTrue(record.owner is account)
+        self.assertTrue(self.map.links >= 1)
+
+        # Objects loaded by select_related are registered as well
+        carenet = self.map.get(Carenet, 'id', self.carenet.id, ('record',))
+        self.assertTrue(carenet.record is record)
+        with self.assertNumQueries(0):
+            self.assertTrue(self.map.get(Record, 'id', self.record.id) is record)
+
+    def test_parent_models(self):
+        # An Account is also a Principal
+        account = self.map.add(Account.objects.get(email=self.account.email))
+        with self.assertNumQueries(0):
+            self.assertTrue(self.map.get(Principal, 'id', self.account.id) is account)
@@ -0,0 +1,106 @@
+from indivo.tests.internal_tests import InternalTests
+from indivo.tests.data import TEST_ACCOUNTS, TEST_RECORDS, TEST_R_DOCS, TEST_ADMINAPPS
+from indivo.lib import instrumentation
+from indivo.lib.instrumentation import QueryCounter, timed, TEMPLATE, SERIALIZE
+from indivo.lib.utils import render_template_raw
+from indivo.middlewares.instrumentation import Instrumentation
+from indivo.models import Record
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.http import HttpResponse
+from django.test.client import RequestFactory
+
+import time
+
+class InstrumentationUnitTests(InternalTests):
+
+    def setUp(self):
+        super(InstrumentationUnitTests, self).setUp()
+        self.old_instrumentation = getattr(settings, 'REQUEST_INSTRUMENTATION', False)
+        self.account = self.createAccount(TEST_ACCOUNTS, 0)
+        self.record = self.createRecord(TEST_RECORDS, 0, owner=self.account)
+        self.doc = self.createDocument(TEST_R_DOCS, 0, record=self.record)
+
+    def tearDown(self):
+        settings.REQUEST_INSTRUMENTATION = self.old_instrumentation
+        instrumentation.finish_request()
+        super(InstrumentationUnitTests, self).tearDown()
+
+    def test_query_counter(self):
+        old_debug = settings.DEBUG
+        use_debug_cursor = connection.use_debug_cursor
+        settings.DEBUG = False
+        try:
+            logged = len(connection.queries)
+            counter = QueryCounter().start()
+            list(Record.objects.all())
+            Record.objects.get(id=self.record.id)
+            counter.stop()
+        finally:
+            settings.DEBUG = old_debug
+
+        self.assertEqual(counter.count, 2)
+        self.assertTrue(counter.time >= 0)
+        self.assertTrue('SELECT' in counter.queries[0]['sql'])
+
+        # We don't leave anything behind
+        self.assertEqual(len(connection.queries), logged)
+        self.assertEqual(connection.use_debug_cursor, use_debug_cursor)
+
+    def test_timed(self):
+        # Nothing to do outside of a request
+        with timed(TEMPLATE):
+            pass
+        self.assertEqual(instrumentation.current(), None)
+
+        timings = instrumentation.start_request()
+        start = time.time()
+        with timed(SERIALIZE):
+            # nested blocks aren't counted twice
+            with timed(SERIALIZE):
+                time.sleep(0.01)
+        elapsed = time.time() - start
+        self.assertTrue(0.01 <= timings.timings[SERIALIZE] <= elapsed)
+
+        render_template_raw('document', {'doc': self.doc, 'record': self.record, 'pha': None})
+        self.assertTrue(timings.timings[TEMPLATE] > 0)
+
+        self.assertEqual(instrumentation.finish_request(), timings)
+        self.assertEqual(instrumentation.current(), None)
+        self.assertTrue(timings.total >= 0.01)
+
+    def test_middleware(self):
+        settings.REQUEST_INSTRUMENTATION = False
+        self.assertRaises(MiddlewareNotUsed, Instrumentation)
+
+        settings.REQUEST_INSTRUMENTATION = True
+        middleware = Instrumentation()
+        admin_app = self.createMachineApp(TEST_ADMINAPPS, 0)
+
+        def view(request, record):
+            list(record.documents.all())
+            return HttpResponse(render_template_raw('document', {'doc': self.doc, 'record': self.record,
+                                                                 'pha': None}))
+
+        for principal, headers in ((admin_app, True), (self.account, False), (None, False)):
+            request = RequestFactory().get('/records/%s/documents/' % self.record.id)
+            request.principal = principal
+            middleware.process_request(request)
+            middleware.process_view(request, view, (), {'record': self.record})
+            response = middleware.process_response(request, view(request, self.record))
+
+            self.assertEqual(request.timings.view_name, 'view')
+            self.assertTrue(request.timings.queries >= 1)
+            self.assertEqual(response.has_header('X-Indivo-Queries'), headers)
+            self.assertEqual(response.has_header('Server-Timing'), headers)
+            if headers:
+                self.assertEqual(response['X-Indivo-Queries'], str(request.timings.queries))
+                self.assertTrue(response['Server-Timing'].startswith('db;dur='))
+                self.assertTrue(float(response['X-Indivo-Template-Time']) > 0)
+
+    def test_query_budget(self):
+        url = '/records/%s/documents/%s' % (self.record.id, self.doc.id)
+        response = self.assertQueryBudget(20, url)
+        self.assertEqual(response.status_code, 200)
+        self.assertRaises(self.failureException, self.assertQueryBudget, 0, url)
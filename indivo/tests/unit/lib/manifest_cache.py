@@ -0,0 +1,72 @@
+from indivo.tests.internal_tests import InternalTests
+from indivo.tests.data.app import TEST_USERAPPS
+from indivo.lib import manifest_cache, conditional
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest
+from django.utils import simplejson
+
+class ManifestCacheUnitTests(InternalTests):
+
+    def setUp(self):
+        super(ManifestCacheUnitTests, self).setUp()
+        self.save_and_modify_setting('APP_MANIFEST_CACHE_TIMEOUT', 300)
+        self.app = self.createUserApp(TEST_USERAPPS, 0)
+        manifest_cache.invalidate()
+
+    def tearDown(self):
+        settings.APP_MANIFEST_CACHE_TIMEOUT = self.saved_settings['APP_MANIFEST_CACHE_TIMEOUT']
+        manifest_cache.invalidate()
+        super(ManifestCacheUnitTests, self).tearDown()
+
+    def test_etag_matches(self):
+        request = HttpRequest()
+        self.assertFalse(conditional.etag_matches(request, '"a"'))
+        for header, matches in (('"a"', True), ('W/"a"', True), ('"b", "a"', True), ('*', True),
+                                ('"b"', False), ('a', False)):
+            request.META['HTTP_IF_NONE_MATCH'] = header
+            self.assertEqual(conditional.etag_matches(request, '"a"'), matches)
+
+    def test_conditional(self):
+        for url in ('/apps/', '/apps/manifests/', '/apps/%s' % self.app.email, '/apps/%s/manifest' % self.app.email):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            etag = response['ETag']
+            self.assertEqual(etag, conditional.strong_etag(response.content))
+
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.content, '')
+            self.assertEqual(response['ETag'], etag)
+
+    def test_cached(self):
+        response = self.client.get('/apps/')
+        self.assertEqual([m['id'] for m in simplejson.loads(response.content)], [self.app.email])
+        hits = manifest_cache.STATS['hits']
+        with self.assertNumQueries(0):
+            manifest_cache.get(('all', False), lambda: self.fail('Serialized again'))
+        self.assertEqual(manifest_cache.STATS['hits'], hits + 1)
+
+        # Saving an app changes the manifests, and their ETag
+        self.app.name = 'Renamed'
+        self.app.save()
+        renamed = self.client.get('/apps/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(renamed.status_code, 200)
+        self.assertEqual(simplejson.loads(renamed.content)[0]['name'], 'Renamed')
+
+        # As does deleting one
+        self.app.delete()
+        self.assertEqual(simplejson.loads(self.client.get('/apps/').content), [])
+
+    def test_other_process(self):
+        manifest_cache.get(('all', False), lambda: 'old')
+
+        # Another process invalidated the cache, through the Django cache
+        cache.set(manifest_cache.GENERATION_KEY, 'elsewhere')
+        self.assertEqual(manifest_cache.get(('all', False), lambda: 'new'), ('new', conditional.strong_etag('new')))
+
+    def test_disabled(self):
+        settings.APP_MANIFEST_CACHE_TIMEOUT = 0
+        manifest_cache.get(('all', False), lambda: 'old')
+        self.assertEqual(manifest_cache.get(('all', False), lambda: 'new')[0], 'new')
+        self.assertTrue(self.client.get('/apps/')['ETag'])
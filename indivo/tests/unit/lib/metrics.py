@@ -0,0 +1,109 @@
+from indivo.tests.internal_tests import InternalTests
+from indivo.tests.data import TEST_ACCOUNTS, TEST_ADMINAPPS, TEST_UIAPPS
+from indivo.accesscontrol.access_rule import AccessRule
+from indivo.lib import metrics, reference_data
+from indivo.lib.metrics import Registry
+from indivo.models import StatusName
+from indivo.views import get_metrics
+from django.conf import settings
+
+import os, shutil, tempfile
+
+class MetricsUnitTests(InternalTests):
+
+    def setUp(self):
+        super(MetricsUnitTests, self).setUp()
+        self.metrics_dir = tempfile.mkdtemp()
+        self.save_and_modify_setting('METRICS_DIR', None)
+
+    def tearDown(self):
+        settings.METRICS_DIR = self.saved_settings['METRICS_DIR']
+        shutil.rmtree(self.metrics_dir)
+        super(MetricsUnitTests, self).tearDown()
+
+    def test_counter_and_histogram(self):
+        registry = Registry()
+        counter = registry.counter('test_total', 'A test counter.', ('view',))
+        histogram = registry.histogram('test_seconds', 'A test histogram.', ('view',), buckets=(0.1, 1.0))
+
+        counter.inc('a')
+        counter.inc('a', amount=2)
+        counter.inc('b')
+        self.assertEqual(counter.samples(), {(u'a',): 3, (u'b',): 1})
+        self.assertRaises(ValueError, counter.inc)
+
+        for value in (0.05, 0.5, 0.5, 5.0):
+            histogram.observe(value, 'a')
+        self.assertEqual(histogram.samples(), {(u'a',): [1, 2, 1, 6.05]})
+
+        lines = registry.render().splitlines()
+        self.assertTrue('# TYPE test_total counter' in lines)
+        self.assertTrue('test_total{view="a"} 3' in lines)
+        self.assertTrue('# TYPE test_seconds histogram' in lines)
+        self.assertTrue('test_seconds_bucket{view="a",le="0.1"} 1' in lines)
+        self.assertTrue('test_seconds_bucket{view="a",le="1.0"} 3' in lines)
+        self.assertTrue('test_seconds_bucket{view="a",le="+Inf"} 4' in lines)
+        self.assertTrue('test_seconds_count{view="a"} 4' in lines)
+
+        # label values are escaped
+        counter.inc('say "hi"\n')
+        self.assertTrue('test_total{view="say \\"hi\\"\\n"} 1' in registry.render().splitlines())
+
+    def test_collectors(self):
+        reference_data.clear_all()
+        hits = reference_data.STATS['hits']
+        StatusName.cached.get('active')
+        StatusName.cached.get('active')
+        self.assertEqual(reference_data.STATS['hits'], hits + 2)
+
+        lines = metrics.REGISTRY.render().splitlines()
+        self.assertTrue('indivo_cache_requests_total{cache="reference_data",result="hit"} %s'
+                        % reference_data.STATS['hits'] in lines)
+        self.assertTrue('indivo_cache_requests_total{cache="permission",result="miss"} %s'
+                        % metrics.permission_cache.STATS['misses'] in lines)
+
+    def test_multiple_processes(self):
+        settings.METRICS_DIR = self.metrics_dir
+
+        # Two processes' worth of metrics
+        registry = Registry()
+        counter = registry.counter('test_total', 'A test counter.', ('view',))
+        histogram = registry.histogram('test_seconds', 'A test histogram.', ('view',), buckets=(1.0,))
+        counter.inc('a', amount=2)
+        histogram.observe(0.5, 'a')
+        registry.flush()
+        os.rename(os.path.join(self.metrics_dir, 'metrics-%s.json' % os.getpid()),
+                  os.path.join(self.metrics_dir, 'metrics-1.json'))
+
+        counter.inc('b')
+        histogram.observe(2.0, 'a')
+        lines = registry.render().splitlines()
+        self.assertTrue('test_total{view="a"} 4' in lines)
+        self.assertTrue('test_total{view="b"} 1' in lines)
+        self.assertTrue('test_seconds_bucket{view="a",le="1.0"} 2' in lines)
+        self.assertTrue('test_seconds_bucket{view="a",le="+Inf"} 3' in lines)
+        self.assertEqual(sorted(os.listdir(self.metrics_dir)), ['metrics-1.json', 'metrics-%s.json' % os.getpid()])
+
+        # A forked child starts counting from zero
+        registry._pid = -1
+        self.assertEqual(registry.snapshot()['test_total']['samples'], {})
+
+    def test_requests(self):
+        self.client.get('/version')
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+
+        requests = metrics.REQUESTS.samples()
+        self.assertTrue(requests[(u'get_version',)] >= 1)
+        self.assertTrue('indivo_requests_total{view="get_version"} ' in response.content)
+        self.assertTrue('indivo_request_duration_seconds_count{view="get_version"} ' in response.content)
+
+        self.client.get('/accounts/nobody@example.org')
+        self.assertTrue(metrics.REQUEST_ERRORS.samples()[(u'account_info',)] >= 1)
+
+    def test_access(self):
+        rule = AccessRule.lookup(get_metrics)
+        self.assertTrue(rule.check(self.createMachineApp(TEST_ADMINAPPS, 0)))
+        self.assertFalse(rule.check(self.createMachineApp(TEST_UIAPPS, 0)))
+        self.assertFalse(rule.check(self.createAccount(TEST_ACCOUNTS, 0)))
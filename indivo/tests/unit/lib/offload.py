@@ -0,0 +1,80 @@
+from indivo.tests.internal_tests import InternalTests
+from indivo.tests.unit.lib.concurrent_ingest import ingest
+from indivo.document_processing import offload
+from indivo.document_processing.document_processing import DocumentProcessing
+from indivo.lib import metrics
+from django.conf import settings
+
+import os
+
+SETTINGS = ('DOCUMENT_OFFLOAD_THRESHOLD', 'DOCUMENT_OFFLOAD_PROCESSES', 'DOCUMENT_OFFLOAD_TIMEOUT', 'VALIDATE_XML')
+
+class OffloadUnitTests(InternalTests):
+
+    def setUp(self):
+        super(OffloadUnitTests, self).setUp()
+        with open(os.path.join(settings.CORE_SCHEMA_DIRS[0], 'procedure/procedure.xml')) as f:
+            self.content = f.read()
+
+        # Processed locally, before any threshold is set
+        self.expected = ingest(self.content)
+
+        self.save_and_modify_setting('DOCUMENT_OFFLOAD_THRESHOLD', 100)
+        self.save_and_modify_setting('DOCUMENT_OFFLOAD_PROCESSES', 1)
+        self.save_and_modify_setting('DOCUMENT_OFFLOAD_TIMEOUT', 30)
+        self.save_and_modify_setting('VALIDATE_XML', True)
+
+    def tearDown(self):
+        offload.shutdown()
+        for name in SETTINGS:
+            setattr(settings, name, self.saved_settings[name])
+        super(OffloadUnitTests, self).tearDown()
+
+    def test_offload_p(self):
+        self.assertTrue(DocumentProcessing(self.content, 'application/xml').offload_p)
+        self.assertFalse(DocumentProcessing('<Procedure/>', 'application/xml').offload_p)
+        self.assertFalse(DocumentProcessing(self.content, 'application/pdf').offload_p)
+        self.assertFalse(DocumentProcessing(self.content.replace('Procedure', 'Unknown'), 'application/xml').offload_p)
+
+        settings.DOCUMENT_OFFLOAD_THRESHOLD = 0
+        self.assertFalse(DocumentProcessing(self.content, 'application/xml').offload_p)
+
+    def test_process(self):
+        executions = sum(metrics.OFFLOAD_EXECUTION.samples().get((), [0])[:-1])
+        successes = metrics.OFFLOADED_DOCUMENTS.samples().get(('ok',), 0)
+
+        self.assertTrue(self.expected)
+        self.assertEqual(ingest(self.content), self.expected)
+
+        # Again, with the pool already started
+        self.assertEqual(ingest(self.content), self.expected)
+
+        self.assertEqual(sum(metrics.OFFLOAD_EXECUTION.samples()[()][:-1]) - executions, 2)
+        self.assertTrue(sum(metrics.OFFLOAD_QUEUE_WAIT.samples()[()][:-1]) >= 2)
+        self.assertEqual(metrics.OFFLOADED_DOCUMENTS.samples()[('ok',)] - successes, 2)
+
+    def test_start(self):
+        settings.DOCUMENT_OFFLOAD_THRESHOLD = 0
+        offload.start()
+        self.assertEqual(offload._pool, None)
+
+        settings.DOCUMENT_OFFLOAD_THRESHOLD = 100
+        offload.start()
+        pool = offload._pool
+        self.assertTrue(pool)
+        self.assertEqual(ingest(self.content), self.expected)
+        self.assertTrue(offload._pool is pool)
+
+    def test_invalid(self):
+        invalid = self.content.replace('</Procedure>', '<notAnElement/></Procedure>')
+        self.assertRaises(ValueError, ingest, invalid)
+        self.assertTrue(metrics.OFFLOADED_DOCUMENTS.samples()[('invalid',)] >= 1)
+
+        # Unless we're not validating
+        settings.VALIDATE_XML = False
+        ingest(invalid)
+
+    def test_timeout(self):
+        settings.DOCUMENT_OFFLOAD_TIMEOUT = 0.000001
+        self.assertRaises(ValueError, ingest, self.content)
+        self.assertTrue(metrics.OFFLOADED_DOCUMENTS.samples()[('timeout',)] >= 1)
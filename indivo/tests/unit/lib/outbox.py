@@ -0,0 +1,143 @@
+from indivo.tests.internal_tests import InternalTests
+from indivo.lib import outbox, utils
+from indivo.models import OutboxEmail
+from django.conf import settings
+from django.core import mail
+
+import asyncore
+import datetime
+import smtpd
+import socket
+import threading
+
+SETTINGS = ('SEND_MAIL', 'EMAIL_OUTBOX', 'EMAIL_OUTBOX_MAX_ATTEMPTS', 'EMAIL_OUTBOX_RETRY_DELAY')
+
+class CountingSMTPServer(smtpd.SMTPServer):
+    """ A local SMTP server that keeps what it receives, and counts the connections it gets. """
+
+    def __init__(self):
+        smtpd.SMTPServer.__init__(self, ('127.0.0.1', 0), None)
+        self.port = self.socket.getsockname()[1]
+        self.connections = 0
+        self.messages = []
+
+    def handle_accept(self):
+        self.connections += 1
+        smtpd.SMTPServer.handle_accept(self)
+
+    def process_message(self, peer, mailfrom, rcpttos, data):
+        self.messages.append((mailfrom, rcpttos, data))
+
+class BrokenConnection(object):
+    """ A mail connection that opens, but fails to send, or to close. """
+
+    def open(self):
+        pass
+
+    def send_messages(self, messages):
+        raise socket.error('connection reset')
+
+    def close(self):
+        raise socket.error('connection reset')
+
+def unused_port():
+    s = socket.socket()
+    s.bind(('127.0.0.1', 0))
+    port = s.getsockname()[1]
+    s.close()
+    return port
+
+class OutboxUnitTests(InternalTests):
+
+    def setUp(self):
+        super(OutboxUnitTests, self).setUp()
+        self.save_and_modify_setting('SEND_MAIL', True)
+        self.save_and_modify_setting('EMAIL_OUTBOX', True)
+        self.save_and_modify_setting('EMAIL_OUTBOX_MAX_ATTEMPTS', 2)
+        self.save_and_modify_setting('EMAIL_OUTBOX_RETRY_DELAY', 60)
+        mail.outbox = []
+
+        self.server = CountingSMTPServer()
+        self.server_thread = threading.Thread(target=asyncore.loop, kwargs={'timeout': 0.1, 'map': None})
+        self.server_thread.daemon = True
+        self.server_thread.start()
+
+    def tearDown(self):
+        self.server.close()
+        self.server_thread.join(5)
+        for name in SETTINGS:
+            setattr(settings, name, self.saved_settings[name])
+        super(OutboxUnitTests, self).tearDown()
+
+    def connection(self, port=None):
+        return mail.get_connection('django.core.mail.backends.smtp.EmailBackend',
+                                   host='127.0.0.1', port=port or self.server.port)
+
+    def test_enqueue(self):
+        utils.send_mail('subject', 'body', 'from@example.org', ['to@example.org', 'cc@example.org'])
+        self.assertEqual(mail.outbox, [])
+
+        email = OutboxEmail.objects.get()
+        self.assertEqual((email.subject, email.status, email.attempts), ('subject', OutboxEmail.QUEUED, 0))
+        self.assertEqual(email.recipient_list, ['to@example.org', 'cc@example.org'])
+
+        # Not while the outbox is off
+        settings.EMAIL_OUTBOX = False
+        utils.send_mail('subject', 'body', 'from@example.org', ['to@example.org'])
+        self.assertEqual(OutboxEmail.objects.count(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_deliver(self):
+        outbox.enqueue_many([('subject %s' % i, 'body', 'from@example.org', ['to%s@example.org' % i])
+                             for i in range(5)])
+
+        self.assertEqual(outbox.deliver(batch_size=3, connection=self.connection()), (3, 0))
+        self.assertEqual(outbox.deliver(batch_size=3, connection=self.connection()), (2, 0))
+        self.assertEqual(outbox.deliver(batch_size=3, connection=self.connection()), (0, 0))
+
+        # One connection per batch
+        self.assertEqual(self.server.connections, 2)
+        self.assertEqual(sorted(rcpttos for mailfrom, rcpttos, data in self.server.messages),
+                         [['to%s@example.org' % i] for i in range(5)])
+        self.assertEqual(OutboxEmail.objects.filter(status=OutboxEmail.SENT).count(), 5)
+
+        # Sent emails are purged once they're old enough
+        self.assertEqual(outbox.purge(1), 0)
+        OutboxEmail.objects.update(sent_at=datetime.datetime.now() - datetime.timedelta(days=2))
+        self.assertEqual(outbox.purge(1), 5)
+
+    def test_retry(self):
+        outbox.enqueue('subject', 'body', 'from@example.org', ['to@example.org'])
+        down = self.connection(port=unused_port())
+
+        self.assertEqual(outbox.deliver(connection=down), (0, 1))
+        email = OutboxEmail.objects.get()
+        self.assertEqual((email.status, email.attempts), (OutboxEmail.QUEUED, 1))
+        self.assertTrue(email.last_error)
+        self.assertTrue(email.next_attempt_at > datetime.datetime.now() + datetime.timedelta(seconds=50))
+
+        # Not due yet
+        self.assertEqual(outbox.deliver(connection=down), (0, 0))
+        self.assertEqual(outbox.retry_delay(1), 60)
+        self.assertEqual(outbox.retry_delay(3), 240)
+
+        # Given up on, after EMAIL_OUTBOX_MAX_ATTEMPTS
+        OutboxEmail.objects.update(next_attempt_at=datetime.datetime.now())
+        self.assertEqual(outbox.deliver(connection=down), (0, 1))
+        self.assertEqual(OutboxEmail.objects.get().status, OutboxEmail.FAILED)
+        self.assertEqual(self.server.messages, [])
+
+    def test_broken_connection(self):
+        # A connection that can't even be closed after a failed send doesn't stop the batch
+        outbox.enqueue_many([('subject', 'body', 'from@example.org', ['to@example.org'])] * 2)
+        self.assertEqual(outbox.deliver(connection=BrokenConnection()), (0, 2))
+        self.assertEqual(OutboxEmail.objects.filter(attempts=1).count(), 2)
+
+    def test_claim(self):
+        outbox.enqueue_many([('subject', 'body', 'from@example.org', ['to@example.org'])] * 3)
+
+        # A second worker doesn't get the emails the first has claimed
+        now = datetime.datetime.now()
+        self.assertEqual(len(outbox.claim(2, now=now)), 2)
+        self.assertEqual(len(outbox.claim(5, now=now)), 1)
+        self.assertEqual(outbox.claim(5, now=now), [])
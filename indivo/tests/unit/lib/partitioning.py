@@ -0,0 +1,85 @@
+from indivo.tests.internal_tests import InternalTests
+from indivo.lib.partitioning import MonthlyPartitions, month_start, next_month, months_between
+from indivo.models import Audit
+from django.core.management import call_command
+from django.utils import simplejson
+import datetime
+import gzip
+import os
+import shutil
+import tempfile
+
+class PartitioningUnitTests(InternalTests):
+
+    def setUp(self):
+        super(PartitioningUnitTests, self).setUp()
+        self.partitions = MonthlyPartitions('indivo_audit', 'datetime')
+        self.archive_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.archive_dir)
+        super(PartitioningUnitTests, self).tearDown()
+
+    def test_months(self):
+        dt = datetime.datetime(2011, 12, 17, 13, 45)
+        self.assertEqual(month_start(dt), datetime.datetime(2011, 12, 1))
+        self.assertEqual(next_month(dt), datetime.datetime(2012, 1, 1))
+
+        months = list(months_between(dt, datetime.datetime(2012, 2, 1)))
+        self.assertEqual(months, [datetime.datetime(2011, 12, 1), datetime.datetime(2012, 1, 1)])
+
+    def test_partition_names(self):
+        dt = datetime.datetime(2011, 3, 17, 13, 45)
+        name = self.partitions.partition_name(dt)
+        self.assertEqual(name, 'indivo_audit_y2011m03')
+        self.assertEqual(self.partitions.parse_partition_name(name), datetime.datetime(2011, 3, 1))
+
+        # Tables that aren't our partitions should be ignored
+        self.assertEqual(self.partitions.parse_partition_name('indivo_auditfoo'), None)
+        self.assertEqual(self.partitions.parse_partition_name('indivo_audit_yabcmde'), None)
+
+    def test_save(self):
+        # Saved audits get an id, whether or not the insert was routed to a partition
+        audit = Audit.objects.create(datetime=datetime.datetime(2011, 1, 15), request_successful=True, record_id='abc')
+        self.assertNotEqual(audit.id, None)
+        self.assertEqual(Audit.objects.get(id=audit.id).record_id, 'abc')
+        self.assertEqual(Audit.objects.filter(record_id='abc').count(), 1)
+
+    def test_prune(self):
+        qs = Audit.objects.filter(record_id='abc')
+
+        # No bounds: queryset is unchanged
+        self.assertEqual(self.partitions.prune(qs), qs)
+
+        # Pruned querysets must return the same results
+        start = datetime.datetime(2011, 1, 1)
+        end = datetime.datetime(2011, 2, 1)
+        Audit.objects.create(datetime=datetime.datetime(2011, 1, 15), request_successful=True, record_id='abc')
+        Audit.objects.create(datetime=datetime.datetime(2011, 3, 15), request_successful=True, record_id='abc')
+        filtered = qs.filter(datetime__gte=start, datetime__lte=end)
+        self.assertEqual(list(self.partitions.prune(filtered, start, end)), list(filtered))
+
+        # Bounds must be dates
+        self.assertRaises(ValueError, self.partitions._literal, "2011-01-01'; DROP TABLE indivo_audit; --")
+
+    def test_archive_audits(self):
+        now = datetime.datetime.utcnow()
+        old = month_start(now) - datetime.timedelta(days=400)
+        for i in range(3):
+            Audit.objects.create(datetime=old + datetime.timedelta(hours=i), request_successful=True,
+                                 record_id='abc', view_func='record')
+        recent = Audit.objects.create(datetime=now, request_successful=True, record_id='abc')
+
+        call_command('archive_audits', output_dir=self.archive_dir, months=12)
+
+        # Old audits are gone, recent ones remain
+        self.assertEqual(list(Audit.objects.filter(record_id='abc')), [recent])
+
+        # And the old ones were written out, one per line
+        filename = os.path.join(self.archive_dir, '%s.ndjson.gz' % self.partitions.partition_name(old))
+        lines = gzip.open(filename, 'rb').read().splitlines()
+        self.assertEqual(len(lines), 3)
+        for line in lines:
+            audit = simplejson.loads(line)
+            self.assertEqual(audit['record_id'], 'abc')
+            self.assertEqual(audit['view_func'], 'record')
@@ -0,0 +1,73 @@
+from indivo.tests.internal_tests import InternalTests
+from indivo.tests.data import TEST_ACCOUNTS, TEST_RECORDS, TEST_USERAPPS
+from indivo.lib import permission_cache
+from indivo.models import Carenet
+from django.conf import settings
+
+class PermissionCacheUnitTests(InternalTests):
+
+    def setUp(self):
+        super(PermissionCacheUnitTests, self).setUp()
+        self.old_ttl = getattr(settings, 'PERMISSION_CACHE_TTL', 0)
+        settings.PERMISSION_CACHE_TTL = 60
+
+        self.owner = self.createAccount(TEST_ACCOUNTS, 0)
+        self.account = self.createAccount(TEST_ACCOUNTS, 1)
+        self.record = self.createRecord(TEST_RECORDS, 0, owner=self.owner)
+        self.carenet = Carenet.objects.filter(record=self.record)[0]
+        self.app = self.createUserApp(TEST_USERAPPS, 0)
+
+    def tearDown(self):
+        settings.PERMISSION_CACHE_TTL = self.old_ttl
+        super(PermissionCacheUnitTests, self).tearDown()
+
+    def test_account_full_share(self):
+        self.assertFalse(self.account.fullySharesRecord(self.record))
+
+        # Answer is cached
+        with self.assertNumQueries(0):
+            self.assertFalse(self.account.fullySharesRecord(self.record))
+
+        # Adding a share invalidates the cache
+        share = self.shareRecordFull(self.record, self.account)
+        self.assertTrue(self.account.fullySharesRecord(self.record))
+        with self.assertNumQueries(0):
+            self.assertTrue(self.account.fullySharesRecord(self.record))
+
+        # And so does removing it
+        share.delete()
+        self.assertFalse(self.account.fullySharesRecord(self.record))
+
+    def test_account_carenet(self):
+        self.assertFalse(self.account.isInCarenet(self.carenet))
+        ca = self.addAccountToCarenet(self.account, self.carenet)
+        self.assertTrue(self.account.isInCarenet(self.carenet))
+        ca.delete()
+        self.assertFalse(self.account.isInCarenet(self.carenet))
+
+    def test_pha(self):
+        self.assertFalse(self.app.scopedToRecord(self.record))
+        self.assertFalse(self.app.isInCarenet(self.carenet))
+
+        self.addAppToCarenet(self.app, self.carenet)
+        self.assertTrue(self.app.scopedToRecord(self.record))
+        self.assertTrue(self.app.isInCarenet(self.carenet))
+        with self.assertNumQueries(0):
+            self.assertTrue(self.app.scopedToRecord(self.record))
+            self.assertTrue(self.app.isInCarenet(self.carenet))
+
+    def test_expiry(self):
+        self.assertFalse(self.account.fullySharesRecord(self.record))
+
+        # Expired entries are reloaded
+        expires, answers = permission_cache._CACHE[self.account.id]
+        permission_cache._CACHE[self.account.id] = (0, answers)
+        with self.assertNumQueries(1):
+            self.assertFalse(self.account.fullySharesRecord(self.record))
+
+    def test_disabled(self):
+        settings.PERMISSION_CACHE_TTL = 0
+        self.assertFalse(self.account.fullySharesRecord(self.record))
+        with self.assertNumQueries(1):
+            self.assertFalse(self.account.fullySharesRecord(self.record))
+        self.assertFalse(permission_cache._CACHE.has_key(self.account.id))
@@ -0,0 +1,78 @@
+from indivo.tests.internal_tests import InternalTests
+from indivo.lib.synthetic_data import SyntheticDataGenerator, EMAIL_DOMAIN
+from indivo.models import *
+from django.utils import simplejson
+
+from lxml import etree
+import datetime
+
+class PopulationUnitTests(InternalTests):
+
+    def setUp(self):
+        super(PopulationUnitTests, self).setUp()
+        generator = SyntheticDataGenerator(3, seed=11, as_of=datetime.datetime(2012, 1, 1), with_documents=True,
+                                           distribution={'VitalSigns': 8})
+        generator.create_records(range(3))
+        generator.fill_records(range(3))
+        self.records = list(Record.objects.filter(owner__email__endswith=EMAIL_DOMAIN).order_by('id'))
+
+    def tearDown(self):
+        super(PopulationUnitTests, self).tearDown()
+
+    def get(self, **params):
+        return self.client.get('/population/VitalSigns/', params)
+
+    def test_all_records(self):
+        response = self.get(aggregate_by='count*date')
+        self.assertEqual(response.status_code, 200)
+        reports = simplejson.loads(response.content)
+        self.assertEqual(len(reports), 1)
+        self.assertEqual(reports[0]['__modelname__'], 'AggregateReport')
+        self.assertEqual(reports[0]['value'], VitalSigns.objects.count())
+
+    def test_record_ids(self):
+        record_ids = [r.id for r in self.records[:2]]
+        response = self.get(aggregate_by='count*date', record_id='|'.join(record_ids))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(simplejson.loads(response.content)[0]['value'],
+                         VitalSigns.objects.filter(record__in=record_ids).count())
+
+    def test_grouping(self):
+        response = self.get(aggregate_by='count*date', group_by='weight_unit')
+        self.assertEqual(response.status_code, 200)
+        groups = dict((r['group'], r['value']) for r in simplejson.loads(response.content))
+        for unit, count in groups.iteritems():
+            if unit is not None:
+                self.assertEqual(count, VitalSigns.objects.filter(weight_unit=unit).count())
+        self.assertEqual(sum(groups.values()), VitalSigns.objects.count())
+
+        response = self.get(aggregate_by='count*date', date_group='date*year',
+                            response_format='application/xml')
+        self.assertEqual(response.status_code, 200)
+        reports = etree.XML(response.content).findall('AggregateReport')
+        self.assertEqual(sum(int(r.get('value')) for r in reports), VitalSigns.objects.count())
+        for report in reports:
+            self.assertEqual(int(report.get('value')),
+                             VitalSigns.objects.filter(date__year=int(report.get('group'))).count())
+
+    def test_timeout(self):
+        response = self.get(aggregate_by='count*date', timeout='5')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(simplejson.loads(response.content)[0]['value'], VitalSigns.objects.count())
+
+    def test_limit(self):
+        # Groups aren't paged by default, only when asked to be
+        response = self.get(aggregate_by='count*date', date_group='date*day')
+        days = VitalSigns.objects.dates('date', 'day').count()
+        self.assertEqual(len(simplejson.loads(response.content)), days)
+        self.assertTrue(days > 1)
+        response = self.get(aggregate_by='count*date', date_group='date*day', limit='1')
+        self.assertEqual(len(simplejson.loads(response.content)), 1)
+
+    def test_invalid(self):
+        # Population queries must aggregate
+        self.assertEqual(self.get().status_code, 400)
+        self.assertEqual(self.get(aggregate_by='count*date', timeout='-1').status_code, 400)
+        self.assertEqual(self.get(aggregate_by='count*date', timeout='soon').status_code, 400)
+        self.assertEqual(self.get(aggregate_by='count*date', no_such_field='x').status_code, 400)
+        self.assertEqual(self.client.get('/population/NoSuchModel/', {'aggregate_by': 'count*date'}).status_code, 404)
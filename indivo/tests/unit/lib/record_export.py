@@ -0,0 +1,120 @@
+from indivo.tests.internal_tests import InternalTests
+from indivo.tests.data import TEST_ACCOUNTS, TEST_RECORDS, TEST_R_DOCS
+from indivo.lib.record_export import RecordExporter, NDJSON, ZIP
+from indivo.lib.synthetic_data import SyntheticDataGenerator, EMAIL_DOMAIN
+from indivo.models import *
+from django.utils import simplejson
+
+import base64, datetime, zipfile
+from StringIO import StringIO
+
+class RecordExportUnitTests(InternalTests):
+
+    def setUp(self):
+        super(RecordExportUnitTests, self).setUp()
+        self.account = self.createAccount(TEST_ACCOUNTS, 0)
+        self.record = self.createRecord(TEST_RECORDS, 0, owner=self.account)
+
+        self.doc = self.createDocument(TEST_R_DOCS, 0, record=self.record)
+        self.other_doc = self.createDocument(TEST_R_DOCS, 1, record=self.record)
+        self.binary_doc = self.createDocument(TEST_R_DOCS, 11, record=self.record)
+        self.new_version = Document(record=self.record, creator=self.account, content=self.doc.content,
+                                    replaces=self.doc, original=self.doc)
+        self.new_version.save()
+        annotation = DocumentSchema.objects.get(type=DocumentSchema.expand_rel('annotation'))
+        self.relateDocs(self.other_doc, self.new_version, annotation)
+
+        # Somebody else's document
+        other_record = self.createRecord(TEST_RECORDS, 1, owner=self.account)
+        self.createDocument(TEST_R_DOCS, 2, record=other_record)
+
+    def tearDown(self):
+        super(RecordExportUnitTests, self).tearDown()
+
+    def parse_ndjson(self, data):
+        return [simplejson.loads(line) for line in data.splitlines()]
+
+    def test_ndjson(self):
+        # Small batches, to make sure we page through everything
+        items = self.parse_ndjson(''.join(RecordExporter(self.record, format=NDJSON, batch_size=2)))
+        self.assertEqual(items[0]['type'], 'record')
+        self.assertEqual(items[0]['id'], self.record.id)
+        self.assertEqual(items[0]['owner'], self.account.email)
+
+        docs = dict((item['id'], item) for item in items if item['type'] == 'document')
+        self.assertEqual(sorted(docs.keys()), sorted(d.id for d in Document.objects.filter(record=self.record)))
+        self.assertEqual(docs[self.doc.id]['content'], self.doc.content)
+        self.assertEqual(docs[self.doc.id]['replaced_by_id'], self.new_version.id)
+        self.assertEqual(docs[self.new_version.id]['replaces_id'], self.doc.id)
+        self.assertEqual(docs[self.doc.id]['creator'], self.doc.creator.email)
+
+        binary = docs[self.binary_doc.id]
+        self.assertEqual(binary['mime_type'], 'image/gif')
+        self.binary_doc.content_file.open()
+        self.assertEqual(base64.b64decode(binary['content_base64']), self.binary_doc.content_file.read())
+        self.binary_doc.content_file.close()
+
+        rels = [item for item in items if item['type'] == 'relationship']
+        self.assertEqual(len(rels), 1)
+        self.assertEqual(rels[0]['document_id'], self.other_doc.id)
+        self.assertEqual(rels[0]['related_document_id'], self.new_version.id)
+        self.assertEqual(rels[0]['relationship'], DocumentSchema.expand_rel('annotation'))
+
+        # No facts unless asked for
+        self.assertFalse([item for item in items if item['type'] == 'fact'])
+
+    def test_zip(self):
+        archive = zipfile.ZipFile(StringIO(''.join(RecordExporter(self.record, format=ZIP, batch_size=2))))
+        self.assertEqual(archive.testzip(), None)
+        names = archive.namelist()
+        self.assertEqual(simplejson.loads(archive.read('record.json'))['id'], self.record.id)
+        self.assertEqual(sorted(n for n in names if n.startswith('documents/')),
+                         ['documents/00001.ndjson', 'documents/00002.ndjson'])
+
+        docs = []
+        for name in names:
+            if name.startswith('documents/'):
+                docs.extend(self.parse_ndjson(archive.read(name)))
+        self.assertEqual(len(docs), 4)
+        for doc in docs:
+            self.assertFalse(doc.has_key('content'))
+            self.assertEqual(doc['content_path'], 'content/%s' % doc['id'])
+        self.assertEqual(archive.read('content/%s' % self.doc.id), self.doc.content)
+
+        rels = []
+        for name in names:
+            if name.startswith('relationships/'):
+                rels.extend(self.parse_ndjson(archive.read(name)))
+        self.assertEqual([r['related_document_id'] for r in rels], [self.new_version.id])
+
+    def test_facts(self):
+        generator = SyntheticDataGenerator(1, seed=3, as_of=datetime.datetime(2012, 1, 1), with_documents=True,
+                                           distribution={'LabResult': 5, 'Audit': 5})
+        generator.create_records([0])
+        generator.fill_records([0])
+        record = Record.objects.get(owner__email__endswith=EMAIL_DOMAIN)
+
+        items = self.parse_ndjson(''.join(RecordExporter(record, format=NDJSON, include_facts=True, batch_size=3)))
+        facts = [item for item in items if item['type'] == 'fact']
+        self.assertEqual(sorted(f['id'] for f in facts),
+                         sorted(Fact.objects.filter(record=record).values_list('id', flat=True)))
+        for fact in facts:
+            self.assertEqual(Fact.objects.get(id=fact['id']).document_id, fact['__documentid__'])
+
+        archive = zipfile.ZipFile(StringIO(''.join(RecordExporter(record, format=ZIP, include_facts=True))))
+        self.assertTrue([name for name in archive.namelist() if name.startswith('facts/')])
+
+    def test_view(self):
+        response = self.client.get('/records/%s/export' % self.record.id)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertTrue(self.record.id in response['Content-Disposition'])
+        self.assertEqual(self.parse_ndjson(response.content)[0]['type'], 'record')
+
+        response = self.client.get('/records/%s/export' % self.record.id, {'format': 'zip', 'facts': 'true'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        self.assertTrue('record.json' in zipfile.ZipFile(StringIO(response.content)).namelist())
+
+        response = self.client.get('/records/%s/export' % self.record.id, {'format': 'tar'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,55 @@
+from indivo.tests.internal_tests import InternalTests
+from indivo.models import StatusName, DocumentSchema, AuthSystem
+
+class ReferenceDataUnitTests(InternalTests):
+
+    def setUp(self):
+        super(ReferenceDataUnitTests, self).setUp()
+
+    def tearDown(self):
+        super(ReferenceDataUnitTests, self).tearDown()
+
+    def test_get(self):
+        active = StatusName.objects.get(name='active')
+
+        # One query loads the whole table, after which lookups are free
+        with self.assertNumQueries(1):
+            self.assertEqual(StatusName.cached.get('active'), active)
+        with self.assertNumQueries(0):
+            self.assertEqual(StatusName.cached.get('active'), active)
+            self.assertEqual(StatusName.cached.get('archived'), StatusName.objects.get(name='archived'))
+
+        # Missing rows raise the usual exception
+        self.assertRaises(StatusName.DoesNotExist, StatusName.cached.get, 'NOTASTATUS')
+
+    def test_invalidation(self):
+        StatusName.cached.load()
+
+        # Saving a row drops the cache, so we see changes
+        s = StatusName.objects.create(id=1000, name='teststatus')
+        self.assertEqual(StatusName.cached.get('teststatus'), s)
+
+        s.delete()
+        self.assertRaises(StatusName.DoesNotExist, StatusName.cached.get, 'teststatus')
+
+    def test_new_rows(self):
+        schema = DocumentSchema.objects.create(type='http://indivo.org/vocab/xml/documents#TestSchema')
+
+        # Pretend the row was added by another process, after we loaded the table
+        DocumentSchema.cached.load()
+        DocumentSchema.cached._rows.pop(schema.type)
+
+        # So we have to find it in the DB, but only once
+        with self.assertNumQueries(1):
+            self.assertEqual(DocumentSchema.cached.get(schema.type), schema)
+        with self.assertNumQueries(0):
+            self.assertEqual(DocumentSchema.cached.get(schema.type), schema)
+
+    def test_password_authsystem(self):
+        # Created on first use if necessary
+        password = AuthSystem.PASSWORD()
+        self.assertEqual(password, AuthSystem.objects.get(short_name='password'))
+
+        AuthSystem.cached.load()
+        with self.assertNumQueries(0):
+            self.assertEqual(AuthSystem.PASSWORD(), password)
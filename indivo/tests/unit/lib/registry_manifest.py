@@ -0,0 +1,96 @@
+from indivo.tests.internal_tests import InternalTests
+from indivo.tests.data import TEST_DOCUMENT_PROCESSING_DOCS
+from indivo.data_models import IndivoDataModelLoader
+from indivo.document_processing import IndivoSchemaLoader, LazyXMLSchema, LazyXSLT
+from indivo.lib.registry_manifest import Manifest
+from django.conf import settings
+
+from lxml import etree
+from StringIO import StringIO
+import os
+import shutil
+import tempfile
+
+SDML = '[{"__modelname__": "%s", "name": "String"}]'
+
+class RegistryManifestUnitTests(InternalTests):
+
+    def setUp(self):
+        super(RegistryManifestUnitTests, self).setUp()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.manifest_path = os.path.join(self.tmp_dir, 'manifest.json')
+        self.models_dir = os.path.join(self.tmp_dir, 'models')
+        self.add_model('First')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+        super(RegistryManifestUnitTests, self).tearDown()
+
+    def add_model(self, name):
+        model_dir = os.path.join(self.models_dir, name.lower())
+        os.makedirs(model_dir)
+        with open(os.path.join(model_dir, 'model.sdml'), 'w') as f:
+            f.write(SDML % name)
+
+        # Make sure the directory looks changed, however coarse the filesystem's clock
+        mtime = os.path.getmtime(self.models_dir) + 10
+        os.utime(self.models_dir, (mtime, mtime))
+
+    def test_manifest(self):
+        manifest = Manifest(self.manifest_path)
+        self.assertEqual(manifest.get('key'), None)
+        manifest.put('key', ['found'], [self.models_dir])
+        manifest.save()
+
+        manifest = Manifest(self.manifest_path)
+        self.assertEqual(manifest.get('key'), ['found'])
+
+        # Stale once the directory changes
+        self.add_model('Second')
+        self.assertEqual(manifest.get('key'), None)
+
+        # A broken manifest is ignored
+        with open(self.manifest_path, 'w') as f:
+            f.write('{not json')
+        self.assertEqual(Manifest(self.manifest_path).get('key'), None)
+
+    def test_data_models(self):
+        loader = IndivoDataModelLoader(self.models_dir, manifest=Manifest(self.manifest_path))
+        found = loader.find_model_dirs()
+        self.assertEqual(found, [(os.path.join(self.models_dir, 'first'), 'model', '.sdml')])
+
+        # A new process reads it from the manifest
+        manifest = Manifest(self.manifest_path)
+        self.assertEqual(manifest.get('data_models:%s' % self.models_dir), [list(f) for f in found])
+        self.assertEqual(IndivoDataModelLoader(self.models_dir, manifest=manifest).find_model_dirs(), found)
+
+        # Until there's a new model
+        self.add_model('Second')
+        loader = IndivoDataModelLoader(self.models_dir, manifest=Manifest(self.manifest_path))
+        self.assertEqual(sorted(os.path.basename(d) for d, fileroot, ext in loader.find_model_dirs()),
+                         ['first', 'second'])
+
+    def test_schemas(self):
+        schema_dir = settings.CORE_SCHEMA_DIRS[0]
+        expected = sorted(fqn for fqn, validation_func, transform in IndivoSchemaLoader(schema_dir).discover_schema_dirs())
+
+        IndivoSchemaLoader(schema_dir, manifest=Manifest(self.manifest_path)).find_schema_dirs()
+        manifest = Manifest(self.manifest_path)
+        self.assertTrue(manifest.get('schemas:%s' % schema_dir))
+        loader = IndivoSchemaLoader(schema_dir, manifest=manifest)
+        self.assertEqual(sorted(fqn for fqn, validation_func, transform in loader.discover_schema_dirs()), expected)
+
+    def test_lazy_compile(self):
+        loader = IndivoSchemaLoader(os.path.join(settings.APP_HOME, 'indivo/tests/schemas/test'))
+        fqn, validation_func, transform = list(loader.discover_schema_dirs())[0]
+        self.assertTrue(isinstance(validation_func, LazyXMLSchema))
+        self.assertFalse(validation_func.is_compiled)
+
+        # Compiled on first use
+        validation_func(etree.parse(StringIO(TEST_DOCUMENT_PROCESSING_DOCS[0])))
+        self.assertTrue(validation_func.is_compiled)
+        self.assertTrue(isinstance(validation_func.compiled, etree.XMLSchema))
+        self.assertRaises(etree.DocumentInvalid, validation_func, etree.parse(StringIO('<Bad/>')))
+
+        if isinstance(getattr(transform, 'to_sdmx', None), LazyXSLT):
+            self.assertFalse(transform.to_sdmx.is_compiled)
@@ -0,0 +1,109 @@
+from indivo.tests.internal_tests import InternalTests
+from indivo.tests.data.account import TEST_ACCOUNTS
+from indivo.tests.data.record import TEST_RECORDS
+from indivo.lib import search
+from indivo.models import *
+from django.conf import settings
+
+class SearchUnitTests(InternalTests):
+
+    def setUp(self):
+        super(SearchUnitTests, self).setUp()
+        self.accounts = [self.createAccount(TEST_ACCOUNTS, i, fullname=name, contact_email=email)
+                         for i, (name, email) in enumerate([('Ann Smith', 'ann@example.org'),
+                                                            ('Smithers', 'smithers@example.org'),
+                                                            ('Joan Blacksmith', 'joan@smith.example.org'),
+                                                            ('Smith', 'js@example.org')])]
+        self.save_and_modify_setting('SEARCH_MAX_CANDIDATES', 1000)
+
+    def tearDown(self):
+        settings.SEARCH_MAX_CANDIDATES = self.saved_settings['SEARCH_MAX_CANDIDATES']
+        super(SearchUnitTests, self).tearDown()
+
+    def names(self, accounts):
+        return [account.full_name for account in accounts]
+
+    def test_trigrams(self):
+        self.assertEqual(search.trigrams('Abcd'), set(['abc', 'bcd', 'cd ', 'd  ']))
+        self.assertEqual(search.trigrams(''), set())
+        self.assertEqual(search.trigrams(None), set())
+        self.assertEqual(search.starts('Ann Smith-Jones'), (set(['ann']), set(['ann', 'smi', 'jon'])))
+        self.assertEqual(search.starts('Jo'), (set(['jo ']), set(['jo '])))
+        self.assertEqual(search.starts(''), (set(), set()))
+
+    def test_search(self):
+        # Ranked: exact, prefix, word, then any match; shorter fields first
+        total, accounts = search.search(Account, {'full_name': 'smith'})
+        self.assertEqual(total, 4)
+        self.assertEqual(self.names(accounts), ['Smith', 'Smithers', 'Ann Smith', 'Joan Blacksmith'])
+
+        # Paged
+        total, accounts = search.search(Account, {'full_name': 'smith'}, offset=1, limit=2)
+        self.assertEqual(total, 4)
+        self.assertEqual(self.names(accounts), ['Smithers', 'Ann Smith'])
+
+        # Fields ORed together, ranked by the best match
+        total, accounts = search.search(Account, {'full_name': 'joan', 'contact_email': 'n@ex'})
+        self.assertEqual(self.names(accounts), ['Joan Blacksmith', 'Ann Smith'])
+
+        # Short terms, and terms across words
+        self.assertEqual(search.search(Account, {'full_name': 'th'})[0], 4)
+        self.assertEqual(self.names(search.search(Account, {'full_name': 'rs'})[1]), ['Smithers'])
+        self.assertEqual(self.names(search.search(Account, {'full_name': 'n s'})[1]), ['Ann Smith'])
+        self.assertEqual(search.search(Account, {'full_name': 'smythe'}), (0, []))
+
+    def test_broad(self):
+        # Terms with too many candidates to rank them all are answered with the best the index finds,
+        # as many as the page needs, and a total counted in the index
+        settings.SEARCH_MAX_CANDIDATES = 2
+        self.assertEqual(search.candidates(Account, 'full_name', 'smith'), None)
+        total, accounts = search.search(Account, {'full_name': 'smith'}, limit=2)
+        self.assertEqual(total, 4)
+        self.assertEqual(self.names(accounts), ['Smith', 'Smithers'])
+
+        # Fields that start with the term, then words that do, then any others
+        total, accounts = search.search(Account, {'full_name': 's'}, limit=2)
+        self.assertEqual(total, 4)
+        self.assertEqual(self.names(accounts), ['Smith', 'Smithers'])
+        self.assertEqual(self.names(search.search(Account, {'full_name': 's'}, offset=2, limit=1)[1]), ['Ann Smith'])
+        self.assertEqual(len(search.best_candidates(Account, 'full_name', 's', 3)), 3)
+        self.assertEqual(set(search.best_candidates(Account, 'full_name', 'j')),
+                         set([self.accounts[2].pk]))
+        self.assertEqual(set(search.best_candidates(Account, 'full_name', 'smith', 2)),
+                         set([self.accounts[1].pk, self.accounts[3].pk]))
+
+        # Without a limit, every match is ranked
+        self.assertEqual(self.names(search.search(Account, {'full_name': 's', 'contact_email': 'joan'})[1]),
+                         ['Smith', 'Smithers', 'Joan Blacksmith', 'Ann Smith'])
+
+    def test_maintained(self):
+        account = self.accounts[0]
+        account.full_name = 'Ann Jones'
+        account.save()
+        self.assertEqual(self.names(search.search(Account, {'full_name': 'jones'})[1]), ['Ann Jones'])
+        self.assertEqual(search.search(Account, {'full_name': 'smith'})[0], 3)
+
+        # Saves that don't change the searchable fields leave the index alone
+        indexed = set(SearchTrigram.objects.values_list('id', flat=True))
+        account = Account.objects.get(pk=account.pk)
+        account.total_login_count += 1
+        account.save()
+        self.assertEqual(set(SearchTrigram.objects.values_list('id', flat=True)), indexed)
+
+        record = self.createRecord(TEST_RECORDS, 0, label='Ann Jones')
+        self.assertEqual(search.search(Record, {'label': 'ann j'})[1], [record])
+
+        # Deleted objects leave the index
+        record_id = record.id
+        record.delete()
+        self.assertFalse(SearchTrigram.objects.filter(object_id=record_id).exists())
+        account_id = self.accounts[1].pk
+        self.accounts[1].delete()
+        self.assertFalse(SearchTrigram.objects.filter(object_id=account_id).exists())
+        self.assertEqual(search.search(Account, {'full_name': 'smith'})[0], 2)
+
+    def test_rebuild(self):
+        SearchTrigram.objects.all().delete()
+        self.assertEqual(search.search(Account, {'full_name': 'smith'}), (0, []))
+        self.assertEqual(search.rebuild(Account, batch_size=3), Account.objects.count())
+        self.assertEqual(search.search(Account, {'full_name': 'smith'})[0], 4)
@@ -0,0 +1,77 @@
+from indivo.tests.internal_tests import InternalTests
+from indivo.lib import smart_ontology, conditional
+from django.conf import settings
+
+import os
+import shutil
+import tempfile
+import urllib
+
+ONTOLOGY = '''<?xml version="1.0" encoding="utf-8"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#" xmlns:owl="http://www.w3.org/2002/07/owl#">
+  <owl:Class rdf:about="http://smartplatforms.org/terms#%s"/>
+</rdf:RDF>
+'''
+
+SETTINGS = ('SMART_ONTOLOGY_PATH',)
+
+class SmartOntologyUnitTests(InternalTests):
+
+    def setUp(self):
+        super(SmartOntologyUnitTests, self).setUp()
+        self.dir = tempfile.mkdtemp()
+        self.save_and_modify_setting('SMART_ONTOLOGY_PATH', os.path.join(self.dir, 'smart', 'ontology.rdf'))
+
+    def tearDown(self):
+        for name in SETTINGS:
+            setattr(settings, name, self.saved_settings[name])
+        shutil.rmtree(self.dir)
+        super(SmartOntologyUnitTests, self).tearDown()
+
+    def source(self, content):
+        """ A file:// URL for *content*. """
+        source_path = os.path.join(self.dir, 'source.rdf')
+        with open(source_path, 'wb') as f:
+            f.write(content)
+        return 'file://' + urllib.pathname2url(source_path)
+
+    def test_shipped(self):
+        # The copy under version control is there, and is RDF/XML
+        settings.SMART_ONTOLOGY_PATH = None
+        smart_ontology.validate(smart_ontology.load()[0])
+
+    def test_refresh(self):
+        self.assertEqual(smart_ontology.refresh(self.source(ONTOLOGY % 'Allergy')),
+                         (True, conditional.strong_etag(ONTOLOGY % 'Allergy')))
+        self.assertEqual(smart_ontology.load()[0], ONTOLOGY % 'Allergy')
+        self.assertFalse(smart_ontology.refresh(self.source(ONTOLOGY % 'Allergy'))[0])
+
+        # Broken downloads leave the file alone
+        for broken in ('<rdf:RDF', '<html>Not found</html>'):
+            self.assertRaises(ValueError, smart_ontology.refresh, self.source(broken))
+        self.assertEqual(smart_ontology.load()[0], ONTOLOGY % 'Allergy')
+        self.assertEqual(os.listdir(os.path.dirname(smart_ontology.path())), ['ontology.rdf'])
+
+    def test_view(self):
+        # No file: unavailable, rather than fetched in the request
+        self.assertEqual(self.client.get('/ontology').status_code, 503)
+
+        # Served from the file, once it's there
+        smart_ontology.refresh(self.source(ONTOLOGY % 'Allergy'))
+        response = self.client.get('/ontology')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, ONTOLOGY % 'Allergy')
+        self.assertEqual(response['Content-Type'], 'application/rdf+xml')
+        self.assertTrue('max-age' in response['Cache-Control'])
+        self.assertTrue(response.has_header('Last-Modified'))
+        etag = response['ETag']
+
+        response = self.client.get('/ontology', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, '')
+
+        # A refreshed file is served without a restart
+        smart_ontology.refresh(self.source(ONTOLOGY % 'Medication'))
+        response = self.client.get('/ontology', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, ONTOLOGY % 'Medication')
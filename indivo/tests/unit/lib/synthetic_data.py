@@ -0,0 +1,80 @@
+from indivo.tests.internal_tests import InternalTests
+from indivo.tests.data import TEST_ACCOUNTS
+from indivo.lib.synthetic_data import SyntheticDataGenerator, EMAIL_DOMAIN, account_email, bulk_insert
+from indivo.models import *
+
+import datetime
+
+class SyntheticDataUnitTests(InternalTests):
+
+    def setUp(self):
+        super(SyntheticDataUnitTests, self).setUp()
+        self.generator = self.new_generator()
+
+    def tearDown(self):
+        super(SyntheticDataUnitTests, self).tearDown()
+
+    def new_generator(self, seed=7):
+        return SyntheticDataGenerator(3, seed=seed, as_of=datetime.datetime(2012, 1, 1), with_documents=True,
+                                      distribution={'LabResult': 5, 'Audit': 5})
+
+    def snapshot(self, generator, index):
+        return [(model.__name__, [dict((f.attname, getattr(obj, f.attname)) for f in obj._meta.fields)
+                                  for obj in instances])
+                for model, instances in generator.record_data(index)]
+
+    def test_bulk_insert(self):
+        # Multi-table models get a row in each of their tables
+        accounts = [Account(id='bulk-%s' % i, email='bulk-%s@%s' % (i, EMAIL_DOMAIN), type='Account',
+                            full_name='Bulk %s' % i, contact_email='bulk@%s' % EMAIL_DOMAIN) for i in range(5)]
+        bulk_insert(Account, accounts, batch_size=2)
+        self.assertEqual(Account.objects.filter(email__endswith=EMAIL_DOMAIN).count(), 5)
+        account = Account.objects.get(id='bulk-3')
+        self.assertEqual(account.full_name, 'Bulk 3')
+        self.assertEqual(account.state, 'uninitialized')
+        self.assertTrue(account.created_at)
+        self.assertEqual(Principal.objects.get(id='bulk-3').type, 'Account')
+
+    def test_reproducible(self):
+        # The same seed always gives the same data, whichever generator makes it
+        self.assertEqual(self.snapshot(self.generator, 1), self.snapshot(self.new_generator(), 1))
+        self.assertNotEqual(self.snapshot(self.generator, 1), self.snapshot(self.generator, 2))
+        self.assertNotEqual(self.snapshot(self.generator, 1), self.snapshot(self.new_generator(seed=8), 1))
+
+    def test_generate(self):
+        self.assertEqual(self.generator.create_records(range(3)), 3)
+        counts = {}
+        for index in range(3):
+            for model, n in self.generator.fill_records([index]).iteritems():
+                counts[model] = counts.get(model, 0) + n
+
+        records = Record.objects.filter(owner__email__endswith=EMAIL_DOMAIN)
+        self.assertEqual(records.count(), 3)
+        for record in records:
+            self.assertEqual(record.owner.account.contact_email, record.owner.email)
+            self.assertEqual(Carenet.objects.filter(record=record).count(), 3)
+        self.assertEqual(records[0].owner, Account.objects.get(email=account_email(7, 0)))
+
+        for model in (Medication, LabResult, VitalSigns, Problem, Allergy, Immunization, Document):
+            self.assertEqual(model.objects.filter(record__in=records).count(), counts[model.__name__])
+        self.assertTrue(counts['LabResult'])
+        self.assertEqual(Audit.objects.filter(record_id__in=[r.id for r in records]).count(), counts['Audit'])
+        self.assertEqual(Fact.objects.filter(record__in=records, document__isnull=True).count(), 0)
+
+    def test_source_documents(self):
+        # Processing a generated document gives the facts generated with it
+        account = self.createAccount(TEST_ACCOUNTS, 0)
+        self.generator.create_records(range(3))
+        self.generator.fill_records(range(3))
+        for doc in Document.objects.filter(record__owner__email__endswith=EMAIL_DOMAIN)[:5]:
+            processed = Document(record=doc.record, creator=account, content=doc.content)
+            processed.save()
+            self.assertEqual(processed.fqn, doc.fqn)
+            self.assertEqual(processed.digest, doc.digest)
+            for model in (Medication, LabResult, VitalSigns, Problem, Allergy, Immunization):
+                self.assertEqual(self.fact_values(model, doc), self.fact_values(model, processed))
+
+    def fact_values(self, model, doc):
+        ignored = set(['id', 'document_id', 'created_at', 'fact_ptr_id'])
+        return sorted(sorted((k, v) for k, v in values.iteritems() if k not in ignored)
+                      for values in model.objects.filter(document=doc).values())
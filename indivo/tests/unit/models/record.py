@@ -4,10 +4,13 @@ from indivo.tests.data.record import TEST_RECORDS
 from indivo.tests.data.app import TEST_USERAPPS
 from indivo.tests.data.message import TEST_MESSAGES
 from indivo.models import Record, Carenet, Notification, Message, RecordNotificationRoute
+from indivo.lib.instrumentation import QueryCounter
+from indivo.lib.utils import bulk_insert
 from django.db import IntegrityError, transaction
 from django.conf import settings
 
 import copy
+import uuid
 
 class RecordModelUnitTests(InternalTests):
     def setUp(self):
@@ -126,6 +129,39 @@ class RecordModelUnitTests(InternalTests):
 
         self.assertEqual(Notification.objects.filter(record=self.record, account=self.u_account).count(), 0)
 
+    def test_fan_out_queries(self):
+        def count_queries(call, *args):
+            counter = QueryCounter().start()
+            try:
+                call(*args)
+            finally:
+                counter.stop()
+            return counter.count
+
+        few_messages = count_queries(self.record.send_message, 'fan_out_1', self.app, 'subj', 'body')
+        few_notifications = count_queries(self.record.notify, self.app, 'Notify This!')
+
+        # Route to every other account as well: no more queries for the extra recipients
+        for i in (0, 4, 5):
+            RecordNotificationRoute.objects.create(record=self.record, account=self.createAccount(TEST_ACCOUNTS, i))
+        RecordNotificationRoute.objects.create(record=self.record, account=self.u_account)
+
+        self.assertEqual(count_queries(self.record.send_message, 'fan_out_2', self.app, 'subj', 'body'), few_messages)
+        self.assertEqual(count_queries(self.record.notify, self.app, 'Notify This!'), few_notifications)
+
+        self.assertEqual(Message.objects.filter(sender=self.app, external_identifier='fan_out_2').count(), 6)
+        self.assertEqual(Notification.objects.filter(record=self.record, account=self.u_account).count(), 1)
+
+    def test_bulk_insert(self):
+        # One multi-row statement per batch, not one per recipient
+        def notifications():
+            return [Notification(id=str(uuid.uuid4()), record=self.record, sender=self.app, account=account,
+                                 content='Bulk', creator=self.app)
+                    for account in (self.account, self.s_account, self.u_account)]
+        self.assertNumQueries(1, bulk_insert, Notification, notifications())
+        self.assertNumQueries(2, bulk_insert, Notification, notifications(), batch_size=2)
+        self.assertEqual(Notification.objects.filter(content='Bulk').count(), 6)
+
     def test_create_default_carenets(self):
         
         # Eliminate all of our default carenets
@@ -56,6 +56,9 @@ urlpatterns = patterns('',
     # record list
     (r'^records/$', MethodDispatcher({'GET':record_list})),
 
+    # everything a landing page shows, in one call
+    (r'^summary$', MethodDispatcher({'GET':account_summary})),
+
     # send a message or read the inbox
     (r'^inbox/$', MethodDispatcher({
                 'GET' : account_inbox,
@@ -21,6 +21,9 @@ urlpatterns = patterns('',
                 # for now, POST compatibility (Ben)
                 'POST' : record_set_owner
                 })),
+    # export
+    (r'^/export$', MethodDispatcher({'GET': record_export})),
+
     # shares
     (r'^/shares/$', MethodDispatcher({
         'GET'  : record_shares,
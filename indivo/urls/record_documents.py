@@ -74,4 +74,8 @@ urlpatterns = patterns('',
       MethodDispatcher({'PUT' : document_create_by_rel_with_ext_id, 
                         'POST': document_create_by_rel_with_ext_id})),    
 
+    # documents related by chains of rels
+    (r'^(?P<document_id>[^/]+)/related/$', 
+      MethodDispatcher({'GET' : get_related_documents})),
+
 )
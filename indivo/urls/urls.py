@@ -8,6 +8,7 @@ urlpatterns = patterns('',
     # OAuth
     (r'^oauth/', include('indivo.urls.oauth')),
     (r'^version$', MethodDispatcher({'GET':get_version})),
+    (r'^metrics$', MethodDispatcher({'GET':get_metrics})),
 
     # account-specific URLs
     (r'^accounts/$', MethodDispatcher({'POST':account_create})),
@@ -33,6 +34,9 @@ urlpatterns = patterns('',
      MethodDispatcher({'GET' : pha, 'DELETE': pha_delete})),
     (r'^apps/(?P<pha_email>[^/]+)', include('indivo.urls.application')),
 
+    # population reports, across records
+    (r'^population/(?P<data_model>[^/]+)/$', MethodDispatcher({'GET': population_list})),
+
     # SMART container calls
     (r'^ontology$', MethodDispatcher({'GET': smart_ontology})),
     (r'^capabilities/$', MethodDispatcher({'GET': smart_capabilities})),              
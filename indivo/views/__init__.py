@@ -23,6 +23,7 @@ from account    import *
 from audit      import *
 from documents  import *
 from messaging  import *
+from monitoring import *
 from pha        import *
 from record     import *
 from reports    import *
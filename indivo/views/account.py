@@ -10,12 +10,11 @@
 from base import *
 import urllib
 import logging
-from indivo.lib import utils
+from indivo.lib import utils, search
 from indivo.lib.sample_data import IndivoDataLoader
 from django.http import HttpResponseBadRequest
 from django.db import IntegrityError
 from django.conf import settings
-from django.db.models import Q
 from oauth.oauth import HTTPRequest, OAuthRequest
 
 ACTIVE_STATE, UNINITIALIZED_STATE = 'active', 'uninitialized'
@@ -254,6 +253,73 @@ def account_info(request, account):
                                 'auth_systems': auth_systems})
 
 
+@utils.django_json
+def account_summary(request, account):
+    """ Everything a portal's landing page shows about an account, in one call.
+
+    That's the records the account can see (as from
+    :py:meth:`~indivo.views.record.record_list`), each with the account's
+    role and the record's carenets (for records the account owns or has been
+    fully shared) or the carenet it's shared through, and the apps enabled
+    on the record or carenet (as from
+    :py:meth:`~indivo.views.record.record_phas`), along with the account's
+    unread message and notification counts. The number of queries is the
+    same however many records, carenets and apps there are.
+
+    Will return :http:statuscode:`200` with the summary as JSON on success.
+
+    """
+
+    counts = UnreadCounts.for_account(account)
+    owned = list(Record.objects.filter(owner=account))
+    full_shares = list(AccountFullShare.objects.filter(with_account=account).select_related('record'))
+    carenet_shares = list(CarenetAccount.objects.filter(account=account).select_related('carenet__record'))
+
+    # The carenets and apps of every record and carenet, a query each
+    record_ids = set([record.id for record in owned] + [share.record_id for share in full_shares])
+    carenets = {}
+    if record_ids:
+        for carenet in Carenet.objects.filter(record__in=record_ids).order_by('name'):
+            carenets.setdefault(carenet.record_id, []).append({'id': carenet.id, 'name': carenet.name})
+
+    manifests = {}
+    def manifest(pha):
+        if pha.id not in manifests:
+            manifests[pha.id] = pha.to_manifest(as_string=False)
+        return manifests[pha.id]
+
+    record_apps = {}
+    if record_ids:
+        for share in PHAShare.objects.filter(record__in=record_ids).select_related('with_pha'):
+            record_apps.setdefault(share.record_id, []).append(manifest(share.with_pha))
+
+    carenet_apps = {}
+    carenet_ids = [share.carenet_id for share in carenet_shares]
+    if carenet_ids:
+        for carenet_pha in CarenetPHA.objects.filter(carenet__in=carenet_ids).select_related('pha'):
+            carenet_apps.setdefault(carenet_pha.carenet_id, []).append(manifest(carenet_pha.pha))
+
+    records = []
+    for record in owned:
+        records.append({'id': record.id, 'label': record.label, 'role': 'owner',
+                        'carenets': carenets.get(record.id, []), 'apps': record_apps.get(record.id, [])})
+    for share in full_shares:
+        records.append({'id': share.record.id, 'label': share.record.label, 'role': 'full_share',
+                        'role_label': share.role_label,
+                        'carenets': carenets.get(share.record_id, []), 'apps': record_apps.get(share.record_id, [])})
+    for share in carenet_shares:
+        carenet = share.carenet
+        records.append({'id': carenet.record.id, 'label': carenet.record.label, 'role': 'carenet',
+                        'carenet': {'id': carenet.id, 'name': carenet.name, 'can_write': share.can_write},
+                        'apps': carenet_apps.get(carenet.id, [])})
+
+    return {'id': account.email,
+            'full_name': account.full_name,
+            'unread_messages': counts.messages,
+            'unread_notifications': counts.notifications,
+            'records': records}
+
+
 def account_check_secrets(request, account, primary_secret):
     """ Validate an account's primary and secondary secrets.
 
@@ -284,7 +350,8 @@ def account_check_secrets(request, account, primary_secret):
             raise PermissionDenied()
     return DONE
 
-def account_search(request):
+@marsloader()
+def account_search(request, query_options):
     """ Search for accounts by name or email.
     
     request.GET must contain the query parameters, any of:
@@ -296,6 +363,10 @@ def account_search(request):
     This call returns all accounts matching any part of any of the
     passed query parameters: i.e. it ORs together the query parameters 
     and runs a partial-text match on each.
+
+    Matches are ranked (exact matches first, then matches at the start of
+    a field or word), and paged with the *offset* and *limit* query
+    parameters. See :py:mod:`indivo.lib.search`.
     
     Will return :http:statuscode:`200` with XML describing
     matching accounts on success, :http:statuscode:`400` if
@@ -309,15 +380,10 @@ def account_search(request):
     if not (fullname or contact_email):
         return HttpResponseBadRequest('No search criteria given')
     
-    query_filter = Q()
-    if fullname:
-        query_filter |= Q(full_name__icontains = fullname)
-    if contact_email:
-        query_filter |= Q(contact_email__icontains = contact_email)
-
-    query = Account.objects.filter(query_filter)
+    total, accounts = search.search(Account, {'full_name': fullname, 'contact_email': contact_email},
+                                    offset=query_options['offset'], limit=query_options['limit'])
     
-    return render_template('accounts_search', {'accounts': query}, type='xml')
+    return render_template('accounts_search', {'accounts': accounts, 'total': total}, type='xml')
 
 
 @transaction.commit_manually
@@ -384,7 +450,7 @@ def account_authsystem_add(request, account):
     
     # set the auth system
     try:
-        system = AuthSystem.objects.get(short_name = desired_system)
+        system = AuthSystem.cached.get(desired_system)
         account.auth_systems.create(username = username, 
                                  auth_system = system)
     except AuthSystem.DoesNotExist:
@@ -93,7 +93,7 @@ def audit_function_view(request, record, document_id, function_name, query_optio
     status = query_options['status']
     return render_template('reports/report', 
                            {'fobjs' : audits[offset:offset+limit],
-                            'trc': len(audits),
+                            'trc': audits.count(),
                             'item_template': AUDIT_TEMPLATE,
                             'limit': limit,
                             'offset': offset,
@@ -123,7 +123,7 @@ def audit_record_view(request, record, query_options):
     audits = Audit.objects.filter(record_id=record.id).order_by('-datetime')
     return render_template('reports/report', 
                            {'fobjs' : audits[offset:offset+limit],
-                            'trc': len(audits),
+                            'trc': audits.count(),
                             'item_template': AUDIT_TEMPLATE,
                             'limit': limit,
                             'offset': offset,
@@ -156,7 +156,7 @@ def audit_document_view(request, record, document_id, query_options):
     status = query_options['status']
     return render_template('reports/report', 
                            {'fobjs' : audits[offset:offset+limit],
-                            'trc': len(audits),
+                            'trc': audits.count(),
                             'item_template': AUDIT_TEMPLATE,
                             'limit': limit,
                             'offset': offset,
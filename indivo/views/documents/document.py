@@ -10,7 +10,7 @@
 import urllib2
 import hashlib
 
-from indivo.lib import utils
+from indivo.lib import utils, conditional
 
 from indivo.views.base import *
 from indivo.document_processing.document_utils import DocumentUtils
@@ -459,7 +459,9 @@ def document(request, document_id, record=None, pha=None):
     **Returns:**
 
     * An HttpResponse object whose body contains the raw content of the document 
-        on success.
+        on success, or an empty :http:statuscode:`304` if the request's
+        If-None-Match header has the document's ETag (or its If-Modified-Since
+        header is no earlier than the document's last modification).
 
     **Raises:**
     
@@ -472,13 +474,22 @@ def document(request, document_id, record=None, pha=None):
         or (pha and document.pha != pha):
         raise Http404
     
-    return _render_document(document)
+    return _render_document(request, document)
+
+def _document_etag(document):
+    """ The ETag of a document's content: its digest, plus its status. """
+    if not document.digest:
+        return None
+    return conditional.etag('document', document.digest, document.status_id)
 
-def _render_document(document):
+def _render_document(request, document):
     """ Get the raw content of a document, ready to be sent over the wire.
 
     **Arguments:**
 
+    * *request*: the incoming Django HttpRequest object, which may be
+        conditional (see :py:func:`indivo.lib.conditional.not_modified`).
+
     * *document*: the
         :py:class:`~indivo.models.records_and_documents.Document`
         instance to render.
@@ -486,10 +497,15 @@ def _render_document(document):
     **Returns:**
 
     * An HttpResponse object whose body contains the The raw content of the 
-        document on success.
+        document on success, or an empty :http:statuscode:`304` if the
+        client already has it.
 
     """
 
+    return conditional.lazy_response(request, lambda: _document_content(document),
+                                     etag=_document_etag(document), last_modified=document.modified_at)
+
+def _document_content(document):
     # no content, must be a file
     if not document.content:
         return HttpResponse(document.content_file, mimetype=document.mime_type)
@@ -556,6 +572,11 @@ def document_list(request, query_options, record=None, pha=None):
     * an HTTPResponse whose body is an XML string containing the rendered list of 
         documents (which might be empty), on success.
 
+    * an empty :http:statuscode:`304` if the request's If-None-Match header has
+        the list's ETag. Lists of a record's documents take their ETag from the
+        record's :py:class:`~indivo.models.records_and_documents.RecordVersion`,
+        and are only built if it has changed; other lists are hashed.
+
     **Raises:**
     
     * :py:exc:`django.http.Http404`: if *type* was passed, but didn't 
@@ -563,6 +584,14 @@ def document_list(request, query_options, record=None, pha=None):
 
     """
 
+    version = record and RecordVersion.current(record.id)
+    if version:
+        return conditional.lazy_response(request, lambda: _document_list(request, query_options, record, pha),
+                                         etag=version.etag('documents', pha and pha.id),
+                                         last_modified=version.changed_at)
+    return conditional.hashed_response(request, _document_list(request, query_options, record, pha))
+
+def _document_list(request, query_options, record=None, pha=None):
     order_by = query_options['order_by']
     offset = query_options['offset']
     limit = query_options['limit']
@@ -9,6 +9,7 @@
 
 from indivo.views.base import *
 from indivo.views.documents.document import _set_doc_latest, _get_document
+from indivo.lib import conditional
 
 
 def update_document_meta(request, record, document_id):
@@ -27,7 +28,7 @@ def carenet_document_meta(request, carenet, document_id):
   """
 
   document = _get_document(carenet=carenet, document_id=document_id)
-  return _document_meta(carenet=carenet, document=document)
+  return _document_meta(request, carenet=carenet, document=document)
 
 
 def record_document_meta(request, record, document_id):
@@ -39,7 +40,7 @@ def record_document_meta(request, record, document_id):
   """
 
   document = _get_document(record=record, document_id=document_id)
-  return _document_meta(record=record, document=document)
+  return _document_meta(request, record=record, document=document)
 
 
 def record_document_meta_ext(request, record, pha, external_id):
@@ -50,7 +51,7 @@ def record_document_meta_ext(request, record, pha, external_id):
 
   """
 
-  return _document_meta(record=record, pha=pha, external_id=external_id)
+  return _document_meta(request, record=record, pha=pha, external_id=external_id)
 
 
 def app_document_meta(request, pha, document_id):
@@ -62,7 +63,7 @@ def app_document_meta(request, pha, document_id):
   """
   """For 1:1 mapping of URLs to views. Calls _document_meta"""
   document = _get_document(pha=pha, document_id=document_id)
-  return _document_meta(pha=pha, document=document, app_specific=True)
+  return _document_meta(request, pha=pha, document=document, app_specific=True)
 
 def app_document_meta_ext(request, pha, external_id):
   """ Fetch the metadata of an app-specific document identified by external id.
@@ -72,7 +73,7 @@ def app_document_meta_ext(request, pha, external_id):
 
   """
 
-  return _document_meta(pha=pha, external_id=external_id, app_specific=True)
+  return _document_meta(request, pha=pha, external_id=external_id, app_specific=True)
 
 
 def record_app_document_meta(request, record, pha, document_id):
@@ -84,7 +85,7 @@ def record_app_document_meta(request, record, pha, document_id):
   """
 
   document = _get_document(record=record, pha=pha, document_id=document_id)
-  return _document_meta(record=record, document=document, pha=pha, app_specific=True)
+  return _document_meta(request, record=record, document=document, pha=pha, app_specific=True)
 
 
 def record_app_document_meta_ext(request, record, pha, external_id):
@@ -95,10 +96,10 @@ def record_app_document_meta_ext(request, record, pha, external_id):
 
   """
 
-  return _document_meta(record=record, pha=pha, external_id=external_id, app_specific=True)
+  return _document_meta(request, record=record, pha=pha, external_id=external_id, app_specific=True)
 
 
-def _document_meta(record=None, carenet=None, document=None, pha=None, external_id=None, app_specific=False):
+def _document_meta(request, record=None, carenet=None, document=None, pha=None, external_id=None, app_specific=False):
   """ Fetch the metadata of a single document.
   
   Metadata includes:
@@ -128,6 +129,9 @@ def _document_meta(record=None, carenet=None, document=None, pha=None, external_
 
   **ARGUMENTS:**
   
+  * *request*: The incoming Django HttpRequest object, which may be
+    conditional (see :py:func:`indivo.lib.conditional.not_modified`).
+
   * *record*: The 
     :py:class:`~indivo.models.records_and_documents.Record` that
     the document is scoped to, if applicable.
@@ -162,7 +166,12 @@ def _document_meta(record=None, carenet=None, document=None, pha=None, external_
   **RETURNS:**
 
   * An HttpResponse object with an XML string describing the document metadata
-    on success.
+    on success, or an empty :http:statuscode:`304` if the request's
+    If-None-Match header has the metadata's ETag. The metadata of a
+    record-specific document takes its ETag from the document's digest and
+    status, and the record's
+    :py:class:`~indivo.models.records_and_documents.RecordVersion` (which
+    changes along with the document's versions and relationships).
 
   **RAISES:**
 
@@ -187,6 +196,15 @@ def _document_meta(record=None, carenet=None, document=None, pha=None, external_
     if not document:
       raise Http404
 
-  _set_doc_latest(document)
-
-  return render_template('single_document', {'doc' : document, 'record': document.record})
+  version = document.record_id and RecordVersion.current(document.record_id)
+  if version:
+    etag = version.etag('meta', document.id, document.digest, document.status_id)
+    last_modified = version.changed_at
+  else:
+    etag = conditional.etag('meta', document.id, document.digest, document.status_id, document.modified_at)
+    last_modified = document.modified_at
+
+  def render():
+    _set_doc_latest(document)
+    return render_template('single_document', {'doc' : document, 'record': document.record})
+  return conditional.lazy_response(request, render, etag=etag, last_modified=last_modified)
@@ -8,7 +8,8 @@
 """
 
 from indivo.views.base import *
-from indivo.views.documents.document import _document_create, _render_documents, _get_document
+from indivo.views.documents.document import _document_create, _render_documents, _get_document, _set_doc_latest
+from indivo.lib import document_graph
 
 @marsloader()
 def get_documents_by_rel(request, record, document_id, rel, query_options, pha=None):
@@ -59,7 +60,7 @@ def get_documents_by_rel(request, record, document_id, rel, query_options, pha=N
 
   tdc = 0
   try:
-    relationship = DocumentSchema.objects.get(type=DocumentSchema.expand_rel(rel))
+    relationship = DocumentSchema.cached.get(DocumentSchema.expand_rel(rel))
     docs = Document.objects.filter(record=record,
                                    status=query_options['status'],
                                    rels_as_doc_1__document_0__original=document.original_id, # doc is related to passed document
@@ -70,6 +71,110 @@ def get_documents_by_rel(request, record, document_id, rel, query_options, pha=N
   return _render_documents(docs, record, pha, tdc)
 
 
+@marsloader()
+def get_related_documents(request, record, document_id, query_options):
+  """ Get all documents reachable from the passed document_id by following relationships, level by level.
+
+  Follows relationships from *document_id* (and its other versions) to the
+  documents they point to, then from those documents, and so on, returning
+  each document found once, with the fewest relationships it took to reach it
+  (its depth). Documents are listed by depth.
+
+  **ARGUMENTS:**
+
+  * *request*: The incoming Django HttpRequest object. ``request.GET`` may
+    contain:
+
+    * *rel*: Only follow relationships of this type. May be passed more than
+      once. By default, follows relationships of every type.
+
+    * *max_depth*: Stop after this many relationships. Defaults to, and may
+      not exceed, ``settings.DOCUMENT_RELS_MAX_DEPTH``.
+
+    * *cursor*: Continue listing after this point: the *next_cursor* of the
+      previous page.
+
+  * *record*: The 
+    :py:class:`~indivo.models.records_and_documents.Record` that
+    the document is scoped to.
+
+  * *document_id*: The internal document identifier for the source document.
+
+  * *limit*, *status*: Standard paging and filtering arguments. See
+    :py:func:`~indivo.lib.view_decorators.marsloader` or :doc:`/query-api`.
+    *offset* and *order_by* are ignored: page with *cursor* instead.
+
+  **RETURNS:**
+
+  * An HttpResponse object with an XML string listing the related documents,
+    the number of them at each depth, and the cursor for the next page (if
+    there is one), on success.
+
+  * :http:statuscode:`400` if *rel* isn't a valid relationship type, or
+    *max_depth* or *cursor* are invalid.
+
+  **RAISES:**
+
+  * :py:exc:`django.http.Http404` if *document_id*
+    doesn't identify an existing document scoped to *record*.
+
+  """
+  document = _get_document(record=record, document_id=document_id)
+  if not document:
+    raise Http404
+
+  try:
+    relationships = [DocumentSchema.cached.get(DocumentSchema.expand_rel(rel))
+                     for rel in request.GET.getlist('rel')] or None
+  except DocumentSchema.DoesNotExist:
+    return HttpResponseBadRequest('Argument rel must be a valid relationship type')
+
+  max_depth = document_graph.max_depth_setting()
+  try:
+    max_depth = min(int(request.GET.get('max_depth', max_depth)), max_depth)
+    if max_depth < 1:
+      raise ValueError
+  except ValueError:
+    return HttpResponseBadRequest('Argument max_depth must be a positive integer')
+
+  try:
+    after = _parse_cursor(request.GET.get('cursor'))
+  except ValueError:
+    return HttpResponseBadRequest('Argument cursor must be the next_cursor of a previous page')
+
+  depths = document_graph.closure(document, relationships, max_depth)
+  depths = document_graph.with_status(depths, query_options['status'])
+  ordered = sorted((depth, doc_id) for doc_id, depth in depths.iteritems())
+
+  remaining = [entry for entry in ordered if after is None or entry > after]
+  page = remaining[:query_options['limit']]
+  next_cursor = None
+  if len(remaining) > len(page) and page:
+    next_cursor = '%s:%s' % page[-1]
+
+  docs_by_id = Document.objects.select_related('creator', 'suppressed_by', 'status').in_bulk([doc_id for depth, doc_id in page])
+  docs = [(depth, docs_by_id[doc_id]) for depth, doc_id in page if doc_id in docs_by_id]
+  for depth, doc in docs:
+    _set_doc_latest(doc)
+  document_graph.prefetch_relation_counts([doc for depth, doc in docs])
+
+  return utils.render_template('related_documents', {'document'    : document,
+                                                     'record'      : record,
+                                                     'docs'        : docs,
+                                                     'levels'      : document_graph.level_counts(depths),
+                                                     'max_depth'   : max_depth,
+                                                     'next_cursor' : next_cursor,
+                                                     'tdc'         : len(depths)})
+
+def _parse_cursor(cursor):
+  """ The (depth, document id) a page of related documents starts after, or None for the first page. """
+  if not cursor:
+    return None
+  depth, sep, doc_id = cursor.partition(':')
+  if not sep or not doc_id:
+    raise ValueError(cursor)
+  return (int(depth), doc_id)
+
 def document_rels(request, record, document_id_0, rel, document_id_1):
   """ Create a new relationship between two existing documents.
 
@@ -100,7 +205,7 @@ def document_rels(request, record, document_id_0, rel, document_id_1):
   """
   try:
     document_0    = Document.objects.get(id = document_id_0)
-    relationship  = DocumentSchema.objects.get(type= DocumentSchema.expand_rel(rel))
+    relationship  = DocumentSchema.cached.get(DocumentSchema.expand_rel(rel))
     document_1 = Document.objects.get(id = document_id_1)
 
     DocumentRels.objects.create(document_0=document_0, document_1=document_1, relationship=relationship)
@@ -186,7 +291,7 @@ def _document_create_by_rel(request, record, document_id, rel, pha=None, externa
     # create the rel
     DocumentRels.objects.create(document_0 = old_doc, 
                                 document_1 = new_doc, 
-                                relationship = DocumentSchema.objects.get(type=DocumentSchema.expand_rel(rel)))
+                                relationship = DocumentSchema.cached.get(DocumentSchema.expand_rel(rel)))
   except DocumentSchema.DoesNotExist:
     raise Http404
   except ValueError as e:
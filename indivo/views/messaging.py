@@ -59,6 +59,7 @@ def account_send_message(request, account):
     body                = request.POST.get('body', "[no body]"),
     body_type           = request.POST.get('body_type', 'plaintext'),
     severity            = request.POST.get('severity', 'low'))
+  UnreadCounts.add([account.pk], messages=1)
   
   account.notify_account_of_new_message()
   return render_template('_message', {'message' : message})
@@ -176,10 +177,12 @@ def account_inbox_message(request, account, message_id):
 
   message = account.message_as_recipient.get(id = message_id)
 
-  # if message not read, mark it read
+  # if message not read, mark it read (and count it as read, only if no concurrent request beat us to it)
   if not message.read_at:
     message.read_at = datetime.datetime.utcnow()
-    message.save()
+    if Message.objects.filter(id=message.id, read_at=None).update(read_at=message.read_at,
+                                                                  modified_at=datetime.datetime.now()):
+      UnreadCounts.add([account.pk], messages=-1)
 
   # markdown
   if message.body_type == 'markdown':
@@ -235,11 +238,13 @@ def account_message_archive(request, account, message_id):
 def account_notifications(request, account, query_options):
   """ List an account's notifications.
 
-  Orders by *order_by*, pages by *limit* and *offset*.
+  Orders by *order_by*, pages by *limit* and *offset*. This call
+  additionally zeroes the account's unread notification count.
   
   Will return :http:statuscode:`200` with a list of notifications on success.
 
   """
 
   notifications = Notification.objects.filter(account = account).order_by(query_options['order_by'])
+  UnreadCounts.objects.filter(account=account).exclude(notifications=0).update(notifications=0)
   return render_template('notifications', {'notifications' : notifications})
@@ -0,0 +1,22 @@
+"""
+.. module:: views.monitoring
+   :synopsis: Indivo view implementations for monitoring the server.
+
+"""
+
+from django.http import HttpResponse
+from indivo.lib.metrics import REGISTRY
+
+# The Prometheus text exposition format
+METRICS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+def get_metrics(request):
+    """ Return request, ingest, cache and database metrics, in the Prometheus text format.
+
+    Counts are totals since the server started, added up over all of its
+    processes if ``settings.METRICS_DIR`` is set.
+
+    Will return :http:statuscode:`200` with the metrics.
+
+    """
+    return HttpResponse(REGISTRY.render().encode('utf-8'), content_type=METRICS_CONTENT_TYPE)
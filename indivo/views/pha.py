@@ -15,7 +15,7 @@ from base import *
 from oauth.djangoutils import extract_request
 from oauth import oauth
 from indivo.views.documents.document import _get_document
-from indivo.lib import iso8601
+from indivo.lib import iso8601, manifest_cache
 import base64, hmac, datetime
 
 from django.utils import simplejson
@@ -23,7 +23,8 @@ from django.utils import simplejson
 def all_manifests(request):
     """ List SMART manifests for all available userapps.
 
-    Will return :http:statuscode:`200` with a list of app manifests as JSON on success.
+    Will return :http:statuscode:`200` with a list of app manifests as JSON on success,
+    or :http:statuscode:`304` if the request's If-None-Match header has the list's ETag.
 
     """
     
@@ -32,21 +33,24 @@ def all_manifests(request):
 def all_phas(request):
     """ List all available userapps.
 
-    Will return :http:statuscode:`200` with a list of app manifests as JSON on success.
+    Will return :http:statuscode:`200` with a list of app manifests as JSON on success,
+    or :http:statuscode:`304` if the request's If-None-Match header has the list's ETag.
 
     """
 
     return _phas(request)
 
-@utils.django_json
 def _phas(request, smart_only=False):
-    return PHA.queryset_as_manifests(PHA.objects.all(), smart_only=smart_only)
+    return manifest_cache.response(request, ('all', smart_only),
+                                   lambda: PHA.queryset_as_manifests(PHA.objects.all(), as_string=True,
+                                                                     smart_only=smart_only))
 
 def pha(request, pha):
     """ Return a description of a single userapp.
 
     Will return :http:statuscode:`200` with the app's JSON manifest
-    on success.
+    on success, or :http:statuscode:`304` if the request's If-None-Match
+    header has the manifest's ETag.
     
     """
 
@@ -56,14 +60,15 @@ def app_manifest(request, pha):
     """ Return a SMART manifest for a single userapp.
 
     Will return :http:statuscode:`200` with the app's JSON manifest
-    on success.
+    on success, or :http:statuscode:`304` if the request's If-None-Match
+    header has the manifest's ETag.
     
     """
     return _pha(request, pha, smart_only=True)
 
-@utils.django_json
 def _pha(request, pha, smart_only=False):
-    return pha.to_manifest(smart_only=smart_only, as_string=False)
+    return manifest_cache.response(request, ('app', pha.id, smart_only),
+                                   lambda: pha.to_manifest(smart_only=smart_only, as_string=True))
 
 def app_record_list(request, pha):
     """ Return a list of all records that have this pha enabled.
@@ -249,14 +254,14 @@ def session_create(request):
         if not password and request.POST.has_key('system'):
                 system = request.POST['system']
                 try:
-                        AuthSystem.objects.get(short_name=system)
+                        AuthSystem.cached.get(system)
                         user = auth.authenticate(request, username, None, system)
                 except AuthSystem.DoesNotExist:
                         raise PermissionDenied()
     if not password and request.POST.has_key('system'):
         system = request.POST['system']
         try:
-            AuthSystem.objects.get(short_name=system)
+            AuthSystem.cached.get(system)
             user = auth.authenticate(request, username, None, system)
         except AuthSystem.DoesNotExist:
             raise PermissionDenied()
@@ -10,11 +10,11 @@
 #import libxml2
 from lxml import etree
 
-from indivo.lib import utils
+from indivo.lib import utils, search
+from indivo.lib.record_export import RecordExporter, FORMATS, NDJSON
 from indivo.views.documents.document import _document_create
 from base import *
 
-from django.db.models import Q
 
 ACTIVE_STATE = 'active'
 
@@ -81,7 +81,36 @@ def record(request, record):
 
   return render_template('record', {'record': record})
 
-def record_search(request):
+def record_export(request, record):
+  """ Export a whole record: its documents (with all versions), metadata, relationships and facts.
+
+  request.GET may contain:
+
+  * *format*: ``ndjson`` (the default) for one JSON object per line, or
+    ``zip`` for a zip archive with the document bodies as separate files.
+
+  * *facts*: ``true`` to include the facts extracted from the documents.
+
+  The export is streamed as it is built, so it starts right away even for
+  very large records.
+
+  Will return :http:statuscode:`200` with the export on success,
+  :http:statuscode:`400` if *format* is invalid.
+
+  """
+
+  format = request.GET.get('format', NDJSON)
+  if format not in FORMATS:
+    return HttpResponseBadRequest('Invalid export format: %s' % format)
+
+  exporter = RecordExporter(record, format=format,
+                            include_facts=request.GET.get('facts', '').lower() == 'true')
+  response = HttpResponse(iter(exporter), content_type=exporter.content_type)
+  response['Content-Disposition'] = 'attachment; filename=%s' % exporter.filename
+  return response
+
+@marsloader()
+def record_search(request, query_options):
   """ Search for records by label (usually the same as full name).
 
   request.GET must contain the query parameters, any of:
@@ -92,6 +121,10 @@ def record_search(request):
   query parameters: i.e. it ORs together the query parameters and
   runs a partial-text match on each.
 
+  Matches are ranked (exact matches first, then matches at the start of
+  the label or of a word in it), and paged with the *offset* and *limit*
+  query parameters. See :py:mod:`indivo.lib.search`.
+
   Will return :http:statuscode:`200` with XML describing matching
   records on success, :http:statuscode:`400` if no query parameters 
   are passed.
@@ -103,13 +136,10 @@ def record_search(request):
   if not label:
     return HttpResponseBadRequest('No search criteria given')
 
-  query_filter = Q()
-  if label:
-    query_filter |= Q(label__icontains=label)
-
-  query = Record.objects.filter(query_filter)
+  total, records = search.search(Record, {'label': label},
+                                 offset=query_options['offset'], limit=query_options['limit'])
 
-  return render_template('record_list', {'records':query}, type='xml')
+  return render_template('records_search', {'records': records, 'total': total}, type='xml')
                                          
 @utils.django_json
 def record_phas(request, record):
@@ -131,7 +161,7 @@ def record_phas(request, record):
   # are we filtering by schema?
   type = request.GET.get('type', None)
   if type:
-    schema = DocumentSchema.objects.get(type=type)
+    schema = DocumentSchema.cached.get(type)
     phas = [pha for pha in phas if pha.schema == schema]
 
   # interpolate the the start_url_template into start_url
@@ -13,4 +13,5 @@ from procedure              import *
 from simple_clinical_notes  import *
 from ccr                    import *
 from generic                import *
+from population             import *
 from smart                  import *
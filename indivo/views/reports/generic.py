@@ -11,7 +11,10 @@ from django.db.models.loading import get_model
 from django.http import HttpResponseBadRequest, HttpResponse, Http404
 from django.utils import simplejson
 
+from indivo.lib import conditional
+from indivo.lib.instrumentation import timed, SERIALIZE
 from indivo.lib.query import FactQuery
+from indivo.models import Fact, RecordVersion
 from indivo.lib.view_decorators import marsloader
 from indivo.serializers.json import IndivoJSONEncoder
 
@@ -37,18 +40,19 @@ def serialize(cls, format, query, record=None, carenet=None):
     
     """
      
-    # aggregate queries
-    if query.aggregate_by:
-        return serialize_as_aggregate(format, query)
+    with timed(SERIALIZE):
+        # aggregate queries
+        if query.aggregate_by:
+            return serialize_as_aggregate(format, query)
     
-    # non-aggregate queries
-    queryset = query.results
-    result_count = query.trc
-    method = "to_" + SERIALIZATION_FORMAT_MAP[format]
-    if hasattr(cls, method):
-        return getattr(cls, method)(queryset, result_count, record, carenet)
-    else:
-        raise ValueError("format not supported")
+        # non-aggregate queries
+        queryset = query.results
+        result_count = query.trc
+        method = "to_" + SERIALIZATION_FORMAT_MAP[format]
+        if hasattr(cls, method):
+            return getattr(cls, method)(queryset, result_count, record, carenet)
+        else:
+            raise ValueError("format not supported")
 
 def serialize_as_aggregate(format, query):
     """Serialize an aggregate query to the requested format"""
@@ -121,6 +125,10 @@ def _generic_list(request, query_options, data_model, record=None, carenet=None,
 
   Will return :http:statuscode:`200` with a list of Models or AggregateReports 
   on success, :http:statuscode:`400` if any invalid query parameters were passed.
+  Reports over a record's (or carenet's) facts carry an ETag from the record's
+  :py:class:`~indivo.models.records_and_documents.RecordVersion`, and requests
+  whose If-None-Match header has it get a :http:statuscode:`304`, without
+  running the query.
 
   """
   # check requested format
@@ -137,16 +145,38 @@ def _generic_list(request, query_options, data_model, record=None, carenet=None,
       # model not found
       raise Http404
 
-  # build query
-  model_filters =  model_class.filter_fields # TODO: possible to make a lazy class property?
-  query = FactQuery(model_class, 
-                model_filters,
-                query_options,
-                record, 
-                carenet)
-  try:
-      query.execute()
-      data = serialize(model_class, response_format, query, record, carenet)
-      return HttpResponse(data, mimetype=response_format)
-  except ValueError as e:
-    return HttpResponseBadRequest(str(e))
+  def build():
+      # build query
+      model_filters =  model_class.filter_fields # TODO: possible to make a lazy class property?
+      query = FactQuery(model_class, 
+                    model_filters,
+                    query_options,
+                    record, 
+                    carenet)
+      try:
+          query.execute()
+          data = serialize(model_class, response_format, query, record, carenet)
+          return HttpResponse(data, mimetype=response_format)
+      except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+
+  version = report_version(model_class, record, carenet)
+  if not version:
+      return build()
+  return conditional.lazy_response(request, build,
+                                   etag=version.etag('report', carenet and carenet.id, data_model, response_format),
+                                   last_modified=version.changed_at)
+
+def report_version(model_class, record=None, carenet=None):
+  """ The :py:class:`~indivo.models.records_and_documents.RecordVersion` that reports over *model_class* for *record* (or *carenet*) change with.
+
+  None for reports that don't have one: those over many records, or not over facts.
+
+  """
+  if not issubclass(model_class, Fact):
+      return None
+  if carenet:
+      return RecordVersion.current(carenet.record_id)
+  if record:
+      return RecordVersion.current(record.id)
+  return None
@@ -0,0 +1,152 @@
+"""
+.. module:: views.reports.population
+   :synopsis: Indivo view implementations for aggregate reports across many records.
+
+"""
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.db.models.loading import get_model
+from django.http import HttpResponseBadRequest, HttpResponse, Http404
+from django.utils import simplejson
+from django.utils.html import escape
+
+from indivo.lib.query import FactQuery, statement_timeout
+from indivo.lib.view_decorators import marsloader
+from indivo.serializers.json import IndivoJSONEncoder
+from generic import SERIALIZATION_FORMAT_MAP
+
+import logging
+
+# Rows to render before handing a chunk to the client
+CHUNK_ROWS = 500
+
+def population_timeout(timeout):
+  """ The time limit for a population query, in seconds: *timeout*, as requested, but no more than the configured maximum. """
+  max_timeout = getattr(settings, 'POPULATION_QUERY_TIMEOUT', 30)
+  if timeout is None:
+    return max_timeout
+  timeout = float(timeout)
+  if timeout <= 0:
+    raise ValueError('timeout must be positive')
+  return min(timeout, max_timeout) if max_timeout else timeout
+
+@marsloader(query_api_support=True)
+def population_list(request, query_options, data_model):
+  """ Aggregate the Model data across all records, or across a list of records.
+
+  Takes the same query parameters as the generic reports (see :doc:`/query-api`),
+  plus:
+
+  * *record_id*: Only aggregate over these records (ids separated by ``|``).
+    Defaults to all records.
+
+  * *timeout*: Give up after this many seconds. Defaults to (and may not exceed)
+    settings.POPULATION_QUERY_TIMEOUT.
+
+  Only aggregate queries (with an *aggregate_by*) are allowed. The aggregation
+  runs as a single query in the database, and the results are streamed back as
+  they are rendered. Unlike the other reports, grouped results are not paged
+  unless a *limit* is passed: every group is returned.
+
+  Will return :http:statuscode:`200` with a list of AggregateReports on success,
+  :http:statuscode:`400` if any invalid query parameters were passed, or if
+  there was no *aggregate_by*, or :http:statuscode:`503` if the query took
+  longer than its time limit.
+
+  """
+
+  response_format = request.GET.get('response_format', 'application/json')
+  if SERIALIZATION_FORMAT_MAP.get(response_format) not in ('json', 'xml'):
+    return HttpResponseBadRequest("format not supported")
+
+  model_class = get_model('indivo', data_model)
+  if model_class is None:
+    raise Http404
+
+  if not query_options.get('aggregate_by'):
+    return HttpResponseBadRequest('Population queries must be aggregations: pass an aggregate_by')
+
+  # record_id and timeout aren't filters on the model: pull them out before the query sees them
+  record_ids = query_options['filters'].pop('record_id', None)
+  if record_ids is not None:
+    record_ids = [record_id for record_id in record_ids.split('|') if record_id]
+
+  try:
+    timeout = population_timeout(query_options['filters'].pop('timeout', None))
+  except ValueError:
+    return HttpResponseBadRequest('Argument timeout must be a positive number of seconds')
+
+  # marsloader's default page would silently drop groups: only page when asked to
+  if 'limit' not in request.GET:
+    query_options['limit'] = None
+
+  query = FactQuery(model_class, model_class.filter_fields, query_options, record_ids=record_ids)
+  try:
+    with statement_timeout(timeout):
+      query.execute(count=False)
+
+      # Run the query now, while the time limit holds
+      rows = iter(query.results) if query.flat_aggregation else query.results.iterator()
+      first_rows = _take(rows, CHUNK_ROWS)
+  except ValueError as e:
+    return HttpResponseBadRequest(str(e))
+  except DatabaseError:
+    # Most likely cancelled for running too long
+    logging.exception('Population query for %s failed (time limit %s seconds)' % (data_model, timeout))
+    return HttpResponse('Query did not finish within %s seconds' % timeout, status=503)
+
+  render = _json_rows if SERIALIZATION_FORMAT_MAP[response_format] == 'json' else _xml_rows
+  return HttpResponse(render(query, first_rows, rows), mimetype=response_format)
+
+def _take(rows, n):
+  taken = []
+  for row in rows:
+    taken.append(row)
+    if len(taken) >= n:
+      break
+  return taken
+
+def _chunks(first_rows, rows):
+  """ Lists of at most CHUNK_ROWS rows: *first_rows*, then the rest of *rows*. """
+  yield first_rows
+  while True:
+    chunk = _take(rows, CHUNK_ROWS)
+    if not chunk:
+      return
+    yield chunk
+
+def _group_key(query):
+  if query.group_by:
+    return query.group_by
+  if query.date_group:
+    return query.date_group['time_incr']
+  return None
+
+def _json_rows(query, first_rows, rows):
+  """ The rows as aggregate_json() renders them, a chunk at a time. """
+  group_key = _group_key(query)
+  separator = ''
+  yield '['
+  for chunk in _chunks(first_rows, rows):
+    out = []
+    for row in chunk:
+      data = {'__modelname__': 'AggregateReport', 'value': row['aggregate_value']}
+      if group_key:
+        data['group'] = row[group_key]
+      out.append(separator + simplejson.dumps(data, cls=IndivoJSONEncoder))
+      separator = ', '
+    yield ''.join(out)
+  yield ']'
+
+def _xml_rows(query, first_rows, rows):
+  """ The rows as aggregate_xml() renders them, a chunk at a time. """
+  group_key = _group_key(query)
+  yield '<AggregateReports>'
+  for chunk in _chunks(first_rows, rows):
+    out = []
+    for row in chunk:
+      group = ' group="%s"' % escape(row[group_key]) if group_key else ''
+      out.append('<AggregateReport value="%s"%s/>' % (escape(row['aggregate_value']), group))
+    yield ''.join(out).encode('utf-8')
+  yield '</AggregateReports>'
@@ -8,10 +8,12 @@
 
 from django.http import HttpResponseBadRequest, HttpResponse, Http404, HttpResponseServerError
 from django.db.models.loading import get_model
+from indivo.lib import conditional
 from indivo.lib.view_decorators import DEFAULT_ORDERBY
+from indivo.lib.instrumentation import timed, SERIALIZE
 from indivo.lib.query import FactQuery
 from indivo.lib.rdf import PatientGraph
-from indivo.models import StatusName, Allergy, AllergyExclusion
+from indivo.models import StatusName, Allergy, AllergyExclusion, RecordVersion
 from .generic import _generic_list
 
 SMART_URLS_TO_DATAMODELS = {
@@ -29,7 +31,7 @@ def get_default_query_args():
     return {
         'offset': 0,
         'order_by': '-%s'%DEFAULT_ORDERBY,
-        'status': StatusName.objects.get(name='active'),
+        'status': StatusName.cached.get('active'),
         'group_by': None,
         'aggregate_by': None,
         'date_range': None,
@@ -46,6 +48,14 @@ def smart_generic(request, record, model_name):
         raise Http404
     return _generic_list(request, default_query_args, data_model_name, response_format="application/rdf+xml", record=record)
 
+def _conditional(request, record, build, *parts):
+    """ *build()*'s response, or a :http:statuscode:`304` if the request's If-None-Match header has its ETag, from *record*'s version. """
+    version = RecordVersion.current(record.id)
+    if not version:
+        return build()
+    return conditional.lazy_response(request, build, etag=version.etag('smart', *parts),
+                                     last_modified=version.changed_at)
+
 def smart_allergies(request, record):
     """ SMART allergy list, serialized as RDF/XML.
     
@@ -53,6 +63,9 @@ def smart_allergies(request, record):
     
     """
 
+    return _conditional(request, record, lambda: _smart_allergies(record), 'allergies')
+
+def _smart_allergies(record):
     default_query_args = get_default_query_args()  
     allergies_query = FactQuery(Allergy, Allergy.filter_fields, default_query_args, record, None)
     exclusions_query = FactQuery(AllergyExclusion, AllergyExclusion.filter_fields, default_query_args, record, None)
@@ -63,13 +76,19 @@ def smart_allergies(request, record):
     except ValueError as e:
         return HttpResponseBadRequest(str(e))
     
-    graph = PatientGraph(record)
-    graph.addAllergyList(allergies_query.results.iterator())
-    graph.addAllergyExclusions(exclusions_query.results.iterator())
-    return HttpResponse(graph.toRDF(), mimetype='application/rdf+xml')
+    with timed(SERIALIZE):
+        graph = PatientGraph(record)
+        graph.addAllergyList(allergies_query.results.iterator())
+        graph.addAllergyExclusions(exclusions_query.results.iterator())
+        data = graph.toRDF()
+    return HttpResponse(data, mimetype='application/rdf+xml')
 
 def smart_generic_instance(request, record, model_name, model_id):
     """Retrieve a specific instance of a SMART model."""
+    return _conditional(request, record, lambda: _smart_generic_instance(record, model_name, model_id),
+                        model_name, model_id)
+
+def _smart_generic_instance(record, model_name, model_id):
     data_model_name = SMART_URLS_TO_DATAMODELS.get(model_name, None)
     if not data_model_name:
         # model mapping not found
@@ -84,7 +103,8 @@ def smart_generic_instance(request, record, model_name, model_id):
         model_instance = model_class.objects.filter(id=model_id)
         if model_instance.count() == 1:
             # found
-            data = model_class.to_rdf(model_instance, 1, record)
+            with timed(SERIALIZE):
+                data = model_class.to_rdf(model_instance, 1, record)
             return HttpResponse(data, mimetype='application/rdf+xml')
         elif model_instance.count() > 1:
             # more than a single instance found
@@ -101,16 +121,21 @@ def smart_allergies_instance(request, record, model_id):
     SMART allergies can be an Allergy or an AllergyExclusion
     
     """
+    return _conditional(request, record, lambda: _smart_allergies_instance(record, model_id), 'allergies', model_id)
+
+def _smart_allergies_instance(record, model_id):
     try:
         # Allergy and AllergyExclusion IDs are non-overlapping, so we can search
         # for them sequentially
         instance = Allergy.objects.filter(id=model_id)
         if instance.count() == 1:
-            data = Allergy.to_rdf(instance, 1, record)
+            with timed(SERIALIZE):
+                data = Allergy.to_rdf(instance, 1, record)
         else:
             instance = AllergyExclusion.objects.filter(id=model_id)
             if instance.count() == 1:
-                data = AllergyExclusion.to_rdf(instance, 1, record)
+                with timed(SERIALIZE):
+                    data = AllergyExclusion.to_rdf(instance, 1, record)
             else:
                 raise Http404
     except ValueError as e:
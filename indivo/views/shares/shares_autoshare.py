@@ -35,7 +35,7 @@ def autoshare_list(request, record):
   autoshares = []
   if request.GET.has_key(TYPE):
     try:
-      docschema = DocumentSchema.objects.get(type = DocumentProcessing.expand_schema(request.GET[TYPE]))
+      docschema = DocumentSchema.cached.get(DocumentProcessing.expand_schema(request.GET[TYPE]))
     except DocumentSchema.DoesNotExist:
       raise Http404
     carenets = [autoshare.carenet for autoshare in CarenetAutoshare.objects.select_related().filter(
@@ -82,7 +82,7 @@ def autoshare_create(request, record, carenet):
   TYPE = 'type'
   if request.POST.has_key(TYPE):
     try:
-      docschema = DocumentSchema.objects.get(type = DocumentProcessing.expand_schema(request.POST[TYPE]))
+      docschema = DocumentSchema.cached.get(DocumentProcessing.expand_schema(request.POST[TYPE]))
     except DocumentSchema.DoesNotExist:
       raise Http404
     CarenetAutoshare.objects.create(record  = record, 
@@ -109,7 +109,7 @@ def autoshare_delete(request, record, carenet):
   TYPE = 'type'
   if request.POST.has_key(TYPE):
     try:
-      docschema = DocumentSchema.objects.get(type = DocumentProcessing.expand_schema(request.POST[TYPE]))
+      docschema = DocumentSchema.cached.get(DocumentProcessing.expand_schema(request.POST[TYPE]))
     except DocumentSchema.DoesNotExist:
       raise Http404
     CarenetAutoshare.objects.filter(record  = record, 
@@ -101,7 +101,7 @@ def carenet_document_list(request, carenet, query_options):
   try:
     doc_type_uri = request.GET.get('type', None)
     if doc_type_uri:
-      requested_doc_type = DocumentSchema.objects.get(type = doc_type_uri)
+      requested_doc_type = DocumentSchema.cached.get(doc_type_uri)
     else:
       requested_doc_type = None
   except DocumentSchema.DoesNotExist:
@@ -134,7 +134,7 @@ def carenet_document(request, carenet, document_id):
     raise Http404
 
   if document_in_carenet(carenet, document_id):
-    return _render_document(document)
+    return _render_document(request, document)
   else: 
     raise Http404
 
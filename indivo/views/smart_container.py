@@ -7,17 +7,28 @@
 """
 
 from base import *
-import urllib2
+from indivo.lib import conditional, smart_ontology as ontology
 
 def smart_ontology(request):
-    """Fetch the SMART ontology as RDF/XML."""
+    """Fetch the SMART ontology as RDF/XML.
 
-    # just fetch it from the smart server
-    # TODO: cache this file and serve it statically
-    url = 'http://sandbox-api.smartplatforms.org/ontology'
+    Served from the copy that ships with Indivo (see
+    :py:mod:`indivo.lib.smart_ontology`), with an ETag and caching headers.
+    Will return :http:statuscode:`304` if the request's If-None-Match header
+    has the ontology's ETag, or :http:statuscode:`503` if the file is missing.
 
-    ontology = urllib2.urlopen(url).read()
-    return HttpResponse(ontology, mimetype="application/rdf+xml")
+    """
+
+    try:
+        body, etag, modified = ontology.load()
+    except (IOError, OSError), e:
+        logging.error('Cannot read the SMART ontology file (run manage.py refresh_smart_ontology): %s' % e)
+        return HttpResponse('The SMART ontology is not available', status=503, mimetype='text/plain')
+
+    response = conditional.lazy_response(request, lambda: HttpResponse(body, mimetype='application/rdf+xml'),
+                                         etag=etag, last_modified=datetime.datetime.fromtimestamp(modified))
+    response['Cache-Control'] = 'public, max-age=%d' % ontology.max_age()
+    return response
 
 def smart_capabilities(request):
     """SMART Capabilities"""
@@ -4,6 +4,7 @@ from xml.dom import minidom
 import datasections
 from django.conf import settings
 from indivo.models import PHA, MachineApp
+from indivo.lib import manifest_cache
 
 class AppSyncer(object):
 	def __init__(self, app_paths=None):
@@ -37,6 +38,9 @@ class AppSyncer(object):
 			print "\tMachine App %s no longer registered. Deleting..." % app.email
 			app.delete()
 
+		# have every server process drop its serialized manifests (see indivo.lib.manifest_cache)
+		manifest_cache.invalidate()
+
 	def sync_app_dir(self, dir_path, user_app=True, verbosity=True):
 		for app_dir in os.listdir(dir_path):
 			full_app_path = os.path.join(dir_path, app_dir)